@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for /ai/analyze-locations-batch against mocked upstreams.
+Geocoding and weather are replaced with fixed-latency async stubs so the
+numbers reflect the pipeline, not the network.
+
+    python benchmarks/bench_batch_analysis.py --sizes 100 1000 10000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from server import BatchLocationRequest, LocationAnalysisRequest
+
+
+def install_mock_upstreams(latency_s: float, failure_rate: float):
+    """Swap geocoding and weather for stubs with a fixed latency"""
+    analyzer = server.location_analyzer
+
+    async def fake_address(lat, lon):
+        await asyncio.sleep(latency_s)
+        if random.random() < failure_rate:
+            raise RuntimeError("mock geocoder failure")
+        return {
+            'formatted_address': f"Mock Road, Mock City ({lat:.4f}, {lon:.4f})",
+            'components': {'road': 'Mock Road', 'city': 'Delhi', 'house_number': '12'},
+            'source': 'mock',
+            'accuracy': 'high'
+        }
+
+    async def fake_weather(lat, lon):
+        await asyncio.sleep(latency_s)
+        return {'temperature': 25.0, 'condition': 'clear'}
+
+    analyzer.geocoder.get_real_address = fake_address
+    analyzer._get_weather_data = fake_weather
+
+
+def make_locations(count: int, duplicate_ratio: float):
+    locations = []
+    for i in range(count):
+        if locations and random.random() < duplicate_ratio:
+            locations.append(dict(random.choice(locations)))
+            continue
+        locations.append({
+            'latitude': 28.4 + random.random() * 0.5,
+            'longitude': 77.0 + random.random() * 0.5,
+            'hour': 21,
+            'day_of_week': 4,
+            'time_of_day': 'night'
+        })
+    return locations
+
+
+async def run_sequential(locations):
+    """The previous implementation: one location at a time (failures skipped so timing completes)"""
+    for location in locations:
+        try:
+            await server.location_analyzer.analyze_complete_location(LocationAnalysisRequest(**location))
+        except RuntimeError:
+            continue
+
+
+async def run_pipeline(locations):
+    return await server.analyze_locations_batch(BatchLocationRequest(locations=locations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--concurrency', type=int, default=server.BATCH_CONCURRENCY)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.01)
+    parser.add_argument('--sequential-max', type=int, default=1000,
+                        help="skip the sequential baseline above this batch size")
+    args = parser.parse_args()
+
+    random.seed(42)
+    server.logger.disabled = True
+    server.logging.getLogger('models.location_analyzer').disabled = True
+    install_mock_upstreams(args.latency_ms / 1000.0, args.failure_rate)
+    server.BATCH_CONCURRENCY = args.concurrency
+
+    print(f"{'items':>8} {'unique':>8} {'failed':>7} {'pipeline s':>11} {'items/s':>10} {'sequential s':>13} {'speedup':>8}")
+    for size in args.sizes:
+        locations = make_locations(size, args.duplicate_ratio)
+
+        start = time.perf_counter()
+        result = asyncio.run(run_pipeline(locations))
+        pipeline_s = time.perf_counter() - start
+
+        sequential = '-'
+        speedup = '-'
+        if size <= args.sequential_max:
+            start = time.perf_counter()
+            asyncio.run(run_sequential(locations))
+            sequential_s = time.perf_counter() - start
+            sequential = f"{sequential_s:.2f}"
+            speedup = f"{sequential_s / pipeline_s:.1f}x"
+
+        summary = result['summary']
+        print(f"{size:>8} {summary['unique_locations']:>8} {summary['failed']:>7} {pipeline_s:>11.2f} "
+              f"{size / pipeline_s:>10.0f} {sequential:>13} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Per-turn latency of the conversation fallback as a conversation grows: re-reading
+chat_history every turn versus the per-session running counts.
+
+    python benchmarks/bench_conversation_turns.py --turns 500 --report 10 100 250 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.conversational_assistant import ConversationSessionStore, generate_response
+
+MESSAGES = ["I am walking alone at night and feel a bit scared", "where am i, I think I'm lost",
+            "can you give me some safety tips for the bus", "I feel sad today", "thanks, that helps",
+            "someone is following me", "is this area safe at night", "hello"]
+
+
+def run(turns, report, sessions, repeats):
+    rng = random.Random(0)
+    history, latencies = [], {}
+    for turn in range(1, turns + 1):
+        text = rng.choice(MESSAGES)
+        snapshot = sessions.sessions.get('bench') if sessions else None
+        samples = []
+        for _ in range(repeats if turn in report else 1):
+            # Repeats replay the same turn, so each starts from the same session state
+            if snapshot is not None:
+                sessions.sessions.set('bench', {**snapshot, 'intents': snapshot['intents'].copy(),
+                                                'emotions': snapshot['emotions'].copy()})
+            start = time.perf_counter()
+            reply = generate_response(text, history, 'bench' if sessions else None, sessions)
+            samples.append((time.perf_counter() - start) * 1000)
+        if turn in report:
+            latencies[turn] = sorted(samples)[len(samples) // 2]
+        history += [{'from': 'user', 'text': text}, {'from': 'bot', 'text': reply}]
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=500)
+    parser.add_argument('--report', type=int, nargs='+', default=[10, 100, 250, 500])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    full = run(args.turns, set(args.report), None, args.repeats)
+    session = run(args.turns, set(args.report), ConversationSessionStore(), args.repeats)
+    print(f"{'turn':>6} {'history msgs':>13} {'full history ms':>16} {'session ms':>11}")
+    for turn in sorted(full):
+        print(f"{turn:>6} {2 * (turn - 1):>13} {full[turn]:>16.3f} {session[turn]:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
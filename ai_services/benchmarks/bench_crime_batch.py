@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Crime prediction throughput: predict_crime_risk_batch at several batch sizes vs
+calling predict_crime_risk once per location (what /ai/predict-crime does per request).
+
+    python benchmarks/bench_crime_batch.py --crimes 100000 --batch-sizes 1 10 100 1000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from models import crime_prediction
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+
+
+def make_requests(n: int, rng: np.random.Generator):
+    return [{
+        'lat': float(28.61 + rng.normal(0, 0.03)),
+        'lon': float(77.21 + rng.normal(0, 0.03)),
+        'time_of_day': str(rng.choice(['morning', 'afternoon', 'evening', 'night'])),
+        'weather': str(rng.choice(['clear', 'rain', 'fog'])),
+        'user_profile': str(rng.choice(['alone', 'with_friends', 'public_transport'])),
+        'area_type': str(rng.choice(['residential', 'commercial', 'isolated']))
+    } for _ in range(n)]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # predictions print a line each
+        result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--crimes', type=int, default=100000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--single-limit', type=int, default=200, help="cap on per-request calls timed")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(0)
+    crimes = pd.DataFrame({
+        'latitude': 28.61 + rng.normal(0, 0.03, args.crimes),
+        'longitude': 77.21 + rng.normal(0, 0.03, args.crimes),
+        'crime_type': rng.choice(['theft', 'robbery', 'assault', 'burglary', 'fraud'], args.crimes),
+        'date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 300, args.crimes), unit='D'),
+        'area': rng.choice(['Connaught Place', 'Karol Bagh', 'Paharganj', 'Saket'], args.crimes)
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        crimes.to_csv(path, index=False)
+        crime_prediction.csv_crime_analyzer = CSVCrimeAnalyzer(path)
+
+    print(f"{'batch':>6} {'single ms/loc':>14} {'batch ms/loc':>13} {'batch loc/s':>12} {'speedup':>8}")
+    for size in args.batch_sizes:
+        requests = make_requests(size, rng)
+        sample = requests[:args.single_limit]
+        _, single_s = timed(lambda: [crime_prediction.predict_crime_risk(**r) for r in sample])
+        _, batch_s = timed(crime_prediction.predict_crime_risk_batch, requests)
+        single_ms = single_s / len(sample) * 1000
+        batch_ms = batch_s / size * 1000
+        print(f"{size:>6} {single_ms:>14.2f} {batch_ms:>13.2f} {size / batch_s:>12.0f} {single_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag while /ai/predict-crime requests run, with crime prediction run
+inline on the loop (the previous behaviour) vs on the thread or process executor.
+A synthetic crime dataset with coordinates makes each prediction do real pandas work.
+A light probe coroutine measures how long other requests would wait.
+
+    python benchmarks/bench_event_loop_lag.py --crimes 50000 --requests 40
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import server
+from models import crime_prediction
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from server import CrimePredictionRequest
+from utils.executor import CPUExecutor, EventLoopLagMonitor
+
+
+class InlineExecutor:
+    """Runs the function directly on the event loop, as the endpoint used to"""
+
+    async def run(self, func, *args, stateful: bool = False, **kwargs):
+        return func(*args, **kwargs)
+
+    def shutdown(self):
+        pass
+
+
+async def probe(stop: asyncio.Event, latencies: list):
+    """A trivial request every 10 ms; its latency is what other clients see"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        latencies.append((time.perf_counter() - start - 0.01) * 1000)
+
+
+async def run_mode(executor, requests: int, concurrency: int):
+    server.cpu_executor = executor
+    server.prediction_cache.clear()  # every request below is a distinct point, so each one computes
+    monitor = EventLoopLagMonitor(interval_s=0.01)
+    monitor.start()
+    stop, probe_latencies = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, probe_latencies))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await server.predict_crime_endpoint(CrimePredictionRequest(
+                lat=28.6 + i * 0.001, lon=77.2, time_of_day='night', weather='clear', user_profile='woman'
+            ))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    await monitor.stop()
+    lag = monitor.stats()['lag_ms']
+    return elapsed, lag, np.percentile(probe_latencies, 99) if probe_latencies else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--crimes', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(0)
+    crimes = pd.DataFrame({
+        'latitude': 28.6 + rng.normal(0, 0.02, args.crimes),
+        'longitude': 77.2 + rng.normal(0, 0.02, args.crimes),
+        'crime_type': rng.choice(['theft', 'assault', 'robbery', 'fraud'], args.crimes),
+        'date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 300, args.crimes), unit='D')
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        crimes.to_csv(path, index=False)
+        crime_prediction.csv_crime_analyzer = CSVCrimeAnalyzer(path)
+
+    print(f"{'mode':>8} {'total s':>8} {'lag avg ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'probe p99 ms':>13}")
+    for mode in ('inline', 'thread', 'process'):
+        executor = InlineExecutor() if mode == 'inline' else CPUExecutor(mode=mode, max_workers=args.workers)
+        elapsed, lag, probe_p99 = asyncio.run(run_mode(executor, args.requests, args.concurrency))
+        executor.shutdown()
+        print(f"{mode:>8} {elapsed:>8.2f} {lag['avg']:>11.1f} {lag['p99']:>11.1f} {lag['max']:>11.1f} {probe_p99:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cost of typo correction in keyword detection: microseconds per text for the
+exact matcher and the matcher with the symmetric-delete index, over texts with
+a given share of misspelled keywords; cold (unmemoized) lookups per token;
+and per-fragment latency of a voice-trigger stream with and without correction.
+
+    python benchmarks/bench_fuzzy_keywords.py --texts 20000 --words 5 20 --typo-rate 0 0.05
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.keyword_matcher import SafetyKeywordMatcher, VoiceTriggerStreams, fuzzy_keyword_index
+
+FILLER = ("i am on my way home and the place looks quiet there are people near the shop "
+          "my phone battery is fine but i do not know this area very well").split()
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+
+
+def per_item_us(func, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) * 1e6 / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=20000)
+    parser.add_argument('--words', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--typo-rate', type=float, nargs='+', default=[0.0, 0.05],
+                        help="share of words that are misspelled keywords")
+    parser.add_argument('--pool', type=int, default=5000, help="distinct texts to draw from")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = fuzzy_keyword_index().vocabulary
+    exact = SafetyKeywordMatcher()
+    fuzzy = SafetyKeywordMatcher(fuzzy=fuzzy_keyword_index())
+
+    print(f"{'words':>5} {'typos':>6} {'exact us':>9} {'fuzzy us':>9} {'added us':>9} {'decisions changed':>18}")
+    for words in args.words:
+        for typo_rate in args.typo_rate:
+            pool = [' '.join(misspell(rng, rng.choice(vocabulary)) if rng.random() < typo_rate else rng.choice(FILLER)
+                             for _ in range(rng.randint(1, words))) for _ in range(args.pool)]
+            texts = [rng.choice(pool) for _ in range(args.texts)]
+            fuzzy.analyze_many(pool)  # steady state: tokens seen before are memoized
+            exact_us = per_item_us(exact.analyze, texts)
+            fuzzy_us = per_item_us(fuzzy.analyze, texts)
+            changed = sum(exact.analyze(text) != fuzzy.analyze(text) for text in pool) / len(pool)
+            print(f"{words:>5} {typo_rate:>6.0%} {exact_us:>9.2f} {fuzzy_us:>9.2f} {fuzzy_us - exact_us:>9.2f} "
+                  f"{changed:>18.1%}")
+
+    # Lookups that miss the memo: every token is new
+    tokens = list({misspell(rng, rng.choice(vocabulary)) + rng.choice(LETTERS) * rng.randint(0, 1)
+                   for _ in range(args.texts)})
+    cold = fuzzy_keyword_index()
+    print(f"\ncold lookup: {per_item_us(cold.lookup, tokens):.1f} us/token over {len(tokens)} distinct tokens, "
+          f"{sum(cold.lookup(token) is not None for token in tokens) / len(tokens):.0%} resolved")
+
+    # Streams: fragments of 1-8 characters of a 20-word transcript
+    transcript = ' '.join(misspell(rng, rng.choice(vocabulary)) if rng.random() < 0.05 else rng.choice(FILLER)
+                          for _ in range(20))
+    fragments, position = [], 0
+    while position < len(transcript):
+        step = rng.randint(1, 8)
+        fragments.append(transcript[position:position + step])
+        position += step
+    for name, matcher in (('exact', exact), ('fuzzy', fuzzy)):
+        stream = VoiceTriggerStreams(matcher).open()
+        start = time.perf_counter()
+        for _ in range(200):
+            for fragment in fragments:
+                stream.feed(fragment)
+            stream.finish()
+        print(f"stream ({name}): {(time.perf_counter() - start) * 1e6 / (200 * len(fragments)):.2f} us/fragment")
+
+
+if __name__ == "__main__":
+    main()
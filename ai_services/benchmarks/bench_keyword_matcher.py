@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Texts per second for intent + emotion + voice-trigger detection: one
+`any(word in text ...)` chain per keyword table, the Aho-Corasick pass alone,
+and SafetyKeywordMatcher (automaton up to scan_max_chars, substring scans beyond).
+
+    python benchmarks/bench_keyword_matcher.py --texts 50000 --words 5 20 80
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.keyword_matcher import (INTENT_KEYWORDS, EMOTION_KEYWORDS, VOICE_TRIGGER_KEYWORDS,
+                                    SafetyKeywordMatcher)
+
+FILLER = ("i am on my way home and the place looks quiet there are people near the shop "
+          "my phone battery is fine but i do not know this area very well").split()
+KEYWORDS = [w for table in (INTENT_KEYWORDS, EMOTION_KEYWORDS, VOICE_TRIGGER_KEYWORDS) for _, group in table for w in group]
+
+
+def scan_tables(text):
+    text = text.lower()
+    return tuple(next((label for label, words in table if any(word in text for word in words)), default)
+                 for table, default in ((INTENT_KEYWORDS, 'general'), (EMOTION_KEYWORDS, 'neutral'),
+                                        (VOICE_TRIGGER_KEYWORDS, 'safe')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=50000)
+    parser.add_argument('--words', type=int, nargs='+', default=[5, 20, 80])
+    parser.add_argument('--keyword-rate', type=float, default=0.1, help="share of words that are keywords")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    automaton_only = SafetyKeywordMatcher(scan_max_chars=10 ** 9)
+    matcher = SafetyKeywordMatcher()
+    print(f"{'words':>6} {'chars':>6} {'scans texts/s':>14} {'automaton texts/s':>18} {'matcher texts/s':>16} {'speedup':>8}")
+    for n_words in args.words:
+        texts = [' '.join(rng.choice(KEYWORDS) if rng.random() < args.keyword_rate else rng.choice(FILLER)
+                          for _ in range(n_words)) for _ in range(args.texts)]
+        start = time.perf_counter()
+        for text in texts:
+            scan_tables(text)
+        scans = args.texts / (time.perf_counter() - start)
+        rates = []
+        for candidate in (automaton_only, matcher):
+            start = time.perf_counter()
+            for text in texts:
+                candidate.analyze(text)
+            rates.append(args.texts / (time.perf_counter() - start))
+        chars = sum(map(len, texts)) / len(texts)
+        print(f"{n_words:>6} {chars:>6.0f} {scans:>14,.0f} {rates[0]:>18,.0f} {rates[1]:>16,.0f} {rates[1] / scans:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Concurrent live-tracking sessions one worker can sustain.
+Starts a single uvicorn worker (mocked geocoding/weather) in a child process and
+connects N WebSocket clients that each send one fix per interval while walking,
+so every `--fixes-per-cell` fixes cross into a new cell. Reports round-trip
+latency for fixes that produce a push, worker CPU, and whether the worker kept up.
+Clients are spread over `--client-procs` processes; if the worker is well below
+100% CPU while latency climbs, add client processes before blaming the worker.
+
+    python benchmarks/bench_live_tracking.py --sessions 100 500 1000 2000 --duration 15
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import numpy as np
+import websockets
+
+PORT = 8765
+
+
+def run_worker(latency_s: float, ready):
+    import logging
+    import uvicorn
+    import server
+    from benchmarks.bench_batch_analysis import install_mock_upstreams
+
+    logging.disable(logging.INFO)
+    install_mock_upstreams(latency_s, 0.0)
+    config = uvicorn.Config(server.app, port=PORT, log_level='warning', ws_max_queue=64)
+    ready.set()
+    uvicorn.Server(config).run()
+
+
+async def client(index: int, args, deadline: float, latencies: list, counters: dict):
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}/ai/track?session_id=bench-{index}") as ws:
+        # Stagger starts so sessions do not all tick together
+        await asyncio.sleep(args.interval * (index % 100) / 100)
+        lat, lon = 28.4 + (index % 500) * 0.002, 77.0 + (index // 500) * 0.002
+        step = 0
+        counters['expected'] += (deadline - time.time()) / args.interval
+        while time.time() < deadline:
+            tick = time.time()
+            crosses = step % args.fixes_per_cell == 0
+            if crosses:
+                lon += 0.0011
+            fix = {'latitude': lat, 'longitude': lon + (step % 3) * 0.00001, 'hour': 21, 'day_of_week': 4}
+            await ws.send(json.dumps(fix))
+            counters['sent'] += 1
+            if crosses:
+                await ws.recv()
+                latencies.append(time.time() - tick)
+            step += 1
+            await asyncio.sleep(max(0.0, args.interval - (time.time() - tick)))
+
+
+def run_clients(first: int, count: int, args, deadline: float):
+    """One client process: `count` sessions until the shared wall-clock deadline"""
+    async def run():
+        latencies, counters = [], {'sent': 0, 'expected': 0.0}
+        results = await asyncio.gather(*(client(i, args, deadline, latencies, counters)
+                                         for i in range(first, first + count)), return_exceptions=True)
+        return latencies, counters, sum(isinstance(r, Exception) for r in results)
+    return asyncio.run(run())
+
+
+def worker_cpu_seconds(pid: int) -> float:
+    """User + system CPU time of the worker process (Linux /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return float('nan')
+
+
+def run_level(sessions: int, args, worker_pid: int):
+    cpu_before = worker_cpu_seconds(worker_pid)
+    start = time.time()
+    deadline = start + args.duration
+    per_proc = -(-sessions // args.client_procs)
+    jobs = [(first, min(per_proc, sessions - first), args, deadline) for first in range(0, sessions, per_proc)]
+    with multiprocessing.Pool(len(jobs)) as pool:
+        outputs = pool.starmap(run_clients, jobs)
+    elapsed = time.time() - start
+    worker_cpu = (worker_cpu_seconds(worker_pid) - cpu_before) / elapsed * 100
+
+    latencies = [value for output in outputs for value in output[0]]
+    sent = sum(output[1]['sent'] for output in outputs)
+    expected = sum(output[1]['expected'] for output in outputs)
+    errors = sum(output[2] for output in outputs)
+    delivered = min(1.0, sent / max(expected, 1))
+    p50, p95, p99 = (np.percentile(latencies, q) * 1000 if latencies else float('nan') for q in (50, 95, 99))
+    # Kept up: (almost) every scheduled fix went out and pushes came back within one interval
+    sustained = errors == 0 and delivered >= 0.95 and p95 < args.interval * 1000
+    print(f"{sessions:>9} {sessions / args.interval:>9.0f} {delivered:>10.1%} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+          f"{worker_cpu:>9.0f}% {errors:>7} {'yes' if sustained else 'no':>10}")
+    return sustained
+
+
+async def wait_for_port():
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', PORT)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("worker did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[100, 500, 1000, 2000])
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between fixes per session")
+    parser.add_argument('--fixes-per-cell', type=int, default=5)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="mock geocoding/weather latency")
+    parser.add_argument('--client-procs', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    worker = multiprocessing.Process(target=run_worker, args=(args.latency_ms / 1000, ready), daemon=True)
+    worker.start()
+    ready.wait()
+    try:
+        asyncio.run(wait_for_port())
+        print(f"{'sessions':>9} {'fixes/s':>9} {'delivered':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'worker cpu':>10} {'errors':>7} {'sustained':>10}")
+        for sessions in args.sessions:
+            run_level(sessions, args, worker.pid)
+    finally:
+        worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+LocalCrimeStore load throughput and radius-query latency as the table grows.
+Incidents are generated and loaded chunk by chunk, so the process never holds
+the whole dataset; resident memory is reported to show that queries do not either.
+
+    python benchmarks/bench_local_crime_store.py --rows 1000000 5000000 --queries 500
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from models.local_crime_store import LocalCrimeStore
+
+# Incidents spread over a ~100 km square around Delhi, denser towards the center
+CENTER = (28.61, 77.21)
+
+
+def frames(rows: int, chunk: int, rng: np.random.Generator):
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        yield pd.DataFrame({
+            'latitude': CENTER[0] + rng.normal(0, 0.2, n),
+            'longitude': CENTER[1] + rng.normal(0, 0.2, n),
+            'crime_type': rng.choice(['theft', 'robbery', 'burglary', 'assault', 'fraud'], n),
+            'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 730, n), unit='D'),
+            'area': rng.choice(['North', 'South', 'East', 'West'], n)
+        })
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--radius-km', type=float, nargs='+', default=[0.5, 1.0, 2.0])
+    parser.add_argument('--chunk', type=int, default=200000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>10} {'load s':>7} {'rows/s':>9} {'db MB':>7} {'radius':>6} {'filter':>8} "
+          f"{'hits':>7} {'p50 ms':>7} {'p99 ms':>7} {'max RSS MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalCrimeStore(os.path.join(tmp, 'crimes.db'))
+        loaded = 0
+        for rows in sorted(args.rows):
+            start = time.perf_counter()
+            added = store.load_frames(frames(rows - loaded, args.chunk, rng), args.chunk)
+            loaded += added
+            load_s = time.perf_counter() - start
+            db_mb = os.path.getsize(store.db_path) / 1e6
+
+            query_lat = CENTER[0] + rng.normal(0, 0.1, args.queries)
+            query_lon = CENTER[1] + rng.normal(0, 0.1, args.queries)
+            for radius in args.radius_km:
+                for label, filters in (('none', {}), ('3 months', {'month_from': '2025-10'})):
+                    latencies, hits = [], 0
+                    for lat, lon in zip(query_lat, query_lon):
+                        t = time.perf_counter()
+                        hits += len(store.query(lat, lon, radius, **filters))
+                        latencies.append((time.perf_counter() - t) * 1000)
+                    print(f"{loaded:>10} {load_s:>7.1f} {added / max(load_s, 1e-9):>9.0f} {db_mb:>7.0f} "
+                          f"{radius:>6.1f} {label:>8} {hits / args.queries:>7.0f} {np.percentile(latencies, 50):>7.2f} "
+                          f"{np.percentile(latencies, 99):>7.2f} {rss_mb():>10.0f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Instrumentation overhead: nanoseconds per counter increment, histogram
+observation (with and without the label lookup) and timed block, the extra
+cost of MetricsMiddleware per ASGI request, and the time to render /metrics
+for a given number of labeled series.
+
+    python benchmarks/bench_metrics.py --n 200000 --series 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def per_call_ns(func, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) * 1e9 / n
+
+
+def timed_block(histogram):
+    with histogram.time():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=200000)
+    parser.add_argument('--series', type=int, default=200, help="labeled histogram series to render")
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter('calls_total', "Calls", labels=('provider', 'outcome'))
+    histogram = registry.histogram('stage_seconds', "Stages", labels=('stage',))
+    child = histogram.labels('geocode')
+    baseline = per_call_ns(lambda: None, args.n)
+
+    print(f"{'operation':<32} {'ns':>8}")
+    for name, func in (('counter.labels().inc()', lambda: counter.labels('geo', 'ok').inc()),
+                       ('histogram child observe()', lambda: child.observe(0.0123)),
+                       ('histogram.labels().observe()', lambda: histogram.labels('geocode').observe(0.0123)),
+                       ('with histogram.labels().time()', lambda: timed_block(histogram.labels('geocode')))):
+        print(f"{name:<32} {per_call_ns(func, args.n) - baseline:>8.0f}")
+
+    # Middleware: a minimal ASGI app with and without it
+    class Route:
+        path = '/ai/analyze-location'
+
+    async def app(scope, receive, send):
+        scope['route'] = Route
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'{}'})
+
+    async def send(message):
+        pass
+
+    async def requests_ns(asgi, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            await asgi({'type': 'http', 'method': 'POST', 'path': '/ai/analyze-location'}, None, send)
+        return (time.perf_counter() - start) * 1e9 / n
+
+    wrapped = MetricsMiddleware(app, registry.histogram('http_seconds', "Requests", labels=('method', 'route', 'status')))
+    n = args.n // 4
+    plain_ns, wrapped_ns = asyncio.run(requests_ns(app, n)), asyncio.run(requests_ns(wrapped, n))
+    print(f"{'middleware per request':<32} {wrapped_ns - plain_ns:>8.0f}")
+
+    for i in range(args.series):
+        histogram.labels(f"stage_{i}").observe(i / 1000)
+    start = time.perf_counter()
+    text = registry.render()
+    print(f"\nrender: {(time.perf_counter() - start) * 1000:.2f} ms for {args.series + 1} histogram series, "
+          f"{len(text.splitlines())} lines, {len(text) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pattern engine cost per user: initial ingest of a full history, an incremental
+update with one new day of points, and cluster extraction on its own.
+
+    python benchmarks/bench_pattern_analysis.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from models.safety_predictor import SafetyPredictor
+from models.pattern_analyzer import PatternAnalyzer
+
+START_MS = 1790812800000  # 2026-10-01T00:00:00Z
+
+
+def make_history(points: int, days: int, places: int, rng: np.random.Generator):
+    """GPS fixes spread over `days`, 90% around a few frequent places and 10% in transit"""
+    centers = np.column_stack([18.52 + rng.normal(0, 0.05, places), 73.85 + rng.normal(0, 0.05, places)])
+    owner = rng.integers(0, places, points)
+    lat = centers[owner, 0] + rng.normal(0, 0.0003, points)
+    lon = centers[owner, 1] + rng.normal(0, 0.0003, points)
+    transit = rng.random(points) < 0.1
+    lat[transit] = 18.52 + rng.normal(0, 0.08, transit.sum())
+    lon[transit] = 73.85 + rng.normal(0, 0.08, transit.sum())
+    ts = START_MS + np.sort(rng.integers(0, days * 86400 * 1000, points))
+    safety = np.round(rng.uniform(3, 10, points), 1)
+    return [
+        {'latitude': a, 'longitude': b, 'timestamp': int(t), 'safety_score': s}
+        for a, b, t, s in zip(lat.tolist(), lon.tolist(), ts.tolist(), safety.tolist())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--places', type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'points':>9} {'initial ms':>11} {'+1 day ms':>10} {'clusters ms':>12} {'cells':>7} {'clusters':>9}")
+    for size in args.sizes:
+        history = make_history(size, args.days + 1, args.places, rng)
+        split = len(history) - len(history) // (args.days + 1)
+        analyzer = PatternAnalyzer(SafetyPredictor())
+
+        start = time.perf_counter()
+        analyzer.analyze('bench', history[:split], days=args.days)
+        initial_ms = (time.perf_counter() - start) * 1000
+
+        # Node resends the whole history; only the newest day should cost anything
+        start = time.perf_counter()
+        result = analyzer.analyze('bench', history, days=args.days)
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        state = analyzer.get_state('bench')
+        state._clusters = None
+        start = time.perf_counter()
+        state.clusters(analyzer.min_points)
+        cluster_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>9} {initial_ms:>11.1f} {incremental_ms:>10.1f} {cluster_ms:>12.1f} "
+              f"{len(state.cells):>7} {len(result['frequent_locations']):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory of the preforked server (WEB_WORKERS=N python server.py)
+against uvicorn's own --workers, where every worker imports the app and loads
+the data itself. Drives /ai/classify-text-batch with concurrent keep-alive
+clients and reads RSS/PSS/USS of every server process from /proc. The load
+generator runs on the same machine, so scaling tops out below the core count.
+
+    python benchmarks/bench_prefork.py --workers 1 2 4 --duration 10 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from utils.executor import summarize_samples
+from utils.prefork import memory_usage
+
+PORT = 8767
+TEXTS = ["help me please", "where am i", "is this road safe at night", "I am scared", "ok thanks"] * 4
+
+
+def start_server(mode: str, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, PORT=str(PORT), WEB_WORKERS=str(workers))
+    if mode == 'prefork':
+        command = [sys.executable, 'server.py']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'server:app', '--port', str(PORT), '--workers', str(workers)]
+    return subprocess.Popen(command + (['--log-level', 'warning'] if mode != 'prefork' else []), cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+async def wait_ready(session: aiohttp.ClientSession, workers: int, timeout_s: float = 60):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            async with session.get(f"http://127.0.0.1:{PORT}/health") as response:
+                if response.status == 200:
+                    await asyncio.sleep(1.0 + 0.5 * workers)  # let every worker finish starting
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def load(duration_s: float, concurrency: int):
+    latencies, errors = [], 0
+    connector = aiohttp.TCPConnector(limit=concurrency, force_close=False)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        deadline = time.perf_counter() + duration_s
+
+        async def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    async with session.post(f"http://127.0.0.1:{PORT}/ai/classify-text-batch",
+                                            json={'texts': TEXTS}) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                            continue
+                except aiohttp.ClientError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def run(mode: str, workers: int, args) -> dict:
+    server = start_server(mode, workers)
+    try:
+        async with aiohttp.ClientSession() as session:
+            await wait_ready(session, workers)
+        await load(1.0, args.concurrency)  # warm-up
+        latencies, errors = await load(args.duration, args.concurrency)
+        processes = children(server.pid)
+        if mode == 'uvicorn':
+            # uvicorn's supervisor may sit between us and the workers
+            processes = [child for pid in processes for child in (children(pid) or [pid])]
+        memory = [memory_usage(pid) for pid in processes]
+        memory = [m for m in memory if m]
+        parent = memory_usage(server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    summary = summarize_samples(latencies)
+    return {
+        'rps': len(latencies) / args.duration,
+        'p50': summary.get('p50', 0.0), 'p99': summary.get('p99', 0.0), 'errors': errors,
+        'parent_rss': parent.get('rss_mb', 0.0),
+        'worker_rss': sum(m['rss_mb'] for m in memory) / len(memory) if memory else 0.0,
+        'worker_uss': sum(m['uss_mb'] for m in memory) / len(memory) if memory else 0.0,
+        'total_pss': parent.get('pss_mb', 0.0) + sum(m['pss_mb'] for m in memory)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--modes', nargs='+', default=['prefork', 'uvicorn'], choices=['prefork', 'uvicorn'])
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs; {len(TEXTS)} texts per request, {args.concurrency} clients, {args.duration:.0f}s")
+    print(f"{'mode':<8} {'workers':>7} {'req/s':>8} {'scaling':>8} {'p50 ms':>7} {'p99 ms':>7} {'errors':>6} "
+          f"{'parent RSS':>10} {'worker RSS':>10} {'worker USS':>10} {'total PSS':>9}")
+    for mode in args.modes:
+        baseline = None
+        for workers in args.workers:
+            result = asyncio.run(run(mode, workers, args))
+            baseline = baseline or result['rps']
+            print(f"{mode:<8} {workers:>7} {result['rps']:>8.0f} {result['rps'] / baseline:>7.2f}x "
+                  f"{result['p50']:>7.1f} {result['p99']:>7.1f} {result['errors']:>6} {result['parent_rss']:>10.1f} "
+                  f"{result['worker_rss']:>10.1f} {result['worker_uss']:>10.1f} {result['total_pss']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
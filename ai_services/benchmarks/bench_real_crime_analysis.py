@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Per-stage cost of RealCrimeAnalyzer.analyze_location_crime_risk as the number
+of fetched incidents grows. Fetching is replaced by a prepared incident list so
+the numbers cover normalization and the statistics only.
+
+    python benchmarks/bench_real_crime_analysis.py --incidents 1000 10000 100000 --runs 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.real_crime_analyzer import RealCrimeAnalyzer
+
+
+def incidents(n: int, rng: random.Random):
+    now = datetime.now()
+    months = [(now - timedelta(days=30 * k)).strftime('%Y-%m') for k in range(12)]
+    categories = ['theft', 'burglary', 'robbery', 'drugs', 'violent-crime', 'vehicle-crime', 'public-order']
+    return [{
+        'id': f"incident_{i}",
+        'category': rng.choice(categories),
+        'location': {'latitude': 28.6 + rng.random() / 50, 'longitude': 77.2 + rng.random() / 50, 'street': 'Main Street'},
+        'date': rng.choice(months),
+        'outcome_status': 'Under investigation',
+        'severity': rng.randint(1, 10)
+    } for i in range(n)]
+
+
+async def run(args):
+    rng = random.Random(0)
+    stages = [s for s in RealCrimeAnalyzer.ANALYSIS_STAGES if s != 'fetch']
+    print(f"{'incidents':>10} " + ' '.join(f"{s + ' ms':>14}" for s in stages) + f" {'total ms':>9}")
+    for n in args.incidents:
+        crime_data = incidents(n, rng)
+        async with RealCrimeAnalyzer() as analyzer:
+            async def fetch(lat, lon, radius_km):
+                return crime_data
+
+            analyzer._fetch_crime_data = fetch
+            for _ in range(args.runs):
+                await analyzer.analyze_location_crime_risk(28.61, 77.21)
+            breakdown = analyzer.stats()['analysis_stages_ms']
+        p50 = [breakdown[s]['p50'] for s in stages]
+        print(f"{n:>10} " + ' '.join(f"{v:>14.2f}" for v in p50) + f" {sum(p50):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--incidents', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Route scoring: one batched pass vs scoring each sample point on its own
+(what hundreds of sequential /ai/predict-crime calls would do, minus HTTP).
+
+    python benchmarks/bench_route_scoring.py --km 20 --crimes 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from models.safety_predictor import SafetyPredictor
+from models.route_scorer import RouteScorer
+from utils.geo import densify_polyline
+
+
+def make_route(km: float, vertices: int, rng: np.random.Generator):
+    """A wandering route of roughly `km` kilometers through Pune"""
+    step_deg = km / vertices / 111.32
+    heading = np.cumsum(rng.normal(0, 0.4, vertices))
+    lats = 18.45 + np.concatenate([[0], np.cumsum(np.cos(heading) * step_deg)])
+    lons = 73.80 + np.concatenate([[0], np.cumsum(np.sin(heading) * step_deg)])
+    return [{'latitude': a, 'longitude': b} for a, b in zip(lats.tolist(), lons.tolist())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--km', type=float, default=20)
+    parser.add_argument('--vertices', type=int, default=200)
+    parser.add_argument('--spacing', type=float, default=50)
+    parser.add_argument('--crimes', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    crimes = pd.DataFrame({
+        'latitude': 18.52 + rng.normal(0, 0.08, args.crimes),
+        'longitude': 73.85 + rng.normal(0, 0.08, args.crimes),
+        'crime_type': rng.choice(['theft', 'assault', 'robbery', 'fraud'], args.crimes)
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        crimes.to_csv(path, index=False)
+        analyzer = CSVCrimeAnalyzer(path)
+
+    predictor = SafetyPredictor()
+    scorer = RouteScorer(predictor, analyzer)
+    route = make_route(args.km, args.vertices, rng)
+
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        result = scorer.score_route(route, hour=21, day_of_week=4, spacing_m=args.spacing, crime_radius_km=0.5)
+    batched_ms = (time.perf_counter() - start) / args.repeats * 1000
+    samples = result['summary']['samples']
+
+    sample_lat, sample_lon, _, _ = densify_polyline(
+        [p['latitude'] for p in route], [p['longitude'] for p in route], result['summary']['spacing_m'])
+    start = time.perf_counter()
+    for lat, lon in zip(sample_lat.tolist(), sample_lon.tolist()):
+        analyzer.analyze_location_crime_risk(lat, lon, radius_km=0.5)
+        predictor.predict_safety_score({'hour': 21, 'day_of_week': 4})
+    sequential_ms = (time.perf_counter() - start) * 1000
+
+    print(f"route {result['summary']['total_km']} km, {samples} samples, {args.crimes} crimes indexed")
+    print(f"batched:    {batched_ms:8.2f} ms")
+    print(f"per-sample: {sequential_ms:8.2f} ms ({sequential_ms / batched_ms:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
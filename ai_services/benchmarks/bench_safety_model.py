@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Batched CPU inference latency for the trained safety-model backends vs the rule table.
+
+    python benchmarks/bench_safety_model.py --trees 100 --depth 6
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from models.safety_predictor import SafetyPredictor, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES
+from models.safety_model import TreeEnsembleSafetyModel, fit_linear_model_from_rules, N_FEATURES
+
+
+def random_tree_ensemble(trees: int, depth: int, rng: np.random.Generator) -> TreeEnsembleSafetyModel:
+    """Complete binary trees of the given depth with random splits on one-hot features"""
+    nodes = 2 ** (depth + 1) - 1
+    internal = 2 ** depth - 1
+    index = np.arange(nodes)
+    left = np.where(index < internal, 2 * index + 1, -1)
+    right = np.where(index < internal, 2 * index + 2, -1)
+    return TreeEnsembleSafetyModel(
+        feature=rng.integers(0, N_FEATURES, (trees, nodes)),
+        threshold=np.full((trees, nodes), 0.5),
+        left=np.tile(left, (trees, 1)),
+        right=np.tile(right, (trees, 1)),
+        value=rng.normal(0, 0.05, (trees, nodes)),
+        base_score=6.5,
+        version='bench'
+    )
+
+
+def time_backend(predictor: SafetyPredictor, columns, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predictor.predict_safety_scores(*columns)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000, 1000000])
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=6)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rules = SafetyPredictor()
+    linear = SafetyPredictor()
+    linear.model = fit_linear_model_from_rules(rules._score_table.array, 'bench')
+    tree = SafetyPredictor()
+    tree.model = random_tree_ensemble(args.trees, args.depth, rng)
+
+    print(f"{'batch':>9} {'rules ms':>10} {'linear ms':>10} {'tree ms':>10} {'tree us/row':>12}")
+    for size in args.sizes:
+        columns = (
+            rng.integers(0, 24, size), rng.integers(0, 7, size), rng.integers(0, len(AREA_TYPES), size),
+            rng.integers(0, len(WEATHER_CONDITIONS), size), rng.integers(0, len(CITY_SIZES), size)
+        )
+        repeats = max(1, 100000 // size)
+        rules_ms = time_backend(rules, columns, repeats)
+        linear_ms = time_backend(linear, columns, repeats)
+        tree_ms = time_backend(tree, columns, max(1, repeats // 10))
+        print(f"{size:>9} {rules_ms:>10.3f} {linear_ms:>10.3f} {tree_ms:>10.3f} {tree_ms * 1000 / size:>12.3f}")
+
+    print(f"\nLinear backend stats: {linear.get_model_status()['inference']}")
+
+
+if __name__ == "__main__":
+    main()
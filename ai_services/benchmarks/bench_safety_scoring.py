@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+SafetyPredictor scoring at 10^3 to 10^7 rows: vectorized table reads vs the
+per-row scalar path (table lookup) vs evaluating the rules directly.
+
+    python benchmarks/bench_safety_scoring.py --max-power 7 --scalar-max-power 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from models.safety_predictor import SafetyPredictor, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES
+
+
+def make_columns(rows: int, rng: np.random.Generator):
+    return (
+        rng.integers(0, 24, rows),
+        rng.integers(0, 7, rows),
+        rng.integers(0, len(AREA_TYPES), rows),
+        rng.integers(0, len(WEATHER_CONDITIONS), rows),
+        rng.integers(0, len(CITY_SIZES), rows),
+    )
+
+
+def score_scalar(predictor: SafetyPredictor, columns):
+    hours, days, areas, weathers, cities = (c.tolist() for c in columns)
+    return [
+        predictor.predict_safety_score({
+            'hour': h, 'day_of_week': d, 'area_type': AREA_TYPES[a],
+            'weather': {'condition': WEATHER_CONDITIONS[w]}, 'city_size': CITY_SIZES[c]
+        })
+        for h, d, a, w, c in zip(hours, days, areas, weathers, cities)
+    ]
+
+
+def score_rules(predictor: SafetyPredictor, columns):
+    hours, days, areas, weathers, cities = (c.tolist() for c in columns)
+    return [
+        predictor._rule_safety_score(h, d, AREA_TYPES[a], WEATHER_CONDITIONS[w], CITY_SIZES[c])
+        for h, d, a, w, c in zip(hours, days, areas, weathers, cities)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-power', type=int, default=3)
+    parser.add_argument('--max-power', type=int, default=7)
+    parser.add_argument('--scalar-max-power', type=int, default=5, help="skip the scalar loop above 10^N rows")
+    args = parser.parse_args()
+
+    predictor = SafetyPredictor()
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>10} {'vector ms':>10} {'rows/s':>12} {'scalar ms':>10} {'rules ms':>10} {'speedup':>8} {'identical':>9}")
+    for power in range(args.min_power, args.max_power + 1):
+        rows = 10 ** power
+        columns = make_columns(rows, rng)
+
+        start = time.perf_counter()
+        scores = predictor.predict_safety_scores(*columns)
+        vector_s = time.perf_counter() - start
+
+        scalar_ms = rules_ms = speedup = identical = '-'
+        if power <= args.scalar_max_power:
+            start = time.perf_counter()
+            expected = score_scalar(predictor, columns)
+            scalar_s = time.perf_counter() - start
+            start = time.perf_counter()
+            from_rules = score_rules(predictor, columns)
+            rules_s = time.perf_counter() - start
+            scalar_ms = f"{scalar_s * 1000:.1f}"
+            rules_ms = f"{rules_s * 1000:.1f}"
+            speedup = f"{rules_s / vector_s:.0f}x"
+            identical = str(scores.tolist() == expected == from_rules)
+
+        print(f"{rows:>10} {vector_s * 1000:>10.1f} {rows / vector_s:>12.0f} {scalar_ms:>10} {rules_ms:>10} {speedup:>8} {identical:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cold start of a fresh replica: import time of server.py, time from process
+start until /health answers, and latency of the first crime prediction and
+route score (which need the crime data), with and without the background
+warm-up. --root points at another checkout (e.g. a git worktree of an older
+commit) to compare against it.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --root /tmp/baseline/ai_services
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.startup_profile import profile_imports
+
+PORT = 8768
+PREDICTION = {'lat': 28.6139, 'lon': 77.2090, 'time_of_day': 'night', 'weather': 'clear', 'user_profile': 'alone'}
+ROUTE = {'points': [{'latitude': 28.6139, 'longitude': 77.2090}, {'latitude': 28.6239, 'longitude': 77.2190}]}
+
+
+def request_ms(path: str, body: dict = None) -> float:
+    start = time.perf_counter()
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f"http://127.0.0.1:{PORT}{path}", data=data,
+                                     headers={'content-type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_start(root: str, warm_up: bool, settle_s: float) -> dict:
+    env = dict(os.environ, PORT=str(PORT), STARTUP_WARMUP='1' if warm_up else '0')
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'server.py'], cwd=root, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                request_ms('/health')
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if time.perf_counter() - start > 60:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.01)
+        ready_ms = (time.perf_counter() - start) * 1000
+        # A load balancer sends traffic shortly after the first health check passes
+        time.sleep(settle_s)
+        return {'ready_ms': ready_ms, 'first_prediction_ms': request_ms('/ai/predict-crime', PREDICTION),
+                'first_route_ms': request_ms('/ai/score-route', ROUTE)}
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--root', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="directory containing server.py")
+    parser.add_argument('--settle', type=float, default=0.0, help="seconds between readiness and the first request")
+    args = parser.parse_args()
+
+    imports = [profile_imports('server', cwd=args.root) for _ in range(args.runs)]
+    print(f"import server: {statistics.median(p['import_ms'] for p in imports):.0f} ms "
+          f"({statistics.median(p['wall_ms'] for p in imports):.0f} ms with interpreter start), "
+          f"deferred: {', '.join(imports[0]['deferred']) or 'none'}")
+
+    print(f"\n{'warm-up':<8} {'ready ms':>9} {'1st predict ms':>15} {'1st route ms':>13}  (median of {args.runs})")
+    for warm_up in (False, True):
+        runs = [cold_start(args.root, warm_up, args.settle) for _ in range(args.runs)]
+        print(f"{'on' if warm_up else 'off':<8} {statistics.median(r['ready_ms'] for r in runs):>9.0f} "
+              f"{statistics.median(r['first_prediction_ms'] for r in runs):>15.1f} "
+              f"{statistics.median(r['first_route_ms'] for r in runs):>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-result and peak memory for /ai/analyze-locations-stream,
+compared with the buffered /ai/analyze-locations-batch, against mocked upstreams.
+
+    python benchmarks/bench_stream_analysis.py --sizes 1000 10000 50000 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+
+import server
+from server import BatchLocationRequest
+from bench_batch_analysis import install_mock_upstreams, make_locations
+
+
+def make_request(locations, chunk_lines: int = 100) -> Request:
+    """Fake ASGI request whose body arrives in NDJSON chunks, generated lazily"""
+    def chunks():
+        for start in range(0, len(locations), chunk_lines):
+            lines = locations[start:start + chunk_lines]
+            yield ("\n".join(json.dumps(line) for line in lines) + "\n").encode()
+
+    body = chunks()
+
+    async def receive():
+        chunk = next(body, None)
+        if chunk is None:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        return {'type': 'http.request', 'body': chunk, 'more_body': True}
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/ai/analyze-locations-stream', 'headers': []}
+    return Request(scope, receive)
+
+
+async def run_stream(locations):
+    response = await server.analyze_locations_stream(make_request(locations))
+    start = time.perf_counter()
+    first = None
+    count = 0
+    async for _ in response.body_iterator:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return first, time.perf_counter() - start, count
+
+
+async def run_buffered(locations):
+    start = time.perf_counter()
+    await server.analyze_locations_batch(BatchLocationRequest(locations=locations))
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def measure(coro_factory):
+    """Time a clean run, then repeat under tracemalloc for the peak (tracing skews timings)"""
+    result = asyncio.run(coro_factory())
+    tracemalloc.start()
+    asyncio.run(coro_factory())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--latency-ms', type=float, default=5.0)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+
+    random.seed(7)
+    server.logger.disabled = True
+    server.logging.getLogger('models.location_analyzer').disabled = True
+    install_mock_upstreams(args.latency_ms / 1000.0, 0.0)
+    server.BATCH_CONCURRENCY = args.concurrency
+
+    print(f"{'items':>8} {'stream TTFR ms':>15} {'stream s':>9} {'stream MiB':>11} {'batch TTFR ms':>14} {'batch MiB':>10}")
+    for size in args.sizes:
+        # Distinct points only, so the buffered path cannot dedupe its way ahead
+        locations = make_locations(size, 0.0)
+        (first, total, _), stream_peak = measure(lambda: run_stream(locations))
+        (batch_first, _), batch_peak = measure(lambda: run_buffered(locations))
+        # Peaks exclude the input list itself, which both runs share
+        print(f"{size:>8} {first * 1000:>15.1f} {total:>9.2f} {stream_peak:>11.1f} {batch_first * 1000:>14.1f} {batch_peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
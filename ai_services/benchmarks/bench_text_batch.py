@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Bulk chat-log classification throughput (messages/s) for analyze_texts, the
+function behind /ai/classify-text-batch, including JSON encoding of the response.
+Messages are drawn from a pool so a share of them repeat, as in real chat logs.
+
+    python benchmarks/bench_text_batch.py --messages 10000 100000 --pool 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.keyword_matcher import INTENT_KEYWORDS, EMOTION_KEYWORDS, analyze_texts
+
+FILLER = ("i am on my way home the place looks quiet there are people near the shop "
+          "my phone battery is fine thanks ok yes no").split()
+KEYWORDS = [w for table in (INTENT_KEYWORDS, EMOTION_KEYWORDS) for _, group in table for w in group]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--pool', type=int, default=5000, help="distinct messages to draw from")
+    parser.add_argument('--words', type=int, default=12, help="max words per message")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pool = [' '.join(rng.choice(KEYWORDS) if rng.random() < 0.15 else rng.choice(FILLER)
+                     for _ in range(rng.randint(1, args.words))) for _ in range(args.pool)]
+    print(f"{'messages':>9} {'distinct':>9} {'classify ms':>12} {'json ms':>8} {'messages/s':>11}")
+    for n in args.messages:
+        texts = [rng.choice(pool) for _ in range(n)]
+        start = time.perf_counter()
+        results = analyze_texts(texts)
+        classify_s = time.perf_counter() - start
+        start = time.perf_counter()
+        json.dumps({'results': results})
+        json_s = time.perf_counter() - start
+        print(f"{n:>9} {len(set(texts)):>9} {classify_s * 1000:>12.1f} {json_s * 1000:>8.1f} "
+              f"{n / (classify_s + json_s):>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Hashed n-gram text model vs the keyword tables: intent/emotion accuracy and
+latency per text. Labeled utterances are generated from paraphrase templates;
+the model trains on all but the last template of each label, so the "unseen"
+rows measure phrasings it never saw (the keyword tables never saw any of them).
+
+    python benchmarks/bench_text_classifier.py --train 20000 --test 5000 --batch 1 100 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.keyword_matcher import SafetyKeywordMatcher
+from models.text_classifier import DEFAULT_BUCKETS, save_text_model, train_text_model
+
+PLACES = ["the metro station", "mg road", "the market", "my hostel", "the bus stop", "sector 18", "the mall",
+          "connaught place", "the railway station", "my office", "the park", "college"]
+TIMES = ["tonight", "at 11 pm", "after dark", "early in the morning", "around midnight", "this evening"]
+
+INTENT_TEMPLATES = {
+    'sos': ["someone is pulling me into a car near {place}", "a man with a knife is near me at {place}",
+            "call the police, i am being attacked at {place}", "send someone to {place} right now",
+            "i was pushed to the ground and robbed at {place}, come quickly"],
+    'location': ["where exactly am i right now", "how do i get to {place} from here",
+                 "share my current location with my sister", "which way is {place}",
+                 "show me the map to {place}"],
+    'crime': ["how many thefts were reported around {place}", "is {place} known for robberies",
+              "were there any muggings near {place} last month", "what is the crime rate in {place}",
+              "has anyone been snatched near {place} recently"],
+    'travel_safety': ["should i take a cab from {place} {time}", "is it okay to walk to {place} {time}",
+                      "is the metro to {place} crowded {time}", "can i go back to {place} by bus {time}",
+                      "which transport is best to reach {place} {time}"],
+    'safety_tips': ["what should i carry for self defence", "give me tips to stay secure at {place}",
+                    "how can i protect myself when going to {place}",
+                    "what precautions should women take at {place}", "any suggestions for staying secure in a new city"],
+    'emotional_support': ["i can't stop shaking after what happened at {place}",
+                          "i feel so alone and i don't know what to do", "i keep crying since the incident at {place}",
+                          "can you talk to me for a while, i am not okay", "my heart is racing and i can't calm down"],
+    'harassment': ["a guy keeps staring and making comments at {place}", "someone has been texting me vulgar messages",
+                   "a man touched me inappropriately at {place}", "my coworker keeps sending me creepy messages",
+                   "a stranger has been following me since {place}"],
+    'general': ["hi there", "what can you do", "thank you so much", "tell me a joke", "hello, who are you"]
+}
+
+EMOTION_TEMPLATES = {
+    'happy': ["i feel much better now", "thank you, i am relieved", "feeling great today", "i'm glad i made it",
+              "that cheered me up"],
+    'sad': ["i feel really low", "i am so upset", "this made me cry", "i'm heartbroken", "everything feels hopeless"],
+    'angry': ["i am furious about this", "this is so infuriating", "i'm really pissed off", "i'm fed up with this",
+              "this makes my blood boil"],
+    'scared': ["i'm terrified", "i am so frightened", "i'm really nervous", "my hands are shaking with fear",
+               "i'm scared to go out"],
+    'distressed': ["this is an emergency", "please hurry, i'm in trouble", "i'm in serious trouble",
+                   "i don't know what to do, it's urgent", "i need someone now"]
+}
+
+
+def utterances(rng: random.Random, n: int, held_out: bool):
+    """(texts, intents, emotions); `held_out` picks only the last template of each label"""
+    def template(options):
+        return options[-1] if held_out else rng.choice(options[:-1])
+
+    texts, intents, emotions = [], [], []
+    for _ in range(n):
+        intent = rng.choice(list(INTENT_TEMPLATES))
+        text = template(INTENT_TEMPLATES[intent]).format(place=rng.choice(PLACES), time=rng.choice(TIMES))
+        emotion = 'neutral'
+        if rng.random() < 0.6:
+            emotion = rng.choice(list(EMOTION_TEMPLATES))
+            clause = template(EMOTION_TEMPLATES[emotion])
+            text = f"{text}, {clause}" if rng.random() < 0.5 else f"{clause}. {text}"
+        texts.append(text.capitalize() if rng.random() < 0.3 else text)
+        intents.append(intent)
+        emotions.append(emotion)
+    return texts, intents, emotions
+
+
+def accuracy(predicted, expected) -> float:
+    return sum(p == e for p, e in zip(predicted, expected)) / len(expected)
+
+
+def per_text_us(func, texts, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(texts)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--train', type=int, default=20000)
+    parser.add_argument('--test', type=int, default=5000)
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--save', help="also save the trained model here")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts, intents, emotions = utterances(rng, args.train, held_out=False)
+    start = time.perf_counter()
+    model = train_text_model(texts, {'intent': intents, 'emotion': emotions}, 'bench',
+                             n_buckets=args.buckets, epochs=args.epochs)
+    print(f"Trained on {len(texts)} texts in {time.perf_counter() - start:.1f}s "
+          f"({args.buckets} buckets, {args.epochs} epochs)")
+    if args.save:
+        save_text_model(args.save, model)
+
+    # Fresh matcher without the memoized decisions, so its latency is per text
+    matcher = SafetyKeywordMatcher()
+    print(f"\n{'test set':<8} {'head':<8} {'keywords':>9} {'model':>7}")
+    for name, held_out in (('seen', False), ('unseen', True)):
+        test_texts, test_intents, test_emotions = utterances(random.Random(1), args.test, held_out)
+        keywords = matcher.analyze_many(test_texts)
+        learned = model.predict(test_texts)
+        for head, expected in (('intent', test_intents), ('emotion', test_emotions)):
+            print(f"{name:<8} {head:<8} {accuracy([r[head] for r in keywords], expected):>9.1%} "
+                  f"{accuracy([r[head] for r in learned], expected):>7.1%}")
+
+    print(f"\n{'batch':>6} {'keywords us/text':>17} {'model us/text':>14}")
+    pool, _, _ = utterances(random.Random(2), max(args.batch), held_out=False)
+    for size in args.batch:
+        batch = pool[:size]
+        keyword_us = per_text_us(lambda b: [matcher.analyze(text) for text in b], batch)
+        model_us = per_text_us(model.predict, batch)
+        print(f"{size:>6} {keyword_us:>17.2f} {model_us:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Streaming voice-trigger latency: time from sending the fragment that completes a
+keyword to receiving the trigger on /ai/active-voice/stream. Starts one uvicorn
+worker in a child process; N concurrent clients stream a transcript in small
+fragments (like interim speech-to-text output) at a fixed rate, each ending in a keyword.
+
+    python benchmarks/bench_voice_stream.py --streams 1 50 200 --fragments-per-s 10
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import websockets
+
+PORT = 8766
+PHRASES = ["i am walking home and someone is behind me please help",
+           "the auto driver took a different road mujhe bachao",
+           "call my sister it is an emergency",
+           "he will not let me go help me"]
+
+
+def run_worker(ready):
+    import logging
+    import uvicorn
+    import server
+
+    logging.disable(logging.INFO)
+    config = uvicorn.Config(server.app, port=PORT, log_level='warning')
+    ready.set()
+    uvicorn.Server(config).run()
+
+
+async def client(index: int, args, latencies: list, misses: list, sent_fragments: list):
+    rng = random.Random(index)
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}/ai/active-voice/stream") as ws:
+        await asyncio.sleep(rng.random() / args.fragments_per_s)
+        for _ in range(args.phrases):
+            phrase = rng.choice(PHRASES)
+            cuts = sorted(rng.sample(range(1, len(phrase)), len(phrase) // 4))
+            fragments = [phrase[a:b] for a, b in zip([0] + cuts, cuts + [len(phrase)])]
+            sent_fragments.append(len(fragments))
+            for fragment in fragments[:-1]:
+                await ws.send(json.dumps({'text': fragment}))
+                await asyncio.sleep(1 / args.fragments_per_s)
+            sent = time.perf_counter()
+            await ws.send(json.dumps({'text': fragments[-1], 'final': True}))
+            try:
+                reply = json.loads(await asyncio.wait_for(ws.recv(), timeout=2))
+                latencies.append(time.perf_counter() - sent)
+                assert reply['type'] == 'trigger'
+            except asyncio.TimeoutError:
+                misses.append(phrase)
+            await asyncio.sleep(1 / args.fragments_per_s)
+
+
+async def run_level(streams: int, args):
+    latencies, misses, sent_fragments = [], [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i, args, latencies, misses, sent_fragments) for i in range(streams)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = (np.percentile(latencies, q) * 1000 for q in (50, 95, 99))
+    print(f"{streams:>8} {sum(sent_fragments) / elapsed:>12.0f} {len(latencies):>9} {len(misses):>7} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+
+async def wait_for_port():
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', PORT)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("worker did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, nargs='+', default=[1, 50, 200])
+    parser.add_argument('--phrases', type=int, default=5, help="phrases per stream")
+    parser.add_argument('--fragments-per-s', type=float, default=10.0, help="per stream")
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    worker = multiprocessing.Process(target=run_worker, args=(ready,), daemon=True)
+    worker.start()
+    ready.wait()
+    try:
+        asyncio.run(wait_for_port())
+        print(f"{'streams':>8} {'fragments/s':>12} {'triggers':>9} {'missed':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for streams in args.streams:
+            asyncio.run(run_level(streams, args))
+    finally:
+        worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
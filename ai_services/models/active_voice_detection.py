@@ -1,18 +1,5 @@
-def detect_voice_trigger(text):
-    text = text.lower()
-
-    keywords = [
-        "help me",
-        "save me",
-        "bachao",
-        "mujhe bachao",
-        "sos",
-        "emergency",
-        "please help"
-    ]
+from .keyword_matcher import analyze_text
 
-    for word in keywords:
-        if word in text:
-            return "triggered"
 
-    return "safe"
+def detect_voice_trigger(text):
+    return analyze_text(text)['trigger']
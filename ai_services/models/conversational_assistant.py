@@ -1,32 +1,105 @@
-from models.intent_detector import detect_intent
-from models.emotion_detector import detect_emotion
+from models.keyword_matcher import analyze_text
+from utils.cache import LRUCache, approx_size
+from collections import Counter
 import random
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def generate_response(user_input, chat_history):
+
+class ConversationSessionStore:
+    """
+    Running intent/emotion counts per conversation, so a turn only classifies
+    its new message instead of the whole chat history. Sessions idle for
+    `ttl_s` expire and the least recently used are evicted past `max_sessions`.
+    A session is rebuilt from chat_history when it is unknown or the history
+    length no longer matches; an empty chat_history means "use the session".
+    Concurrent turns of one session are serialized with `lock`.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, max_sessions: int = 10000, ttl_s: float = 3600.0):
+        self.sessions = LRUCache(max_sessions, ttl=ttl_s, name='conversation_sessions', sizeof=approx_size)
+        # Striped, so there is no per-session lock to create or evict
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self.incremental_turns = 0
+        self.rebuilds = {'new_session': 0, 'history_mismatch': 0}
+
+    def lock(self, session_id) -> threading.Lock:
+        """Hold this from `context` to `record` so two turns cannot both count from the same state"""
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    def context(self, session_id, chat_history):
+        context = self.sessions.get(session_id)
+        if context is not None and (not chat_history or len(chat_history) == context['messages']):
+            self.incremental_turns += 1
+            return context
+        self.rebuilds['new_session' if context is None else 'history_mismatch'] += 1
+        return conversation_context(chat_history)
+
+    def record(self, session_id, context, signals):
+        """Fold this turn (the user message and the reply) into the session"""
+        context['intents'][signals['intent']] += 1
+        context['emotions'][signals['emotion']] += 1
+        context['messages'] += 2
+        self.sessions.set(session_id, context)
+
+    def stats(self):
+        return {
+            'sessions': self.sessions.stats(),
+            'incremental_turns': self.incremental_turns,
+            'rebuilds': dict(self.rebuilds)
+        }
+
+
+def conversation_context(chat_history):
+    """Intent and emotion counts over the user messages of a chat history"""
+    context = {'intents': Counter(), 'emotions': Counter(), 'messages': len(chat_history)}
+    for msg in chat_history:
+        if msg['from'] == 'user':
+            signals = analyze_text(msg['text'])
+            context['intents'][signals['intent']] += 1
+            context['emotions'][signals['emotion']] += 1
+    return context
+
+
+def generate_response(user_input, chat_history, session_id=None, sessions=None):
     """
     Enhanced conversational assistant using intent and emotion detection.
     Falls back to rule-based responses.
     """
-    return generate_fallback_response(user_input, chat_history)
+    return generate_fallback_response(user_input, chat_history, session_id, sessions)
 
-def generate_fallback_response(user_input, chat_history):
+def generate_fallback_response(user_input, chat_history, session_id=None, sessions=None):
     """
     Rule-based fallback when OpenAI is unavailable.
+    With a session store and id, history context comes from the session's running counts.
     """
-    intent = detect_intent(user_input)
-    emotion = detect_emotion(user_input)
+    # One keyword pass per message gives both intent and emotion
+    signals = analyze_text(user_input)
+    if sessions is None or not session_id:
+        return rule_based_reply(signals, conversation_context(chat_history))
+
+    # One turn per session at a time: its counts are read, used and updated together
+    with sessions.lock(session_id):
+        context = sessions.context(session_id, chat_history)
+        response = rule_based_reply(signals, context)
+        sessions.record(session_id, context, signals)
+    return response
 
-    # Analyze chat history for context
-    history_intents = [detect_intent(msg['text']) for msg in chat_history if msg['from'] == 'user']
-    history_emotions = [detect_emotion(msg['text']) for msg in chat_history if msg['from'] == 'user']
+def rule_based_reply(signals, context):
+    """The reply to a message with these signals, given the intent/emotion counts of the history"""
+    intent = signals['intent']
+    emotion = signals['emotion']
+    history_intents = context['intents']
+    history_emotions = context['emotions']
 
     # Determine if this is a continuation
-    is_continuation = len(chat_history) > 0
+    is_continuation = context['messages'] > 0
 
     # Response templates based on intent and emotion
     responses = {
@@ -122,11 +195,11 @@ def generate_fallback_response(user_input, chat_history):
 
     # Add context from history if continuation
     if is_continuation:
-        if intent == "sos" and "sos" in history_intents:
+        if intent == "sos" and history_intents["sos"] > 0:
             response += " I remember you mentioned safety concerns before. Are you still in danger?"
-        elif emotion == "sad" and history_emotions.count("sad") > 1:
+        elif emotion == "sad" and history_emotions["sad"] > 1:
             response += " I notice you've been feeling down. Would you like resources for support?"
-        elif intent == "general" and len(chat_history) > 4:
+        elif intent == "general" and context['messages'] > 4:
             response += " We've been chatting for a while. Is there anything specific on your mind?"
 
     return response
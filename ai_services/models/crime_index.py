@@ -0,0 +1,148 @@
+import logging
+import math
+from typing import Tuple
+
+import numpy as np
+
+from utils.geo import KM_PER_DEGREE, haversine_km
+
+logger = logging.getLogger(__name__)
+
+MAX_REACH_CELLS = 1024  # beyond this many neighbour cells per query, compare against every crime instead
+BRUTE_FORCE_CHUNK = 2_000_000  # query x crime distances computed at once by the fallback
+
+
+class CrimeGridIndex:
+    """
+    Uniform grid over crime coordinates for batched radius queries.
+    Crimes are sorted by packed cell key, so the crimes of any cell are one
+    contiguous slice found with searchsorted; a query only measures distances
+    to crimes in the cells its radius can reach.
+    """
+
+    def __init__(self, lats, lons, severity, cell_km: float = 0.25):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        severity = np.asarray(severity, dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        self.row_index = np.flatnonzero(valid)
+        self.cell_km = cell_km
+        self.size = int(valid.sum())
+
+        self.cell_lat = cell_km / KM_PER_DEGREE
+        if self.size == 0:
+            self.cell_lon = self.cell_lat
+            self.origin = (0, 0)
+            self.span = (1, 1)
+            self.keys = np.empty(0, dtype=np.int64)
+            self.lats = self.lons = self.severity = np.empty(0)
+            self.rows = np.empty(0, dtype=np.intp)
+            return
+
+        # Size longitude cells at the highest latitude so cells are never narrower than cell_km
+        widest = min(89.0, float(np.abs(lats[valid]).max()))
+        self.cell_lon = self.cell_lat / math.cos(math.radians(widest))
+
+        cell_x, cell_y = self._cells(lats[valid], lons[valid])
+        self.origin = (int(cell_x.min()), int(cell_y.min()))
+        self.span = (int(cell_x.max()) - self.origin[0] + 1, int(cell_y.max()) - self.origin[1] + 1)
+        keys = (cell_x - self.origin[0]) * self.span[1] + (cell_y - self.origin[1])
+
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.lats = lats[valid][order]
+        self.lons = lons[valid][order]
+        self.severity = severity[valid][order]
+        self.rows = self.row_index[order]
+        logger.info(f"🗺️ Crime grid index: {self.size} crimes in {len(np.unique(self.keys))} cells of {cell_km} km")
+
+    def _cells(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.floor(lats / self.cell_lat).astype(np.int64),
+                np.floor(lons / self.cell_lon).astype(np.int64))
+
+    def query(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """All (query position, source row, distance km) pairs within `radius_km`"""
+        pair_query, pair_crime, distance = self._pairs(lats, lons, radius_km)
+        return pair_query, self.rows[pair_crime], distance
+
+    def _pairs(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if not (np.isfinite(lats).all() and np.isfinite(lons).all()):
+            raise ValueError("Query coordinates must be finite numbers")
+        if self.size == 0 or lats.size == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+
+        cell_x, cell_y = self._cells(lats, lons)
+        lat_cell_km = self.cell_lat * KM_PER_DEGREE
+        reach_x = int(math.ceil(radius_km / lat_cell_km))
+        # Longitude cells narrow towards the poles, so size the reach for the highest query latitude
+        lon_cell_km = self.cell_lon * KM_PER_DEGREE * math.cos(math.radians(min(89.0, float(np.abs(lats).max()))))
+        reach_y = int(math.ceil(radius_km / lon_cell_km))
+        # The cell walk is a Python loop over (2 * reach + 1)^2 cells; large radii (or queries
+        # near the poles) would make it run for seconds, so measure every crime directly instead
+        if (2 * reach_x + 1) * (2 * reach_y + 1) > MAX_REACH_CELLS:
+            return self._pairs_brute_force(lats, lons, radius_km)
+        query_ids, starts, lengths = [], [], []
+        for dx in range(-reach_x, reach_x + 1):
+            for dy in range(-reach_y, reach_y + 1):
+                # Skip corner cells whose nearest edge is already beyond the radius
+                gap_x = max(abs(dx) - 1, 0) * lat_cell_km
+                gap_y = max(abs(dy) - 1, 0) * lon_cell_km
+                if gap_x ** 2 + gap_y ** 2 > radius_km ** 2:
+                    continue
+                x = cell_x + dx - self.origin[0]
+                y = cell_y + dy - self.origin[1]
+                inside = np.flatnonzero((x >= 0) & (x < self.span[0]) & (y >= 0) & (y < self.span[1]))
+                if inside.size == 0:
+                    continue
+                keys = x[inside] * self.span[1] + y[inside]
+                lo = np.searchsorted(self.keys, keys, side='left')
+                hi = np.searchsorted(self.keys, keys, side='right')
+                hit = hi > lo
+                query_ids.append(inside[hit])
+                starts.append(lo[hit])
+                lengths.append(hi[hit] - lo[hit])
+
+        if not query_ids:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+        query_ids, starts, lengths = (np.concatenate(parts) for parts in (query_ids, starts, lengths))
+
+        # Expand each (query, cell slice) into one candidate pair per crime in the slice
+        pair_query = np.repeat(query_ids, lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pair_crime = np.repeat(starts, lengths) + offsets
+
+        distance = haversine_km(lats[pair_query], lons[pair_query], self.lats[pair_crime], self.lons[pair_crime])
+        within = distance <= radius_km
+        return pair_query[within], pair_crime[within], distance[within]
+
+    def _pairs_brute_force(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Distances from every query to every crime, in chunks of bounded size"""
+        # Only crimes inside the latitude band of a chunk of queries can be within the radius
+        by_lat = np.argsort(self.lats, kind='stable')
+        sorted_lats = self.lats[by_lat]
+        band = radius_km / KM_PER_DEGREE * (1 + 1e-9)  # a hair wider, so rounding cannot drop a crime on the edge
+        chunk = max(1, BRUTE_FORCE_CHUNK // self.size)
+        pair_query, pair_crime, distance = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)], [np.empty(0)]
+        for start in range(0, lats.size, chunk):
+            q_lat, q_lon = lats[start:start + chunk], lons[start:start + chunk]
+            lo = np.searchsorted(sorted_lats, q_lat.min() - band, side='left')
+            hi = np.searchsorted(sorted_lats, q_lat.max() + band, side='right')
+            if hi <= lo:
+                continue
+            candidates = by_lat[lo:hi]
+            block = haversine_km(q_lat[:, None], q_lon[:, None], self.lats[candidates][None, :], self.lons[candidates][None, :])
+            query, crime = np.nonzero(block <= radius_km)
+            pair_query.append(query + start)
+            pair_crime.append(candidates[crime])
+            distance.append(block[query, crime])
+        return np.concatenate(pair_query), np.concatenate(pair_crime), np.concatenate(distance)
+
+    def summarize(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Per query point: number of crimes within the radius and their total severity"""
+        n = np.asarray(lats).size
+        pair_query, pair_crime, _ = self._pairs(lats, lons, radius_km)
+        counts = np.bincount(pair_query, minlength=n)
+        severity = np.bincount(pair_query, weights=self.severity[pair_crime], minlength=n)
+        return counts, severity
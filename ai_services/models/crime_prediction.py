@@ -1,10 +1,18 @@
+import logging
+import math
 import random
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 from .csv_crime_analyzer import CSVCrimeAnalyzer
+from .rule_tables import CompiledRuleTable
+from utils.cache import LRUCache, approx_size
 import asyncio
 
-# Initialize CSV crime analyzer
-csv_crime_analyzer = CSVCrimeAnalyzer()
+logger = logging.getLogger(__name__)
+
+# Initialize CSV crime analyzer; the CSV (and pandas) load on the first prediction
+csv_crime_analyzer = CSVCrimeAnalyzer(lazy=True)
 
 def predict_crime_risk(lat: float, lon: float, time_of_day: str, weather: str, user_profile: str, location_name: str = None, area_type: str = None) -> dict:
     """
@@ -34,6 +42,61 @@ def predict_crime_risk(lat: float, lon: float, time_of_day: str, weather: str, u
         final_score = calculate_fallback_score(lat, lon, time_of_day, weather, user_profile, area_type)
         csv_crime_data = None
     
+    return _build_prediction_response(lat, lon, time_of_day, weather, user_profile, location_name, area_type,
+                                      final_score, csv_crime_data)
+
+def predict_crime_risk_batch(requests: List[Dict[str, Any]]) -> List[dict]:
+    """
+    predict_crime_risk for many requests at once.
+    One batched radius query covers every location and the contextual scores come
+    from a single table lookup; the responses are identical to per-request calls.
+    """
+    if not requests:
+        return []
+    lats = np.array([_coordinate(r.get('lat')) for r in requests])
+    lons = np.array([_coordinate(r.get('lon')) for r in requests])
+    contexts = [[r.get(key) for r in requests] for key in ('time_of_day', 'weather', 'user_profile', 'area_type')]
+    contextual_scores = np.array(_contextual_table.lookup_many(*contexts), dtype=float)
+    
+    # Items without usable coordinates are left out of the batched query so they cannot fail it
+    queryable = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+    csv_results = [None] * len(requests)
+    final_scores = [None] * len(requests)
+    if queryable.size:
+        try:
+            results = csv_crime_analyzer.batch_location_crime_risk(lats[queryable], lons[queryable], radius_km=2.0)
+            base_scores = np.array([result['risk_score'] for result in results], dtype=float)
+            for i, result, score in zip(queryable.tolist(), results, base_scores * 0.7 + contextual_scores[queryable] * 0.3):
+                csv_results[i] = result
+                final_scores[i] = score
+            logger.info(f"📊 CSV Batch Analysis: {len(requests)} locations, "
+                        f"{sum(result['crime_data_found'] for result in results)} crimes found")
+        except Exception as e:
+            logger.warning(f"⚠️ CSV batch crime analysis failed, using fallback: {e}")
+    if queryable.size < len(requests):
+        logger.warning(f"⚠️ {len(requests) - queryable.size} batch locations without valid coordinates, using fallback")
+    final_scores = [
+        score if score is not None else calculate_fallback_score(lat, lon, r.get('time_of_day'), r.get('weather'),
+                                                                 r.get('user_profile'), r.get('area_type'))
+        for r, lat, lon, score in zip(requests, lats.tolist(), lons.tolist(), final_scores)
+    ]
+    
+    return [
+        _build_prediction_response(lat, lon, r.get('time_of_day'), r.get('weather'), r.get('user_profile'),
+                                   r.get('location_name'), r.get('area_type'), float(score), csv_data)
+        for r, lat, lon, score, csv_data in zip(requests, lats.tolist(), lons.tolist(), final_scores, csv_results)
+    ]
+
+def _coordinate(value) -> float:
+    """A coordinate as a float; anything unparseable becomes NaN"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _build_prediction_response(lat: float, lon: float, time_of_day: str, weather: str, user_profile: str,
+                               location_name: str, area_type: str, final_score: float, csv_crime_data: Dict) -> dict:
+    """Risk level, recommendations and the response body for a combined score"""
     # Normalize score to be between 1 and 10
     final_score = max(1, min(10, final_score))
     
@@ -69,7 +132,7 @@ def predict_crime_risk(lat: float, lon: float, time_of_day: str, weather: str, u
             "location_name": location_name or f"Location ({lat:.4f}, {lon:.4f})"
         },
         "confidence": 0.85,
-        "analysis_timestamp": "2024-12-25T" + str(random.randint(10, 23)) + ":" + str(random.randint(10, 59)) + ":00Z"
+        "analysis_timestamp": _analysis_timestamp()
     }
     
     # Add CSV crime data insights if available
@@ -98,61 +161,157 @@ def predict_crime_risk(lat: float, lon: float, time_of_day: str, weather: str, u
     
     return response
 
-def calculate_contextual_adjustments(time_of_day: str, weather: str, user_profile: str, area_type: str) -> float:
+def _analysis_timestamp() -> str:
+    return "2024-12-25T" + str(random.randint(10, 23)) + ":" + str(random.randint(10, 59)) + ":00Z"
+
+class CrimePredictionCache:
     """
-    Calculate contextual risk adjustments based on time, weather, user situation
+    TTL/LRU cache of predict_crime_risk results keyed on the canonical request:
+    coordinates rounded to `precision` decimals plus the contextual inputs.
+    Entries belong to one version of the crime dataset and are dropped as soon
+    as the analyzer reloads (or is replaced).
+    """
+    
+    FIELDS = ('time_of_day', 'weather', 'user_profile', 'area_type', 'location_name')
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 900, precision: int = 4):
+        self.precision = precision
+        self.entries = LRUCache(maxsize, ttl=ttl, name='crime_predictions', sizeof=approx_size)
+        self._lock = threading.Lock()
+        self._dataset = None
+        self.invalidations = 0
+        self.stale_writes = 0
+    
+    def key(self, request: Dict[str, Any]) -> tuple:
+        return (round(float(request['lat']), self.precision), round(float(request['lon']), self.precision),
+                *(request.get(field) for field in self.FIELDS))
+    
+    def dataset_token(self) -> Tuple[int, int]:
+        """Identifies the crime data results are computed from; clears the cache when it changed"""
+        analyzer = csv_crime_analyzer
+        token = (id(analyzer), analyzer.data_version)
+        with self._lock:
+            if token != self._dataset:
+                if self._dataset is not None:
+                    self.invalidations += 1
+                self.entries.clear()
+                self._dataset = token
+        return token
+    
+    def get(self, request: Dict[str, Any]) -> Optional[dict]:
+        """Cached prediction (with a fresh timestamp) or None"""
+        self.dataset_token()
+        cached = self.entries.get(self.key(request))
+        if cached is None:
+            return None
+        return {**cached, "analysis_timestamp": _analysis_timestamp()}
+    
+    def set(self, request: Dict[str, Any], prediction: dict, token: Tuple[int, int]):
+        """Store a prediction computed while `token` was current; dropped if the data changed meanwhile"""
+        if self.dataset_token() != token:
+            with self._lock:
+                self.stale_writes += 1
+            return
+        self.entries.set(self.key(request), prediction)
+    
+    def clear(self):
+        self.entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        token = self.dataset_token()
+        return {
+            **self.entries.stats(),
+            'precision_decimals': self.precision,
+            'data_version': token[1],
+            'invalidations': self.invalidations,
+            'stale_writes': self.stale_writes
+        }
+
+# Contextual rules; change them through update_contextual_rules so the lookup table is recompiled
+# Time of day adjustments (35% weight)
+TIME_ADJUSTMENTS = {
+    "morning": 2,    # Safest time
+    "afternoon": 1,  # Generally safe
+    "evening": -1,   # Moderate risk
+    "night": -3      # Highest risk
+}
+
+# Weather adjustments (20% weight)
+WEATHER_ADJUSTMENTS = {
+    "clear": 1,
+    "partly_cloudy": 0,
+    "cloudy": 0,
+    "overcast": -0.5,
+    "drizzle": -1,
+    "rain": -1.5,
+    "heavy_rain": -2,
+    "fog": -2,
+    "storm": -2.5,
+    "thunderstorm": -3
+}
+
+# User profile adjustments (25% weight)
+PROFILE_ADJUSTMENTS = {
+    "alone": -2,              # Higher risk when alone
+    "with_friends": 1.5,      # Safer in groups
+    "family": 2,              # Safest with family
+    "public_transport": -0.5, # Moderate risk
+    "vehicle": 1,             # Safer in vehicle
+    "indoor_public": 1        # Generally safer indoors
+}
+
+# Area type adjustments (20% weight)
+AREA_ADJUSTMENTS = {
+    "residential": 1,
+    "commercial": 0.5,
+    "industrial": -1,
+    "highway": -1.5,
+    "isolated": -2,
+    "unknown": 0
+}
+
+def _rule_contextual_adjustments(time_of_day: str, weather: str, user_profile: str, area_type: str) -> float:
+    """
+    Evaluate the contextual rules directly (used to compile the lookup table)
     """
     score = 5  # Base contextual score
     
-    # Time of day adjustments (35% weight)
-    time_adjustments = {
-        "morning": 2,    # Safest time
-        "afternoon": 1,  # Generally safe
-        "evening": -1,   # Moderate risk
-        "night": -3      # Highest risk
-    }
-    score += time_adjustments.get(time_of_day, 0)
-    
-    # Weather adjustments (20% weight)
-    weather_adjustments = {
-        "clear": 1,
-        "partly_cloudy": 0,
-        "cloudy": 0,
-        "overcast": -0.5,
-        "drizzle": -1,
-        "rain": -1.5,
-        "heavy_rain": -2,
-        "fog": -2,
-        "storm": -2.5,
-        "thunderstorm": -3
-    }
-    score += weather_adjustments.get(weather, 0)
-    
-    # User profile adjustments (25% weight)
-    profile_adjustments = {
-        "alone": -2,              # Higher risk when alone
-        "with_friends": 1.5,      # Safer in groups
-        "family": 2,              # Safest with family
-        "public_transport": -0.5, # Moderate risk
-        "vehicle": 1,             # Safer in vehicle
-        "indoor_public": 1        # Generally safer indoors
-    }
-    score += profile_adjustments.get(user_profile, 0)
+    score += TIME_ADJUSTMENTS.get(time_of_day, 0)
+    score += WEATHER_ADJUSTMENTS.get(weather, 0)
+    score += PROFILE_ADJUSTMENTS.get(user_profile, 0)
     
-    # Area type adjustments (20% weight)
     if area_type:
-        area_adjustments = {
-            "residential": 1,
-            "commercial": 0.5,
-            "industrial": -1,
-            "highway": -1.5,
-            "isolated": -2,
-            "unknown": 0
-        }
-        score += area_adjustments.get(area_type, 0)
+        score += AREA_ADJUSTMENTS.get(area_type, 0)
     
     return score
 
+def _contextual_axes():
+    # None stands for any value without an adjustment (and for a missing area type)
+    return (
+        tuple(TIME_ADJUSTMENTS) + (None,),
+        tuple(WEATHER_ADJUSTMENTS) + (None,),
+        tuple(PROFILE_ADJUSTMENTS) + (None,),
+        tuple(AREA_ADJUSTMENTS) + (None,)
+    )
+
+_contextual_table = CompiledRuleTable('contextual adjustment', _rule_contextual_adjustments, _contextual_axes())
+
+def update_contextual_rules(time_of_day: Dict[str, float] = None, weather: Dict[str, float] = None,
+                            user_profile: Dict[str, float] = None, area_type: Dict[str, float] = None):
+    """Replace contextual adjustment tables and recompile the lookup table"""
+    for table, changes in ((TIME_ADJUSTMENTS, time_of_day), (WEATHER_ADJUSTMENTS, weather),
+                           (PROFILE_ADJUSTMENTS, user_profile), (AREA_ADJUSTMENTS, area_type)):
+        if changes is not None:
+            table.clear()
+            table.update(changes)
+    _contextual_table.compile(_contextual_axes())
+
+def calculate_contextual_adjustments(time_of_day: str, weather: str, user_profile: str, area_type: str) -> float:
+    """
+    Calculate contextual risk adjustments based on time, weather, user situation
+    """
+    return _contextual_table.lookup(time_of_day, weather, user_profile, area_type)
+
 def calculate_fallback_score(lat: float, lon: float, time_of_day: str, weather: str, user_profile: str, area_type: str) -> float:
     """
     Fallback scoring when CSV crime data is unavailable
@@ -160,7 +319,7 @@ def calculate_fallback_score(lat: float, lon: float, time_of_day: str, weather:
     score = calculate_contextual_adjustments(time_of_day, weather, user_profile, area_type)
     
     # Add location-based pseudo-randomness
-    if lat and lon:
+    if lat and lon and math.isfinite(lat) and math.isfinite(lon):
         location_hash = (int(lat * 1000) + int(lon * 1000)) % 10
         if location_hash in [0, 1, 2]:  # 30% safer areas
             score += 1
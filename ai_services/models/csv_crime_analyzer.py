@@ -1,78 +1,182 @@
-import pandas as pd
+import copy
 import numpy as np
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import os
 from math import radians, cos, sin, asin, sqrt
 import json
 
+from .crime_index import CrimeGridIndex
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Crime severity weights by crime type
+CRIME_WEIGHTS = {
+    'murder': 10,
+    'rape': 10,
+    'robbery': 9,
+    'assault': 8,
+    'burglary': 7,
+    'theft': 6,
+    'vehicle_theft': 6,
+    'fraud': 5,
+    'vandalism': 4,
+    'drug_offense': 4,
+    'public_disorder': 3,
+    'other': 3
+}
+
 class CSVCrimeAnalyzer:
     """
     CSV-based crime data analyzer for location-based risk assessment
     """
     
-    def __init__(self, csv_file_path: str = "data/crime_data.csv"):
+    def __init__(self, csv_file_path: str = "data/crime_data.csv", lazy: bool = False):
         self.csv_file_path = csv_file_path
+        self.data_version = 1  # bumped on every reload so result caches can tell the data changed
         self.crime_data = None
-        self.load_crime_data()
+        self.__dict__.update(self._build_crime_index(None))
         
         # Crime severity weights
-        self.crime_weights = {
-            'murder': 10,
-            'rape': 10,
-            'robbery': 9,
-            'assault': 8,
-            'burglary': 7,
-            'theft': 6,
-            'vehicle_theft': 6,
-            'fraud': 5,
-            'vandalism': 4,
-            'drug_offense': 4,
-            'public_disorder': 3,
-            'other': 3
-        }
+        self.crime_weights = dict(CRIME_WEIGHTS)
+        
+        # lazy: read the CSV (and import pandas) on the first analysis instead of now
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.Lock()  # held while the data attributes are replaced or copied
+        if not lazy:
+            self.load_crime_data()
     
-    def load_crime_data(self):
-        """Load crime data from CSV file"""
+    def ensure_loaded(self):
+        """Load the crime data if it has not been loaded yet; concurrent first calls load once"""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load_crime_data()
+    
+    def load_crime_data(self, csv_file_path: Optional[str] = None) -> bool:
+        """
+        Load crime data from a CSV file (default: the current one). The frame and its index
+        are built aside and swapped in together; analyses already running finish on the data
+        they started with, and if the file cannot be read the current data is kept.
+        Returns whether the file was loaded.
+        """
+        path = csv_file_path or self.csv_file_path
         try:
-            if os.path.exists(self.csv_file_path):
-                self.crime_data = pd.read_csv(self.csv_file_path)
-                logger.info(f"✅ Loaded {len(self.crime_data)} crime records from CSV")
-                
-                # Standardize column names (case insensitive)
-                self.crime_data.columns = self.crime_data.columns.str.lower().str.strip()
-                
-                # Expected columns: latitude, longitude, crime_type, date, area, severity
-                required_cols = ['latitude', 'longitude', 'crime_type']
-                missing_cols = [col for col in required_cols if col not in self.crime_data.columns]
-                
-                if missing_cols:
-                    logger.warning(f"⚠️ Missing columns in CSV: {missing_cols}")
-                    logger.info(f"📋 Available columns: {list(self.crime_data.columns)}")
-                
-                # Convert date column if exists
-                if 'date' in self.crime_data.columns:
-                    try:
-                        self.crime_data['date'] = pd.to_datetime(self.crime_data['date'])
-                    except:
-                        logger.warning("⚠️ Could not parse date column")
-                
-                logger.info(f"📊 Crime data loaded successfully: {self.crime_data.shape}")
-                
-            else:
-                logger.warning(f"⚠️ CSV file not found: {self.csv_file_path}")
-                logger.info("📝 Creating sample CSV structure...")
-                self.create_sample_csv()
-                
+            crime_data = self._read_crime_csv(path)
         except Exception as e:
             logger.error(f"❌ Error loading CSV: {e}")
-            self.crime_data = None
+            self._loaded = True
+            return False
+        
+        state = dict(self._build_crime_index(crime_data), crime_data=crime_data, csv_file_path=path)
+        with self._swap_lock:
+            if self._loaded:
+                state['data_version'] = self.data_version + 1
+            self.__dict__.update(state)
+            self._loaded = True
+        return True
     
-    def create_sample_csv(self):
-        """Create a sample CSV file structure for reference"""
+    def _read_crime_csv(self, path: str) -> 'pd.DataFrame':
+        """Read and normalize a crime CSV; a missing file is replaced by the sample structure"""
+        import pandas as pd
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ CSV file not found: {path}")
+            logger.info("📝 Creating sample CSV structure...")
+            return self.create_sample_csv(path)
+        
+        crime_data = pd.read_csv(path)
+        logger.info(f"✅ Loaded {len(crime_data)} crime records from CSV")
+        
+        # Standardize column names (case insensitive)
+        crime_data.columns = crime_data.columns.str.lower().str.strip()
+        
+        # Expected columns: latitude, longitude, crime_type, date, area, severity
+        required_cols = ['latitude', 'longitude', 'crime_type']
+        missing_cols = [col for col in required_cols if col not in crime_data.columns]
+        
+        if missing_cols:
+            logger.warning(f"⚠️ Missing columns in CSV: {missing_cols}")
+            logger.info(f"📋 Available columns: {list(crime_data.columns)}")
+        
+        # Convert date column if exists
+        if 'date' in crime_data.columns:
+            try:
+                crime_data['date'] = pd.to_datetime(crime_data['date'])
+            except:
+                logger.warning("⚠️ Could not parse date column")
+        
+        logger.info(f"📊 Crime data loaded successfully: {crime_data.shape}")
+        return crime_data
+    
+    def _snapshot(self) -> 'CSVCrimeAnalyzer':
+        """Shallow copy pinned to the current data; a concurrent reload replaces attributes of self only"""
+        self.ensure_loaded()
+        with self._swap_lock:
+            return copy.copy(self)
+    
+    def _crime_severities(self, crime_data: 'pd.DataFrame') -> np.ndarray:
+        """Per-row severity: the severity column, else the crime type weight, else 5"""
+        import pandas as pd
+        if 'severity' in crime_data.columns:
+            # Missing severities add nothing, as in the per-location sum
+            return pd.to_numeric(crime_data['severity'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        if 'crime_type' in crime_data.columns:
+            types = crime_data['crime_type'].astype(str).str.lower()
+            return types.map(self.crime_weights).fillna(5).to_numpy(dtype=float)
+        return np.full(len(crime_data), 5.0)
+    
+    def _crime_high_severity(self, crime_data: 'pd.DataFrame') -> np.ndarray:
+        """Per-row flag matching the high_severity_count rule in _analyze_crime_patterns"""
+        import pandas as pd
+        if 'severity' in crime_data.columns:
+            return (pd.to_numeric(crime_data['severity'], errors='coerce') >= 7).to_numpy()
+        if 'crime_type' in crime_data.columns:
+            return crime_data['crime_type'].isin(['murder', 'rape', 'robbery', 'assault']).to_numpy()
+        return np.zeros(len(crime_data), dtype=bool)
+    
+    def _build_crime_index(self, crime_data: Optional['pd.DataFrame']) -> Dict[str, Any]:
+        """Spatial index over crimes with coordinates, used for radius queries, and the per-row arrays"""
+        state = {
+            'crime_index': None,
+            '_row_severity': np.empty(0),
+            '_row_high_severity': np.empty(0, dtype=bool),
+            '_row_dates': None,
+            '_row_codes': {}
+        }
+        if crime_data is None or not {'latitude', 'longitude'} <= set(crime_data.columns):
+            return state
+        import pandas as pd
+        try:
+            severity = self._crime_severities(crime_data)
+            high_severity = self._crime_high_severity(crime_data)
+            dates = None
+            if 'date' in crime_data.columns and pd.api.types.is_datetime64_dtype(crime_data['date']):
+                dates = crime_data['date'].to_numpy()
+            # Categorical columns as integer codes for grouped counts in batch analysis
+            codes = {column: pd.factorize(crime_data[column])
+                     for column in ('crime_type', 'area') if column in crime_data.columns}
+            index = CrimeGridIndex(
+                pd.to_numeric(crime_data['latitude'], errors='coerce'),
+                pd.to_numeric(crime_data['longitude'], errors='coerce'),
+                severity
+            )
+        except Exception as e:
+            logger.error(f"❌ Error building crime index: {e}")
+            return state
+        state.update(crime_index=index, _row_severity=severity, _row_high_severity=high_severity,
+                     _row_dates=dates, _row_codes=codes)
+        return state
+    
+    def create_sample_csv(self, csv_file_path: Optional[str] = None) -> 'pd.DataFrame':
+        """Create a sample CSV file structure for reference and return its data"""
+        import pandas as pd
+        path = csv_file_path or self.csv_file_path
         sample_data = {
             'latitude': [28.6139, 28.6129, 28.6149, 19.0760, 19.0770],
             'longitude': [77.2090, 77.2080, 77.2100, 72.8777, 72.8787],
@@ -83,11 +187,9 @@ class CSVCrimeAnalyzer:
         }
         
         sample_df = pd.DataFrame(sample_data)
-        sample_df.to_csv(self.csv_file_path, index=False)
-        logger.info(f"📝 Sample CSV created at: {self.csv_file_path}")
-        
-        # Load the sample data
-        self.crime_data = sample_df
+        sample_df.to_csv(path, index=False)
+        logger.info(f"📝 Sample CSV created at: {path}")
+        return sample_df
     
     def haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points in kilometers"""
@@ -108,6 +210,9 @@ class CSVCrimeAnalyzer:
         """
         Analyze crime risk for a specific location using CSV data
         """
+        return self._snapshot()._analyze_location_crime_risk(lat, lon, radius_km)
+    
+    def _analyze_location_crime_risk(self, lat: float, lon: float, radius_km: float = 2.0) -> Dict[str, Any]:
         try:
             if self.crime_data is None or self.crime_data.empty:
                 return self._fallback_analysis(lat, lon)
@@ -158,29 +263,172 @@ class CSVCrimeAnalyzer:
             logger.error(f"❌ CSV crime analysis failed: {e}")
             return self._fallback_analysis(lat, lon)
     
-    def _find_nearby_crimes(self, lat: float, lon: float, radius_km: float) -> pd.DataFrame:
+    def _find_nearby_crimes(self, lat: float, lon: float, radius_km: float) -> 'pd.DataFrame':
         """Find crimes within specified radius"""
-        if self.crime_data is None or 'latitude' not in self.crime_data.columns:
+        if self.crime_index is None:
+            import pandas as pd
             return pd.DataFrame()
         
-        # Calculate distances
-        distances = []
-        for _, crime in self.crime_data.iterrows():
-            try:
-                crime_lat = float(crime['latitude'])
-                crime_lon = float(crime['longitude'])
-                distance = self.haversine_distance(lat, lon, crime_lat, crime_lon)
-                distances.append(distance)
-            except:
-                distances.append(float('inf'))
-        
-        # Filter crimes within radius
-        self.crime_data['distance'] = distances
-        nearby_crimes = self.crime_data[self.crime_data['distance'] <= radius_km].copy()
+        _, rows, distances = self.crime_index.query([lat], [lon], radius_km)
+        order = np.argsort(rows)
+        nearby_crimes = self.crime_data.iloc[rows[order]].copy()
+        nearby_crimes['distance'] = distances[order]
         
         return nearby_crimes
     
-    def _analyze_crime_patterns(self, nearby_crimes: pd.DataFrame, lat: float, lon: float) -> Dict:
+    def batch_crime_scores(self, lats, lons, radius_km: float = 2.0) -> Dict[str, np.ndarray]:
+        """
+        Vectorized crime counts and risk scores (1-10, higher is safer) for many points,
+        using the same formula as _calculate_risk_metrics with density scaled to the radius
+        """
+        return self._snapshot()._batch_crime_scores(lats, lons, radius_km)
+    
+    def _batch_crime_scores(self, lats, lons, radius_km: float = 2.0) -> Dict[str, np.ndarray]:
+        lats = np.asarray(lats, dtype=float)
+        if self.crime_index is None:
+            counts = np.zeros(lats.size, dtype=np.int64)
+            severity = np.zeros(lats.size)
+        else:
+            counts, severity = self.crime_index.summarize(lats, lons, radius_km)
+        
+        density = counts / (radius_km ** 2)  # 2 km radius -> count / 4, as in _calculate_risk_metrics
+        avg_severity = np.divide(severity, counts, out=np.full(lats.size, 5.0), where=counts > 0)
+        scores = np.maximum(1.0, 10.0 - density * 0.8 - (avg_severity - 5) * 0.4)
+        scores = np.where(counts > 0, scores, 8.0)
+        return {'crime_count': counts, 'risk_score': np.round(scores, 1)}
+    
+    def batch_location_crime_risk(self, lats, lons, radius_km: float = 2.0) -> List[Dict[str, Any]]:
+        """
+        analyze_location_crime_risk for many points from one batched radius query.
+        Per-point statistics are grouped aggregates over the (point, crime) pairs, and
+        the risk metrics follow _calculate_risk_metrics in vectorized form.
+        """
+        return self._snapshot()._batch_location_crime_risk(lats, lons, radius_km)
+    
+    def _batch_location_crime_risk(self, lats, lons, radius_km: float = 2.0) -> List[Dict[str, Any]]:
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        n = lats.size
+        if self.crime_data is None or self.crime_data.empty:
+            return [self._fallback_analysis(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())]
+        
+        if self.crime_index is None:
+            pair_q, pair_row, distance = np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+        else:
+            pair_q, pair_row, distance = self.crime_index.query(lats, lons, radius_km)
+        
+        columns = self.crime_data.columns
+        counts = np.bincount(pair_q, minlength=n)
+        if 'severity' in columns or 'crime_type' in columns:
+            total_severity = np.bincount(pair_q, weights=self._row_severity[pair_row], minlength=n)
+        else:
+            total_severity = counts * 5.0
+        high_severity = np.bincount(pair_q, weights=self._row_high_severity[pair_row], minlength=n).astype(int)
+        
+        # Recent incidents: last 30 days when dates parsed, otherwise the first five nearby crimes
+        if self._row_dates is not None:
+            cutoff = np.datetime64(datetime.now() - timedelta(days=30))
+            recent_pairs = np.flatnonzero(self._row_dates[pair_row] >= cutoff)
+        else:
+            recent_pairs = np.arange(pair_q.size)
+        # The first five per point in data order, as the per-point query returns them
+        recent_pairs = recent_pairs[np.argsort(pair_q[recent_pairs] * len(self.crime_data) + pair_row[recent_pairs])]
+        recent_q = pair_q[recent_pairs]
+        rank = np.arange(recent_q.size) - np.searchsorted(recent_q, recent_q, side='left')
+        recent_pairs, recent_q = recent_pairs[rank < 5], recent_q[rank < 5]
+        recent_records = self.crime_data.iloc[pair_row[recent_pairs]].copy()
+        recent_records['distance'] = distance[recent_pairs]
+        recent_by_q: Dict[int, List[Dict]] = {}
+        for q, record in zip(recent_q.tolist(), recent_records.to_dict('records')):
+            recent_by_q.setdefault(q, []).append(record)
+        recent_shown = np.bincount(recent_q, minlength=n)
+        
+        breakdowns = self._grouped_value_counts(pair_q, pair_row, 'crime_type')
+        areas = self._grouped_value_counts(pair_q, pair_row, 'area')
+        
+        # Vectorized _calculate_risk_metrics
+        found = counts > 0
+        avg_severity = np.divide(total_severity, counts, out=np.full(n, 5.0), where=found)
+        density = counts / 4.0
+        risk_score = np.where(found, np.maximum(1.0, 10.0 - density * 0.8 - (avg_severity - 5) * 0.4), 8.0)
+        crime_rate = np.select([density > 15, density > 10, density > 5, density > 2],
+                               ['Very High', 'High', 'Moderate', 'Low'], 'Very Low')
+        is_hotspot = found & ((high_severity > 2) | (counts > 10) | (recent_shown > 3))
+        hotspot_factor = np.where(found, np.minimum(3.0, 1.0 + counts / 10.0), 1.0)
+        risk_level = np.select([risk_score >= 8, risk_score >= 6, risk_score >= 4],
+                               ['Low Risk', 'Moderate Risk', 'High Risk'], 'Very High Risk')
+        confidence = np.minimum(0.95, 0.7 + np.minimum(counts, 20) * 0.01)
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        for q in range(n):
+            total = int(counts[q])
+            if total == 0:
+                most_common, frequency, breakdown = 'None', 0, {}
+            elif 'crime_type' in columns:
+                breakdown = breakdowns.get(q, {})
+                most_common = next(iter(breakdown), 'Unknown')
+                frequency = breakdown.get(most_common, 0)
+            else:
+                most_common, frequency, breakdown = 'Unknown', total, {'unknown': total}
+            score = round(float(risk_score[q]), 1)
+            
+            results.append({
+                'location': {'lat': float(lats[q]), 'lon': float(lons[q]), 'radius_km': radius_km},
+                'crime_data_found': total,
+                'risk_score': score,
+                'risk_level': str(risk_level[q]),
+                'crime_statistics': {
+                    'total_crimes': total,
+                    'crime_rate': str(crime_rate[q]) if total else 'Very Low',
+                    'most_common_crime': most_common,
+                    'crime_frequency': frequency,
+                    'safety_index': score,
+                    'crime_density_per_km2': round(float(density[q]), 2),
+                    'crime_breakdown': breakdown
+                },
+                'recent_incidents': recent_by_q.get(q, []),
+                'hotspot_analysis': {
+                    'is_hotspot': bool(is_hotspot[q]),
+                    'risk_factor': round(float(hotspot_factor[q]), 2),
+                    'high_severity_count': int(high_severity[q])
+                },
+                'safety_recommendations': self._recommendation_templates(
+                    score, most_common, bool(is_hotspot[q]), int(recent_shown[q])
+                ),
+                'area_info': {
+                    'area_name': next(iter(areas.get(q, {})), 'Unknown Area'),
+                    'city': 'Unknown City',
+                    'state': 'Unknown State',
+                    'country': 'India'
+                },
+                'data_sources': ['csv_crime_data'],
+                'analysis_timestamp': timestamp,
+                'confidence': round(float(confidence[q]), 2)
+            })
+        return results
+    
+    def _grouped_value_counts(self, pair_q: np.ndarray, pair_row: np.ndarray, column: str) -> Dict[int, Dict[Any, int]]:
+        """value_counts of `column` among each point's nearby crimes: most frequent first, ties in data order"""
+        if column not in self._row_codes or pair_q.size == 0:
+            return {}
+        codes, uniques = self._row_codes[column]
+        pair_codes = codes[pair_row]
+        valid = pair_codes >= 0  # value_counts drops missing values
+        # Count only the (point, value) combinations that occur, not every point times every value
+        keys, inverse, counts = np.unique(pair_q[valid].astype(np.int64) * len(uniques) + pair_codes[valid],
+                                          return_inverse=True, return_counts=True)
+        first_row = np.full(keys.size, len(self.crime_data))
+        np.minimum.at(first_row, inverse.ravel(), pair_row[valid])
+        key_q, key_code = np.divmod(keys, len(uniques))
+        order = np.lexsort((first_row, -counts, key_q))
+        
+        grouped: Dict[int, Dict[Any, int]] = {}
+        for q, code, count in zip(key_q[order].tolist(), key_code[order].tolist(), counts[order].tolist()):
+            grouped.setdefault(q, {})[uniques[code]] = count
+        return grouped
+    
+    def _analyze_crime_patterns(self, nearby_crimes: 'pd.DataFrame', lat: float, lon: float) -> Dict:
         """Analyze patterns in nearby crimes"""
         if nearby_crimes.empty:
             return {
@@ -236,8 +484,9 @@ class CSVCrimeAnalyzer:
             'temporal_patterns': self._analyze_temporal_patterns(nearby_crimes)
         }
     
-    def _analyze_temporal_patterns(self, crimes: pd.DataFrame) -> Dict:
+    def _analyze_temporal_patterns(self, crimes: 'pd.DataFrame') -> Dict:
         """Analyze temporal patterns in crime data"""
+        import pandas as pd
         patterns = {}
         
         if 'date' in crimes.columns and not crimes.empty:
@@ -258,7 +507,7 @@ class CSVCrimeAnalyzer:
         
         return patterns
     
-    def _calculate_risk_metrics(self, nearby_crimes: pd.DataFrame, crime_analysis: Dict) -> Dict:
+    def _calculate_risk_metrics(self, nearby_crimes: 'pd.DataFrame', crime_analysis: Dict) -> Dict:
         """Calculate risk metrics based on crime data"""
         total_crimes = len(nearby_crimes)
         
@@ -339,16 +588,23 @@ class CSVCrimeAnalyzer:
     
     def _generate_recommendations(self, risk_metrics: Dict, crime_analysis: Dict) -> List[str]:
         """Generate safety recommendations based on analysis"""
+        return self._recommendation_templates(
+            risk_metrics['risk_score'], crime_analysis['most_common_crime'],
+            risk_metrics['is_hotspot'], len(crime_analysis['recent_incidents'])
+        )
+    
+    def _recommendation_templates(self, risk_score: float, most_common_crime: str, is_hotspot: bool, recent_count: int) -> List[str]:
+        """Recommendation templates shared by single and batch analysis"""
         recommendations = []
         
         # Risk-based recommendations
-        if risk_metrics['risk_score'] <= 4:
+        if risk_score <= 4:
             recommendations.extend([
                 "⚠️ HIGH RISK AREA: Avoid this location if possible",
                 "Share your live location with trusted contacts immediately",
                 "Use well-lit main roads only, avoid shortcuts"
             ])
-        elif risk_metrics['risk_score'] <= 6:
+        elif risk_score <= 6:
             recommendations.extend([
                 "⚡ MODERATE RISK: Exercise extra caution in this area",
                 "Avoid walking alone, especially during evening/night hours"
@@ -357,7 +613,7 @@ class CSVCrimeAnalyzer:
             recommendations.append("✅ Relatively safe area, maintain normal precautions")
         
         # Crime-specific recommendations
-        most_common = crime_analysis['most_common_crime'].lower()
+        most_common = str(most_common_crime).lower()
         if 'theft' in most_common:
             recommendations.append("🎒 High theft activity - secure valuables and avoid displaying expensive items")
         elif 'robbery' in most_common:
@@ -370,16 +626,16 @@ class CSVCrimeAnalyzer:
             recommendations.append("🚗 Vehicle crimes reported - ensure car security and park in safe areas")
         
         # Hotspot recommendations
-        if risk_metrics['is_hotspot']:
+        if is_hotspot:
             recommendations.append("📍 Crime hotspot identified - consider alternative routes")
         
         # Recent activity recommendations
-        if len(crime_analysis['recent_incidents']) > 2:
-            recommendations.append(f"⏰ {len(crime_analysis['recent_incidents'])} recent incidents - heightened vigilance advised")
+        if recent_count > 2:
+            recommendations.append(f"⏰ {recent_count} recent incidents - heightened vigilance advised")
         
         return recommendations[:5]  # Limit to 5 most important
     
-    def _get_area_info(self, lat: float, lon: float, nearby_crimes: pd.DataFrame) -> Dict:
+    def _get_area_info(self, lat: float, lon: float, nearby_crimes: 'pd.DataFrame') -> Dict:
         """Get area information from crime data"""
         area_info = {
             'area_name': 'Unknown Area',
@@ -437,6 +693,9 @@ class CSVCrimeAnalyzer:
     
     def get_crime_statistics(self) -> Dict:
         """Get overall crime statistics from CSV data"""
+        return self._snapshot()._get_crime_statistics()
+    
+    def _get_crime_statistics(self) -> Dict:
         if self.crime_data is None or self.crime_data.empty:
             return {'status': 'No data available'}
         
@@ -1,29 +1,10 @@
+from .keyword_matcher import analyze_text
+
+
 def detect_emotion(text):
     """
     Enhanced emotion detection for safety conversations.
-    Analyzes emotional state to provide appropriate support.
+    Analyzes emotional state to provide appropriate support
+    (see EMOTION_KEYWORDS in models.keyword_matcher).
     """
-    text = text.lower()
-
-    # Positive emotions
-    if any(word in text for word in ["happy", "good", "great", "awesome", "fine", "okay", "confident", "safe"]):
-        return "happy"
-
-    # Negative emotions - sadness
-    elif any(word in text for word in ["sad", "bad", "terrible", "awful", "depressed", "down", "unhappy", "low"]):
-        return "sad"
-
-    # Negative emotions - anger
-    elif any(word in text for word in ["angry", "mad", "furious", "rage", "frustrated", "annoyed", "irritated"]):
-        return "angry"
-
-    # Fear and anxiety
-    elif any(word in text for word in ["scared", "afraid", "fear", "terrified", "anxious", "worried", "panic", "nervous"]):
-        return "scared"
-
-    # Distress and panic
-    elif any(word in text for word in ["distress", "crisis", "emergency", "help", "danger", "threat", "unsafe"]):
-        return "distressed"
-
-    else:
-        return "neutral"
+    return analyze_text(text)['emotion']
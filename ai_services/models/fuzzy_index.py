@@ -0,0 +1,187 @@
+import re
+import string
+from typing import Container, Dict, Iterable, List, Optional, Set
+
+# Tokens are runs of characters that are neither whitespace nor ASCII punctuation
+_SEPARATORS = str.maketrans({c: ' ' for c in string.punctuation})
+_TOKEN = re.compile(f"[^\\s{re.escape(string.punctuation)}]+")
+_TRAILING_TOKEN = re.compile(f"[^\\s{re.escape(string.punctuation)}]*\\Z")
+_MISSING = object()
+_VOWELS = str.maketrans('', '', 'aeiouy')
+
+
+def osa_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions and
+    adjacent transpositions); anything above `limit` is reported as limit + 1
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """`word` and every string made by deleting up to `distance` of its characters"""
+    variants, frontier = {word}, {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class InflectedWordList:
+    """
+    Membership in a word list that, like most dictionaries, holds base forms
+    only: a token is also a word when removing a regular suffix gives a listed
+    word ("scares", "snared", "safer", "worries", "stopped").
+    """
+
+    # (suffix, what replaces it); the base word must have three letters or more
+    SUFFIXES = (('ies', 'y'), ('ied', 'y'), ('ier', 'y'), ('iest', 'y'), ('ing', ''), ('ing', 'e'),
+                ('ed', ''), ('ed', 'e'), ('er', ''), ('er', 'e'), ('est', ''), ('est', 'e'),
+                ('sses', 'ss'), ('xes', 'x'), ('zes', 'z'), ('ches', 'ch'), ('shes', 'sh'), ('oes', 'o'),
+                ('s', ''), ('ly', ''))
+
+    def __init__(self, words: Iterable[str]):
+        self.words = words if isinstance(words, (set, frozenset)) else set(words)
+
+    def __contains__(self, token: str) -> bool:
+        words = self.words
+        if token in words:
+            return True
+        for suffix, replacement in self.SUFFIXES:
+            if not token.endswith(suffix) or len(token) - len(suffix) + len(replacement) < 3:
+                continue
+            stem = token[:-len(suffix)]
+            if stem + replacement in words:
+                return True
+            # Doubled final consonant: "stopped", "running"
+            if not replacement and stem[-1] == stem[-2] and stem[:-1] in words:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class SymmetricDeleteIndex:
+    """
+    Typo-tolerant lookup of tokens in a fixed vocabulary. Every vocabulary word
+    is stored under each string obtained by deleting up to its allowed distance
+    of characters; a token's candidates are the words sharing one of its own
+    delete variants, confirmed with `osa_distance`. A lookup is a few dict probes
+    whatever the vocabulary size, and results are memoized per token.
+
+    The allowed distance grows with length: none below `min_length`, one up to
+    `long_length - 1` characters, two from there on. Below `strict_length` one
+    edit is a quarter of the word, so a short token must keep the keyword's
+    consonants in order ("halp", "rute") or only swap two letters ("hlep");
+    "held" or "cafe" are not read as "help" or "safe". Tokens in `known_words` (any
+    container, e.g. an `InflectedWordList`) are real words and never corrected,
+    and a token with two equally close vocabulary words is left alone.
+    """
+
+    MAX_CACHED_TOKENS = 100000
+
+    def __init__(self, vocabulary: Iterable[str], known_words: Container[str] = frozenset(), min_length: int = 4,
+                 long_length: int = 9, strict_length: int = 5):
+        self.vocabulary = list(dict.fromkeys(word.lower() for word in vocabulary))
+        self.known_words = known_words
+        self._words = set(self.vocabulary)
+        self.min_length = min_length
+        self.long_length = long_length
+        self.strict_length = strict_length
+        self._index: Dict[str, List[str]] = {}
+        for word in self.vocabulary:
+            for variant in deletes(word, self.max_distance(word)):
+                self._index.setdefault(variant, []).append(word)
+        # token -> canonical word, or None when it needs no correction
+        self._cache: Dict[str, Optional[str]] = {}
+        # Whitespace-separated words (punctuation included) that need no correction
+        self._verified: Set[str] = set()
+        self.corrections = 0
+
+    def max_distance(self, token: str) -> int:
+        if len(token) < self.min_length:
+            return 0
+        return 1 if len(token) < self.long_length else 2
+
+    def plausible(self, token: str, word: str) -> bool:
+        """Whether a short `token` may be a misspelling of `word` at all (longer ones always may)"""
+        if len(token) >= self.strict_length:
+            return True
+        return token.translate(_VOWELS) == word.translate(_VOWELS) or sorted(token) == sorted(word)
+
+    def lookup(self, token: str) -> Optional[str]:
+        """The vocabulary word `token` is a misspelling of, or None"""
+        fix = self._cache.get(token, _MISSING)
+        if fix is _MISSING:
+            fix = self._resolve(token)
+            if len(self._cache) < self.MAX_CACHED_TOKENS:
+                self._cache[token] = fix
+        return fix
+
+    def _resolve(self, token: str) -> Optional[str]:
+        distance = self.max_distance(token)
+        if not distance or token in self._words or token in self.known_words:
+            return None
+        best, best_distance, tied = None, distance + 1, False
+        candidates = {word for variant in deletes(token, distance) for word in self._index.get(variant, ())}
+        for word in candidates:
+            limit = min(distance, self.max_distance(word))
+            d = osa_distance(token, word, limit)
+            if d > limit or not self.plausible(token, word):
+                continue
+            if d < best_distance:
+                best, best_distance, tied = word, d, False
+            elif d == best_distance:
+                tied = True
+        return None if tied else best
+
+    def correct(self, text: str) -> str:
+        """`text` with misspelled vocabulary tokens replaced (the same string if there are none)"""
+        words = text.split()
+        verified = self._verified
+        if verified.issuperset(words):
+            return text
+        fixes = {}
+        for word in words:
+            if word in verified:
+                continue
+            found = False
+            for token in word.translate(_SEPARATORS).split():
+                fix = self.lookup(token)
+                if fix is not None:
+                    fixes[token] = fix
+                    found = True
+            if not found and len(verified) < self.MAX_CACHED_TOKENS:
+                verified.add(word)
+        if not fixes:
+            return text
+        self.corrections += len(fixes)
+        return _TOKEN.sub(lambda match: fixes.get(match.group(), match.group()), text)
+
+    @staticmethod
+    def trailing_token_start(text: str) -> int:
+        """Where the token `text` ends in begins (len(text) if it ends with a separator)"""
+        return _TRAILING_TOKEN.search(text).start()
+
+    def stats(self):
+        return {
+            'vocabulary': len(self.vocabulary),
+            'index_entries': len(self._index),
+            'cached_tokens': len(self._cache),
+            'verified_words': len(self._verified),
+            'corrections': self.corrections
+        }
@@ -1,9 +1,11 @@
-import requests
 import logging
 from typing import Dict, Any
+import asyncio
 import time
 import json
 
+from utils.helpers import http_get
+
 logger = logging.getLogger(__name__)
 
 class RealGeocoder:
@@ -13,6 +15,9 @@ class RealGeocoder:
             self._get_bigdatacloud_address, # BigDataCloud (Free)
             self._get_locationiq_address,   # LocationIQ (Free tier)
         ]
+        # Nominatim allows one request per second across all concurrent analyses
+        self._nominatim_lock = asyncio.Lock()
+        self._nominatim_last_call = 0.0
     
     async def get_real_address(self, lat: float, lon: float) -> Dict[str, Any]:
         """Get real address using multiple geocoding services"""
@@ -47,9 +52,10 @@ class RealGeocoder:
             'Accept-Language': 'en'
         }
         
-        time.sleep(1)  # Respect rate limits
+        await self._respect_nominatim_rate_limit()
         
-        response = requests.get(
+        response = await asyncio.to_thread(
+            http_get,
             "https://nominatim.openstreetmap.org/reverse",
             params=params,
             headers=headers,
@@ -65,7 +71,8 @@ class RealGeocoder:
     async def _get_bigdatacloud_address(self, lat: float, lon: float) -> Dict[str, Any]:
         """BigDataCloud Reverse Geocoding (More Accurate)"""
         try:
-            response = requests.get(
+            response = await asyncio.to_thread(
+                http_get,
                 f"https://api.bigdatacloud.net/data/reverse-geocode-client",
                 params={
                     'latitude': lat,
@@ -89,7 +96,8 @@ class RealGeocoder:
             # You need to get free API key from locationiq.com
             api_key = "pk.your_locationiq_key_here"  # Get free from locationiq.com
             
-            response = requests.get(
+            response = await asyncio.to_thread(
+                http_get,
                 f"https://us1.locationiq.com/v1/reverse.php",
                 params={
                     'key': api_key,
@@ -109,6 +117,14 @@ class RealGeocoder:
         
         return None
     
+    async def _respect_nominatim_rate_limit(self):
+        """Space Nominatim calls at least one second apart"""
+        async with self._nominatim_lock:
+            wait = 1.0 - (time.monotonic() - self._nominatim_last_call)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._nominatim_last_call = time.monotonic()
+    
     def _parse_nominatim_data(self, data: Dict, lat: float, lon: float) -> Dict[str, Any]:
         """Parse OpenStreetMap data"""
         address = data.get('address', {})
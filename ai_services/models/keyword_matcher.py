@@ -0,0 +1,376 @@
+import collections
+import time
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from english_words import get_english_words_set
+
+from utils.executor import summarize_samples
+from .fuzzy_index import InflectedWordList, SymmetricDeleteIndex
+
+# Keyword tables in priority order: the first group with a keyword in the
+# lowercased text wins. Keywords match as substrings ("save" matches "unsafe").
+INTENT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    # Emergency and SOS
+    ("sos", ["help", "bachao", "save", "sos", "emergency", "danger", "threat"]),
+    # Location and navigation
+    ("location", ["location", "where am i", "gps", "directions", "lost", "find"]),
+    # Crime and security
+    ("crime", ["crime", "danger", "risk", "attack", "harassment", "stalking"]),
+    # Travel and movement safety
+    ("travel_safety", ["travel", "alone", "night", "dark", "walking", "roads", "street", "public transport", "road",
+                       "path", "route", "journey", "commute", "bus", "train", "auto", "rickshaw", "taxi", "cab",
+                       "uber", "ola", "rapido"]),
+    # Personal safety tips
+    ("safety_tips", ["tips", "advice", "safety", "safe", "protect", "prevent", "how to", "what if"]),
+    # Emotional support
+    ("emotional_support", ["scared", "afraid", "fear", "anxious", "worried", "panic", "distress"]),
+    # Harassment specific
+    ("harassment", ["harassed", "unwanted", "attention", "following", "creepy", "uncomfortable"])
+]
+DEFAULT_INTENT = "general"
+
+EMOTION_KEYWORDS: List[Tuple[str, List[str]]] = [
+    # Positive emotions
+    ("happy", ["happy", "good", "great", "awesome", "fine", "okay", "confident", "safe"]),
+    # Negative emotions - sadness
+    ("sad", ["sad", "bad", "terrible", "awful", "depressed", "down", "unhappy", "low"]),
+    # Negative emotions - anger
+    ("angry", ["angry", "mad", "furious", "rage", "frustrated", "annoyed", "irritated"]),
+    # Fear and anxiety
+    ("scared", ["scared", "afraid", "fear", "terrified", "anxious", "worried", "panic", "nervous"]),
+    # Distress and panic
+    ("distressed", ["distress", "crisis", "emergency", "help", "danger", "threat", "unsafe"])
+]
+DEFAULT_EMOTION = "neutral"
+
+VOICE_TRIGGER_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("triggered", ["help me", "save me", "bachao", "mujhe bachao", "sos", "emergency", "please help"])
+]
+DEFAULT_TRIGGER = "safe"
+
+KEYWORD_TABLES = {
+    'intent': (INTENT_KEYWORDS, DEFAULT_INTENT),
+    'emotion': (EMOTION_KEYWORDS, DEFAULT_EMOTION),
+    'trigger': (VOICE_TRIGGER_KEYWORDS, DEFAULT_TRIGGER)
+}
+
+# Tables whose words speech-to-text misspellings ("halp", "bachaao") are corrected
+# to, minus phrase words that mean nothing alone
+FUZZY_TABLES = ('trigger', 'intent')
+# Tables decided on the corrected text by default (see configure_default_matcher);
+# the others only see the words as written
+FUZZY_DECISIONS = ('trigger',)
+FUZZY_EXCLUDED = {"where", "what"}
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list. `scan` walks the text once
+    and returns a bitmask of every keyword occurring in it (bit i = keywords[i]),
+    however many keywords there are and however they overlap. It runs over UTF-8
+    bytes (a substring of the text is a substring of its encoding and vice versa)
+    so the transition table is one flat list indexed by state * 256 + byte.
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.bit = {keyword: 1 << i for i, keyword in enumerate(self.keywords)}
+
+        # Trie of all keywords; output[s] holds the keywords ending at state s
+        goto: List[Dict[int, int]] = [{}]
+        output = [0]
+        for keyword in self.keywords:
+            state = 0
+            for byte in keyword.encode('utf-8'):
+                if byte not in goto[state]:
+                    goto.append({})
+                    output.append(0)
+                    goto[state][byte] = len(goto) - 1
+                state = goto[state][byte]
+            output[state] |= self.bit[keyword]
+
+        # Failure links breadth-first, folding each state's transitions into a
+        # complete row so scanning never follows a failure chain
+        delta = [[0] * 256 for _ in goto]
+        for byte, child in goto[0].items():
+            delta[0][byte] = child
+        fail = [0] * len(goto)
+        queue = collections.deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            row, fallback = delta[state], delta[fail[state]]
+            for byte in range(256):
+                child = goto[state].get(byte)
+                if child is None:
+                    row[byte] = fallback[byte]
+                else:
+                    fail[child] = fallback[byte]
+                    row[byte] = child
+                    queue.append(child)
+
+        # States are stored pre-multiplied by 256, and outputs at those offsets
+        self._delta = [target * 256 for row in delta for target in row]
+        self._output = [0] * len(self._delta)
+        for state, keywords in enumerate(output):
+            self._output[state * 256] = keywords
+        self.states = len(goto)
+
+    def scan(self, text: str) -> int:
+        return self.feed(0, text)[1]
+
+    def feed(self, state: int, text: str) -> Tuple[int, int]:
+        """
+        Continue a scan from `state` (0 at the start of a stream) and return the
+        new state with the keywords completed in `text`, including ones that
+        began in earlier fragments
+        """
+        delta, output = self._delta, self._output
+        hits = 0
+        for byte in text.encode('utf-8', 'surrogatepass'):
+            state = delta[state + byte]
+            if output[state]:
+                hits |= output[state]
+        return state, hits
+
+    def keywords_in(self, hits: int) -> List[str]:
+        return [keyword for keyword in self.keywords if hits & self.bit[keyword]]
+
+    def matches(self, text: str) -> Set[str]:
+        return set(self.keywords_in(self.scan(text)))
+
+
+class SafetyKeywordMatcher:
+    """
+    Intent, emotion and voice-trigger decisions from one pass over the text.
+    Each table is reduced to per-group bitmasks, so a decision is the first
+    group (in table order) whose mask intersects the keyword hits.
+
+    A Python-level pass costs per character while `word in text` runs in C, so
+    past `scan_max_chars` (about where the two cross over, see
+    benchmarks/bench_keyword_matcher.py) the tables are checked with substring
+    scans instead; both give the same decisions.
+
+    With a `fuzzy` index, misspelled tokens are replaced by the keywords they are
+    within a small edit distance of, so "halp me" triggers like "help me". Only the
+    `fuzzy_tables` decisions read the corrected text (by default the voice trigger,
+    where a missed keyword costs most); the others are decided on the words as written.
+    """
+
+    MAX_CACHED_DECISIONS = 4096
+
+    def __init__(self, tables: Dict[str, Tuple[List[Tuple[str, List[str]]], str]] = None,
+                 scan_max_chars: int = 256, fuzzy: SymmetricDeleteIndex = None,
+                 fuzzy_tables: Sequence[str] = FUZZY_DECISIONS):
+        self.tables = tables or KEYWORD_TABLES
+        self.scan_max_chars = scan_max_chars
+        self.fuzzy = fuzzy
+        self.fuzzy_tables = frozenset(fuzzy_tables) if fuzzy is not None else frozenset()
+        self.automaton = KeywordAutomaton([word for groups, _ in self.tables.values()
+                                           for _, words in groups for word in words])
+        bit = self.automaton.bit
+        self._decisions = [
+            (name, [(label, sum(bit[word] for word in set(words))) for label, words in groups], default,
+             name in self.fuzzy_tables)
+            for name, (groups, default) in self.tables.items()
+        ]
+        # Keywords that make a table decide anything but its default
+        self.table_masks = {name: sum(bit[word] for word in {w for _, words in groups for w in words})
+                            for name, (groups, _) in self.tables.items()}
+        # Texts produce few distinct keyword sets, so decisions are memoized by hit masks
+        self._decided: Dict[Tuple[int, int], Dict[str, str]] = {}
+
+    def analyze(self, text: str) -> Dict[str, str]:
+        text = text.lower()
+        corrected = self.fuzzy.correct(text) if self.fuzzy_tables else text
+        if len(text) > self.scan_max_chars:
+            return self._scan_tables(text, corrected)
+        hits = self.automaton.scan(text)
+        # correct() returns the same string when nothing was misspelled
+        corrected_hits = hits if corrected is text else self.automaton.scan(corrected)
+        key = (hits, corrected_hits)
+        decided = self._decided.get(key)
+        if decided is None:
+            decided = self._decide(hits, corrected_hits)
+            if len(self._decided) < self.MAX_CACHED_DECISIONS:
+                self._decided[key] = decided
+        return dict(decided)
+
+    def analyze_many(self, texts: Sequence[str]) -> List[Dict[str, str]]:
+        """`analyze` per text; repeated texts (common in chat logs) are classified once and share a result"""
+        seen: Dict[str, Dict[str, str]] = {}
+        results = []
+        for text in texts:
+            result = seen.get(text)
+            if result is None:
+                result = seen[text] = self.analyze(text)
+            results.append(result)
+        return results
+
+    def _decide(self, hits: int, corrected_hits: int) -> Dict[str, str]:
+        result = {}
+        for name, groups, default, fuzzy in self._decisions:
+            table_hits = corrected_hits if fuzzy else hits
+            result[name] = next((label for label, mask in groups if table_hits & mask), default)
+        return result
+
+    def _scan_tables(self, text: str, corrected: str) -> Dict[str, str]:
+        result = {}
+        for name, (groups, default) in self.tables.items():
+            table_text = corrected if name in self.fuzzy_tables else text
+            result[name] = next((label for label, words in groups if any(word in table_text for word in words)), default)
+        return result
+
+
+class VoiceTriggerStream:
+    """
+    Rolling voice-trigger match over a transcript that arrives in fragments.
+    Fragments are concatenated as they are (include the spaces the speech-to-text
+    produced); the automaton state carries across them, so a keyword split over a
+    boundary ("bach" + "ao") is reported by the fragment that completes it.
+
+    With typo correction, the automaton state only advances over completed
+    words, each corrected once it ends; the word still being spoken is matched
+    as heard from that state, so exact keywords still fire on the fragment that
+    completes them and a misspelled one fires when its word ends (or on `finish`).
+    """
+
+    MAX_PENDING_CHARS = 64  # longer runs without a separator are not words to correct
+
+    def __init__(self, streams: 'VoiceTriggerStreams'):
+        self.streams = streams
+        self.automaton = streams.matcher.automaton
+        self.fuzzy = streams.matcher.fuzzy if 'trigger' in streams.matcher.fuzzy_tables else None
+        self.trigger_mask = streams.matcher.table_masks['trigger']
+        self.state = 0
+        self.pending = ''
+        self.pending_hits = 0
+        self.chars = 0
+        self.triggers = 0
+
+    def feed(self, fragment: str) -> List[str]:
+        """Trigger keywords completed by this fragment (empty if none)"""
+        start = time.perf_counter()
+        if self.fuzzy is None:
+            self.state, hits = self.automaton.feed(self.state, fragment.lower())
+        else:
+            hits = self._feed_words(self.pending + fragment.lower())
+        self.chars += len(fragment)
+        return self._report(hits, start)
+
+    def finish(self) -> List[str]:
+        """End the phrase: match the last word as corrected, then reset"""
+        start = time.perf_counter()
+        hits = self._feed_words(self.pending, final=True) if self.fuzzy is not None else 0
+        self.reset()
+        return self._report(hits, start)
+
+    def _feed_words(self, text: str, final: bool = False) -> int:
+        split = len(text) if final or len(text) > self.MAX_PENDING_CHARS else self.fuzzy.trailing_token_start(text)
+        hits = 0
+        if split:
+            self.state, hits = self.automaton.feed(self.state, self.fuzzy.correct(text[:split]))
+            # Keywords already reported while their word was still pending
+            hits &= ~self.pending_hits
+            self.pending_hits = 0
+        self.pending = text[split:]
+        if self.pending:
+            _, pending_hits = self.automaton.feed(self.state, self.pending)
+            hits |= pending_hits & ~self.pending_hits
+            self.pending_hits |= pending_hits
+        return hits
+
+    def _report(self, hits: int, start: float) -> List[str]:
+        keywords = self.automaton.keywords_in(hits & self.trigger_mask) if hits & self.trigger_mask else []
+        self.triggers += bool(keywords)
+        self.streams.record(keywords, (time.perf_counter() - start) * 1000)
+        return keywords
+
+    def reset(self):
+        """Start a new phrase: nothing before this point can complete a keyword"""
+        self.state = 0
+        self.pending = ''
+        self.pending_hits = 0
+
+
+class VoiceTriggerStreams:
+    """Opens VoiceTriggerStreams over one matcher and keeps their counters"""
+
+    def __init__(self, matcher: SafetyKeywordMatcher = None):
+        self.matcher = matcher or default_matcher()
+        self.active = 0
+        self.opened = 0
+        self.fragments = 0
+        self.triggers = 0
+        self.feed_ms = collections.deque(maxlen=1000)
+
+    def open(self) -> VoiceTriggerStream:
+        self.active += 1
+        self.opened += 1
+        return VoiceTriggerStream(self)
+
+    def close(self, stream: VoiceTriggerStream):
+        self.active -= 1
+
+    def record(self, keywords: List[str], feed_ms: float):
+        self.fragments += 1
+        self.triggers += bool(keywords)
+        self.feed_ms.append(feed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'active_streams': self.active,
+            'streams_opened': self.opened,
+            'fragments': self.fragments,
+            'triggers': self.triggers,
+            'feed_ms': summarize_samples(self.feed_ms)
+        }
+
+
+_default_matcher = None
+
+
+def dictionary_words() -> InflectedWordList:
+    """Webster's word list (with regular inflections): tokens that are real words are never corrected"""
+    return InflectedWordList(get_english_words_set(['web2'], lower=True, alpha=True))
+
+
+def fuzzy_keyword_index(tables: Dict[str, Tuple[List[Tuple[str, List[str]]], str]] = None) -> SymmetricDeleteIndex:
+    """Typo-tolerant index over the words of the FUZZY_TABLES keywords"""
+    tables = tables or KEYWORD_TABLES
+    vocabulary = [token for name in FUZZY_TABLES if name in tables for _, words in tables[name][0]
+                  for word in words for token in word.split() if token not in FUZZY_EXCLUDED]
+    # Keywords of the other tables are real words too
+    known = {token for groups, _ in tables.values() for _, words in groups for word in words for token in word.split()}
+    words = dictionary_words()
+    words.words |= known
+    return SymmetricDeleteIndex(vocabulary, known_words=words)
+
+
+def configure_default_matcher(fuzzy_tables: Sequence[str] = FUZZY_DECISIONS) -> SafetyKeywordMatcher:
+    """
+    Build the shared matcher, deciding `fuzzy_tables` (of FUZZY_TABLES) on typo-corrected
+    text. Call it before anything holds on to default_matcher(), e.g. at service start.
+    """
+    global _default_matcher
+    unknown = set(fuzzy_tables) - set(FUZZY_TABLES)
+    if unknown:
+        raise ValueError(f"Typo correction is only available for {list(FUZZY_TABLES)}, not {sorted(unknown)}")
+    _default_matcher = SafetyKeywordMatcher(fuzzy=fuzzy_keyword_index(), fuzzy_tables=fuzzy_tables)
+    return _default_matcher
+
+
+def default_matcher() -> SafetyKeywordMatcher:
+    """The shared matcher (typo correction for voice triggers unless configured otherwise), built on first use"""
+    if _default_matcher is None:
+        return configure_default_matcher()
+    return _default_matcher
+
+
+def analyze_text(text: str) -> Dict[str, str]:
+    """{'intent', 'emotion', 'trigger'} for `text` with the shared matcher"""
+    return default_matcher().analyze(text)
+
+
+def analyze_texts(texts: Sequence[str]) -> List[Dict[str, str]]:
+    return default_matcher().analyze_many(texts)
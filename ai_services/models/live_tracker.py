@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .location_analyzer import LocationAnalyzer
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Response fields that change on every analysis and are not worth pushing
+VOLATILE_FIELDS = ('timestamp',)
+
+
+class TrackingSession:
+    """What the last fix resolved to, so the next fix only redoes what changed"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.cell = None
+        self.weather_key = None
+        self.time_key = None
+        self.address_info = None
+        self.weather_data = None
+        self.analysis = None
+        self.fixes = 0
+        self.geocode_calls = 0
+        self.weather_calls = 0
+        self.score_calls = 0
+
+
+class LiveTracker:
+    """
+    Incremental location analysis for a stream of GPS fixes.
+    Address is refetched when the quantized cell changes, weather when its
+    coarse cell or time bucket rolls over, and the score when either (or the hour) does.
+    """
+
+    def __init__(self, location_analyzer: LocationAnalyzer, cell_size_deg: float = 0.001,
+                 weather_cell_deg: float = 0.05, weather_bucket_s: int = 900,
+                 max_sessions: int = 10000, session_ttl_s: float = 1800):
+        self.location_analyzer = location_analyzer
+        self.cell_size_deg = cell_size_deg
+        self.weather_cell_deg = weather_cell_deg
+        self.weather_bucket_s = weather_bucket_s
+        self.sessions = LRUCache(max_sessions, ttl=session_ttl_s, name='tracking_sessions')
+        self.active_connections = 0
+
+    def get_session(self, session_id: str) -> TrackingSession:
+        """Existing session (so a reconnect resumes its state) or a new one"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = TrackingSession(session_id)
+        self.sessions.set(session_id, session)
+        return session
+
+    async def process_fix(self, session: TrackingSession, fix: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply one fix; returns the message to push, or None when nothing visible changed"""
+        lat = float(fix['latitude'])
+        lon = float(fix['longitude'])
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError("Coordinates out of range")
+        now = datetime.now()
+        hour = int(fix['hour']) if fix.get('hour') is not None else now.hour
+        day_of_week = int(fix['day_of_week']) if fix.get('day_of_week') is not None else now.weekday()
+
+        cell = (math.floor(lat / self.cell_size_deg), math.floor(lon / self.cell_size_deg))
+        weather_key = (math.floor(lat / self.weather_cell_deg), math.floor(lon / self.weather_cell_deg),
+                       int(time.time() // self.weather_bucket_s))
+        time_key = (hour, day_of_week, fix.get('time_of_day'))
+
+        recomputed = []
+        fetches = {}
+        if cell != session.cell:
+            fetches['address'] = self.location_analyzer.geocoder.get_real_address(lat, lon)
+        if weather_key != session.weather_key:
+            fetches['weather'] = self.location_analyzer._get_weather_data(lat, lon)
+        if fetches:
+            results = dict(zip(fetches, await asyncio.gather(*fetches.values())))
+            if 'address' in results:
+                session.address_info = results['address']
+                session.cell = cell
+                session.geocode_calls += 1
+            if 'weather' in results:
+                session.weather_data = results['weather']
+                session.weather_key = weather_key
+                session.weather_calls += 1
+            recomputed.extend(results)
+
+        session.fixes += 1
+        if not fetches and time_key == session.time_key:
+            return None
+
+        analyzer = self.location_analyzer
+        features = analyzer.build_features(lat, lon, session.address_info, session.weather_data,
+                                           hour, day_of_week, fix.get('time_of_day'))
+        safety_score = analyzer.safety_predictor.predict_safety_score(features)
+        analysis = analyzer.build_analysis(session.address_info, session.weather_data, features, safety_score)
+        session.time_key = time_key
+        session.score_calls += 1
+        recomputed.append('score')
+
+        previous, session.analysis = session.analysis, analysis
+        if previous is None:
+            return {'type': 'snapshot', 'seq': session.fixes, 'session_id': session.session_id, 'analysis': analysis}
+
+        changes = {key: value for key, value in analysis.items()
+                   if key not in VOLATILE_FIELDS and previous.get(key) != value}
+        if not changes:
+            return None
+        return {'type': 'delta', 'seq': session.fixes, 'recomputed': recomputed, 'changes': changes}
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = self.sessions.values()
+        fixes = sum(s.fixes for s in sessions)
+        return {
+            'active_connections': self.active_connections,
+            'sessions': self.sessions.stats(),
+            'fixes': fixes,
+            'geocode_calls': sum(s.geocode_calls for s in sessions),
+            'weather_calls': sum(s.weather_calls for s in sessions),
+            'score_calls': sum(s.score_calls for s in sessions)
+        }
@@ -0,0 +1,254 @@
+import collections
+import contextlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.executor import summarize_samples
+from utils.geo import KM_PER_DEGREE, haversine_km
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    external_id TEXT,
+    category TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    street TEXT,
+    month TEXT,
+    date TEXT,
+    outcome_status TEXT,
+    severity REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS incidents_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+"""
+
+# Dropped during bulk loads and rebuilt afterwards; maintaining them row by row slows loading down
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_incidents_month ON incidents(month);
+CREATE INDEX IF NOT EXISTS idx_incidents_date ON incidents(date);
+"""
+
+COLUMNS = ('external_id', 'category', 'latitude', 'longitude', 'street', 'month', 'date', 'outcome_status', 'severity')
+
+
+class LocalCrimeStore:
+    """
+    Disk-backed incident store: SQLite with an R*Tree over coordinates.
+    A radius query reads the bounding box from the R*Tree and keeps the rows
+    within the exact great-circle distance, so memory use does not grow with
+    the number of stored incidents. Month and date filters use ordinary indexes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.queries = 0
+        self.query_ms = collections.deque(maxlen=1000)
+        self.candidates = 0
+        self.returned = 0
+        with self._connection() as conn:
+            conn.executescript(SCHEMA + INDEXES)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a loader"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def bulk_load(self, incidents: Iterable[Dict[str, Any]], batch_size: int = 50000) -> int:
+        """
+        Insert incidents (normalized records with a `location` dict, or flat rows
+        with latitude/longitude) in batched transactions; returns rows inserted
+        """
+        with self._bulk() as conn:
+            return self._insert(conn, (self._row(incident) for incident in incidents), batch_size)
+
+    def load_csv(self, path: str, chunksize: int = 200000) -> int:
+        """Stream a crime CSV (latitude, longitude, crime_type, date, area, severity) into the store"""
+        def chunks():
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                chunk.columns = chunk.columns.str.lower().str.strip()
+                yield chunk
+        return self.load_frames(chunks(), chunksize)
+
+    def load_frames(self, frames: Iterable[pd.DataFrame], batch_size: int = 200000) -> int:
+        """Load DataFrames in the CSV column layout one at a time, so input size is not bounded by RAM"""
+        total = 0
+        with self._bulk() as conn:
+            for frame in frames:
+                total += self._insert(conn, self._frame_rows(frame), batch_size)
+        return total
+
+    @contextlib.contextmanager
+    def _bulk(self):
+        """Drop the month/date indexes while loading and rebuild them once at the end"""
+        conn = self._connection()
+        with self._write_lock:
+            conn.executescript("DROP INDEX IF EXISTS idx_incidents_month; DROP INDEX IF EXISTS idx_incidents_date;")
+            try:
+                yield conn
+            finally:
+                conn.executescript(INDEXES)
+
+    @staticmethod
+    def _frame_rows(frame: pd.DataFrame) -> Iterable[tuple]:
+        lat = pd.to_numeric(frame['latitude'], errors='coerce')
+        lon = pd.to_numeric(frame['longitude'], errors='coerce')
+        valid = lat.notna() & lon.notna()
+        # Inserting in spatial order keeps R*Tree node splits local, which makes bulk loads much faster
+        order = np.lexsort((lon[valid].to_numpy(), np.floor(lat[valid].to_numpy() * 100)))
+        frame, lat, lon = frame[valid].iloc[order], lat[valid].iloc[order], lon[valid].iloc[order]
+        dates = pd.to_datetime(frame['date'], errors='coerce') if 'date' in frame.columns else pd.Series(pd.NaT, index=frame.index)
+
+        def column(values: pd.Series, default=None) -> List[Any]:
+            return values.astype(object).where(values.notna(), default).tolist()
+
+        def optional(name: str, default=None) -> List[Any]:
+            return column(frame[name], default) if name in frame.columns else [default] * len(frame)
+
+        severity = pd.to_numeric(frame['severity'], errors='coerce') if 'severity' in frame.columns else None
+        return zip(
+            optional('id'),
+            optional('crime_type', 'other'),
+            lat.tolist(),
+            lon.tolist(),
+            optional('area'),
+            _date_strings(dates, 'M'),
+            _date_strings(dates, 'D'),
+            optional('outcome_status'),
+            column(severity) if severity is not None else [None] * len(frame)
+        )
+
+    def _insert(self, conn: sqlite3.Connection, rows: Iterable[tuple], batch_size: int) -> int:
+        inserted = 0
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM incidents").fetchone()[0]
+        batch = []
+        for row in rows:
+            batch.append((next_id,) + row)
+            next_id += 1
+            if len(batch) >= batch_size:
+                inserted += self._write_batch(conn, batch)
+                batch = []
+        if batch:
+            inserted += self._write_batch(conn, batch)
+        return inserted
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: List[tuple]) -> int:
+        with conn:
+            conn.executemany(f"INSERT INTO incidents (id, {', '.join(COLUMNS)}) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", batch)
+            # Points are degenerate boxes
+            conn.executemany("INSERT INTO incidents_rtree VALUES (?, ?, ?, ?, ?)",
+                             [(row[0], row[3], row[3], row[4], row[4]) for row in batch])
+        return len(batch)
+
+    @staticmethod
+    def _row(incident: Dict[str, Any]) -> tuple:
+        location = incident.get('location') or {}
+        lat = float(location.get('latitude', incident.get('latitude')))
+        lon = float(location.get('longitude', incident.get('longitude')))
+        date = incident.get('incident_date') or incident.get('date')
+        date = str(date) if date is not None else None
+        month = incident.get('month') or (date[:7] if date else None)
+        return (
+            incident.get('id'),
+            incident.get('category') or incident.get('crime_type') or 'other',
+            lat, lon,
+            location.get('street') or incident.get('street'),
+            month,
+            date[:10] if date and len(date) >= 10 else None,
+            incident.get('outcome_status'),
+            incident.get('severity')
+        )
+
+    def query(self, lat: float, lon: float, radius_km: float, month_from: Optional[str] = None,
+              month_to: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Incidents within `radius_km`, nearest first. Months are 'YYYY-MM' and dates
+        'YYYY-MM-DD', both inclusive; a date filter skips incidents without a full date.
+        """
+        start = time.perf_counter()
+        # Degrees on the sphere haversine_km measures on, a hair wider so the box always contains the circle
+        dlat = radius_km / KM_PER_DEGREE * (1 + 1e-9)
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(89.0, abs(lat) + dlat))), 1e-6))
+        sql = ["SELECT i.id, i.external_id, i.category, i.latitude, i.longitude, i.street, i.month, i.date,"
+               " i.outcome_status, i.severity FROM incidents_rtree r JOIN incidents i ON i.id = r.id"
+               " WHERE r.min_lat <= ? AND r.max_lat >= ? AND r.min_lon <= ? AND r.max_lon >= ?"]
+        params: List[Any] = [lat + dlat, lat - dlat, lon + dlon, lon - dlon]
+        for clause, value in (("i.month >= ?", month_from), ("i.month <= ?", month_to),
+                              ("i.date >= ?", date_from), ("i.date <= ?", date_to)):
+            if value is not None:
+                sql.append(clause)
+                params.append(value)
+        rows = self._connection().execute(" AND ".join(sql), params).fetchall()
+
+        # The R*Tree stores 32-bit bounds (rounded outwards) and a box is wider than the circle
+        results = []
+        if rows:
+            distance = haversine_km(lat, lon, [row[3] for row in rows], [row[4] for row in rows])
+            within = np.flatnonzero(distance <= radius_km)
+            for i in within[np.argsort(distance[within], kind='stable')][:limit].tolist():
+                row = rows[i]
+                results.append({
+                    'id': row[1] if row[1] is not None else f"local_{row[0]}",
+                    'category': row[2],
+                    'location': {'latitude': row[3], 'longitude': row[4], 'street': row[5] or 'Unknown'},
+                    'date': row[6] or 'unknown',
+                    'incident_date': row[7],
+                    'outcome_status': row[8] or 'Unknown',
+                    'severity': row[9],
+                    'distance_km': round(float(distance[i]), 4)
+                })
+
+        with self._stats_lock:
+            self.queries += 1
+            self.candidates += len(rows)
+            self.returned += len(results)
+            self.query_ms.append((time.perf_counter() - start) * 1000)
+        return results
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'db_path': self.db_path,
+                'incidents': self.count(),
+                'db_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+                'queries': self.queries,
+                'candidates_scanned': self.candidates,
+                'incidents_returned': self.returned,
+                'query_ms': summarize_samples(self.query_ms)
+            }
+
+
+def _date_strings(dates: pd.Series, unit: str) -> List[Optional[str]]:
+    """'YYYY-MM' (unit 'M') or 'YYYY-MM-DD' (unit 'D') per timestamp, None where missing"""
+    values = dates.to_numpy(dtype='datetime64[ns]').astype(f'datetime64[{unit}]')
+    strings = np.datetime_as_string(values, unit=unit).astype(object)
+    strings[np.isnat(values)] = None
+    return strings.tolist()
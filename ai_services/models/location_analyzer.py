@@ -1,12 +1,17 @@
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Tuple
 from .geocoding_service import RealGeocoder
 from .safety_predictor import SafetyPredictor
+from utils.helpers import http_get
+from utils.metrics import registry
 
 logger = logging.getLogger(__name__)
 
+analysis_stage_seconds = registry.histogram('analysis_stage_duration_seconds',
+                                            "Time per stage of a location analysis", labels=('stage',))
+
 class LocationAnalyzer:
     def __init__(self, geocoder: RealGeocoder, safety_predictor: SafetyPredictor):
         self.geocoder = geocoder
@@ -14,31 +19,56 @@ class LocationAnalyzer:
     
     async def analyze_complete_location(self, location_data) -> Dict[str, Any]:
         """Complete location analysis with real address and safety scoring"""
+        address_info, weather_data, features = await self.gather_location_context(location_data)
+        
+        # Calculate safety score
+        with analysis_stage_seconds.labels('scoring').time():
+            safety_score = self.safety_predictor.predict_safety_score(features)
+        
+        with analysis_stage_seconds.labels('insights').time():
+            return self.build_analysis(address_info, weather_data, features, safety_score)
+    
+    async def gather_location_context(self, location_data) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Fetch address and weather and assemble scoring features (the I/O-bound part of an analysis)"""
         
         # Get real address details
-        address_info = await self.geocoder.get_real_address(
-            location_data.latitude, 
-            location_data.longitude
-        )
+        with analysis_stage_seconds.labels('geocode').time():
+            address_info = await self.geocoder.get_real_address(
+                location_data.latitude, 
+                location_data.longitude
+            )
         
         # Get weather data
-        weather_data = await self._get_weather_data(location_data.latitude, location_data.longitude)
+        with analysis_stage_seconds.labels('weather').time():
+            weather_data = await self._get_weather_data(location_data.latitude, location_data.longitude)
         
-        # Prepare features for safety prediction
-        features = {
-            'latitude': location_data.latitude,
-            'longitude': location_data.longitude,
-            'hour': location_data.hour or datetime.now().hour,
-            'day_of_week': location_data.day_of_week or datetime.now().weekday(),
+        with analysis_stage_seconds.labels('features').time():
+            features = self.build_features(
+                location_data.latitude, location_data.longitude, address_info, weather_data,
+                location_data.hour, location_data.day_of_week, location_data.time_of_day
+            )
+        
+        return address_info, weather_data, features
+    
+    def build_features(self, latitude: float, longitude: float, address_info: Dict[str, Any], weather_data: Dict[str, Any],
+                       hour: int = None, day_of_week: int = None, time_of_day: str = None) -> Dict[str, Any]:
+        """Prepare features for safety prediction"""
+        now = datetime.now()
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            # 0 is midnight / Monday, not missing
+            'hour': hour if hour is not None else now.hour,
+            'day_of_week': day_of_week if day_of_week is not None else now.weekday(),
             'weather': weather_data,
-            'time_of_day': location_data.time_of_day,
+            'time_of_day': time_of_day,
             'address_components': address_info['components'],
             'area_type': self.safety_predictor.detect_area_type(address_info),
             'city_size': self._get_city_size(address_info['components'].get('city', ''))
         }
-        
-        # Calculate safety score
-        safety_score = self.safety_predictor.predict_safety_score(features)
+    
+    def build_analysis(self, address_info: Dict[str, Any], weather_data: Dict[str, Any], features: Dict[str, Any], safety_score: float) -> Dict[str, Any]:
+        """Turn a safety score and its context into the analysis response"""
         
         # Generate insights
         risk_factors = self.safety_predictor.get_risk_factors(safety_score, features)
@@ -66,7 +96,8 @@ class LocationAnalyzer:
     async def _get_weather_data(self, lat: float, lon: float) -> Dict[str, Any]:
         """Get current weather data"""
         try:
-            response = requests.get(
+            response = await asyncio.to_thread(
+                http_get,
                 "https://api.open-meteo.com/v1/forecast",
                 params={
                     'latitude': lat,
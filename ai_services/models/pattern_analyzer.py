@@ -0,0 +1,486 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .safety_predictor import SafetyPredictor, AREA_TYPES, CITY_SIZES, WEATHER_CONDITIONS
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+MS_PER_HOUR = 3600 * 1000
+MS_PER_DAY = 24 * MS_PER_HOUR
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday = 0)
+
+# Location history carries no area, weather or city context; predictions score them as unknown
+UNKNOWN_AREA = AREA_TYPES.index('unknown')
+UNKNOWN_WEATHER = WEATHER_CONDITIONS.index('unknown')
+DEFAULT_CITY_SIZE = CITY_SIZES.index('medium')
+
+
+class CellStats:
+    """Running totals for the points that fell into one grid cell"""
+    __slots__ = ('count', 'sum_lat', 'sum_lon', 'safety_sum', 'safety_count', 'hours', 'weekdays', 'first_seen', 'last_seen')
+
+    def __init__(self):
+        self.count = 0
+        self.sum_lat = 0.0
+        self.sum_lon = 0.0
+        self.safety_sum = 0.0
+        self.safety_count = 0
+        self.hours = np.zeros(24, dtype=np.int64)
+        self.weekdays = np.zeros(7, dtype=np.int64)
+        self.first_seen = None
+        self.last_seen = None
+
+    def add(self, other: 'CellStats'):
+        self.count += other.count
+        self.sum_lat += other.sum_lat
+        self.sum_lon += other.sum_lon
+        self.safety_sum += other.safety_sum
+        self.safety_count += other.safety_count
+        self.hours += other.hours
+        self.weekdays += other.weekdays
+        self.first_seen = other.first_seen if self.first_seen is None else min(self.first_seen, other.first_seen)
+        self.last_seen = other.last_seen if self.last_seen is None else max(self.last_seen, other.last_seen)
+
+    def subtract(self, other: 'CellStats'):
+        # first/last seen stay as approximate bounds after expiry
+        self.count -= other.count
+        self.sum_lat -= other.sum_lat
+        self.sum_lon -= other.sum_lon
+        self.safety_sum -= other.safety_sum
+        self.safety_count -= other.safety_count
+        self.hours -= other.hours
+        self.weekdays -= other.weekdays
+
+
+class UserPatternState:
+    """
+    Per-user location history folded into grid cells, bucketed by local day.
+    New points are added to their cell totals, and days that leave the window are
+    subtracted, so updates never revisit older history.
+    """
+
+    def __init__(self, cell_size_m: float):
+        self.cell_size_m = cell_size_m
+        self.cell_lat = cell_size_m / METERS_PER_DEGREE
+        self.cell_lon = None  # fixed from the first batch's latitude
+        self.day_cells: Dict[int, Dict[Tuple[int, int], CellStats]] = {}
+        self.cells: Dict[Tuple[int, int], CellStats] = {}
+        self.watermark_ms: Optional[int] = None
+        self.total_points = 0
+        self._clusters = None
+        self.lock = threading.Lock()  # analyses may run on executor threads
+
+    def ingest(self, lat: np.ndarray, lon: np.ndarray, ts_ms: np.ndarray, safety: np.ndarray, tz_offset_minutes: int) -> int:
+        """Add points newer than the watermark; returns how many were added"""
+        keep = ~np.isnan(lat) & ~np.isnan(lon) & (ts_ms >= 0)
+        if self.watermark_ms is not None:
+            keep &= ts_ms > self.watermark_ms
+        if not keep.any():
+            return 0
+        lat, lon, ts_ms, safety = lat[keep], lon[keep], ts_ms[keep], safety[keep]
+
+        if self.cell_lon is None:
+            self.cell_lon = self.cell_lat / max(0.1, math.cos(math.radians(float(np.median(lat)))))
+
+        local_ms = ts_ms + tz_offset_minutes * 60 * 1000
+        days = local_ms // MS_PER_DAY
+        hours = (local_ms // MS_PER_HOUR) % 24
+        cell_x = np.floor(lat / self.cell_lat).astype(np.int64)
+        cell_y = np.floor(lon / self.cell_lon).astype(np.int64)
+
+        # Pack (day, cell) into one int64 key; a 1-D unique is far cheaper than unique over rows
+        origin = [days.min(), cell_x.min(), cell_y.min()]
+        span_x = int(cell_x.max() - origin[1]) + 1
+        span_y = int(cell_y.max() - origin[2]) + 1
+        keys = ((days - origin[0]) * span_x + (cell_x - origin[1])) * span_y + (cell_y - origin[2])
+        group_keys, inverse = np.unique(keys, return_inverse=True)
+        n_groups = len(group_keys)
+        groups = np.column_stack([
+            group_keys // (span_x * span_y) + origin[0],
+            (group_keys // span_y) % span_x + origin[1],
+            group_keys % span_y + origin[2]
+        ])
+        has_safety = ~np.isnan(safety)
+
+        counts = np.bincount(inverse, minlength=n_groups)
+        sum_lat = np.bincount(inverse, weights=lat, minlength=n_groups)
+        sum_lon = np.bincount(inverse, weights=lon, minlength=n_groups)
+        safety_sum = np.bincount(inverse, weights=np.where(has_safety, safety, 0.0), minlength=n_groups)
+        safety_count = np.bincount(inverse, weights=has_safety, minlength=n_groups)
+        hour_hist = np.bincount(inverse * 24 + hours, minlength=n_groups * 24).reshape(n_groups, 24)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        first_seen = np.minimum.reduceat(ts_ms[order], bounds)
+        last_seen = np.maximum.reduceat(ts_ms[order], bounds)
+
+        for g, (day, cx, cy) in enumerate(groups.tolist()):
+            stats = CellStats()
+            stats.count = int(counts[g])
+            stats.sum_lat = float(sum_lat[g])
+            stats.sum_lon = float(sum_lon[g])
+            stats.safety_sum = float(safety_sum[g])
+            stats.safety_count = int(safety_count[g])
+            stats.hours = hour_hist[g].copy()
+            stats.weekdays[(day + EPOCH_WEEKDAY) % 7] = stats.count  # a group is one local day
+            stats.first_seen = int(first_seen[g])
+            stats.last_seen = int(last_seen[g])
+
+            day_bucket = self.day_cells.setdefault(day, {})
+            existing = day_bucket.get((cx, cy))
+            if existing is None:
+                day_bucket[(cx, cy)] = stats
+            else:
+                existing.add(stats)
+            self.cells.setdefault((cx, cy), CellStats()).add(stats)
+
+        self.watermark_ms = int(ts_ms.max()) if self.watermark_ms is None else max(self.watermark_ms, int(ts_ms.max()))
+        self.total_points += int(keep.sum())
+        self._clusters = None
+        return int(keep.sum())
+
+    def expire(self, window_days: int, tz_offset_minutes: int) -> int:
+        """Drop day buckets older than the window, ending at the newest point; returns points removed"""
+        if self.watermark_ms is None:
+            return 0
+        newest_day = (self.watermark_ms + tz_offset_minutes * 60 * 1000) // MS_PER_DAY
+        removed = 0
+        for day in [d for d in self.day_cells if d <= newest_day - window_days]:
+            for cell, stats in self.day_cells.pop(day).items():
+                total = self.cells[cell]
+                total.subtract(stats)
+                removed += stats.count
+                if total.count <= 0:
+                    del self.cells[cell]
+        if removed:
+            self.total_points -= removed
+            self._clusters = None
+        return removed
+
+    def clusters(self, min_points: int) -> List[Dict[str, Any]]:
+        """
+        Grid density clustering: cells with at least `min_points` points are core
+        cells, touching core cells (8-neighbourhood) join one cluster, and occupied
+        cells next to a core cell are attached as border cells. Runs over occupied
+        cells only, so the cost does not depend on how many points they hold.
+        """
+        if self._clusters is not None and self._clusters[0] == min_points:
+            return self._clusters[1]
+
+        core = [cell for cell, stats in self.cells.items() if stats.count >= min_points]
+        parent = {cell: cell for cell in core}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cx, cy in core:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    neighbour = (cx + dx, cy + dy)
+                    if (dx or dy) and neighbour in parent:
+                        root_a, root_b = find((cx, cy)), find(neighbour)
+                        if root_a != root_b:
+                            parent[root_b] = root_a
+
+        members: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for cell in core:
+            members.setdefault(find(cell), []).append(cell)
+        for (cx, cy), stats in self.cells.items():
+            if (cx, cy) in parent:
+                continue
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    neighbour = (cx + dx, cy + dy)
+                    if neighbour in parent:
+                        members[find(neighbour)].append((cx, cy))
+                        break
+                else:
+                    continue
+                break
+
+        clusters = []
+        for cells in members.values():
+            total = CellStats()
+            for cell in cells:
+                total.add(self.cells[cell])
+            clusters.append({'cells': cells, 'stats': total})
+        clusters.sort(key=lambda c: c['stats'].count, reverse=True)
+
+        self._clusters = (min_points, clusters)
+        return clusters
+
+    def daily_safety(self) -> List[Tuple[int, float]]:
+        """(day, average reported safety score) for days with scored points"""
+        series = []
+        for day in sorted(self.day_cells):
+            total = sum(s.safety_sum for s in self.day_cells[day].values())
+            count = sum(s.safety_count for s in self.day_cells[day].values())
+            if count:
+                series.append((day, total / count))
+        return series
+
+
+def _timestamps_to_ms(values: List[Any]) -> np.ndarray:
+    """ISO strings or epoch numbers (seconds or milliseconds) to epoch ms; unparseable -> -1"""
+    import pandas as pd
+    series = pd.Series(values, dtype=object)
+    result = np.full(len(series), -1, dtype=np.int64)
+    # Each element is parsed on its own: a missing or malformed value must not affect the others
+    numeric = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+    numeric = np.where(numeric > 1e11, numeric, numeric * 1000)
+    finite = np.isfinite(numeric)
+    result[finite] = numeric[finite]
+    textual = ~finite & series.notna().to_numpy() & np.isnan(numeric)
+    if textual.any():
+        parsed = pd.to_datetime(series[textual], utc=True, errors='coerce', format='ISO8601')
+        # Subtracting the epoch is independent of the datetime resolution pandas picked
+        ms = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)
+        result[textual] = ms.fillna(-1).to_numpy(dtype=np.int64)
+    return result
+
+
+def _hour_ranges(hours: List[int]) -> List[str]:
+    """Collapse a set of hours into wrap-around ranges like '20:00-02:00'"""
+    if not hours:
+        return []
+    hour_set = set(hours)
+    if len(hour_set) == 24:
+        return ['00:00-24:00']
+    ranges = []
+    for start in sorted(hour_set):
+        if (start - 1) % 24 in hour_set:
+            continue
+        end = start
+        while (end + 1) % 24 in hour_set:
+            end = (end + 1) % 24
+        ranges.append(f"{start:02d}:00-{(end + 1) % 24:02d}:00")
+    return ranges
+
+
+class PatternAnalyzer:
+    """
+    Location pattern engine: clusters each user's history into frequent places and
+    joins them against safety scoring and crime risk to find risky routines.
+    """
+
+    def __init__(self, safety_predictor: SafetyPredictor, crime_risk: Callable[[float, float], float] = None,
+                 cell_size_m: float = 150.0, min_points: int = 5, max_users: int = 1000, max_clusters: int = 10):
+        self.safety_predictor = safety_predictor
+        self.crime_risk = crime_risk
+        self.cell_size_m = cell_size_m
+        self.min_points = min_points
+        self.max_clusters = max_clusters
+        self.states = LRUCache(max_users, name='pattern_states')
+        self._lock = threading.Lock()
+
+    def get_state(self, user_id: str) -> UserPatternState:
+        with self._lock:
+            state = self.states.get(user_id)
+            if state is None:
+                state = UserPatternState(self.cell_size_m)
+                self.states.set(user_id, state)
+            return state
+
+    def update(self, user_id: str, locations: List[Dict[str, Any]], days: int, tz_offset_minutes: int = 330) -> Dict[str, int]:
+        """
+        Fold new location points into the user's state and expire old days.
+        Points that are not added are counted: `points_skipped_old` were not newer than the
+        latest point already ingested, `points_skipped_invalid` lack a timestamp or coordinates.
+        """
+        state = self.get_state(user_id)
+        added = invalid = old = 0
+        if locations:
+            # Clients resend their whole history, so drop already-seen points before touching other fields
+            ts_ms = _timestamps_to_ms([p.get('timestamp') for p in locations])
+            invalid = int((ts_ms < 0).sum())
+            fresh = np.flatnonzero(ts_ms >= 0 if state.watermark_ms is None else ts_ms > state.watermark_ms)
+            old = len(locations) - invalid - len(fresh)
+            locations = [locations[i] for i in fresh]
+            ts_ms = ts_ms[fresh]
+            if locations:
+                lat = _numeric_column(locations, 'latitude')
+                lon = _numeric_column(locations, 'longitude')
+                safety = _numeric_column(locations, 'safety_score')
+                added = state.ingest(lat, lon, ts_ms, safety, tz_offset_minutes)
+                invalid += len(locations) - added
+        expired = state.expire(days, tz_offset_minutes)
+        return {'points_added': added, 'points_skipped_old': old, 'points_skipped_invalid': invalid,
+                'points_expired': expired, 'total_points': state.total_points}
+
+    def analyze(self, user_id: str, locations: List[Dict[str, Any]] = None, days: int = 30, tz_offset_minutes: int = 330) -> Dict[str, Any]:
+        start = time.perf_counter()
+        state = self.get_state(user_id)
+        with state.lock:
+            return self._analyze_locked(state, user_id, locations, days, tz_offset_minutes, start)
+
+    def _analyze_locked(self, state: UserPatternState, user_id: str, locations, days: int,
+                        tz_offset_minutes: int, start: float) -> Dict[str, Any]:
+        update = self.update(user_id, locations or [], days, tz_offset_minutes)
+        clusters = state.clusters(self.min_points)[:self.max_clusters]
+
+        frequent_locations = self._score_clusters(clusters, tz_offset_minutes)
+        risk_patterns = self._risk_patterns(frequent_locations)
+        high_risk_periods = self._high_risk_periods(state)
+
+        return {
+            'frequent_locations': frequent_locations,
+            'risk_patterns': risk_patterns,
+            'safety_trends': {
+                'overall_trend': self._overall_trend(state),
+                'high_risk_periods': high_risk_periods,
+                'safe_locations': [
+                    {'latitude': loc['latitude'], 'longitude': loc['longitude'], 'visits': loc['visits']}
+                    for loc in frequent_locations if loc['combined_safety_score'] >= 8
+                ]
+            },
+            'recommendations': self._recommendations(risk_patterns, high_risk_periods),
+            'analysis_summary': {
+                **update,
+                'days': days,
+                'clusters': len(frequent_locations),
+                'occupied_cells': len(state.cells),
+                'processing_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+        }
+
+    def _score_clusters(self, clusters: List[Dict[str, Any]], tz_offset_minutes: int) -> List[Dict[str, Any]]:
+        if not clusters:
+            return []
+
+        # One batched scoring pass over every (cluster, visited hour) pair, on the cluster's busiest weekday
+        pairs = [(i, hour) for i, c in enumerate(clusters) for hour in np.flatnonzero(c['stats'].hours)]
+        hours = np.array([hour for _, hour in pairs])
+        peak_weekdays = [int(np.argmax(c['stats'].weekdays)) for c in clusters]
+        weekdays = np.array([peak_weekdays[i] for i, _ in pairs], dtype=np.intp)
+        scores = self._predict_scores(hours, weekdays)
+        weights = np.array([clusters[i]['stats'].hours[hour] for i, hour in pairs], dtype=float)
+        owners = np.array([i for i, _ in pairs])
+        predicted = np.bincount(owners, weights=scores * weights, minlength=len(clusters)) / \
+            np.maximum(np.bincount(owners, weights=weights, minlength=len(clusters)), 1)
+
+        results = []
+        for i, cluster in enumerate(clusters):
+            stats = cluster['stats']
+            lat = stats.sum_lat / stats.count
+            lon = stats.sum_lon / stats.count
+            night_visits = int(stats.hours[[20, 21, 22, 23, 0, 1, 2, 3, 4, 5]].sum())
+
+            components = [float(predicted[i])]
+            observed = stats.safety_sum / stats.safety_count if stats.safety_count else None
+            if observed is not None:
+                components.append(observed)
+            crime_score = None
+            if self.crime_risk is not None:
+                try:
+                    crime_score = float(self.crime_risk(lat, lon))
+                    components.append(crime_score)
+                except Exception as e:
+                    logger.warning(f"⚠️ Crime risk lookup failed for cluster: {e}")
+            combined = round(sum(components) / len(components), 1)
+
+            results.append({
+                'latitude': round(lat, 6),
+                'longitude': round(lon, 6),
+                'visits': int(stats.count),
+                'radius_m': round(self.cell_size_m * math.sqrt(len(cluster['cells'])) / 2, 1),
+                'peak_hours': [int(h) for h in np.argsort(stats.hours)[::-1][:3] if stats.hours[h] > 0],
+                'peak_weekday': peak_weekdays[i],
+                'night_visit_share': round(night_visits / stats.count, 2),
+                'first_seen': datetime.fromtimestamp(stats.first_seen / 1000, tz=timezone.utc).isoformat(),
+                'last_seen': datetime.fromtimestamp(stats.last_seen / 1000, tz=timezone.utc).isoformat(),
+                'average_safety_score': round(observed, 1) if observed is not None else None,
+                'predicted_safety_score': round(float(predicted[i]), 1),
+                'crime_risk_score': crime_score,
+                'combined_safety_score': combined,
+                'risk_level': self.safety_predictor.get_risk_level(combined)
+            })
+        return results
+
+    def _predict_scores(self, hours: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+        """Rule or model safety scores from time alone; area, weather and city take their neutral codes"""
+        n = len(hours)
+        return self.safety_predictor.predict_safety_scores(
+            hours, weekdays, np.full(n, UNKNOWN_AREA), np.full(n, UNKNOWN_WEATHER), np.full(n, DEFAULT_CITY_SIZE)
+        )
+
+    def _risk_patterns(self, frequent_locations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        patterns = []
+        for loc in frequent_locations:
+            where = {'latitude': loc['latitude'], 'longitude': loc['longitude']}
+            if loc['combined_safety_score'] < 6:
+                patterns.append({
+                    'type': 'frequent_high_risk_location',
+                    'location': where,
+                    'visits': loc['visits'],
+                    'risk_level': loc['risk_level'],
+                    'description': f"You regularly visit a {loc['risk_level'].lower()} location ({loc['visits']} visits)"
+                })
+            if loc['night_visit_share'] >= 0.3 and loc['predicted_safety_score'] < 6:
+                patterns.append({
+                    'type': 'night_routine',
+                    'location': where,
+                    'visits': loc['visits'],
+                    'risk_level': loc['risk_level'],
+                    'description': f"{int(loc['night_visit_share'] * 100)}% of visits here happen at night"
+                })
+        return patterns
+
+    def _high_risk_periods(self, state: UserPatternState) -> List[str]:
+        """Visited hours whose average (reported or predicted) safety falls below 6"""
+        if not state.cells:
+            return ['20:00-02:00']
+        visits = np.zeros(24)
+        weekdays = np.zeros(7)
+        for stats in state.cells.values():
+            visits += stats.hours
+            weekdays += stats.weekdays
+        hours = np.arange(24)
+        predicted = self._predict_scores(hours, np.full(24, int(np.argmax(weekdays)), dtype=np.intp))
+        return _hour_ranges([int(h) for h in hours if visits[h] > 0 and predicted[h] < 6])
+
+    def _overall_trend(self, state: UserPatternState) -> str:
+        series = state.daily_safety()
+        if len(series) < 4:
+            return 'stable'
+        half = len(series) // 2
+        earlier = sum(score for _, score in series[:half]) / half
+        later = sum(score for _, score in series[half:]) / (len(series) - half)
+        if later - earlier > 0.5:
+            return 'improving'
+        if earlier - later > 0.5:
+            return 'declining'
+        return 'stable'
+
+    def _recommendations(self, risk_patterns: List[Dict[str, Any]], high_risk_periods: List[str]) -> List[str]:
+        recommendations = []
+        if any(p['type'] == 'frequent_high_risk_location' for p in risk_patterns):
+            recommendations.append("Some places you visit often carry elevated risk - share your location when going there")
+        if any(p['type'] == 'night_routine' for p in risk_patterns):
+            recommendations.append("Consider varying your routine for enhanced safety")
+        if high_risk_periods:
+            recommendations.append(f"Avoid high-risk areas during {', '.join(high_risk_periods)}")
+        if not recommendations:
+            recommendations = [
+                "Consider varying your routine for enhanced safety",
+                "Avoid high-risk areas during night hours"
+            ]
+        return recommendations[:4]
+
+    def stats(self) -> Dict[str, Any]:
+        return self.states.stats()
+
+
+def _numeric_column(points: List[Dict[str, Any]], key: str) -> np.ndarray:
+    """Float column from a list of dicts; missing or non-numeric values become NaN"""
+    import pandas as pd
+    return pd.to_numeric(pd.Series([p.get(key) for p in points], dtype=object), errors='coerce').to_numpy(dtype=float)
@@ -4,20 +4,48 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import json
 import asyncio
+import collections
+import time
 import aiohttp
+import numpy as np
+
+from utils.executor import summarize_samples
+from .local_crime_store import LocalCrimeStore
 
 logger = logging.getLogger(__name__)
 
 class RealCrimeAnalyzer:
     """
-    Real crime data analyzer using multiple data sources for accurate risk assessment
+    Real crime data analyzer using multiple data sources for accurate risk assessment.
+    HTTP sources share one pooled aiohttp session; use `async with RealCrimeAnalyzer()`
+    (or start()/close()) to own its lifetime. Pass a LocalCrimeStore to serve
+    incidents from the local SQLite database.
     """
     
-    def __init__(self):
+    # Seconds each source may take before the fan-out stops waiting for it
+    DEFAULT_SOURCE_TIMEOUTS = {'uk_police': 5.0, 'osm': 3.0, 'local': 2.0}
+    
+    ANALYSIS_STAGES = ('fetch', 'normalize', 'patterns', 'statistics', 'assessment')
+    
+    def __init__(self, source_timeouts: Optional[Dict[str, float]] = None, pool_size: int = 20,
+                 local_store: Optional[LocalCrimeStore] = None, local_months: int = 12):
+        self.local_store = local_store
+        self.local_months = local_months
+        self.source_timeouts = {**self.DEFAULT_SOURCE_TIMEOUTS, **(source_timeouts or {})}
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.fanouts = 0
+        self.fanout_ms = collections.deque(maxlen=1000)
+        self.source_stats = {name: {'ok': 0, 'failed': 0, 'timeouts': 0, 'latency_ms': collections.deque(maxlen=1000)}
+                             for name in self.source_timeouts}
+        self.stage_ms = {stage: collections.deque(maxlen=1000) for stage in self.ANALYSIS_STAGES}
+        
         self.crime_apis = {
             'police_data': 'https://data.police.uk/api/',  # UK Police Data
             'crime_mapping': 'https://www.crimemapping.com/api/',  # US Crime Mapping
-            'local_crime_db': None  # Your local crime database
+            'local_crime_db': local_store.db_path if local_store else None  # Your local crime database
         }
         
         # Crime severity weights
@@ -40,17 +68,33 @@ class RealCrimeAnalyzer:
         Analyze real crime risk for a specific location
         """
         try:
+            timer = time.perf_counter()
+            
+            def lap(stage: str):
+                nonlocal timer
+                now = time.perf_counter()
+                self.stage_ms[stage].append((now - timer) * 1000)
+                timer = now
+            
             # Get recent crime data from multiple sources
             crime_data = await self._fetch_crime_data(lat, lon, radius_km)
+            lap('fetch')
+            
+            # Convert the incident records to columns once; every statistic below reads the arrays
+            incidents = self._normalize_incidents(crime_data)
+            lap('normalize')
             
             # Analyze crime patterns
-            risk_analysis = self._analyze_crime_patterns(crime_data, lat, lon)
+            risk_analysis = self._analyze_crime_patterns(incidents, lat, lon)
+            lap('patterns')
             
             # Get area safety statistics
-            area_stats = self._calculate_area_statistics(crime_data)
+            area_stats = self._calculate_area_statistics(incidents)
+            lap('statistics')
             
             # Generate risk score and recommendations
             final_assessment = self._generate_risk_assessment(risk_analysis, area_stats)
+            lap('assessment')
             
             return {
                 'location': {'lat': lat, 'lon': lon, 'radius_km': radius_km},
@@ -70,32 +114,52 @@ class RealCrimeAnalyzer:
             logger.error(f"❌ Real crime analysis failed: {e}")
             return self._fallback_analysis(lat, lon)
     
+    async def start(self):
+        """Open the pooled session (done lazily on first fetch if not called)"""
+        if self._session is None or self._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_created)
+            trace.on_connection_reuseconn.append(self._on_connection_reused)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300, keepalive_timeout=30),
+                trace_configs=[trace]
+            )
+        return self._session
+    
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _on_connection_created(self, session, context, params):
+        self.connections_created += 1
+    
+    async def _on_connection_reused(self, session, context, params):
+        self.connections_reused += 1
+    
     async def _fetch_crime_data(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
         """
-        Fetch real crime data from multiple sources
+        Fetch real crime data from all sources concurrently, merging each result as it arrives
         """
-        all_crime_data = []
-        
-        # Method 1: UK Police Data API (if location is in UK)
-        try:
-            uk_data = await self._fetch_uk_police_data(lat, lon)
-            all_crime_data.extend(uk_data)
-        except Exception as e:
-            logger.warning(f"UK Police API failed: {e}")
-        
-        # Method 2: OpenStreetMap Crime Data
-        try:
-            osm_data = await self._fetch_osm_crime_data(lat, lon, radius_km)
-            all_crime_data.extend(osm_data)
-        except Exception as e:
-            logger.warning(f"OSM Crime data failed: {e}")
+        start = time.perf_counter()
+        sources = {
+            'uk_police': self._fetch_uk_police_data(lat, lon),  # Method 1: UK Police Data API (if location is in UK)
+            'osm': self._fetch_osm_crime_data(lat, lon, radius_km),  # Method 2: OpenStreetMap Crime Data
+            'local': self._fetch_local_crime_data(lat, lon, radius_km)  # Method 3: Local Crime Database (if available)
+        }
         
-        # Method 3: Local Crime Database (if available)
-        try:
-            local_data = await self._fetch_local_crime_data(lat, lon, radius_km)
-            all_crime_data.extend(local_data)
-        except Exception as e:
-            logger.warning(f"Local crime DB failed: {e}")
+        all_crime_data = []
+        for arrived in asyncio.as_completed([self._fetch_source(name, fetch) for name, fetch in sources.items()]):
+            all_crime_data.extend(await arrived)
+        self.fanouts += 1
+        self.fanout_ms.append((time.perf_counter() - start) * 1000)
         
         # Method 4: Simulated Real Crime Data (for demonstration)
         if not all_crime_data:
@@ -103,23 +167,57 @@ class RealCrimeAnalyzer:
         
         return all_crime_data
     
+    async def _fetch_source(self, name: str, fetch) -> List[Dict]:
+        """One source under its own timeout; a failure or timeout contributes no records"""
+        stats = self.source_stats[name]
+        start = time.perf_counter()
+        try:
+            records = await asyncio.wait_for(fetch, timeout=self.source_timeouts[name])
+            stats['ok'] += 1
+            return records
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            logger.warning(f"⏱️ Crime source {name} timed out after {self.source_timeouts[name]}s")
+        except Exception as e:
+            stats['failed'] += 1
+            logger.warning(f"Crime source {name} failed: {e}")
+        finally:
+            stats['latency_ms'].append((time.perf_counter() - start) * 1000)
+        return []
+    
     async def _fetch_uk_police_data(self, lat: float, lon: float) -> List[Dict]:
         """
         Fetch data from UK Police API
         """
-        try:
-            async with aiohttp.ClientSession() as session:
-                # Get crimes at location
-                url = f"https://data.police.uk/api/crimes-at-location?date=2024-11&lat={lat}&lng={lon}"
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [self._normalize_uk_crime_data(crime) for crime in data]
-        except Exception as e:
-            logger.error(f"UK Police API error: {e}")
+        session = await self.start()
+        # Get crimes at location
+        url = f"{self.crime_apis['police_data']}crimes-at-location?date=2024-11&lat={lat}&lng={lon}"
+        async with session.get(url) as response:
+            if response.status == 200:
+                data = await response.json()
+                return [self._normalize_uk_crime_data(crime) for crime in data]
         
         return []
     
+    def stats(self) -> Dict[str, Any]:
+        connections = self.connections_created + self.connections_reused
+        return {
+            'session_open': self._session is not None and not self._session.closed,
+            'pool_size': self.pool_size,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'reuse_rate': round(self.connections_reused / connections, 4) if connections else 0.0,
+            'fanouts': self.fanouts,
+            'fanout_ms': summarize_samples(self.fanout_ms),
+            'sources': {
+                name: {**{k: v for k, v in stats.items() if k != 'latency_ms'},
+                       'timeout_s': self.source_timeouts[name],
+                       'latency_ms': summarize_samples(stats['latency_ms'])}
+                for name, stats in self.source_stats.items()
+            },
+            'analysis_stages_ms': {stage: summarize_samples(samples) for stage, samples in self.stage_ms.items()}
+        }
+    
     async def _fetch_osm_crime_data(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
         """
         Fetch crime data from OpenStreetMap-based sources
@@ -130,11 +228,19 @@ class RealCrimeAnalyzer:
     
     async def _fetch_local_crime_data(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
         """
-        Fetch from local crime database (if available)
+        Fetch from local crime database (if available): incidents of the last `local_months` months
         """
-        # This would connect to your local crime database
-        # For now, return empty list
-        return []
+        if self.local_store is None:
+            return []
+        now = datetime.now()
+        first_month = now.year * 12 + now.month - 1 - (self.local_months - 1)
+        month_from = f"{first_month // 12:04d}-{first_month % 12 + 1:02d}"
+        # SQLite reads block, so they run on a thread
+        incidents = await asyncio.to_thread(self.local_store.query, lat, lon, radius_km, month_from=month_from)
+        for incident in incidents:
+            if incident['severity'] is None:
+                incident['severity'] = self.crime_weights.get(incident['category'], 3)
+        return incidents
     
     def _generate_realistic_crime_data(self, lat: float, lon: float, radius_km: float) -> List[Dict]:
         """
@@ -240,55 +346,103 @@ class RealCrimeAnalyzer:
             'severity': self.crime_weights.get(crime_data.get('category', 'other'), 3)
         }
     
-    def _analyze_crime_patterns(self, crime_data: List[Dict], lat: float, lon: float) -> Dict:
+    def _normalize_incidents(self, crime_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Incident records as columns: lat/lon (NaN if missing), month ordinal
+        (year * 12 + month - 1, -1 if the date is not 'YYYY-MM'), category codes
+        into `categories` (first-seen order) and severity (0 if missing)
+        """
+        n = len(crime_data)
+        lat = np.full(n, np.nan)
+        lon = np.full(n, np.nan)
+        month = np.full(n, -1, dtype=np.int64)
+        category = np.zeros(n, dtype=np.int64)
+        severity = np.zeros(n)
+        category_codes: Dict[Any, int] = {}
+        month_ordinals: Dict[Any, int] = {}
+        
+        for i, crime in enumerate(crime_data):
+            location = crime.get('location') or {}
+            try:
+                lat[i] = float(location.get('latitude'))
+                lon[i] = float(location.get('longitude'))
+            except (TypeError, ValueError):
+                pass
+            
+            # Incidents share a handful of months, so each distinct value is parsed once
+            date = crime.get('date')
+            ordinal = month_ordinals.get(date)
+            if ordinal is None:
+                try:
+                    parsed = datetime.strptime(date, '%Y-%m')
+                    ordinal = parsed.year * 12 + parsed.month - 1
+                except (TypeError, ValueError):
+                    ordinal = -1
+                month_ordinals[date] = ordinal
+            month[i] = ordinal
+            
+            category[i] = category_codes.setdefault(crime.get('category', 'other'), len(category_codes))
+            try:
+                severity[i] = float(crime.get('severity') or 0)
+            except (TypeError, ValueError):
+                pass
+        
+        return {
+            'records': crime_data,
+            'lat': lat,
+            'lon': lon,
+            'month': month,
+            'category': category,
+            'categories': list(category_codes),
+            'severity': severity
+        }
+    
+    def _analyze_crime_patterns(self, incidents: Dict[str, Any], lat: float, lon: float) -> Dict:
         """
         Analyze crime patterns and identify hotspots
         """
-        if not crime_data:
+        count = len(incidents['records'])
+        if not count:
             return {
                 'recent_incidents': [],
                 'hotspot_analysis': {'is_hotspot': False, 'risk_factor': 1.0},
                 'crime_trends': {'increasing': False, 'stable': True}
             }
         
-        # Recent incidents (last 30 days)
-        recent_incidents = []
-        for crime in crime_data:
-            try:
-                crime_date = datetime.strptime(crime['date'], '%Y-%m')
-                if (datetime.now() - crime_date).days <= 30:
-                    recent_incidents.append(crime)
-            except:
-                continue
+        # Recent incidents (last 30 days): the month started less than 31 days ago,
+        # i.e. its ordinal is after the month containing now - 31 days
+        cutoff = datetime.now() - timedelta(days=31)
+        recent = incidents['month'] > cutoff.year * 12 + cutoff.month - 1
+        recent_count = int(recent.sum())
         
         # Hotspot analysis
-        high_severity_crimes = [c for c in crime_data if c.get('severity', 0) >= 7]
-        is_hotspot = len(high_severity_crimes) > 3 or len(recent_incidents) > 5
+        high_severity_count = int((incidents['severity'] >= 7).sum())
+        is_hotspot = high_severity_count > 3 or recent_count > 5
         
         # Risk factor calculation
-        total_severity = sum(c.get('severity', 0) for c in crime_data)
-        avg_severity = total_severity / len(crime_data) if crime_data else 0
+        avg_severity = float(incidents['severity'].sum()) / count
         risk_factor = min(2.0, avg_severity / 5.0)
         
         return {
-            'recent_incidents': recent_incidents[:5],  # Top 5 recent
+            'recent_incidents': [incidents['records'][i] for i in np.flatnonzero(recent)[:5]],  # Top 5 recent
             'hotspot_analysis': {
                 'is_hotspot': is_hotspot,
                 'risk_factor': risk_factor,
-                'high_severity_count': len(high_severity_crimes)
+                'high_severity_count': high_severity_count
             },
             'crime_trends': {
-                'total_incidents': len(crime_data),
-                'recent_incidents': len(recent_incidents),
+                'total_incidents': count,
+                'recent_incidents': recent_count,
                 'avg_severity': round(avg_severity, 2)
             }
         }
     
-    def _calculate_area_statistics(self, crime_data: List[Dict]) -> Dict:
+    def _calculate_area_statistics(self, incidents: Dict[str, Any]) -> Dict:
         """
         Calculate area crime statistics
         """
-        if not crime_data:
+        count = len(incidents['records'])
+        if not count:
             return {
                 'total_crimes': 0,
                 'crime_rate': 'Low',
@@ -296,18 +450,14 @@ class RealCrimeAnalyzer:
                 'safety_index': 8.5
             }
         
-        # Crime type frequency
-        crime_types = {}
-        for crime in crime_data:
-            crime_type = crime.get('category', 'other')
-            crime_types[crime_type] = crime_types.get(crime_type, 0) + 1
-        
-        most_common = max(crime_types.items(), key=lambda x: x[1]) if crime_types else ('None', 0)
+        # Crime type frequency; argmax keeps the first-seen type on ties
+        counts = np.bincount(incidents['category'], minlength=len(incidents['categories']))
+        crime_types = dict(zip(incidents['categories'], counts.tolist()))
+        top = int(counts.argmax())
         
         # Safety index calculation (1-10, higher is safer)
-        total_severity = sum(c.get('severity', 0) for c in crime_data)
-        crime_density = len(crime_data) / 1.0  # per km²
-        safety_index = max(1.0, 10.0 - (crime_density * 0.5) - (total_severity / len(crime_data) / 2))
+        crime_density = count / 1.0  # per km²
+        safety_index = max(1.0, 10.0 - (crime_density * 0.5) - (float(incidents['severity'].sum()) / count / 2))
         
         # Crime rate classification
         if crime_density > 20:
@@ -322,10 +472,10 @@ class RealCrimeAnalyzer:
             crime_rate = 'Very Low'
         
         return {
-            'total_crimes': len(crime_data),
+            'total_crimes': count,
             'crime_rate': crime_rate,
-            'most_common_crime': most_common[0],
-            'crime_frequency': most_common[1],
+            'most_common_crime': incidents['categories'][top],
+            'crime_frequency': int(counts[top]),
             'safety_index': round(safety_index, 1),
             'crime_density_per_km2': round(crime_density, 2),
             'crime_breakdown': crime_types
@@ -0,0 +1,99 @@
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .safety_predictor import SafetyPredictor, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES, encode_category
+from .csv_crime_analyzer import CSVCrimeAnalyzer
+from utils.geo import haversine_km, densify_polyline
+
+logger = logging.getLogger(__name__)
+
+
+class RouteScorer:
+    """
+    Scores a polyline by resampling it at a fixed spacing and running every
+    sample through the crime index and SafetyPredictor in one batched pass.
+    """
+
+    def __init__(self, safety_predictor: SafetyPredictor, crime_analyzer: CSVCrimeAnalyzer, max_samples: int = 5000):
+        self.safety_predictor = safety_predictor
+        self.crime_analyzer = crime_analyzer
+        self.max_samples = max_samples
+
+    def score_route(self, points: List[Dict[str, Any]], hour: int, day_of_week: int, spacing_m: float = 50.0,
+                    speed_kmh: float = 5.0, area_type: str = 'unknown', weather: str = 'unknown',
+                    city_size: str = 'medium', crime_radius_km: float = 0.5) -> Dict[str, Any]:
+        start = time.perf_counter()
+        lats = np.array([float(p['latitude']) for p in points])
+        lons = np.array([float(p['longitude']) for p in points])
+        if lats.size < 2:
+            raise ValueError("A route needs at least two points")
+        if not (np.isfinite(lats).all() and np.isfinite(lons).all()
+                and (np.abs(lats) <= 90).all() and (np.abs(lons) <= 180).all()):
+            raise ValueError("Coordinates must be latitudes in [-90, 90] and longitudes in [-180, 180]")
+        if spacing_m <= 0 or crime_radius_km <= 0:
+            raise ValueError("spacing_m and crime_radius_km must be positive")
+
+        # Widen the spacing rather than exceed the sample budget on very long routes
+        route_km = float(haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
+        spacing_m = max(spacing_m, route_km * 1000 / self.max_samples)
+        sample_lat, sample_lon, segment, distance_km = densify_polyline(lats, lons, spacing_m)
+
+        # Samples further along the route are reached later, which can change the hour (and day)
+        elapsed_hours = hour + distance_km / speed_kmh if speed_kmh > 0 else np.full(distance_km.size, float(hour))
+        sample_hour = np.floor(elapsed_hours).astype(np.intp) % 24
+        sample_day = (day_of_week + np.floor(elapsed_hours / 24).astype(np.intp)) % 7
+
+        n = sample_lat.size
+        predicted = self.safety_predictor.predict_safety_scores(
+            sample_hour, sample_day,
+            np.full(n, encode_category([area_type], AREA_TYPES)[0]),
+            np.full(n, encode_category([weather], WEATHER_CONDITIONS)[0]),
+            np.full(n, encode_category([city_size], CITY_SIZES)[0])
+        )
+        crime = self.crime_analyzer.batch_crime_scores(sample_lat, sample_lon, crime_radius_km)
+        scores = np.round((predicted + crime['risk_score']) / 2, 1)
+
+        n_segments = lats.size - 1
+        segment_km = haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:])
+        sample_count = np.bincount(segment, minlength=n_segments)
+        mean_score = np.bincount(segment, weights=scores, minlength=n_segments) / np.maximum(sample_count, 1)
+        min_score = np.full(n_segments, np.inf)
+        np.minimum.at(min_score, segment, scores)
+        max_crimes = np.zeros(n_segments, dtype=np.int64)
+        np.maximum.at(max_crimes, segment, crime['crime_count'])
+
+        segments = []
+        for i in range(n_segments):
+            segments.append({
+                'index': i,
+                'start': {'latitude': float(lats[i]), 'longitude': float(lons[i])},
+                'end': {'latitude': float(lats[i + 1]), 'longitude': float(lons[i + 1])},
+                'length_km': round(float(segment_km[i]), 3),
+                'samples': int(sample_count[i]),
+                'safety_score': round(float(mean_score[i]), 1),
+                'min_safety_score': float(min_score[i]),
+                'max_nearby_crimes': int(max_crimes[i]),
+                'risk_level': self.safety_predictor.get_risk_level(mean_score[i])
+            })
+
+        overall = float(np.average(mean_score, weights=segment_km)) if route_km > 0 else float(scores.mean())
+        high_risk = mean_score < 5
+        return {
+            'segments': segments,
+            'summary': {
+                'safety_score': round(overall, 1),
+                'risk_level': self.safety_predictor.get_risk_level(overall),
+                'min_safety_score': float(scores.min()),
+                'worst_segment': int(np.argmin(mean_score)),
+                'high_risk_segments': int(high_risk.sum()),
+                'high_risk_km': round(float(segment_km[high_risk].sum()), 3),
+                'total_km': round(route_km, 3),
+                'estimated_minutes': round(route_km / speed_kmh * 60, 1) if speed_kmh > 0 else None,
+                'samples': int(n),
+                'spacing_m': round(spacing_m, 1),
+                'processing_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+        }
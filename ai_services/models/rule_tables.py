@@ -0,0 +1,73 @@
+import itertools
+import logging
+import time
+from typing import Any, Callable, Hashable, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledRuleTable:
+    """
+    Dense lookup table for a pure rule function over small categorical inputs.
+    The rule is evaluated once for every combination of axis values, so a
+    lookup is a single indexed read. Keys outside the axes fall back to the rule.
+    """
+
+    def __init__(self, name: str, rule: Callable[..., Any], axes: Sequence[Sequence[Hashable]]):
+        self.name = name
+        self.rule = rule
+        self.compile(axes)
+
+    def compile(self, axes: Sequence[Sequence[Hashable]] = None):
+        """(Re)evaluate the rule over every combination of axis values"""
+        start = time.perf_counter()
+        if axes is not None:
+            self.axes = [tuple(axis) for axis in axes]
+        self._index = [{value: i for i, value in enumerate(axis)} for axis in self.axes]
+
+        shape = tuple(len(axis) for axis in self.axes)
+        self._strides = [int(np.prod(shape[i + 1:], dtype=np.int64)) for i in range(len(shape))]
+
+        # Python values keep the rule's exact result types; the array serves vectorized lookups
+        self.values: List[Any] = [self.rule(*combo) for combo in itertools.product(*self.axes)]
+        self.array = np.array(self.values, dtype=float).reshape(shape)
+
+        self.compile_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"🧮 Compiled {self.name} lookup table: {len(self.values)} entries in {self.compile_ms:.1f} ms")
+
+    def lookup(self, *keys) -> Any:
+        """Rule result for `keys`, read from the table when every key is on an axis"""
+        try:
+            flat = 0
+            for index, stride, key in zip(self._index, self._strides, keys):
+                flat += index[key] * stride
+        except (KeyError, TypeError):
+            return self.rule(*keys)
+        return self.values[flat]
+
+    def lookup_codes(self, *codes) -> np.ndarray:
+        """Vectorized lookup by integer axis positions"""
+        return self.array[tuple(np.asarray(code) for code in codes)]
+
+    def lookup_many(self, *columns: Sequence[Hashable]) -> List[Any]:
+        """`lookup` over parallel columns of keys; off-axis rows fall back to the rule"""
+        codes = []
+        for index, column in zip(self._index, columns):
+            codes.append(np.fromiter((_axis_code(index, key) for key in column), dtype=np.intp, count=len(column)))
+        flat = sum(code * stride for code, stride in zip(codes, self._strides))
+        off_axis = np.zeros(len(flat), dtype=bool)
+        for code in codes:
+            off_axis |= code < 0
+        results = [self.values[i] for i in flat.tolist()]
+        for row in np.flatnonzero(off_axis).tolist():
+            results[row] = self.rule(*(column[row] for column in columns))
+        return results
+
+
+def _axis_code(index, key) -> int:
+    try:
+        return index.get(key, -1)
+    except TypeError:  # unhashable keys are never on an axis
+        return -1
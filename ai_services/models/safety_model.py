@@ -0,0 +1,241 @@
+"""
+Trained safety-score models with pure NumPy inference.
+
+Models are stored as versioned .npz files:
+    format_version   int, MODEL_FORMAT_VERSION
+    model_type       'linear' or 'tree_ensemble'
+    model_version    free-form string shown in status reports
+  linear:
+    weights          (N_FEATURES,) float
+    bias             float
+  tree_ensemble (gradient-boosted trees, one row per tree, -1 marks a leaf):
+    feature          (n_trees, n_nodes) int
+    threshold        (n_trees, n_nodes) float, go left when x[feature] <= threshold
+    left, right      (n_trees, n_nodes) int child node indexes
+    value            (n_trees, n_nodes) float leaf values
+    base_score       float
+
+Usage (fit a linear model to the current rules as a starting point):
+    python -m models.safety_model export-linear data/safety_model.npz --version 2026.10
+"""
+
+import argparse
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+
+# Input layout: one-hot hour, day of week, area type, weather and city size codes
+HOUR_VALUES, DAY_VALUES, AREA_VALUES, WEATHER_VALUES, CITY_VALUES = 24, 7, 6, 10, 3
+FEATURE_OFFSETS = np.cumsum([0, HOUR_VALUES, DAY_VALUES, AREA_VALUES, WEATHER_VALUES])
+N_FEATURES = HOUR_VALUES + DAY_VALUES + AREA_VALUES + WEATHER_VALUES + CITY_VALUES
+
+
+def encode_model_inputs(hour, day_of_week, area_type, weather, city_size) -> np.ndarray:
+    """One-hot encode integer feature codes into an (n, N_FEATURES) matrix"""
+    columns = [np.asarray(c, dtype=np.intp) for c in (hour, day_of_week, area_type, weather, city_size)]
+    rows = columns[0].shape[0]
+    matrix = np.zeros((rows, N_FEATURES), dtype=np.float32)
+    row_index = np.arange(rows)
+    for offset, codes in zip(FEATURE_OFFSETS, columns):
+        matrix[row_index, offset + codes] = 1.0
+    return matrix
+
+
+def _finalize_scores(raw: np.ndarray) -> np.ndarray:
+    """Same output contract as the rule-based scorer: 1-10, one decimal"""
+    return np.clip(np.round(raw.astype(np.float64), 1), 1.0, 10.0)
+
+
+class LinearSafetyModel:
+    model_type = 'linear'
+
+    def __init__(self, weights: np.ndarray, bias: float, version: str):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.version = version
+        if self.weights.shape != (N_FEATURES,):
+            raise ValueError(f"Linear model expects {N_FEATURES} weights, got {self.weights.shape}")
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        return _finalize_scores(inputs @ self.weights + self.bias)
+
+    def to_arrays(self) -> Dict[str, Any]:
+        return {'weights': self.weights, 'bias': self.bias}
+
+
+class TreeEnsembleSafetyModel:
+    model_type = 'tree_ensemble'
+
+    def __init__(self, feature, threshold, left, right, value, base_score: float, version: str):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.base_score = float(base_score)
+        self.version = version
+
+        shapes = {a.shape for a in (self.feature, self.threshold, self.left, self.right, self.value)}
+        if len(shapes) != 1 or self.feature.ndim != 2:
+            raise ValueError("Tree arrays must all have shape (n_trees, n_nodes)")
+        if self.feature.max(initial=0) >= N_FEATURES:
+            raise ValueError("Tree references a feature outside the input layout")
+
+        # Flattened node tables so each step is a 1-D take instead of 2-D fancy indexing
+        n_trees, n_nodes = self.feature.shape
+        offsets = (np.arange(n_trees) * n_nodes)[:, None]
+        internal = self.left >= 0
+        self._feature = self.feature.ravel()
+        self._threshold = self.threshold.ravel()
+        self._left = np.where(internal, self.left + offsets, np.arange(n_nodes) + offsets).ravel()
+        self._right = np.where(internal, self.right + offsets, np.arange(n_nodes) + offsets).ravel()
+        self._value = self.value.ravel()
+        self._roots = offsets.ravel()
+        self.depth = self._max_depth()
+
+    def _max_depth(self) -> int:
+        """Levels to walk so every root reaches a leaf (leaves point to themselves)"""
+        nodes = self._roots.copy()
+        for depth in range(self.feature.shape[1] + 1):
+            children = np.concatenate([self._left[nodes], self._right[nodes]])
+            if np.array_equal(np.unique(children), np.unique(nodes)):
+                return depth
+            nodes = np.unique(children)
+        raise ValueError("Tree arrays contain a cycle")
+
+    def predict(self, inputs: np.ndarray, chunk_rows: int = 2048) -> np.ndarray:
+        """Advance every (row, tree) pair one level per step; leaves loop on themselves"""
+        raw = np.empty(inputs.shape[0])
+        # Chunking keeps the (rows x trees) working set in cache
+        for start in range(0, inputs.shape[0], chunk_rows):
+            chunk = inputs[start:start + chunk_rows]
+            flat_inputs = chunk.ravel()
+            row_offsets = (np.arange(chunk.shape[0]) * chunk.shape[1])[:, None]
+            nodes = np.broadcast_to(self._roots, (chunk.shape[0], self._roots.size))
+
+            for _ in range(self.depth):
+                go_left = flat_inputs.take(row_offsets + self._feature.take(nodes)) <= self._threshold.take(nodes)
+                nodes = np.where(go_left, self._left.take(nodes), self._right.take(nodes))
+
+            raw[start:start + chunk_rows] = self.base_score + self._value.take(nodes).sum(axis=1)
+
+        return _finalize_scores(raw)
+
+    def to_arrays(self) -> Dict[str, Any]:
+        return {
+            'feature': self.feature, 'threshold': self.threshold, 'left': self.left,
+            'right': self.right, 'value': self.value, 'base_score': self.base_score
+        }
+
+
+MODEL_TYPES = {cls.model_type: cls for cls in (LinearSafetyModel, TreeEnsembleSafetyModel)}
+
+
+def save_safety_model(path: str, model):
+    np.savez(path, format_version=MODEL_FORMAT_VERSION, model_type=model.model_type,
+             model_version=model.version, **model.to_arrays())
+
+
+def load_safety_model(path: str):
+    """Load a model file, checking its format version and array shapes"""
+    with np.load(path, allow_pickle=False) as data:
+        format_version = int(data['format_version'])
+        if format_version != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format {format_version} (expected {MODEL_FORMAT_VERSION})")
+        model_type = str(data['model_type'])
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Unknown model type: {model_type}")
+        arrays = {key: data[key] for key in data.files if key not in ('format_version', 'model_type', 'model_version')}
+        version = str(data['model_version'])
+
+    if model_type == 'linear':
+        return LinearSafetyModel(arrays['weights'], float(arrays['bias']), version)
+    return TreeEnsembleSafetyModel(arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+                                   arrays['value'], float(arrays['base_score']), version)
+
+
+class InferenceStats:
+    """Per-batch inference latency for the active model"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.batches = 0
+            self.rows = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+            self.last_ms = 0.0
+            self.last_batch_size = 0
+
+    def record(self, rows: int, elapsed_ms: float):
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.last_ms = elapsed_ms
+            self.last_batch_size = rows
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'rows': self.rows,
+                'avg_batch_ms': round(self.total_ms / self.batches, 4) if self.batches else 0.0,
+                'max_batch_ms': round(self.max_ms, 4),
+                'last_batch_ms': round(self.last_ms, 4),
+                'last_batch_size': self.last_batch_size,
+                'avg_row_us': round(self.total_ms * 1000 / self.rows, 4) if self.rows else 0.0
+            }
+
+
+def warm_up(model, rows: int = 256) -> float:
+    """Run a throwaway batch so the first real request does not pay for allocation; returns ms"""
+    rng = np.random.default_rng(0)
+    inputs = encode_model_inputs(
+        rng.integers(0, HOUR_VALUES, rows), rng.integers(0, DAY_VALUES, rows), rng.integers(0, AREA_VALUES, rows),
+        rng.integers(0, WEATHER_VALUES, rows), rng.integers(0, CITY_VALUES, rows)
+    )
+    start = time.perf_counter()
+    model.predict(inputs)
+    return (time.perf_counter() - start) * 1000
+
+
+def fit_linear_model_from_rules(score_table: np.ndarray, version: str) -> LinearSafetyModel:
+    """Least-squares linear model over the compiled rule table (hour, day, area, weather, city)"""
+    grids = np.meshgrid(*(np.arange(n) for n in score_table.shape), indexing='ij')
+    inputs = encode_model_inputs(*(g.ravel() for g in grids)).astype(np.float64)
+    design = np.hstack([inputs, np.ones((inputs.shape[0], 1))])
+    solution, *_ = np.linalg.lstsq(design, score_table.ravel(), rcond=None)
+    return LinearSafetyModel(solution[:-1], solution[-1], version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Safety model tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export-linear', help="fit a linear model to the current rules and save it")
+    export.add_argument('path')
+    export.add_argument('--version', required=True)
+    args = parser.parse_args()
+
+    from .safety_predictor import SafetyPredictor
+    table = SafetyPredictor()._score_table.array
+    model = fit_linear_model_from_rules(table, args.version)
+    save_safety_model(args.path, model)
+    error = np.abs(model.predict(encode_model_inputs(*(g.ravel() for g in np.meshgrid(
+        *(np.arange(n) for n in table.shape), indexing='ij')))) - table.ravel())
+    print(f"Saved linear model {args.version} to {args.path} (mean abs error vs rules {error.mean():.3f})")
+
+
+if __name__ == "__main__":
+    main()
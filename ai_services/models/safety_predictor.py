@@ -2,61 +2,216 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, Any, List
 import logging
+import threading
+import time
+from .rule_tables import CompiledRuleTable
+from .safety_model import InferenceStats, encode_model_inputs, load_safety_model, warm_up
 
 logger = logging.getLogger(__name__)
 
+# Category vocabularies for columnar (batch) scoring; values outside them are
+# encoded as the first entry, which must carry no score adjustment
+AREA_TYPES = ('unknown', 'residential', 'commercial', 'industrial', 'isolated', 'highway')
+WEATHER_CONDITIONS = ('unknown', 'clear', 'partly_cloudy', 'overcast', 'drizzle', 'rain', 'fog', 'heavy_rain', 'storm', 'thunderstorm')
+CITY_SIZES = ('medium', 'metro', 'small')
+HOURS = tuple(range(24))
+DAYS_OF_WEEK = tuple(range(7))
+
+# Scoring rules; change them through SafetyPredictor.update_rules so the lookup table is recompiled
+DEFAULT_SAFETY_RULES = {
+    'base_score': 7.0,
+    # Time-based factors (25% weight): first matching (start, end) hour band wins
+    'time_bands': (
+        ((22, 23), -2.5),  # Late night
+        ((0, 5), -2.5),    # Late night
+        ((18, 21), -1.5),  # Evening
+        ((6, 17), 0.5),    # Daytime
+    ),
+    # Area type factors (30% weight)
+    'area_type': {'residential': 1.5, 'commercial': 0.5, 'industrial': -1.0, 'isolated': -2.0},
+    # Weather factors (20% weight)
+    'weather': {'heavy_rain': -2.0, 'storm': -2.0, 'thunderstorm': -2.0, 'rain': -1.0, 'fog': -1.0},
+    # Urban vs Rural (15% weight): metropolitan areas have mixed safety
+    'city_size': {'metro': -0.5, 'small': 1.0},
+    # Weekend factors (10% weight)
+    'weekend_days': (5, 6),
+    'weekend': -0.5,
+}
+
+
+def encode_category(values, vocabulary) -> np.ndarray:
+    """Map category strings to integer codes of `vocabulary` (unknown values -> 0)"""
+    index = {value: code for code, value in enumerate(vocabulary)}
+    return np.fromiter((index.get(value, 0) for value in values), dtype=np.int8, count=len(values))
+
 class SafetyPredictor:
-    def __init__(self):
-        # In production, load your actual trained model here
+    def __init__(self, rules: Dict[str, Any] = None, model_path: str = None):
+        # Trained model (see models/safety_model.py); the compiled rules are the fallback
         self.model = None
+        self.model_path = None
+        self.model_loaded_at = None
+        self.model_stats = InferenceStats()
+        self._model_lock = threading.Lock()
+        
+        self.rules = dict(DEFAULT_SAFETY_RULES)
+        self.rules.update(rules or {})
+        self._score_table = CompiledRuleTable('safety score', self._rule_safety_score, self._table_axes())
+        
+        if model_path:
+            try:
+                self.load_model(model_path)
+            except Exception as e:
+                logger.error(f"❌ Could not load safety model {model_path}, using rules: {e}")
+    
+    def load_model(self, path: str) -> Dict[str, Any]:
+        """
+        Load and warm up a model file, then swap it in.
+        Requests already scoring keep the model they started with, so none are dropped.
+        """
+        model = load_safety_model(path)
+        warm_up_ms = warm_up(model)
+        with self._model_lock:
+            previous = self.model
+            self.model = model
+            self.model_path = path
+            self.model_loaded_at = datetime.now().isoformat()
+            self.model_stats.reset()
+        logger.info(f"🧠 Safety model {model.model_type} v{model.version} active (warm-up {warm_up_ms:.2f} ms)"
+                    + (f", replaced v{previous.version}" if previous else ""))
+        return self.get_model_status()
+    
+    def unload_model(self):
+        """Go back to rule-based scoring"""
+        with self._model_lock:
+            self.model = None
+            self.model_path = None
+            self.model_loaded_at = None
+        logger.info("🧠 Safety model unloaded, using rules")
+    
+    def get_model_status(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            'backend': 'model' if model else 'rules',
+            'model_type': model.model_type if model else None,
+            'model_version': model.version if model else None,
+            'model_path': self.model_path,
+            'loaded_at': self.model_loaded_at,
+            'inference': self.model_stats.as_dict()
+        }
+    
+    def _score_codes(self, hour, day_of_week, area_type, weather, city_size) -> np.ndarray:
+        """Score in-range integer codes with the active model, or the rule table when there is none"""
+        model = self.model
+        if model is not None:
+            try:
+                start = time.perf_counter()
+                scores = model.predict(encode_model_inputs(hour, day_of_week, area_type, weather, city_size))
+                self.model_stats.record(len(scores), (time.perf_counter() - start) * 1000)
+                return scores
+            except Exception as e:
+                logger.warning(f"⚠️ Safety model inference failed, using rules: {e}")
+        return self._score_table.lookup_codes(hour, day_of_week, area_type, weather, city_size)
+    
+    def _table_axes(self):
+        return (HOURS, DAYS_OF_WEEK, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES)
+    
+    def update_rules(self, **changes):
+        """Replace scoring rules and recompile the lookup table"""
+        unknown = set(changes) - set(self.rules)
+        if unknown:
+            raise ValueError(f"Unknown safety rules: {sorted(unknown)}")
+        for key, vocabulary in (('area_type', AREA_TYPES), ('weather', WEATHER_CONDITIONS), ('city_size', CITY_SIZES)):
+            adjustments = changes.get(key, {})
+            if vocabulary[0] in adjustments:
+                raise ValueError(f"'{vocabulary[0]}' is the fallback {key} and cannot carry an adjustment")
+            # The compiled table only has rows for known values; anything else would score differently there
+            outside = set(adjustments) - set(vocabulary)
+            if outside:
+                raise ValueError(f"Unknown {key} values {sorted(outside)}; expected one of {list(vocabulary[1:])}")
+        
+        self.rules.update(changes)
+        self._score_table.compile()
+    
+    def _rule_safety_score(self, hour, day_of_week, area_type, weather, city_size) -> float:
+        """Evaluate the scoring rules directly (used to compile the lookup table)"""
+        rules = self.rules
+        base_score = rules['base_score']
+        
+        for (start, end), adjustment in rules['time_bands']:
+            if start <= hour <= end:
+                base_score += adjustment
+                break
+        
+        base_score += rules['area_type'].get(area_type, 0.0)
+        base_score += rules['weather'].get(weather, 0.0)
+        base_score += rules['city_size'].get(city_size, 0.0)
+        
+        if day_of_week in rules['weekend_days']:
+            base_score += rules['weekend']
+        
+        return max(1.0, min(10.0, round(base_score, 1)))
     
     def predict_safety_score(self, features: Dict[str, Any]) -> float:
         """
         Predict safety score based on location features
         Returns score between 1-10 (10 being safest)
         """
-        base_score = 7.0
-        
-        # Time-based factors (25% weight)
         hour = features.get('hour', 12)
-        if 22 <= hour <= 23 or 0 <= hour <= 5:  # Late night
-            base_score -= 2.5
-        elif 18 <= hour <= 21:  # Evening
-            base_score -= 1.5
-        elif 6 <= hour <= 17:  # Daytime
-            base_score += 0.5
-        
-        # Area type factors (30% weight)
+        day_of_week = features.get('day_of_week', 0)
         area_type = features.get('area_type', 'unknown')
-        if area_type == 'residential':
-            base_score += 1.5
-        elif area_type == 'commercial':
-            base_score += 0.5
-        elif area_type == 'industrial':
-            base_score -= 1.0
-        elif area_type == 'isolated':
-            base_score -= 2.0
-        
-        # Weather factors (20% weight)
         weather = features.get('weather', {}).get('condition', 'clear')
-        if weather in ['heavy_rain', 'storm', 'thunderstorm']:
-            base_score -= 2.0
-        elif weather in ['rain', 'fog']:
-            base_score -= 1.0
-        
-        # Urban vs Rural (15% weight)
         city_size = features.get('city_size', 'medium')
-        if city_size == 'metro':
-            base_score -= 0.5  # Metropolitan areas have mixed safety
-        elif city_size == 'small':
-            base_score += 1.0
         
-        # Weekend factors (10% weight)
-        day_of_week = features.get('day_of_week', 0)
-        if day_of_week in [5, 6]:  # Weekend
-            base_score -= 0.5
+        if self.model is not None and hour in HOURS and day_of_week in DAYS_OF_WEEK:
+            codes = ([int(hour)], [int(day_of_week)], encode_category([area_type], AREA_TYPES),
+                     encode_category([weather], WEATHER_CONDITIONS), encode_category([city_size], CITY_SIZES))
+            return float(self._score_codes(*codes)[0])
         
-        return max(1.0, min(10.0, round(base_score, 1)))
+        return self._score_table.lookup(hour, day_of_week, area_type, weather, city_size)
+    
+    def predict_safety_scores(self, hour, day_of_week, area_type, weather, city_size) -> np.ndarray:
+        """
+        Vectorized predict_safety_score over columnar inputs.
+        `hour` and `day_of_week` are numeric arrays; `area_type`, `weather` and `city_size`
+        are integer codes into AREA_TYPES, WEATHER_CONDITIONS and CITY_SIZES.
+        Without a model this reads the compiled table, so results are bit-identical to the scalar score.
+        """
+        hour = np.asarray(hour)
+        day_of_week = np.asarray(day_of_week)
+        area_type = np.asarray(area_type)
+        weather = np.asarray(weather)
+        city_size = np.asarray(city_size)
+        
+        in_table = (hour >= 0) & (hour < len(HOURS)) & (hour == np.floor(hour)) & \
+                   (day_of_week >= 0) & (day_of_week < len(DAYS_OF_WEEK)) & (day_of_week == np.floor(day_of_week))
+        if in_table.all():
+            return self._score_codes(hour.astype(np.intp), day_of_week.astype(np.intp), area_type, weather, city_size)
+        
+        # Fractional or out-of-range hours/days are rare; score those rows with the rules
+        scores = np.empty(hour.shape)
+        scores[in_table] = self._score_codes(
+            hour[in_table].astype(np.intp), day_of_week[in_table].astype(np.intp),
+            area_type[in_table], weather[in_table], city_size[in_table]
+        )
+        for i in np.flatnonzero(~in_table):
+            scores[i] = self._rule_safety_score(
+                hour[i].item(), day_of_week[i].item(),
+                AREA_TYPES[area_type[i]], WEATHER_CONDITIONS[weather[i]], CITY_SIZES[city_size[i]]
+            )
+        return scores
+    
+    def predict_safety_scores_from_features(self, features_list: List[Dict[str, Any]]) -> List[float]:
+        """Score a list of feature dicts (as passed to predict_safety_score) in one vectorized pass"""
+        if not features_list:
+            return []
+        scores = self.predict_safety_scores(
+            np.array([f.get('hour', 12) for f in features_list], dtype=float),
+            np.array([f.get('day_of_week', 0) for f in features_list], dtype=float),
+            encode_category([f.get('area_type', 'unknown') for f in features_list], AREA_TYPES),
+            encode_category([f.get('weather', {}).get('condition', 'clear') for f in features_list], WEATHER_CONDITIONS),
+            encode_category([f.get('city_size', 'medium') for f in features_list], CITY_SIZES)
+        )
+        return scores.tolist()
     
     def detect_area_type(self, address_components: Dict[str, Any]) -> str:
         """Detect area type based on address components"""
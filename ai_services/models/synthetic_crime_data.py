@@ -0,0 +1,287 @@
+"""
+Seeded synthetic crime datasets for load and scale testing.
+
+Incidents cluster around city centres (a few dozen hotspots per city plus a
+diffuse background), follow yearly and weekly seasonality and an evening-heavy
+hour profile, and use the CSVCrimeAnalyzer crime types with severities around
+their weights. Rows are generated in fixed blocks, each with its own seed, so
+the output for a given seed and size is identical however it is consumed.
+
+Formats (all streamed block by block, so size is bounded by disk, not RAM):
+  csv       the CSVCrimeAnalyzer layout: latitude, longitude, crime_type, date, area, severity
+  npy       a directory of column .npy files (open with np.load(mmap_mode='r')) plus meta.json
+  parquet   needs pyarrow
+
+Usage:
+    python -m models.synthetic_crime_data data/crimes_1m.csv --rows 1000000 --seed 7
+    python -m models.synthetic_crime_data data/crimes_100m --rows 100000000 --format npy
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .csv_crime_analyzer import CRIME_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+BLOCK_ROWS = 100000
+
+# name, latitude, longitude, city radius (km), share of incidents
+CITIES: List[Tuple[str, float, float, float, float]] = [
+    ('Delhi', 28.6139, 77.2090, 15.0, 0.28),
+    ('Mumbai', 19.0760, 72.8777, 12.0, 0.24),
+    ('Bengaluru', 12.9716, 77.5946, 12.0, 0.15),
+    ('Kolkata', 22.5726, 88.3639, 10.0, 0.12),
+    ('Chennai', 13.0827, 80.2707, 10.0, 0.11),
+    ('Pune', 18.5204, 73.8567, 8.0, 0.10)
+]
+
+# Relative frequency of each crime type (rarer for the most severe)
+CRIME_FREQUENCIES = {
+    'murder': 0.005, 'rape': 0.01, 'robbery': 0.06, 'assault': 0.10, 'burglary': 0.09,
+    'theft': 0.30, 'vehicle_theft': 0.10, 'fraud': 0.10, 'vandalism': 0.07,
+    'drug_offense': 0.05, 'public_disorder': 0.07, 'other': 0.045
+}
+
+# Share of incidents per hour of day: quiet early morning, peak in the evening
+HOUR_PROFILE = np.array([3, 2, 1.5, 1, 1, 1, 1.5, 2.5, 3.5, 4, 4, 4.5,
+                         5, 5, 5, 5, 5.5, 6, 7, 7.5, 7.5, 7, 6, 4.5])
+
+HOTSPOTS_PER_CITY = 40
+HOTSPOT_SHARE = 0.7  # the rest is spread over the whole city
+KM_PER_DEGREE = 111.32
+
+
+class SyntheticCrimeGenerator:
+    """Reproducible incident blocks; block i depends only on (seed, i, rows in the block)"""
+
+    def __init__(self, seed: int = 0, start_date: str = '2024-01-01', end_date: str = '2025-12-31'):
+        self.seed = seed
+        self.start_date = start_date
+        self.end_date = end_date
+        self.crime_types = list(CRIME_WEIGHTS)
+        self.severity_weights = np.array([CRIME_WEIGHTS[t] for t in self.crime_types], dtype=float)
+        base = np.array([CRIME_FREQUENCIES[t] for t in self.crime_types])
+        self.base_cdf = np.cumsum(base / base.sum())
+
+        # City layout is drawn once from the seed
+        rng = np.random.default_rng([seed, 0])
+        self.areas: List[str] = []
+        centers, spreads, mixes, hotspot_area, self.city_hotspots, self.city_hotspot_cdf, self.outskirts_area = \
+            [], [], [], [], [], [], []
+        for city_index, (name, lat, lon, radius_km, _) in enumerate(CITIES):
+            offsets_km = rng.normal(0, radius_km / 2.5, (HOTSPOTS_PER_CITY, 2))
+            # A few busy markets, many quiet corners
+            popularity = rng.pareto(1.5, HOTSPOTS_PER_CITY) + 1
+            self.city_hotspots.append(np.arange(HOTSPOTS_PER_CITY) + len(centers))
+            self.city_hotspot_cdf.append(np.cumsum(popularity / popularity.sum()))
+            for k in range(HOTSPOTS_PER_CITY):
+                centers.append((lat + offsets_km[k, 0] / KM_PER_DEGREE,
+                                lon + offsets_km[k, 1] / (KM_PER_DEGREE * np.cos(np.radians(lat)))))
+                hotspot_area.append(len(self.areas))
+                self.areas.append(f"{name} Zone {k + 1}")
+            spreads.extend(rng.uniform(0.2, 1.5, HOTSPOTS_PER_CITY))
+            # Each hotspot leans towards some crime types
+            mixes.extend(rng.dirichlet(base / base.sum() * 60, HOTSPOTS_PER_CITY))
+            self.outskirts_area.append(len(self.areas))
+            self.areas.append(f"{name} Outskirts")
+        self.hotspot_centers = np.array(centers)
+        self.hotspot_spread_km = np.array(spreads)
+        self.hotspot_mix_cdf = np.cumsum(mixes, axis=1)
+        self.hotspot_area = np.array(hotspot_area)
+        self.outskirts_area = np.array(self.outskirts_area)
+        self.city_centers = np.array([(c[1], c[2]) for c in CITIES])
+        self.city_radius_km = np.array([c[3] for c in CITIES])
+        shares = np.array([c[4] for c in CITIES])
+        self.city_cdf = np.cumsum(shares / shares.sum())
+
+        # Daily weights: summer peak, festival-season bump, busier Fridays and Saturdays
+        days = pd.date_range(start_date, end_date, freq='D')
+        doy = days.dayofyear.to_numpy()
+        weights = 1 + 0.2 * np.sin(2 * np.pi * (doy - 80) / 365.25) + 0.1 * np.exp(-((doy - 300) / 20.0) ** 2)
+        weights = weights * np.where(days.dayofweek.isin([4, 5]), 1.15, 1.0)
+        self.day_cdf = np.cumsum(weights / weights.sum())
+        self.day_start_s = days.to_numpy().astype('datetime64[s]').astype(np.int64)
+        self.hour_cdf = np.cumsum(HOUR_PROFILE / HOUR_PROFILE.sum())
+
+    def block(self, index: int, rows: int) -> Dict[str, np.ndarray]:
+        """Columns of one block: coordinates, crime type / area codes, epoch seconds, severity"""
+        rng = np.random.default_rng([self.seed, index + 1])
+        city = _draw(self.city_cdf, rng.random(rows))
+        in_hotspot = rng.random(rows) < HOTSPOT_SHARE
+
+        hotspot = np.zeros(rows, dtype=np.intp)
+        u = rng.random(rows)
+        for c, members in enumerate(self.city_hotspots):
+            rows_c = np.flatnonzero(city == c)
+            hotspot[rows_c] = members[_draw(self.city_hotspot_cdf[c], u[rows_c])]
+
+        center = np.where(in_hotspot[:, None], self.hotspot_centers[hotspot], self.city_centers[city])
+        spread_km = np.where(in_hotspot, self.hotspot_spread_km[hotspot], self.city_radius_km[city] / 2)
+        offsets_km = rng.normal(0, 1, (rows, 2)) * spread_km[:, None]
+        lat = center[:, 0] + offsets_km[:, 0] / KM_PER_DEGREE
+        lon = center[:, 1] + offsets_km[:, 1] / (KM_PER_DEGREE * np.cos(np.radians(center[:, 0])))
+
+        u = rng.random(rows)
+        crime = np.where(in_hotspot,
+                         (u[:, None] > self.hotspot_mix_cdf[hotspot]).sum(axis=1),
+                         _draw(self.base_cdf, u))
+        crime = np.minimum(crime, len(self.crime_types) - 1)
+        severity = np.clip(np.rint(self.severity_weights[crime] + rng.normal(0, 1, rows)), 1, 10)
+
+        day = _draw(self.day_cdf, rng.random(rows))
+        hour = _draw(self.hour_cdf, rng.random(rows))
+        seconds = self.day_start_s[day] + hour * 3600 + rng.integers(0, 3600, rows)
+
+        return {
+            'latitude': lat,
+            'longitude': lon,
+            'crime_type': crime.astype(np.uint8),
+            'date': seconds,
+            'area': np.where(in_hotspot, self.hotspot_area[hotspot], self.outskirts_area[city]).astype(np.uint16),
+            'severity': severity.astype(np.int8)
+        }
+
+    def blocks(self, rows: int) -> Iterator[Dict[str, np.ndarray]]:
+        for index, start in enumerate(range(0, rows, BLOCK_ROWS)):
+            yield self.block(index, min(BLOCK_ROWS, rows - start))
+
+    def frames(self, rows: int) -> Iterator[pd.DataFrame]:
+        """Blocks as DataFrames in the CSVCrimeAnalyzer column layout"""
+        crime_types = np.array(self.crime_types, dtype=object)
+        areas = np.array(self.areas, dtype=object)
+        for block in self.blocks(rows):
+            yield pd.DataFrame({
+                'latitude': block['latitude'],
+                'longitude': block['longitude'],
+                'crime_type': crime_types[block['crime_type']],
+                'date': block['date'].astype('datetime64[s]'),
+                'area': areas[block['area']],
+                'severity': block['severity']
+            })
+
+    def meta(self, rows: int) -> Dict:
+        return {
+            'rows': rows,
+            'seed': self.seed,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'crime_types': self.crime_types,
+            'areas': self.areas,
+            'columns': {
+                'latitude': 'float64 degrees',
+                'longitude': 'float64 degrees',
+                'crime_type': 'uint8 index into crime_types',
+                'date': 'int64 seconds since 1970-01-01 (local time)',
+                'area': 'uint16 index into areas',
+                'severity': 'int8 1-10'
+            }
+        }
+
+
+def _draw(cdf: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Inverse-CDF sampling of category indexes"""
+    return np.minimum(np.searchsorted(cdf, u * cdf[-1], side='right'), len(cdf) - 1)
+
+
+def write_csv(generator: SyntheticCrimeGenerator, path: str, rows: int, progress=None) -> int:
+    written = 0
+    for frame in generator.frames(rows):
+        frame.to_csv(path, mode='a' if written else 'w', header=not written, index=False,
+                     float_format='%.6f', date_format='%Y-%m-%d %H:%M:%S')
+        written += len(frame)
+        if progress:
+            progress(written)
+    return written
+
+
+def write_npy(generator: SyntheticCrimeGenerator, path: str, rows: int, progress=None) -> int:
+    """One memory-mapped .npy per column, filled block by block"""
+    os.makedirs(path, exist_ok=True)
+    columns = {}
+    written = 0
+    for block in generator.blocks(rows):
+        for name, values in block.items():
+            if name not in columns:
+                columns[name] = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode='w+',
+                                                          dtype=values.dtype, shape=(rows,))
+            columns[name][written:written + len(values)] = values
+        written += len(block['latitude'])
+        if progress:
+            progress(written)
+    for column in columns.values():
+        column.flush()
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(generator.meta(rows), f, indent=2)
+    return written
+
+
+def write_parquet(generator: SyntheticCrimeGenerator, path: str, rows: int, progress=None) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use --format csv or npy instead")
+    writer = None
+    written = 0
+    try:
+        for frame in generator.frames(rows):
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            written += len(frame)
+            if progress:
+                progress(written)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def load_npy(path: str) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """Memory-mapped columns and metadata of an npy dataset"""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in meta['columns']}
+    return columns, meta
+
+
+WRITERS = {'csv': write_csv, 'npy': write_npy, 'parquet': write_parquet}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic crime dataset")
+    parser.add_argument('output', help="file (csv, parquet) or directory (npy)")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=sorted(WRITERS), default=None, help="default: from the output extension")
+    parser.add_argument('--start-date', default='2024-01-01')
+    parser.add_argument('--end-date', default='2025-12-31')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    fmt = args.format or {'.csv': 'csv', '.parquet': 'parquet'}.get(os.path.splitext(args.output)[1], 'npy')
+    generator = SyntheticCrimeGenerator(args.seed, args.start_date, args.end_date)
+    start = time.perf_counter()
+    last_report = [start]
+
+    def progress(written):
+        now = time.perf_counter()
+        if now - last_report[0] >= 5 or written == args.rows:
+            last_report[0] = now
+            logger.info(f"🧪 {written:,}/{args.rows:,} rows ({written / (now - start):,.0f} rows/s)")
+
+    written = WRITERS[fmt](generator, args.output, args.rows, progress)
+    logger.info(f"✅ Wrote {written:,} synthetic incidents to {args.output} ({fmt}) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
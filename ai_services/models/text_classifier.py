@@ -0,0 +1,371 @@
+"""
+Learned intent/emotion classifier: hashed character and word n-gram features
+with a linear (softmax) model per head, all inference in NumPy.
+
+Features: lowercased text, character n-grams (3-5 bytes, padded with spaces so
+word starts and ends count) and word unigrams/bigrams, each hashed with a sign
+into `n_buckets` columns and scaled by 1/sqrt(n-grams in the text). A batch is
+hashed in a few vectorized passes and scored with one sparse-dense product per
+head; there is no per-text Python work besides lowercasing.
+
+Models are stored as versioned .npz files:
+    format_version   int, MODEL_FORMAT_VERSION
+    model_type       'hashed_ngram_linear'
+    model_version    free-form string shown in status reports
+    n_buckets        int, hashed feature columns
+    heads            names of the heads, e.g. ['intent', 'emotion']
+  per head <h>:
+    <h>_labels       class labels
+    <h>_weights      (n_buckets, n_labels) float32
+    <h>_bias         (n_labels,) float32
+
+Labeled files are CSV with a `text` column and one column per head (`intent`,
+`emotion`); an empty label leaves that row out of that head's training.
+
+Usage:
+    python -m models.text_classifier train data/text_labels.csv data/text_model.npz --version 2026.10
+    python -m models.text_classifier evaluate data/text_model.npz data/text_labels_test.csv
+"""
+
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .keyword_matcher import default_matcher
+from .safety_model import InferenceStats
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+DEFAULT_BUCKETS = 2 ** 18
+CHAR_NGRAMS = (3, 4, 5)
+HEADS = ('intent', 'emotion')
+
+_P = 0x100000001b3
+_P_INV = pow(_P, -1, 2 ** 64)  # odd, so invertible modulo 2**64
+_BIGRAM = np.uint64(0x9e3779b97f4a7c15)
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[[ord(c) for c in '0123456789_abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ']] = True
+_WORD_BYTES[0x80:] = True  # bytes of non-ASCII characters count as word characters
+_SEED_WORD, _SEED_BIGRAM = 11, 12  # char n-grams are seeded with n
+
+
+def _powers(base: int, n: int) -> np.ndarray:
+    powers = np.full(n, base, dtype=np.uint64)
+    powers[:1] = 1
+    return np.cumprod(powers)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """Finalize polynomial hashes (splitmix64) so nearby values spread over all bits"""
+    h ^= h >> np.uint64(31)
+    h *= np.uint64(0xbf58476d1ce4e5b9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94d049bb133111eb)
+    return h ^ (h >> np.uint64(31))
+
+
+def hash_features(texts: Sequence[str], n_buckets: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed n-gram features of `texts` as (rows, columns, scale): the nonzeros of
+    a binary matrix, grouped by n-gram kind and ordered by row within a kind
+    (a repeated n-gram is repeated, not merged), and 1/sqrt(n-gram count) per row.
+    """
+    # All texts as one byte string with a zero byte between them. Polynomial
+    # hashes of any substring then come from one prefix sum in wrapping uint64:
+    # hash(l, r) = (prefix[r] - prefix[l]) * P**(r-1)
+    data = np.frombuffer('\x00'.join(f" {text.lower().replace(chr(0), ' ')} " for text in texts)
+                         .encode('utf-8', 'surrogatepass'), dtype=np.uint8)
+    powers = _powers(_P, len(data))
+    prefix = np.concatenate([[np.uint64(0)], np.cumsum(data * _powers(_P_INV, len(data)), dtype=np.uint64)])
+    texts_before = np.concatenate([[0], np.cumsum(data == 0)])
+
+    rows, hashes = [], []
+    # Character n-grams not crossing into a neighbouring text
+    for n in CHAR_NGRAMS:
+        if len(data) < n:
+            continue
+        within = texts_before[n:] == texts_before[:-n]
+        rows.append(texts_before[:-n][within])
+        hashes.append(((prefix[n:] - prefix[:-n]) * powers[n - 1:])[within] + np.uint64(n))
+
+    # Word unigrams, and bigrams of neighbouring words within a text
+    edges = np.diff(np.concatenate([[False], _WORD_BYTES[data], [False]]).astype(np.int8))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    word_rows = texts_before[starts]
+    words = (prefix[ends] - prefix[starts]) * powers[ends - 1]
+    pairs = np.flatnonzero(word_rows[1:] == word_rows[:-1])
+    rows += [word_rows, word_rows[pairs]]
+    hashes += [words + np.uint64(_SEED_WORD), words[pairs] * _BIGRAM + words[pairs + 1] + np.uint64(_SEED_BIGRAM)]
+
+    row = np.concatenate(rows)
+    column = (_mix(np.concatenate(hashes)) % np.uint64(n_buckets)).astype(np.int64)
+    scale = 1 / np.sqrt(np.maximum(np.bincount(row, minlength=len(texts)), 1)).astype(np.float32)
+    return row, column, scale
+
+
+def sparse_dot(features, n_texts: int, weights: np.ndarray) -> np.ndarray:
+    """
+    (n_texts, n_labels) product of the hashed feature matrix with `weights`,
+    stored label-major as (n_labels, n_buckets) so each label gathers from one row
+    """
+    rows, columns, scale = features
+    product = np.zeros((n_texts, len(weights)), dtype=np.float32)
+    if len(rows):
+        # Nonzeros come in runs of the same row; sum each run, then add the runs up per row
+        runs = np.flatnonzero(np.concatenate([[True], rows[1:] != rows[:-1]]))
+        run_rows = rows[runs]
+        for c, label_weights in enumerate(weights):
+            product[:, c] = np.bincount(run_rows, weights=np.add.reduceat(label_weights[columns], runs),
+                                        minlength=n_texts)
+    return product * scale[:, None]
+
+
+class HashedNgramModel:
+    model_type = 'hashed_ngram_linear'
+
+    def __init__(self, heads: Dict[str, Tuple[Sequence[str], np.ndarray, np.ndarray]], n_buckets: int, version: str):
+        self.n_buckets = int(n_buckets)
+        self.version = version
+        self.heads = {}
+        for name, (labels, weights, bias) in heads.items():
+            weights = np.asarray(weights, dtype=np.float32)
+            bias = np.asarray(bias, dtype=np.float32)
+            if weights.shape != (self.n_buckets, len(labels)) or bias.shape != (len(labels),):
+                raise ValueError(f"Head {name}: expected weights ({self.n_buckets}, {len(labels)}) and bias "
+                                 f"({len(labels)},), got {weights.shape} and {bias.shape}")
+            self.heads[name] = ([str(label) for label in labels], weights, bias)
+        # All heads' labels stacked label-major for sparse_dot
+        self._weights = np.ascontiguousarray(np.hstack([weights for _, weights, _ in self.heads.values()]).T)
+        self._bias = np.concatenate([bias for _, _, bias in self.heads.values()])
+        bounds = np.cumsum([0] + [len(labels) for labels, _, _ in self.heads.values()])
+        self._slices = {name: slice(start, end) for name, start, end in zip(self.heads, bounds[:-1], bounds[1:])}
+
+    def logits(self, features, n_texts: int) -> np.ndarray:
+        """(n_texts, labels of all heads) logits for hashed features"""
+        return sparse_dot(features, n_texts, self._weights) + self._bias
+
+    def scores(self, features, n_texts: int, head: str) -> np.ndarray:
+        """(n_texts, n_labels) logits of one head"""
+        return self.logits(features, n_texts)[:, self._slices[head]]
+
+    def predict(self, texts: Sequence[str]) -> List[Dict[str, str]]:
+        """Most likely label per head for each text"""
+        logits = self.logits(hash_features(texts, self.n_buckets), len(texts))
+        best = {name: np.array(labels, dtype=object)[logits[:, self._slices[name]].argmax(axis=1)].tolist()
+                for name, (labels, _, _) in self.heads.items()}
+        return [{name: best[name][i] for name in self.heads} for i in range(len(texts))]
+
+    def to_arrays(self) -> Dict[str, Any]:
+        arrays = {'n_buckets': self.n_buckets, 'heads': np.array(list(self.heads))}
+        for name, (labels, weights, bias) in self.heads.items():
+            arrays.update({f"{name}_labels": np.array(labels), f"{name}_weights": weights, f"{name}_bias": bias})
+        return arrays
+
+
+def save_text_model(path: str, model: HashedNgramModel):
+    np.savez(path, format_version=MODEL_FORMAT_VERSION, model_type=model.model_type,
+             model_version=model.version, **model.to_arrays())
+
+
+def load_text_model(path: str) -> HashedNgramModel:
+    """Load a model file, checking its format version and array shapes"""
+    with np.load(path, allow_pickle=False) as data:
+        format_version = int(data['format_version'])
+        if format_version != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format {format_version} (expected {MODEL_FORMAT_VERSION})")
+        if str(data['model_type']) != HashedNgramModel.model_type:
+            raise ValueError(f"Unknown model type: {data['model_type']}")
+        heads = {str(name): (data[f"{name}_labels"].tolist(), data[f"{name}_weights"], data[f"{name}_bias"])
+                 for name in data['heads']}
+        return HashedNgramModel(heads, int(data['n_buckets']), str(data['model_version']))
+
+
+def train_text_model(texts: Sequence[str], labels: Dict[str, Sequence[Optional[str]]], version: str,
+                     n_buckets: int = DEFAULT_BUCKETS, epochs: int = 10, batch_size: int = 256,
+                     learning_rate: float = 0.5, seed: int = 0) -> HashedNgramModel:
+    """
+    Softmax regression per head with Adagrad mini-batches over the hashed features.
+    Rows whose label for a head is empty or None do not train that head.
+    """
+    rows, columns, scale = hash_features(texts, n_buckets)
+    # Group the nonzeros by text so a mini-batch can gather its rows
+    columns = columns[np.argsort(rows, kind='stable')]
+    lengths = np.bincount(rows, minlength=len(texts))
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    rng = np.random.default_rng(seed)
+    heads = {}
+    for name, head_labels in labels.items():
+        known = np.array([bool(label) for label in head_labels])
+        classes = sorted({label for label in head_labels if label})
+        target = np.array([classes.index(label) if label else -1 for label in head_labels])
+        weights = np.zeros((len(classes), n_buckets), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        weight_g2 = np.full(n_buckets, 1e-8, dtype=np.float32)
+        bias_g2 = np.full(len(classes), 1e-8, dtype=np.float32)
+        trainable = np.flatnonzero(known)
+
+        for _ in range(epochs):
+            for batch in np.array_split(rng.permutation(trainable), max(1, len(trainable) // batch_size)):
+                offsets = np.concatenate([[0], np.cumsum(lengths[batch])])
+                positions = np.repeat(indptr[batch] - offsets[:-1], lengths[batch]) + np.arange(offsets[-1])
+                batch_rows = np.repeat(np.arange(len(batch)), lengths[batch])
+                features = (batch_rows, columns[positions], scale[batch])
+
+                logits = sparse_dot(features, len(batch), weights) + bias
+                probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+                probabilities /= probabilities.sum(axis=1, keepdims=True)
+                probabilities[np.arange(len(batch)), target[batch]] -= 1.0
+                gradient = probabilities / len(batch)
+
+                touched, inverse = np.unique(features[1], return_inverse=True)
+                row_gradient = gradient * scale[batch][:, None]
+                weight_gradient = np.zeros((len(classes), len(touched)), dtype=np.float32)
+                for c in range(len(classes)):
+                    weight_gradient[c] = np.bincount(inverse, weights=row_gradient[batch_rows, c],
+                                                     minlength=len(touched))
+                weight_g2[touched] += (weight_gradient ** 2).sum(axis=0)
+                weights[:, touched] -= learning_rate * weight_gradient / np.sqrt(weight_g2[touched])
+                bias_gradient = gradient.sum(axis=0)
+                bias_g2 += bias_gradient ** 2
+                bias -= learning_rate * bias_gradient / np.sqrt(bias_g2)
+        heads[name] = (classes, weights.T, bias)
+    return HashedNgramModel(heads, n_buckets, version)
+
+
+def read_labeled_file(path: str) -> Tuple[List[str], Dict[str, List[Optional[str]]]]:
+    """Texts and per-head labels (None where missing) from a labeled CSV"""
+    import pandas as pd
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if 'text' not in frame.columns:
+        raise ValueError(f"{path} has no 'text' column")
+    heads = [head for head in HEADS if head in frame.columns]
+    if not heads:
+        raise ValueError(f"{path} has none of the label columns {HEADS}")
+    return frame['text'].tolist(), {head: [label or None for label in frame[head]] for head in heads}
+
+
+def warm_up(model: HashedNgramModel, rows: int = 64) -> float:
+    """Run a throwaway batch so the first real request does not pay for allocation; returns ms"""
+    start = time.perf_counter()
+    model.predict(["please help me find a safe route home"] * rows)
+    return (time.perf_counter() - start) * 1000
+
+
+class TextClassifier:
+    """
+    Intent/emotion/trigger classification: the keyword matcher, or a trained
+    hashed n-gram model for intent and emotion when one is loaded. Voice
+    triggers always come from the keywords so their recall never depends on a model.
+    """
+
+    def __init__(self, model_path: str = None):
+        self.matcher = default_matcher()
+        self.model = None
+        self.model_path = None
+        self.model_loaded_at = None
+        self.model_stats = InferenceStats()
+        self._model_lock = threading.Lock()
+        if model_path:
+            try:
+                self.load_model(model_path)
+            except Exception as e:
+                logger.error(f"❌ Could not load text model {model_path}, using keywords: {e}")
+
+    def load_model(self, path: str) -> Dict[str, Any]:
+        """Load and warm up a model file, then swap it in"""
+        model = load_text_model(path)
+        warm_up_ms = warm_up(model)
+        with self._model_lock:
+            previous = self.model
+            self.model = model
+            self.model_path = path
+            self.model_loaded_at = datetime.now().isoformat()
+            self.model_stats.reset()
+        logger.info(f"🧠 Text model v{model.version} active (warm-up {warm_up_ms:.2f} ms)"
+                    + (f", replaced v{previous.version}" if previous else ""))
+        return self.get_model_status()
+
+    def unload_model(self):
+        """Go back to keyword classification"""
+        with self._model_lock:
+            self.model = None
+            self.model_path = None
+            self.model_loaded_at = None
+        logger.info("🧠 Text model unloaded, using keywords")
+
+    def get_model_status(self) -> Dict[str, Any]:
+        model = self.model
+        return {
+            'backend': 'model' if model else 'keywords',
+            'model_type': model.model_type if model else None,
+            'model_version': model.version if model else None,
+            'heads': {name: head[0] for name, head in model.heads.items()} if model else None,
+            'model_path': self.model_path,
+            'loaded_at': self.model_loaded_at,
+            'inference': self.model_stats.as_dict()
+        }
+
+    def classify(self, texts: Sequence[str], backend: str = None) -> Tuple[List[Dict[str, str]], str]:
+        """Results per text and the backend used ('model' when loaded unless `backend='keywords'`)"""
+        results = self.matcher.analyze_many(texts)
+        model = self.model
+        if model is None or backend == 'keywords' or not texts:
+            return results, 'keywords'
+        start = time.perf_counter()
+        predicted = model.predict(texts)
+        self.model_stats.record(len(texts), (time.perf_counter() - start) * 1000)
+        return [{**keywords, **learned} for keywords, learned in zip(results, predicted)], 'model'
+
+
+def evaluate(model: HashedNgramModel, texts: Sequence[str], labels: Dict[str, Sequence[Optional[str]]]) -> Dict[str, Dict[str, float]]:
+    """Accuracy per head for the model and the keyword tables on the labeled rows"""
+    predicted = model.predict(texts)
+    keywords = default_matcher().analyze_many(texts)
+    report = {}
+    for head, head_labels in labels.items():
+        rows = [i for i, label in enumerate(head_labels) if label]
+        report[head] = {
+            'rows': len(rows),
+            'model_accuracy': round(float(np.mean([predicted[i].get(head) == head_labels[i] for i in rows])), 4) if rows else 0.0,
+            'keyword_accuracy': round(float(np.mean([keywords[i][head] == head_labels[i] for i in rows])), 4) if rows else 0.0
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text classifier tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help="train a model from a labeled CSV and save it")
+    train.add_argument('labeled')
+    train.add_argument('path')
+    train.add_argument('--version', required=True)
+    train.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS)
+    train.add_argument('--epochs', type=int, default=10)
+    check = sub.add_parser('evaluate', help="accuracy of a model and of the keyword tables on a labeled CSV")
+    check.add_argument('path')
+    check.add_argument('labeled')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        texts, labels = read_labeled_file(args.labeled)
+        start = time.perf_counter()
+        model = train_text_model(texts, labels, args.version, n_buckets=args.buckets, epochs=args.epochs)
+        save_text_model(args.path, model)
+        print(f"Saved text model {args.version} to {args.path} ({len(texts)} texts, "
+              f"{time.perf_counter() - start:.1f}s); on the training data:")
+    else:
+        texts, labels = read_labeled_file(args.labeled)
+        model = load_text_model(args.path)
+    for head, report in evaluate(model, texts, labels).items():
+        print(f"{head}: {report['rows']} rows, model {report['model_accuracy']:.1%}, "
+              f"keywords {report['keyword_accuracy']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+import asyncio
+import contextlib
+import json
 import logging
 import os
+import time
+import uuid
+from collections import Counter
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -15,14 +23,37 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import our custom modules
-from models.location_analyzer import LocationAnalyzer
+from models.location_analyzer import LocationAnalyzer, analysis_stage_seconds
 from models.geocoding_service import RealGeocoder
 from models.safety_predictor import SafetyPredictor
 from models.active_voice_detection import detect_voice_trigger
 from models.emotion_detector import detect_emotion
-from models.crime_prediction import predict_crime_risk
+from models.crime_prediction import predict_crime_risk, predict_crime_risk_batch, csv_crime_analyzer, CrimePredictionCache
+from models.pattern_analyzer import PatternAnalyzer
+from models.route_scorer import RouteScorer
+from models.live_tracker import LiveTracker
+from models.conversational_assistant import ConversationSessionStore, generate_response
+from models.keyword_matcher import VoiceTriggerStreams, configure_default_matcher, default_matcher
+from models.text_classifier import TextClassifier
+from utils.helpers import admin_allowed, format_location_response, get_current_time_info, resolve_data_file
+from utils.cache import MovementThresholdCache
+from utils.batching import DuplexStreamingResponse, dedupe_locations, run_bounded, iter_ndjson_lines, stream_bounded
+from utils.executor import CPUExecutor, EventLoopLagMonitor
+from utils.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from utils.prefork import memory_usage, serve_preforked, worker_index
 
-app = FastAPI(title="CyberSathi AI Location Service")
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    loop_monitor.start()
+    # Serve right away; crime data and lazily imported libraries load in the background
+    warm_up = asyncio.create_task(asyncio.to_thread(preload_shared_state)) if STARTUP_WARMUP else None
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    await loop_monitor.stop()
+    cpu_executor.shutdown()
+
+app = FastAPI(title="CyberSathi AI Location Service", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -33,16 +64,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per route for /metrics
+app.add_middleware(MetricsMiddleware, histogram=registry.histogram(
+    'http_request_duration_seconds', "HTTP request latency by method, route and status",
+    labels=('method', 'route', 'status')
+))
+
 # Pydantic Models
 class CrimePredictionRequest(BaseModel):
-    lat: float
-    lon: float
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
     time_of_day: str
     weather: str
     user_profile: str
     location_name: Optional[str] = None
     area_type: Optional[str] = None
 
+class CrimePredictionBatchRequest(BaseModel):
+    requests: List[CrimePredictionRequest]
+
+class TextClassificationBatchRequest(BaseModel):
+    texts: List[str]
+    backend: Optional[str] = None  # 'keywords' or 'model'; default: the text model when one is loaded
+
 class LocationAnalysisRequest(BaseModel):
     latitude: float
     longitude: float
@@ -61,15 +105,152 @@ class LocationAnalysisRequest(BaseModel):
 class BatchLocationRequest(BaseModel):
     locations: List[Dict[str, Any]]
 
+class RouteScoreRequest(BaseModel):
+    points: List[Dict[str, float]]  # polyline vertices with latitude/longitude
+    spacing_m: float = Field(50.0, ge=5.0)
+    hour: Optional[int] = Field(None, ge=0, le=23)
+    day_of_week: Optional[int] = Field(None, ge=0, le=6)
+    speed_kmh: float = Field(5.0, ge=0)  # walking pace; used to estimate the hour at each sample
+    area_type: str = 'unknown'
+    weather: str = 'unknown'
+    city_size: str = 'medium'
+    crime_radius_km: float = Field(0.5, gt=0, le=5.0)
+
+class ModelReloadRequest(BaseModel):
+    path: Optional[str] = None
+
 class PatternAnalysisRequest(BaseModel):
     user_id: str
     days: int = 30
     locations: Optional[List[Dict[str, Any]]] = None
+    tz_offset_minutes: int = 330  # local time for hour/day bucketing (IST by default)
+
+# Decisions taken on typo-corrected text ("trigger", "intent"); before anything uses the shared matcher
+configure_default_matcher([name.strip() for name in os.getenv("TYPO_CORRECTED_DECISIONS", "trigger").split(",")
+                           if name.strip()])
 
 # Initialize services
 geocoder = RealGeocoder()
-safety_predictor = SafetyPredictor()
+safety_predictor = SafetyPredictor(model_path=os.getenv("SAFETY_MODEL_PATH"))
+text_classifier = TextClassifier(model_path=os.getenv("TEXT_MODEL_PATH"))
 location_analyzer = LocationAnalyzer(geocoder, safety_predictor)
+pattern_analyzer = PatternAnalyzer(
+    safety_predictor,
+    crime_risk=lambda lat, lon: csv_crime_analyzer.analyze_location_crime_risk(lat, lon)['risk_score'],
+    cell_size_m=float(os.getenv("PATTERN_CELL_SIZE_M", 150)),
+    min_points=int(os.getenv("PATTERN_MIN_POINTS", 5)),
+    max_users=int(os.getenv("PATTERN_MAX_USERS", 1000))
+)
+live_tracker = LiveTracker(
+    location_analyzer,
+    cell_size_deg=float(os.getenv("TRACKING_CELL_SIZE_DEG", 0.001)),  # ~110 m
+    weather_bucket_s=int(os.getenv("TRACKING_WEATHER_BUCKET_S", 900)),
+    max_sessions=int(os.getenv("TRACKING_MAX_SESSIONS", 10000))
+)
+route_scorer = RouteScorer(safety_predictor, csv_crime_analyzer, max_samples=int(os.getenv("ROUTE_MAX_SAMPLES", 5000)))
+
+# CPU-bound analysis runs here instead of on the event loop
+cpu_executor = CPUExecutor(
+    mode=os.getenv("CPU_EXECUTOR_MODE", "thread"),
+    max_workers=int(os.getenv("CPU_EXECUTOR_WORKERS", 4))
+)
+loop_monitor = EventLoopLagMonitor(
+    interval_s=float(os.getenv("LOOP_LAG_INTERVAL_S", 0.1)),
+    histogram=registry.histogram('event_loop_lag_seconds', "How late the event loop ran a periodic wake-up",
+                                 buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+)
+
+# Per-user short-circuit for repeated analyses of a user who has not moved
+analysis_cache = MovementThresholdCache(
+    max_users=int(os.getenv("ANALYSIS_CACHE_MAX_USERS", 10000)),
+    distance_m=float(os.getenv("ANALYSIS_CACHE_DISTANCE_M", 100)),
+    max_age_s=float(os.getenv("ANALYSIS_CACHE_MAX_AGE_S", 600)),
+    name='analysis_cache'
+)
+
+# Crime prediction results, dropped whenever the crime dataset is reloaded
+prediction_cache = CrimePredictionCache(
+    maxsize=int(os.getenv("CRIME_CACHE_MAX_ENTRIES", 10000)),
+    ttl=float(os.getenv("CRIME_CACHE_TTL_S", 900)),
+    precision=int(os.getenv("CRIME_CACHE_PRECISION", 4))  # decimals; 4 is ~11 m
+)
+
+# Running intent/emotion counts per conversation for /ai/conversation
+conversation_sessions = ConversationSessionStore(
+    max_sessions=int(os.getenv("CONVERSATION_MAX_SESSIONS", 10000)),
+    ttl_s=float(os.getenv("CONVERSATION_SESSION_TTL_S", 3600))
+)
+
+# Rolling keyword state for streamed speech-to-text transcripts
+voice_streams = VoiceTriggerStreams()
+
+# Batch analysis settings
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+BATCH_DEDUP_TOLERANCE = float(os.getenv("BATCH_DEDUP_TOLERANCE", 0.0001))  # degrees (~11 m)
+CRIME_BATCH_MAX_SIZE = int(os.getenv("CRIME_BATCH_MAX_SIZE", 1000))
+TEXT_BATCH_MAX_SIZE = int(os.getenv("TEXT_BATCH_MAX_SIZE", 100000))
+TEXT_BATCH_INLINE_MAX = int(os.getenv("TEXT_BATCH_INLINE_MAX", 64))  # smaller batches skip the executor hop
+
+# Load what the first requests would otherwise load (crime data, pandas, requests) right after startup
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") not in ("0", "false", "no")
+
+# Reload/unload endpoints: with ADMIN_TOKEN set they need it in X-Admin-Token, otherwise they
+# only answer loopback clients (set a token when a proxy on the same host forwards traffic).
+# Paths in reload requests are file names inside DATA_DIR.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)):
+    if not admin_allowed(x_admin_token, request.client.host if request.client else None, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+def requested_data_file(path: Optional[str]) -> Optional[str]:
+    """A reload request's path resolved inside DATA_DIR; None when the request names no file"""
+    if not path:
+        return None
+    try:
+        return resolve_data_file(path, DATA_DIR)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def analysis_response(result: Dict[str, Any]) -> JSONResponse:
+    """The JSON response FastAPI would build for `result`, timed as the analysis 'serialize' stage"""
+    with analysis_stage_seconds.labels('serialize').time():
+        return JSONResponse(jsonable_encoder(result))
+
+def cache_metrics():
+    """Hits, misses and hit ratio of the in-process caches, read from their counters at scrape time"""
+    analysis = analysis_cache.stats()
+    caches = {
+        'analysis': (analysis['short_circuits'], sum(analysis['recomputes'].values()), analysis['users']['size'])
+    }
+    for name, cache in (('crime_predictions', prediction_cache.entries), ('conversation_sessions', conversation_sessions.sessions),
+                        ('tracking_sessions', live_tracker.sessions), ('pattern_states', pattern_analyzer.states)):
+        stats = cache.stats()
+        caches[name] = (stats['hits'], stats['misses'], stats['size'])
+    return [
+        ('cache_hits_total', 'counter', "Cache lookups answered from the cache",
+         [({'cache': name}, hits) for name, (hits, _, _) in caches.items()]),
+        ('cache_misses_total', 'counter', "Cache lookups that had to compute",
+         [({'cache': name}, misses) for name, (_, misses, _) in caches.items()]),
+        ('cache_hit_ratio', 'gauge', "Hits over lookups since start",
+         [({'cache': name}, hits / (hits + misses) if hits + misses else 0.0) for name, (hits, misses, _) in caches.items()]),
+        ('cache_entries', 'gauge', "Entries currently held",
+         [({'cache': name}, size) for name, (_, _, size) in caches.items()])
+    ]
+
+def executor_metrics():
+    stats = cpu_executor.stats()
+    return [
+        ('cpu_executor_in_flight', 'gauge', "CPU tasks queued or running", [({}, stats['in_flight'])]),
+        ('cpu_executor_tasks_total', 'counter', "CPU tasks completed by function",
+         [({'task': name}, count) for name, count in stats['tasks'].items()]),
+        ('cpu_executor_failures_total', 'counter', "CPU tasks that raised, by function",
+         [({'task': name}, count) for name, count in stats['failures'].items()])
+    ]
+
+registry.register_collector(cache_metrics)
+registry.register_collector(executor_metrics)
 
 # Location Analysis Endpoint
 @app.post("/ai/analyze-location")
@@ -77,12 +258,20 @@ async def analyze_location(data: LocationAnalysisRequest):
     try:
         logger.info(f"📍 Analyzing location: {data.latitude}, {data.longitude}")
         
+        # Reuse the user's last analysis while they stay close to it
+        context = (data.hour, data.day_of_week, data.time_of_day, data.weather)
+        cached = analysis_cache.lookup(data.user_id, data.latitude, data.longitude, context)
+        if cached is not None:
+            cached['timestamp'] = datetime.now().isoformat()
+            return analysis_response(cached)
+        
         # Perform comprehensive location analysis
         analysis_result = await location_analyzer.analyze_complete_location(data)
+        analysis_cache.store(data.user_id, data.latitude, data.longitude, analysis_result, context)
         
         logger.info(f"✅ Location analysis completed for {analysis_result.get('city_name', 'Unknown')}")
         
-        return analysis_result
+        return analysis_response(analysis_result)
         
     except Exception as e:
         logger.error(f"❌ Error in location analysis: {str(e)}")
@@ -90,26 +279,89 @@ async def analyze_location(data: LocationAnalysisRequest):
 
 @app.post("/ai/analyze-locations-batch")
 async def analyze_locations_batch(data: BatchLocationRequest):
+    """Analyze many locations concurrently, reporting success or failure per item"""
     try:
+        unique_indexes, owner = dedupe_locations(data.locations, BATCH_DEDUP_TOLERANCE)
+
+        async def gather_one(index):
+            location_data = LocationAnalysisRequest(**data.locations[index])
+            return await location_analyzer.gather_location_context(location_data)
+
+        outcomes = await run_bounded(unique_indexes, gather_one, BATCH_CONCURRENCY)
+
+        # Score every gathered location in one vectorized pass
+        gathered = [slot for slot, (success, _) in enumerate(outcomes) if success]
+        scores = safety_predictor.predict_safety_scores_from_features([outcomes[slot][1][2] for slot in gathered])
+        for slot, safety_score in zip(gathered, scores):
+            address_info, weather_data, features = outcomes[slot][1]
+            outcomes[slot] = (True, location_analyzer.build_analysis(address_info, weather_data, features, safety_score))
+
         results = []
-        for location in data.locations:
-            location_data = LocationAnalysisRequest(**location)
-            result = await location_analyzer.analyze_complete_location(location_data)
-            results.append(result)
-        
-        return {'analyses': results}
+        for index, slot in enumerate(owner):
+            success, value = outcomes[slot]
+            if success:
+                entry = format_location_response(True, data=value)
+            else:
+                logger.warning(f"⚠️ Batch item {index} failed: {value}")
+                entry = format_location_response(False, error=str(value) or type(value).__name__)
+            entry['index'] = index
+            results.append(entry)
+
+        succeeded = sum(1 for entry in results if entry['success'])
+        logger.info(f"✅ Batch analysis: {succeeded}/{len(results)} succeeded, {len(unique_indexes)} unique locations")
+
+        return {
+            'analyses': results,
+            'summary': {
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'unique_locations': len(unique_indexes)
+            }
+        }
         
     except Exception as e:
         logger.error(f"❌ Error in batch location analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Batch analysis failed")
     
+@app.post("/ai/analyze-locations-stream")
+async def analyze_locations_stream(request: Request):
+    """
+    Streaming batch analysis: the body is NDJSON (one location per line) and each
+    result is written back as an NDJSON line as soon as it is ready.
+    Results carry the input line `index` and may arrive out of order.
+    """
+    async def analyze_line(index, line):
+        location_data = LocationAnalysisRequest(**json.loads(line))
+        return await location_analyzer.analyze_complete_location(location_data)
+
+    async def result_lines(body):
+        total = succeeded = 0
+        try:
+            async for index, success, value in stream_bounded(iter_ndjson_lines(body), analyze_line, BATCH_CONCURRENCY):
+                if success:
+                    entry = format_location_response(True, data=value)
+                    succeeded += 1
+                else:
+                    entry = format_location_response(False, error=str(value) or type(value).__name__)
+                entry['index'] = index
+                total += 1
+                yield json.dumps(entry, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"❌ Error in streaming batch analysis: {str(e)}")
+            yield json.dumps({'success': False, 'error': 'Stream aborted', 'timestamp': datetime.now().isoformat()}) + "\n"
+
+        logger.info(f"✅ Streaming batch analysis: {succeeded}/{total} succeeded")
+        yield json.dumps({'summary': {'total': total, 'succeeded': succeeded, 'failed': total - succeeded}}) + "\n"
+
+    return DuplexStreamingResponse(request, result_lines, media_type="application/x-ndjson")
+
 @app.post("/ai/debug-location")
 async def debug_location(data: LocationAnalysisRequest):
     """Debug endpoint to see what coordinates we're receiving"""
     logger.info(f"🔍 DEBUG - Received coordinates: {data.latitude}, {data.longitude}")
     
     # Test with multiple geocoding services
-    from models.geocoding_service import RealGeocoder
     geocoder = RealGeocoder()
     
     results = {}
@@ -141,20 +393,13 @@ async def debug_location(data: LocationAnalysisRequest):
 @app.post("/ai/analyze-patterns")
 async def analyze_patterns(data: PatternAnalysisRequest):
     try:
-        # This would analyze historical location data for patterns
-        pattern_analysis = {
-            'frequent_locations': [],
-            'risk_patterns': [],
-            'safety_trends': {
-                'overall_trend': 'stable',
-                'high_risk_periods': ['20:00-02:00'],
-                'safe_locations': []
-            },
-            'recommendations': [
-                "Consider varying your routine for enhanced safety",
-                "Avoid high-risk areas during night hours"
-            ]
-        }
+        pattern_analysis = await cpu_executor.run(
+            pattern_analyzer.analyze, data.user_id, data.locations,
+            days=data.days, tz_offset_minutes=data.tz_offset_minutes, stateful=True
+        )
+        summary = pattern_analysis['analysis_summary']
+        logger.info(f"🧭 Pattern analysis for {data.user_id}: +{summary['points_added']} points, "
+                    f"{summary['clusters']} clusters in {summary['processing_ms']} ms")
         
         return pattern_analysis
         
@@ -162,6 +407,160 @@ async def analyze_patterns(data: PatternAnalysisRequest):
         logger.error(f"❌ Error in pattern analysis: {str(e)}")
         raise HTTPException(status_code=500, detail="Pattern analysis failed")
 
+@app.websocket("/ai/track")
+async def live_tracking(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    Live tracking: the client sends GPS fixes as JSON messages and receives a snapshot,
+    then deltas only when the analysis changes. Reconnecting with the same session_id resumes state;
+    without one a fresh id is generated and returned in the first snapshot.
+    """
+    await websocket.accept()
+    session = live_tracker.get_session(session_id or f"ws-{uuid.uuid4().hex}")
+    live_tracker.active_connections += 1
+    logger.info(f"📡 Tracking session {session.session_id} connected")
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                update = await live_tracker.process_fix(session, json.loads(message))
+            except (KeyError, TypeError, ValueError) as e:
+                await websocket.send_json({'type': 'error', 'detail': f"Invalid fix: {e}"})
+                continue
+            except Exception as e:
+                logger.error(f"❌ Error in live tracking: {str(e)}")
+                await websocket.send_json({'type': 'error', 'detail': "Location analysis failed"})
+                continue
+            if update is not None:
+                await websocket.send_json(update)
+    except WebSocketDisconnect:
+        logger.info(f"📴 Tracking session {session.session_id} disconnected after {session.fixes} fixes")
+    finally:
+        live_tracker.active_connections -= 1
+
+@app.post("/ai/score-route")
+async def score_route(data: RouteScoreRequest):
+    """Score a planned route per segment from one batched pass over densified samples"""
+    try:
+        time_info = get_current_time_info()
+        result = await cpu_executor.run(
+            route_scorer.score_route,
+            data.points,
+            hour=data.hour if data.hour is not None else time_info['hour'],
+            day_of_week=data.day_of_week if data.day_of_week is not None else time_info['day_of_week'],
+            spacing_m=data.spacing_m,
+            speed_kmh=data.speed_kmh,
+            area_type=data.area_type,
+            weather=data.weather,
+            city_size=data.city_size,
+            crime_radius_km=data.crime_radius_km,
+            stateful=True
+        )
+        summary = result['summary']
+        logger.info(f"🛣️ Scored route: {summary['total_km']} km, {summary['samples']} samples in {summary['processing_ms']} ms")
+        return result
+        
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid route: {e}")
+    except Exception as e:
+        logger.error(f"❌ Error in route scoring: {str(e)}")
+        raise HTTPException(status_code=500, detail="Route scoring failed")
+
+@app.get("/ai/stats")
+async def service_stats():
+    """Cache and session counters for the in-process analysis state"""
+    return {
+        'analysis_cache': analysis_cache.stats(),
+        'prediction_cache': prediction_cache.stats(),
+        'pattern_states': pattern_analyzer.stats(),
+        'live_tracking': live_tracker.stats(),
+        'conversation_sessions': conversation_sessions.stats(),
+        'voice_streams': voice_streams.stats(),
+        'keyword_corrections': default_matcher().fuzzy.stats(),
+        'text_model': text_classifier.get_model_status(),
+        'cpu_executor': cpu_executor.stats(),
+        'event_loop': loop_monitor.stats(),
+        'process': {'pid': os.getpid(), 'worker': worker_index(), 'memory': memory_usage()}
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format: request and analysis-stage latency, upstream calls, caches, event loop lag"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.post("/ai/crime-data/reload", dependencies=[Depends(require_admin)])
+async def reload_crime_data(data: ModelReloadRequest):
+    """
+    Reload the crime CSV (a name inside DATA_DIR, default: the current file); cached predictions
+    are invalidated. Only the worker that serves this request reloads: with WEB_WORKERS > 1 every
+    worker keeps its own copy, so send the reload to each one (or restart the service).
+    """
+    path = requested_data_file(data.path) or csv_crime_analyzer.csv_file_path
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=400, detail="Crime data file not found")
+    try:
+        loaded = await asyncio.to_thread(csv_crime_analyzer.load_crime_data, path)
+    except Exception as e:
+        logger.error(f"❌ Error reloading crime data: {str(e)}")
+        loaded = False
+    if not loaded:
+        raise HTTPException(status_code=500, detail="Crime data reload failed; the previous data is still served")
+    # Process-pool workers hold the data they were forked with
+    cpu_executor.recycle_process_pool()
+    records = 0 if csv_crime_analyzer.crime_data is None else len(csv_crime_analyzer.crime_data)
+    logger.info(f"🔄 Crime data reloaded from {path}: {records} records (worker {os.getpid()})")
+    return {
+        'path': path,
+        'records': records,
+        'data_version': csv_crime_analyzer.data_version,
+        'worker_pid': os.getpid(),
+        'prediction_cache': prediction_cache.stats()
+    }
+
+# Safety Model Endpoints
+@app.get("/ai/safety-model")
+async def safety_model_status():
+    return safety_predictor.get_model_status()
+
+@app.post("/ai/safety-model/reload", dependencies=[Depends(require_admin)])
+async def reload_safety_model(data: ModelReloadRequest):
+    """Load a model file (a name inside DATA_DIR, default: SAFETY_MODEL_PATH) and swap it in without pausing requests"""
+    path = requested_data_file(data.path) or os.getenv("SAFETY_MODEL_PATH")
+    if not path:
+        raise HTTPException(status_code=400, detail="No model path given and SAFETY_MODEL_PATH is not set")
+    try:
+        # Loading and warm-up run off the event loop; the swap itself is a reference assignment
+        return await asyncio.to_thread(safety_predictor.load_model, path)
+    except Exception as e:
+        logger.error(f"❌ Error loading safety model: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Could not load model: {e}")
+
+@app.post("/ai/safety-model/unload", dependencies=[Depends(require_admin)])
+async def unload_safety_model():
+    safety_predictor.unload_model()
+    return safety_predictor.get_model_status()
+
+# Text Model Endpoints
+@app.get("/ai/text-model")
+async def text_model_status():
+    return text_classifier.get_model_status()
+
+@app.post("/ai/text-model/reload", dependencies=[Depends(require_admin)])
+async def reload_text_model(data: ModelReloadRequest):
+    """Load an intent/emotion model file (a name inside DATA_DIR, default: TEXT_MODEL_PATH) and swap it in"""
+    path = requested_data_file(data.path) or os.getenv("TEXT_MODEL_PATH")
+    if not path:
+        raise HTTPException(status_code=400, detail="No model path given and TEXT_MODEL_PATH is not set")
+    try:
+        return await asyncio.to_thread(text_classifier.load_model, path)
+    except Exception as e:
+        logger.error(f"❌ Error loading text model: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Could not load model: {e}")
+
+@app.post("/ai/text-model/unload", dependencies=[Depends(require_admin)])
+async def unload_text_model():
+    text_classifier.unload_model()
+    return text_classifier.get_model_status()
+
 # Active Voice Detection Endpoint
 @app.post("/ai/active-voice")
 async def active_voice_detection(data: Dict[str, Any]):
@@ -179,6 +578,42 @@ async def active_voice_detection(data: Dict[str, Any]):
         logger.error(f"❌ Error in active voice detection: {str(e)}")
         return {"trigger": "safe"}
 
+@app.websocket("/ai/active-voice/stream")
+async def active_voice_stream(websocket: WebSocket):
+    """
+    Streaming voice-trigger detection: the client sends transcript fragments as
+    {"text": "..."} messages ({"final": true} ends the phrase, {"reset": true}
+    starts over) and receives {"type": "trigger"} as soon as a keyword completes,
+    even when it spans fragments; a misspelled keyword ("halp me") fires once its
+    last word ends or on "final". Fragments without a trigger get no reply.
+    """
+    await websocket.accept()
+    stream = voice_streams.open()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                data = json.loads(message)
+                fragment = data.get('text') or ''
+                if not isinstance(fragment, str):
+                    raise TypeError("text must be a string")
+            except (AttributeError, TypeError, ValueError) as e:
+                await websocket.send_json({'type': 'error', 'detail': f"Invalid fragment: {e}"})
+                continue
+            if data.get('reset'):
+                stream.reset()
+            keywords = stream.feed(fragment) if fragment else []
+            if data.get('final'):
+                keywords += stream.finish()
+            if keywords:
+                logger.info(f"🎤 Streamed voice trigger: {keywords}")
+                await websocket.send_json({'type': 'trigger', 'trigger': 'triggered', 'keywords': keywords,
+                                           'offset': stream.chars})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        voice_streams.close(stream)
+
 # Emotion Detection Endpoint
 @app.post("/ai/emotion")
 async def emotion_detection(data: Dict[str, Any]):
@@ -196,18 +631,54 @@ async def emotion_detection(data: Dict[str, Any]):
         logger.error(f"❌ Error in emotion detection: {str(e)}")
         return {"emotion": "neutral"}
 
+# Batch Text Classification Endpoint
+@app.post("/ai/classify-text-batch")
+async def classify_text_batch(data: TextClassificationBatchRequest):
+    """Intent, emotion and voice trigger for every text (intent and emotion from the text model when loaded)"""
+    if len(data.texts) > TEXT_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {TEXT_BATCH_MAX_SIZE} texts)")
+    if data.backend not in (None, "keywords", "model"):
+        raise HTTPException(status_code=400, detail="backend must be 'keywords' or 'model'")
+    if data.backend == "model" and text_classifier.model is None:
+        raise HTTPException(status_code=400, detail="No text model loaded")
+    try:
+        start = time.time()
+        if len(data.texts) <= TEXT_BATCH_INLINE_MAX:
+            results, backend = text_classifier.classify(data.texts, data.backend)
+        else:
+            results, backend = await cpu_executor.run(text_classifier.classify, data.texts, data.backend, stateful=True)
+        processing_ms = round((time.time() - start) * 1000, 1)
+        logger.info(f"🏷️ Classified {len(results)} texts ({backend}) in {processing_ms} ms")
+
+        return {
+            "results": results,
+            "summary": {
+                "total": len(results),
+                "intents": dict(Counter(r['intent'] for r in results)),
+                "emotions": dict(Counter(r['emotion'] for r in results)),
+                "triggered": sum(r['trigger'] == "triggered" for r in results),
+                "backend": backend,
+                "processing_ms": processing_ms
+            }
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Error in batch text classification: {str(e)}")
+        raise HTTPException(status_code=500, detail="Batch text classification failed")
+
 # Conversation Endpoint
 @app.post("/ai/conversation")
 async def conversation_endpoint(data: Dict[str, Any]):
     try:
         user_input = data.get("user_input", "")
         chat_history = data.get("chat_history", [])
+        session_id = data.get("session_id")
 
         if not user_input:
             return {"reply": "Please provide a message to continue our conversation."}
 
-        from models.conversational_assistant import generate_response
-        reply = generate_response(user_input, chat_history)
+        # With a session_id only the new message is classified; history counts are kept per session
+        reply = generate_response(user_input, chat_history, session_id, conversation_sessions)
 
         logger.info(f"💬 Conversation: '{user_input}' -> '{reply[:50]}...'")
 
@@ -223,8 +694,15 @@ async def predict_crime_endpoint(data: CrimePredictionRequest):
     try:
         logger.info(f"🔮 Predicting crime risk for: {data.lat}, {data.lon}")
         
+        request = data.model_dump()
+        cached = prediction_cache.get(request)
+        if cached is not None:
+            return cached
+        
         # Perform crime risk prediction with enhanced parameters
-        prediction_result = predict_crime_risk(
+        token = prediction_cache.dataset_token()
+        prediction_result = await cpu_executor.run(
+            predict_crime_risk,
             lat=data.lat,
             lon=data.lon,
             time_of_day=data.time_of_day,
@@ -233,6 +711,7 @@ async def predict_crime_endpoint(data: CrimePredictionRequest):
             location_name=data.location_name,
             area_type=data.area_type
         )
+        prediction_cache.set(request, prediction_result, token)
         
         logger.info(f"✅ Crime prediction completed: {prediction_result['risk']} ({prediction_result['score']}/10)")
         
@@ -242,6 +721,39 @@ async def predict_crime_endpoint(data: CrimePredictionRequest):
         logger.error(f"❌ Error in crime prediction: {str(e)}")
         raise HTTPException(status_code=500, detail="Crime prediction failed")
 
+@app.post("/ai/predict-crime-batch")
+async def predict_crime_batch_endpoint(data: CrimePredictionBatchRequest):
+    """Crime risk for many locations from one vectorized pass; same per-item output as /ai/predict-crime"""
+    if len(data.requests) > CRIME_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {CRIME_BATCH_MAX_SIZE} requests)")
+    try:
+        start = time.time()
+        requests = [item.model_dump() for item in data.requests]
+        predictions = [prediction_cache.get(request) for request in requests]
+        misses = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if misses:
+            token = prediction_cache.dataset_token()
+            computed = await cpu_executor.run(predict_crime_risk_batch, [requests[i] for i in misses])
+            for i, prediction in zip(misses, computed):
+                predictions[i] = prediction
+                prediction_cache.set(requests[i], prediction, token)
+        processing_ms = round((time.time() - start) * 1000, 1)
+        logger.info(f"✅ Batch crime prediction completed: {len(predictions)} locations in {processing_ms} ms")
+        
+        return {
+            "predictions": predictions,
+            "summary": {
+                "total": len(predictions),
+                "risk_levels": dict(Counter(p['risk'] for p in predictions)),
+                "cache_hits": len(predictions) - len(misses),
+                "processing_ms": processing_ms
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error in batch crime prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail="Batch crime prediction failed")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -260,7 +772,37 @@ async def home():
         "description": "Real-time location analysis with AI/ML"
     }
 
+def preload_shared_state():
+    """
+    Load and build what requests only read, ahead of the first request: before
+    workers are forked, or in the background right after a single process starts
+    """
+    start = time.perf_counter()
+    default_matcher().analyze_many(["help me", "where am i", "halp"])
+    csv_crime_analyzer.ensure_loaded()
+    if csv_crime_analyzer.crime_data is not None:
+        csv_crime_analyzer.analyze_location_crime_risk(28.6139, 77.2090)
+    import requests  # geocoding and weather lookups import it on first use
+    logger.info(f"🔥 Warm-up done in {(time.perf_counter() - start) * 1000:.0f} ms")
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="CyberSathi AI Location Service (configured through environment variables)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="import the service in a fresh interpreter, print per-module import times and exit")
+    parser.add_argument('--profile-top', type=int, default=20, help="rows per section of the startup profile")
+    args = parser.parse_args()
+    if args.profile_startup:
+        from utils.startup_profile import format_report, profile_imports
+        print(format_report(profile_imports('server'), top=args.profile_top))
+        raise SystemExit(0)
+
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    workers = int(os.getenv("WEB_WORKERS", 1))
+    if workers > 1:
+        # Load once, fork workers that share the loaded data copy-on-write
+        serve_preforked(app, host="0.0.0.0", port=port, workers=workers, preload=preload_shared_state,
+                        after_fork=cpu_executor.reset_after_fork)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
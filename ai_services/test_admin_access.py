@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for the admin endpoint guards
+Checks that reload paths stay inside the data directory and the token/loopback rule
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.helpers import admin_allowed, resolve_data_file
+
+
+def test_paths_stay_inside_data_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        os.makedirs(os.path.join(data_dir, 'models'))
+        root = os.path.realpath(data_dir)
+        assert resolve_data_file('crime_data.csv', data_dir) == os.path.join(root, 'crime_data.csv')
+        assert resolve_data_file('models/../models/safety.npz', data_dir) == os.path.join(root, 'models', 'safety.npz')
+
+        os.symlink('/etc', os.path.join(data_dir, 'link'))
+        for name in ('../secret.csv', '/etc/passwd', 'link/passwd', '.', os.path.join(tmp, 'data2', 'x.csv')):
+            try:
+                resolve_data_file(name, data_dir)
+                assert False, f"{name} resolved outside the data directory"
+            except ValueError:
+                pass
+    print("✅ Reload paths resolve only inside the data directory")
+
+
+def test_admin_token_or_loopback():
+    # No token configured: local clients only
+    assert admin_allowed(None, '127.0.0.1', None) and admin_allowed(None, '::1', None)
+    assert not admin_allowed(None, '203.0.113.7', None) and not admin_allowed(None, None, None)
+    # Token configured: it is required from every client, loopback included
+    assert admin_allowed('s3cret', '203.0.113.7', 's3cret')
+    assert not admin_allowed(None, '127.0.0.1', 's3cret')
+    assert not admin_allowed('wrong', '127.0.0.1', 's3cret')
+    print("✅ Admin endpoints need the token, or a loopback client when none is set")
+
+
+if __name__ == "__main__":
+    test_paths_stay_inside_data_dir()
+    test_admin_token_or_loopback()
+    print("✅ Admin access test complete!")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-user movement-threshold analysis cache
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.cache import LRUCache, MovementThresholdCache, haversine_m
+
+ANALYSIS = {'safety_score': 7.5, 'risk_level': 'Moderate Risk', 'timestamp': 'then'}
+
+
+def test_short_circuits_until_user_moves():
+    cache = MovementThresholdCache(max_users=10, distance_m=100, max_age_s=600)
+    assert cache.lookup('u1', 28.6139, 77.2090) is None
+    cache.store('u1', 28.6139, 77.2090, ANALYSIS)
+
+    hit = cache.lookup('u1', 28.6143, 77.2093)  # ~50 m away
+    assert hit['safety_score'] == 7.5 and hit['cache']['hit']
+    assert 'cache' not in ANALYSIS
+
+    assert cache.lookup('u1', 28.6160, 77.2090) is None  # ~230 m away
+    assert cache.lookup('u1', 28.6139, 77.2090, context=(23, None, None, None)) is None
+    assert cache.lookup(None, 28.6139, 77.2090) is None
+
+    stats = cache.stats()
+    assert stats['short_circuits'] == 1 and stats['bypassed_without_user_id'] == 1
+    assert stats['recomputes'] == {'no_recent_analysis': 1, 'moved': 1, 'context_changed': 1}
+    assert stats['short_circuit_rate'] == 0.25
+    print("✅ Analyses are reused until the user moves")
+
+
+def test_expiry_and_lru_eviction():
+    cache = MovementThresholdCache(max_users=2, distance_m=100, max_age_s=0.05)
+    cache.store('u1', 0, 0, ANALYSIS)
+    time.sleep(0.06)
+    assert cache.lookup('u1', 0, 0) is None
+
+    users = LRUCache(2)
+    users.set('a', 1)
+    users.set('b', 2)
+    users.get('a')
+    users.set('c', 3)
+    assert 'b' not in users and 'a' in users and users.stats()['evictions'] == 1
+    assert abs(haversine_m(28.6139, 77.2090, 28.6239, 77.2090) - 1112) < 2
+    print("✅ Entries expire and least recently used users are evicted")
+
+
+if __name__ == "__main__":
+    test_short_circuits_until_user_moves()
+    test_expiry_and_lru_eviction()
+    print("✅ Analysis cache test complete!")
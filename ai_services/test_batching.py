@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Test script for batch and streaming location analysis
+Checks dedup, bounded concurrency, NDJSON parsing, backpressure, client disconnects and both endpoints
+"""
+
+import sys
+import os
+import asyncio
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import StreamingResponse
+from utils.batching import (DuplexStreamingResponse, dedupe_locations, iter_ndjson_lines,
+                            run_bounded, stream_bounded)
+
+
+async def chunks_of(*chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+
+def test_dedupe_rounds_and_fans_out():
+    locations = [
+        {'latitude': 28.61390, 'longitude': 77.20900, 'hour': 22},
+        {'latitude': 28.61392, 'longitude': 77.20903, 'hour': 22},  # within 0.0001 degrees
+        {'latitude': 28.61392, 'longitude': 77.20903, 'hour': 9},   # same place, other context
+        {'latitude': 28.61450, 'longitude': 77.20900, 'hour': 22},
+        {'latitude': 'north'},                                      # unusable: analyzed (and fails) alone
+        {'latitude': 'north'},
+        {'latitude': 28.61390, 'longitude': 77.20900, 'hour': 22, 'weather': {'condition': 'rain'}},
+    ]
+    unique_indexes, owner = dedupe_locations(locations, 0.0001)
+    assert unique_indexes == [0, 2, 3, 4, 5, 6]
+    assert owner == [0, 0, 1, 2, 3, 4, 5]
+    # Every input maps back to the unique item that answers it
+    assert [unique_indexes[slot] for slot in owner] == [0, 0, 2, 3, 4, 5, 6]
+    print("✅ Near-identical locations share one analysis and fan out to their indexes")
+
+
+def test_run_bounded_limits_and_reports_errors():
+    running = peak = 0
+
+    async def worker(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        if item % 5 == 0:
+            raise ValueError(f"bad item {item}")
+        return item * 2
+
+    outcomes = asyncio.run(run_bounded(list(range(1, 21)), worker, 3))
+    assert peak == 3
+    assert [value for success, value in outcomes if success] == [i * 2 for i in range(1, 21) if i % 5]
+    failed = [value for success, value in outcomes if not success]
+    assert [str(e) for e in failed] == ["bad item 5", "bad item 10", "bad item 15", "bad item 20"]
+    print("✅ Bounded runs keep the concurrency limit and report errors per item in order")
+
+
+def test_ndjson_lines_across_chunks():
+    async def collect(*chunks):
+        return [line async for line in iter_ndjson_lines(chunks_of(*chunks))]
+
+    snow = 'Śnieżka'.encode('utf-8')
+    lines = asyncio.run(collect(b'{"a": 1', b'}\n\n  \r\n{"name": "' + snow[:2], snow[2:] + b'"}\n{"b"', b': 2}'))
+    assert lines == ['{"a": 1}', '{"name": "Śnieżka"}', '{"b": 2}']
+    assert asyncio.run(collect(b'', b'\n')) == []
+    print("✅ NDJSON lines are reassembled across chunk boundaries, including split UTF-8")
+
+
+def test_stream_bounded_backpressure_and_errors():
+    limit, pulled, consumed, ahead = 2, 0, 0, 0
+
+    async def source():
+        nonlocal pulled
+        for i in range(30):
+            pulled += 1
+            yield i
+        raise ValueError("body ended early")
+
+    async def worker(index, item):
+        await asyncio.sleep(0.001 * (item % 3))
+        if item == 7:
+            raise KeyError('latitude')
+        return item
+
+    async def consume():
+        nonlocal consumed, ahead
+        outcomes = []
+        try:
+            async for outcome in stream_bounded(source(), worker, limit):
+                consumed += 1
+                ahead = max(ahead, pulled - consumed)
+                outcomes.append(outcome)
+                await asyncio.sleep(0.002)  # slow reader
+        except ValueError as e:
+            return outcomes, e
+        return outcomes, None
+
+    outcomes, error = asyncio.run(consume())
+    # Up to `limit` running, `limit` results queued and one item waiting for a slot: the rest stays in the source
+    assert ahead <= 2 * limit + 1, ahead
+    assert sorted(index for index, _, _ in outcomes) == list(range(30))
+    assert [(index, success) for index, success, _ in outcomes if not success] == [(7, False)]
+    # A failing source ends the stream after the results already started
+    assert str(error) == "body ended early"
+    print("✅ Streaming keeps at most the limit in flight and surfaces source errors last")
+
+
+def test_stream_bounded_cancels_when_abandoned():
+    started, finished, cancelled = [], [], []
+
+    async def source():
+        for i in range(10):
+            yield i
+
+    async def worker(index, item):
+        started.append(index)
+        try:
+            await asyncio.sleep(0 if item == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        finished.append(index)
+        return item
+
+    async def first_result():
+        stream = stream_bounded(source(), worker, 3)
+        outcome = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        return outcome
+
+    assert asyncio.run(first_result()) == (0, True, 0)
+    assert finished == [0] and {1, 2} <= set(cancelled) and sorted(started) == sorted(finished + cancelled)
+    print("✅ Abandoning the stream cancels the work in flight")
+
+
+class FakeClient:
+    """ASGI receive/send pair delivering a chunked request body, then a disconnect"""
+
+    def __init__(self, chunks, disconnect_after_lines=None, fail_send=False, complete=True):
+        self.messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in chunks]
+        if complete:
+            self.messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+        self.disconnect_after_lines = disconnect_after_lines
+        self.fail_send = fail_send
+        self.disconnected = asyncio.Event()
+        self.lines = []
+
+    async def receive(self):
+        await asyncio.sleep(0)
+        if self.messages:
+            return self.messages.pop(0)
+        if self.disconnect_after_lines is not None:
+            await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.body' and message['body']:
+            if self.fail_send:
+                raise OSError("connection reset")
+            self.lines.extend(message['body'].decode().splitlines())
+            if self.disconnect_after_lines is not None and len(self.lines) >= self.disconnect_after_lines:
+                self.disconnected.set()
+
+    def scope(self, spec_version='2.3'):
+        return {'type': 'http', 'method': 'POST', 'path': '/', 'headers': [], 'asgi': {'spec_version': spec_version}}
+
+
+def echo_handler(seen, block_after=None):
+    async def handler(body):
+        async def echo(index, line):
+            seen.append(index)
+            if block_after is not None and index >= block_after:
+                await asyncio.Event().wait()  # never finishes on its own
+            return json.loads(line)['n']
+
+        async for index, success, value in stream_bounded(iter_ndjson_lines(body), echo, 2):
+            yield json.dumps({'index': index, 'n': value}) + "\n"
+    return handler
+
+
+def test_duplex_response_reads_the_whole_body():
+    body = [f'{{"n": {i}}}\n'.encode() for i in range(12)]
+
+    async def serve(response_class):
+        client = FakeClient(body)
+        request = Request(client.scope(), client.receive)
+        seen = []
+        if response_class is DuplexStreamingResponse:
+            response = DuplexStreamingResponse(request, echo_handler(seen))
+        else:
+            response = StreamingResponse(echo_handler(seen)(request.stream()))
+        try:
+            await response(client.scope(), client.receive, client.send)
+        except ClientDisconnect:
+            pass
+        return client.lines
+
+    lines = asyncio.run(serve(DuplexStreamingResponse))
+    assert sorted(json.loads(line)['n'] for line in lines) == list(range(12))
+    # Why the override exists: Starlette's disconnect listener competes for the body messages
+    assert len(asyncio.run(serve(StreamingResponse))) < 12
+    print("✅ The duplex response gets every body chunk; the stock one loses some")
+
+
+def test_duplex_response_cancels_on_disconnect():
+    async def serve(client, block_after=None):
+        request = Request(client.scope(), client.receive)
+        seen = []
+        response = DuplexStreamingResponse(request, echo_handler(seen, block_after))
+        await asyncio.wait_for(response(client.scope(), client.receive, client.send), timeout=5)
+        return client.lines, seen
+
+    # Item 1 would block forever: the disconnect after the body ended the request anyway
+    lines, seen = asyncio.run(serve(FakeClient([b'{"n": 0}\n{"n": 1}\n'], disconnect_after_lines=1), block_after=1))
+    assert [json.loads(line)['n'] for line in lines] == [0] and seen == [0, 1]
+
+    # Disconnecting mid-body ends the body stream
+    try:
+        asyncio.run(serve(FakeClient([b'{"n": 0}\n{"n"'], complete=False)))
+        assert False, "truncated body not reported"
+    except ClientDisconnect:
+        pass
+
+    async def serve_failing_send():
+        client = FakeClient([b'{"n": 0}\n'], fail_send=True)
+        request = Request(client.scope('2.4'), client.receive)
+        await DuplexStreamingResponse(request, echo_handler([]))(client.scope('2.4'), client.receive, client.send)
+
+    try:
+        asyncio.run(serve_failing_send())
+        assert False, "failed send not reported"
+    except ClientDisconnect:
+        pass
+    print("✅ A client disconnect cancels the streaming work in flight")
+
+
+def with_fake_lookups(test):
+    """Run an endpoint test against the server app with geocoding and weather answered locally"""
+    def run():
+        import server
+        from fastapi.testclient import TestClient
+        analyzer = server.location_analyzer
+
+        async def get_real_address(lat, lon):
+            if lat > 89:
+                raise RuntimeError("geocoder unavailable")
+            return analyzer.geocoder._get_fallback_address(lat, lon)
+
+        async def get_weather_data(lat, lon):
+            return {'temperature': 25, 'condition': 'clear'}
+
+        analyzer.geocoder.get_real_address = get_real_address
+        analyzer._get_weather_data = get_weather_data
+        try:
+            test(TestClient(server.app))
+        finally:
+            del analyzer.geocoder.get_real_address
+            del analyzer._get_weather_data
+    run.__name__ = test.__name__
+    return run
+
+
+@with_fake_lookups
+def test_batch_endpoint(client):
+    locations = [
+        {'latitude': 28.6139, 'longitude': 77.2090, 'hour': 22},
+        {'latitude': 28.61391, 'longitude': 77.20901, 'hour': 22},
+        {'latitude': 89.5, 'longitude': 77.2090, 'hour': 22},
+        {'longitude': 77.2090},
+    ]
+    result = client.post('/ai/analyze-locations-batch', json={'locations': locations}).json()
+    analyses = result['analyses']
+    assert [entry['index'] for entry in analyses] == [0, 1, 2, 3]
+    assert [entry['success'] for entry in analyses] == [True, True, False, False]
+    assert analyses[0]['data'] == analyses[1]['data']
+    assert analyses[2]['error'] == "geocoder unavailable"
+    assert result['summary'] == {'total': 4, 'succeeded': 2, 'failed': 2, 'unique_locations': 3}
+    print("✅ Batch endpoint answers duplicates once and reports failures per index")
+
+
+@with_fake_lookups
+def test_stream_endpoint(client):
+    def body():
+        yield b'{"latitude": 28.6139, "longitude": 77.2090, "hour": 22}\n{"latitude": 19.07'
+        yield b'60, "longitude": 72.8777, "hour": 9}\nnot json\n'
+        yield b'{"latitude": 12.9716, "longitude": 77.5946}'
+
+    response = client.post('/ai/analyze-locations-stream', content=body(),
+                           headers={'content-type': 'application/x-ndjson'})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = {entry['index']: entry for entry in lines[:-1]}
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [results[i]['success'] for i in range(4)] == [True, True, False, True]
+    assert '19.076000, 72.877700' in results[1]['data']['address_info']['formatted_address']
+    assert lines[-1] == {'summary': {'total': 4, 'succeeded': 3, 'failed': 1}}
+    print("✅ Stream endpoint answers each NDJSON line, split or malformed, and ends with a summary")
+
+
+if __name__ == "__main__":
+    test_dedupe_rounds_and_fans_out()
+    test_run_bounded_limits_and_reports_errors()
+    test_ndjson_lines_across_chunks()
+    test_stream_bounded_backpressure_and_errors()
+    test_stream_bounded_cancels_when_abandoned()
+    test_duplex_response_reads_the_whole_body()
+    test_duplex_response_cancels_on_disconnect()
+    test_batch_endpoint()
+    test_stream_endpoint()
+    print("✅ Batching test complete!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for per-session conversation context
+Checks session replies match full-history replies and each turn classifies one message
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models import conversational_assistant
+from models.conversational_assistant import ConversationSessionStore, generate_response
+
+MESSAGES = ["I am scared", "I feel sad and low", "help me please", "hello", "what should I do",
+            "I feel bad today", "someone is following me", "where am i", "ok thanks", "I'm sad again"]
+
+
+def run_conversation(turns, sessions=None, send_history=True, seed=0):
+    rng = random.Random(seed)
+    history, replies = [], []
+    for turn in range(turns):
+        text = rng.choice(MESSAGES)
+        random.seed(turn)  # same template choice in both modes
+        reply = generate_response(text, history if send_history else [], 'conv-1' if sessions else None, sessions)
+        replies.append(reply)
+        history += [{'from': 'user', 'text': text}, {'from': 'bot', 'text': reply}]
+    return replies
+
+
+def test_session_replies_match_full_history():
+    expected = run_conversation(60)
+    assert run_conversation(60, ConversationSessionStore()) == expected
+    assert run_conversation(60, ConversationSessionStore(), send_history=False) == expected
+    assert any("feeling down" in r for r in expected) and any("mentioned safety" in r for r in expected)
+    print("✅ Session context gives the same replies as re-reading the history")
+
+
+def test_each_turn_classifies_only_the_new_message():
+    calls = []
+    original = conversational_assistant.analyze_text
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    conversational_assistant.analyze_text = counting
+    try:
+        sessions = ConversationSessionStore()
+        run_conversation(200, sessions)
+        assert len(calls) == 200
+        assert sessions.stats()['incremental_turns'] == 199 and sessions.stats()['rebuilds']['new_session'] == 1
+
+        calls.clear()
+        run_conversation(50)
+        assert len(calls) == 50 + 49 * 50 // 2  # without a session every turn re-reads the history
+    finally:
+        conversational_assistant.analyze_text = original
+    print("✅ Each session turn classifies one message")
+
+
+def test_sessions_expire_and_rebuild():
+    sessions = ConversationSessionStore(max_sessions=2, ttl_s=0.05)
+    history = [{'from': 'user', 'text': 'help'}, {'from': 'bot', 'text': 'ok'}]
+    generate_response("hi", history, 'a', sessions)
+    assert sessions.sessions.get('a')['messages'] == 4
+
+    # A history that no longer matches the session is trusted over the session
+    generate_response("hi", history * 3, 'a', sessions)
+    assert sessions.stats()['rebuilds']['history_mismatch'] == 1
+    assert sessions.sessions.get('a')['messages'] == 8
+
+    generate_response("hi", [], 'b', sessions)
+    generate_response("hi", [], 'c', sessions)
+    assert len(sessions.sessions) == 2 and sessions.stats()['sessions']['evictions'] == 1
+    time.sleep(0.06)
+    assert sessions.sessions.get('b') is None
+    generate_response("hi", history, 'b', sessions)
+    assert sessions.stats()['rebuilds']['new_session'] == 4
+    print("✅ Sessions are bounded, expire and rebuild from history")
+
+
+def test_concurrent_turns_are_serialized():
+    class SlowStore(ConversationSessionStore):
+        """Records the message count each turn starts from, and gives other turns time to interleave"""
+        def context(self, session_id, chat_history):
+            context = super().context(session_id, chat_history)
+            seen.append(context['messages'])
+            time.sleep(0.002)
+            return context
+
+    seen = []
+    sessions = SlowStore()
+
+    def talk():
+        for _ in range(10):
+            generate_response("I am scared", [], 'shared', sessions)
+
+    threads = [threading.Thread(target=talk) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    context = sessions.sessions.get('shared')
+    # Every turn started from the state the previous one left
+    assert sorted(seen) == list(range(0, 80, 2))
+    assert context['messages'] == 80 and sum(context['intents'].values()) == 40
+    print("✅ Concurrent turns of one session are counted once each")
+
+
+if __name__ == "__main__":
+    test_session_replies_match_full_history()
+    test_each_turn_classifies_only_the_new_message()
+    test_sessions_expire_and_rebuild()
+    test_concurrent_turns_are_serialized()
+    print("✅ Conversation sessions test complete!")
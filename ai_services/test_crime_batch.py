@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for batch crime prediction
+Checks the batched path returns exactly what per-request predictions return
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from models import crime_prediction
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from models.crime_prediction import predict_crime_risk, predict_crime_risk_batch
+
+VOLATILE = ('analysis_timestamp',)
+
+
+def load_analyzer(crimes: pd.DataFrame) -> CSVCrimeAnalyzer:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        crimes.to_csv(path, index=False)
+        return CSVCrimeAnalyzer(path)
+
+
+def synthetic_crimes(rng, n: int, with_severity: bool) -> pd.DataFrame:
+    now = datetime.now()
+    crimes = pd.DataFrame({
+        'latitude': 28.61 + rng.normal(0, 0.01, n),
+        'longitude': 77.21 + rng.normal(0, 0.01, n),
+        'crime_type': rng.choice(['theft', 'robbery', 'assault', 'burglary', 'vehicle_theft', 'fraud'], n),
+        'date': [now - timedelta(days=int(d)) for d in rng.integers(0, 90, n)],
+        'area': rng.choice(['Connaught Place', 'Karol Bagh', 'Paharganj'], n)
+    })
+    if with_severity:
+        crimes['severity'] = rng.integers(1, 11, n).astype(float)
+        crimes.loc[rng.choice(n, n // 20, replace=False), 'severity'] = np.nan
+    return crimes
+
+
+def batch_requests(rng, n: int):
+    return [{
+        'lat': float(28.61 + rng.normal(0, 0.02)),
+        'lon': float(77.21 + rng.normal(0, 0.02)),
+        'time_of_day': rng.choice(['morning', 'evening', 'night', 'dusk']),
+        'weather': rng.choice(['clear', 'rain', 'fog']),
+        'user_profile': rng.choice(['alone', 'family', 'woman']),
+        'area_type': rng.choice(['residential', 'isolated', None]),
+        'location_name': None
+    } for _ in range(n)]
+
+
+def strip(result):
+    """Drop fields that differ between any two calls; normalize numpy scalars and NaN"""
+    if isinstance(result, dict):
+        return {k: strip(v) for k, v in result.items() if k not in VOLATILE}
+    if isinstance(result, list):
+        return [strip(v) for v in result]
+    if isinstance(result, np.generic):
+        result = result.item()
+    if isinstance(result, float) and np.isnan(result):
+        return None
+    if isinstance(result, pd.Timestamp):
+        return result.isoformat()
+    return result
+
+
+def check_parity(crimes: pd.DataFrame, seed: int):
+    analyzer = load_analyzer(crimes)
+    original = crime_prediction.csv_crime_analyzer
+    crime_prediction.csv_crime_analyzer = analyzer
+    try:
+        requests = batch_requests(np.random.default_rng(seed), 60)
+        batched = predict_crime_risk_batch(requests)
+        for request, prediction in zip(requests, batched):
+            assert strip(predict_crime_risk(**request)) == strip(prediction)
+
+        lats = [r['lat'] for r in requests]
+        lons = [r['lon'] for r in requests]
+        for lat, lon, csv_result in zip(lats, lons, analyzer.batch_location_crime_risk(lats, lons)):
+            assert strip(csv_result) == strip(analyzer.analyze_location_crime_risk(lat, lon))
+        return batched
+    finally:
+        crime_prediction.csv_crime_analyzer = original
+
+
+def test_batch_matches_single_with_severity():
+    batched = check_parity(synthetic_crimes(np.random.default_rng(3), 3000, with_severity=True), seed=4)
+    assert any(p.get('real_crime_analysis') for p in batched)
+    print("✅ Batch predictions match single predictions (severity column)")
+
+
+def test_batch_matches_single_with_crime_types():
+    check_parity(synthetic_crimes(np.random.default_rng(5), 800, with_severity=False), seed=6)
+    print("✅ Batch predictions match single predictions (crime type weights)")
+
+
+def test_batch_matches_single_with_many_areas():
+    # One area per few crimes, some missing: counts are grouped sparsely, not per point and area
+    rng = np.random.default_rng(7)
+    crimes = synthetic_crimes(rng, 4000, with_severity=True)
+    crimes['area'] = [f"Ward {i}" for i in rng.integers(0, 1500, len(crimes))]
+    crimes.loc[rng.choice(len(crimes), 200, replace=False), 'area'] = None
+    check_parity(crimes, seed=8)
+    print("✅ Batch predictions match single predictions (high-cardinality areas)")
+
+
+def test_batch_without_coordinates_or_requests():
+    analyzer = load_analyzer(pd.DataFrame({'crime_type': ['theft'], 'area': ['Unknown']}))
+    assert analyzer.batch_location_crime_risk([28.6], [77.2])[0]['risk_score'] == 8.0
+    assert predict_crime_risk_batch([]) == []
+    print("✅ Batch handles data without coordinates and empty batches")
+
+
+def test_bad_coordinates_do_not_fail_the_batch():
+    analyzer = load_analyzer(synthetic_crimes(np.random.default_rng(9), 500, with_severity=True))
+    original = crime_prediction.csv_crime_analyzer
+    crime_prediction.csv_crime_analyzer = analyzer
+    try:
+        requests = batch_requests(np.random.default_rng(10), 4)
+        requests[1]['lat'] = float('nan')
+        requests[2]['lon'] = None
+        batched = predict_crime_risk_batch(requests)
+        assert len(batched) == 4
+        for i in (0, 3):
+            assert strip(batched[i]) == strip(predict_crime_risk(**requests[i]))
+        for i in (1, 2):
+            assert 1 <= batched[i]['score'] <= 10 and not batched[i].get('real_crime_analysis')
+    finally:
+        crime_prediction.csv_crime_analyzer = original
+    print("✅ Items with invalid coordinates fall back on their own")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_with_severity()
+    test_batch_matches_single_with_crime_types()
+    test_batch_matches_single_with_many_areas()
+    test_batch_without_coordinates_or_requests()
+    test_bad_coordinates_do_not_fail_the_batch()
+    print("✅ Batch crime prediction test complete!")
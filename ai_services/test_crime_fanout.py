@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for RealCrimeAnalyzer source fan-out
+Checks sources run concurrently under their own timeouts over one pooled session
+"""
+
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from aiohttp import web
+from models.real_crime_analyzer import RealCrimeAnalyzer
+
+UK_CRIME = {'id': 1, 'category': 'robbery', 'month': '2024-11',
+            'location': {'latitude': '51.5', 'longitude': '-0.12', 'street': {'name': 'High Street'}},
+            'outcome_status': {'category': 'Under investigation'}}
+
+
+async def start_police_api():
+    """Local stand-in for data.police.uk that answers after 50 ms"""
+    async def crimes_at_location(request):
+        await asyncio.sleep(0.05)
+        return web.json_response([UK_CRIME])
+
+    app = web.Application()
+    app.router.add_get('/api/crimes-at-location', crimes_at_location)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/api/"
+
+
+def test_sources_fan_out_concurrently_with_timeouts():
+    async def run():
+        runner, base_url = await start_police_api()
+        try:
+            async with RealCrimeAnalyzer(source_timeouts={'osm': 0.1}) as analyzer:
+                analyzer.crime_apis['police_data'] = base_url
+
+                async def slow_osm(lat, lon, radius_km):
+                    await asyncio.sleep(5)
+                    return [{'category': 'never'}]
+
+                async def local(lat, lon, radius_km):
+                    await asyncio.sleep(0.05)
+                    return [{'category': 'theft', 'date': '2024-11', 'severity': 3}]
+
+                analyzer._fetch_osm_crime_data = slow_osm
+                analyzer._fetch_local_crime_data = local
+
+                start = time.perf_counter()
+                crimes = await analyzer._fetch_crime_data(51.5, -0.12, 1.0)
+                elapsed = time.perf_counter() - start
+
+                # UK and local merged, OSM dropped at its 0.1 s timeout; nothing waited in sequence
+                assert sorted(c['category'] for c in crimes) == ['robbery', 'theft']
+                assert elapsed < 0.5
+                stats = analyzer.stats()
+                assert stats['sources']['osm']['timeouts'] == 1
+                assert stats['sources']['uk_police']['ok'] == 1 and stats['sources']['local']['ok'] == 1
+
+                for _ in range(3):
+                    await analyzer._fetch_crime_data(51.5, -0.12, 1.0)
+                stats = analyzer.stats()
+                assert stats['connections_created'] == 1 and stats['connections_reused'] == 3
+                assert stats['fanouts'] == 4 and stats['fanout_ms']['count'] == 4
+            assert not analyzer.stats()['session_open']
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+    print("✅ Crime sources fan out concurrently over one pooled session")
+
+
+def test_failed_sources_fall_back_to_generated_data():
+    async def run():
+        async with RealCrimeAnalyzer(source_timeouts={'uk_police': 0.2}) as analyzer:
+            analyzer.crime_apis['police_data'] = "http://127.0.0.1:9/api/"  # nothing listens here
+            crimes = await analyzer._fetch_crime_data(28.6139, 77.2090, 1.0)
+            stats = analyzer.stats()['sources']['uk_police']
+            assert stats['failed'] + stats['timeouts'] == 1
+            assert all('category' in c for c in crimes)
+
+    asyncio.run(run())
+    print("✅ Failed sources contribute nothing and generated data fills in")
+
+
+if __name__ == "__main__":
+    test_sources_fan_out_concurrently_with_timeouts()
+    test_failed_sources_fall_back_to_generated_data()
+    print("✅ Crime fan-out test complete!")
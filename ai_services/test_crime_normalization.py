@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for columnar incident normalization in RealCrimeAnalyzer
+Checks the array statistics match the per-record computation and stages are timed
+"""
+
+import sys
+import os
+import asyncio
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from models.real_crime_analyzer import RealCrimeAnalyzer
+
+
+def record_based_statistics(crime_data):
+    """The per-record computation the columnar path replaced"""
+    recent = []
+    for crime in crime_data:
+        try:
+            if (datetime.now() - datetime.strptime(crime['date'], '%Y-%m')).days <= 30:
+                recent.append(crime)
+        except Exception:
+            continue
+    high = [c for c in crime_data if c.get('severity', 0) >= 7]
+    avg_severity = sum(c.get('severity', 0) for c in crime_data) / len(crime_data)
+    crime_types = {}
+    for crime in crime_data:
+        crime_types[crime.get('category', 'other')] = crime_types.get(crime.get('category', 'other'), 0) + 1
+    most_common = max(crime_types.items(), key=lambda x: x[1])
+    return recent[:5], len(recent), len(high), avg_severity, crime_types, most_common
+
+
+def incidents(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    now = datetime.now()
+    months = [(now - timedelta(days=30 * k)).strftime('%Y-%m') for k in range(-1, 12)] + ['unknown', '2024-13']
+    return [{
+        'id': f"incident_{i}",
+        'category': rng.choice(['theft', 'burglary', 'robbery', 'drugs', 'violent-crime']),
+        'location': {'latitude': 28.6 + rng.random() / 100, 'longitude': 77.2 + rng.random() / 100, 'street': 'Main Street'},
+        'date': rng.choice(months),
+        'severity': rng.randint(1, 10)
+    } for i in range(n)]
+
+
+def test_columnar_statistics_match_records():
+    analyzer = RealCrimeAnalyzer()
+    for n in (1, 7, 500, 5000):
+        crime_data = incidents(n, seed=n)
+        columns = analyzer._normalize_incidents(crime_data)
+        patterns = analyzer._analyze_crime_patterns(columns, 28.6, 77.2)
+        area = analyzer._calculate_area_statistics(columns)
+        recent, recent_count, high, avg_severity, crime_types, most_common = record_based_statistics(crime_data)
+
+        assert patterns['recent_incidents'] == recent
+        assert patterns['crime_trends']['recent_incidents'] == recent_count
+        assert patterns['hotspot_analysis']['high_severity_count'] == high
+        assert abs(patterns['hotspot_analysis']['risk_factor'] - min(2.0, avg_severity / 5.0)) < 1e-9
+        assert area['crime_breakdown'] == crime_types and list(area['crime_breakdown']) == list(crime_types)
+        assert (area['most_common_crime'], area['crime_frequency']) == most_common
+
+    columns = analyzer._normalize_incidents([{'category': 'theft', 'date': '2024-11', 'location': {}}])
+    assert columns['month'][0] == 2024 * 12 + 10 and columns['severity'][0] == 0
+    empty = analyzer._normalize_incidents([])
+    assert analyzer._calculate_area_statistics(empty)['total_crimes'] == 0
+    print("✅ Columnar crime statistics match the per-record computation")
+
+
+def test_analysis_stages_are_timed():
+    async def run():
+        async with RealCrimeAnalyzer() as analyzer:
+            crime_data = incidents(2000)
+
+            async def fetch(lat, lon, radius_km):
+                return crime_data
+
+            analyzer._fetch_crime_data = fetch
+            result = await analyzer.analyze_location_crime_risk(28.6, 77.2)
+            assert result['crime_data_found'] == 2000 and result['crime_statistics']['total_crimes'] == 2000
+            stages = analyzer.stats()['analysis_stages_ms']
+            assert list(stages) == list(RealCrimeAnalyzer.ANALYSIS_STAGES)
+            assert all(stage['count'] == 1 for stage in stages.values())
+
+    asyncio.run(run())
+    print("✅ Analysis stages are timed separately")
+
+
+if __name__ == "__main__":
+    test_columnar_statistics_match_records()
+    test_analysis_stages_are_timed()
+    print("✅ Crime normalization test complete!")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the CPU executor and event-loop lag monitor
+"""
+
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.executor import CPUExecutor, EventLoopLagMonitor
+
+
+def blocking_work(duration: float, value: int = 0) -> int:
+    time.sleep(duration)
+    return value * 2
+
+
+def failing_work():
+    raise ValueError("boom")
+
+
+def test_executor_keeps_loop_responsive():
+    async def run():
+        executor = CPUExecutor(mode='thread', max_workers=2)
+        monitor = EventLoopLagMonitor(interval_s=0.01)
+        monitor.start()
+        results = await asyncio.gather(*(executor.run(blocking_work, 0.05, value=i) for i in range(4)))
+        await monitor.stop()
+        assert results == [0, 2, 4, 6]
+
+        stats = executor.stats()
+        assert stats['tasks'] == {'blocking_work': 4} and stats['in_flight'] == 0
+        assert stats['max_queue_depth'] == 2  # 4 tasks on 2 workers
+        assert stats['wait_ms']['max'] >= 40  # the last two waited for a free worker
+        assert monitor.stats()['lag_ms']['max'] < 40
+
+        try:
+            await executor.run(failing_work)
+            raise AssertionError("exception was swallowed")
+        except ValueError:
+            pass
+        assert executor.stats()['failures'] == {'failing_work': 1}
+        executor.shutdown()
+
+    asyncio.run(run())
+    print("✅ Blocking work runs off the event loop")
+
+
+def test_process_mode_runs_stateless_work():
+    async def run():
+        executor = CPUExecutor(mode='process', max_workers=1)
+        assert await executor.run(blocking_work, 0, value=21) == 42
+        assert await executor.run(blocking_work, 0, value=1, stateful=True) == 2
+        executor.shutdown()
+
+    asyncio.run(run())
+    print("✅ Process pool runs stateless work; stateful work stays on threads")
+
+
+if __name__ == "__main__":
+    test_executor_keeps_loop_responsive()
+    test_process_mode_runs_stateless_work()
+    print("✅ Executor test complete!")
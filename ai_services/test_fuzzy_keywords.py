@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for typo-tolerant keyword lookup
+Checks the symmetric-delete index against brute force, the corrected trigger decisions and opt-in intent correction
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.fuzzy_index import InflectedWordList, SymmetricDeleteIndex, osa_distance
+from models.keyword_matcher import (SafetyKeywordMatcher, VoiceTriggerStreams, analyze_text, configure_default_matcher,
+                                    fuzzy_keyword_index)
+from models.intent_detector import detect_intent
+from models.emotion_detector import detect_emotion
+from models.active_voice_detection import detect_voice_trigger
+
+
+def test_osa_distance():
+    assert osa_distance("help", "help", 2) == 0
+    assert osa_distance("halp", "help", 2) == 1
+    assert osa_distance("hlep", "help", 2) == 1  # transposition
+    assert osa_distance("emergancy", "emergency", 2) == 1
+    assert osa_distance("bachaao", "bachao", 2) == 1
+    assert osa_distance("ca", "abc", 3) == 3
+    assert osa_distance("help", "harassment", 2) == 3
+    print("✅ OSA distance")
+
+
+def test_lookup_matches_brute_force():
+    index = fuzzy_keyword_index()
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    tokens = set()
+    for word in index.vocabulary * 20:
+        chars = list(word)
+        for _ in range(rng.randint(0, 2)):
+            i = rng.randrange(len(chars) + 1)
+            op = rng.choice(['insert', 'delete', 'replace', 'swap'])
+            if op == 'insert':
+                chars.insert(i, rng.choice(letters))
+            elif op == 'delete' and i < len(chars) and len(chars) > 1:
+                del chars[i]
+            elif op == 'replace' and i < len(chars):
+                chars[i] = rng.choice(letters)
+            elif op == 'swap' and i + 1 < len(chars):
+                chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        tokens.add(''.join(chars))
+
+    for token in tokens:
+        distance = index.max_distance(token)
+        expected = None
+        if distance and token not in index.known_words and token not in index.vocabulary:
+            scored = sorted((osa_distance(token, word, 9), word) for word in index.vocabulary
+                            if osa_distance(token, word, 9) <= min(distance, index.max_distance(word))
+                            and index.plausible(token, word))
+            if scored and (len(scored) == 1 or scored[0][0] < scored[1][0]):
+                expected = scored[0][1]
+        assert index.lookup(token) == expected, (token, expected)
+    print(f"✅ Index lookups match brute force over {len(tokens)} misspellings")
+
+
+def test_speech_misspellings_resolve():
+    index = fuzzy_keyword_index()
+    expected = {'halp': 'help', 'bachaao': 'bachao', 'emergancy': 'emergency', 'hlep': 'help',
+                'plese': 'please', 'harasment': 'harassment', 'rute': 'route', 'trian': 'train'}
+    for token, word in expected.items():
+        assert index.lookup(token) == word, token
+    # Dictionary words and their inflections, short words and exact keywords stay as they are;
+    # short tokens are only corrected by vowel changes or a swap
+    for token in ('hell', 'kelp', 'hanger', 'manger', 'scares', 'snared', 'safer', 'worries', 'stalling', 'tipsy',
+                  'last', 'same', 'tarin', 'rikshaw', 'held', 'cafe', 'sav', 'plz', 'help', 'bus', 'hello'):
+        assert index.lookup(token) is None, token
+    words = InflectedWordList({'scare', 'worry', 'stop', 'watch', 'go'})
+    assert all(w in words for w in ('scares', 'scared', 'worries', 'stopped', 'stopping', 'watches'))
+    assert not any(w in words for w in ('halp', 'scarf', 'stoop', 'wat'))
+    ambiguous = SymmetricDeleteIndex(['cart', 'card'])
+    assert ambiguous.lookup('carx') is None and ambiguous.lookup('cardd') == 'card'
+    print("✅ Speech-to-text misspellings resolve to keywords, real words do not")
+
+
+def test_corrected_decisions():
+    assert detect_voice_trigger("halp me") == 'triggered'
+    assert detect_voice_trigger("Mujhe bachaao!") == 'triggered'
+    assert detect_voice_trigger("EMERGANCY, plese halp") == 'triggered'
+    assert detect_voice_trigger("what the hell") == 'safe'
+    exact = SafetyKeywordMatcher().analyze("halp me")
+    assert exact['trigger'] == 'safe'
+    assert analyze_text("halp me") == dict(exact, trigger='triggered')
+    # Intent is corrected only when the service is configured for it (TYPO_CORRECTED_DECISIONS)
+    assert detect_intent("is the trian crowded") == 'general'
+    try:
+        configure_default_matcher(('trigger', 'intent'))
+        assert detect_intent("is the trian crowded") == 'travel_safety'
+        assert detect_intent("i am lost, which rute is quickest") == 'location'
+        assert detect_intent("I feel fine") == 'general'
+        assert detect_emotion("halp me") == exact['emotion']
+    finally:
+        configure_default_matcher()
+    try:
+        configure_default_matcher(('emotion',))
+        assert False, "emotion correction accepted"
+    except ValueError:
+        pass
+    print("✅ Trigger decisions use corrected tokens, intent when configured")
+
+
+def test_ordinary_words_left_alone():
+    exact = SafetyKeywordMatcher()
+    texts = ("the kelp forest", "nice hanger", "a manger scene", "don't scare me", "it's safer here",
+             "the snared rabbit", "stalling for time", "worries about the exam", "he held me", "meet at the cafe")
+    try:
+        configure_default_matcher(('trigger', 'intent'))
+        for text in texts:
+            assert analyze_text(text) == exact.analyze(text), text
+            assert detect_emotion(text) == exact.analyze(text)['emotion'], text
+    finally:
+        configure_default_matcher()
+    print("✅ Ordinary words near a keyword are not corrected")
+
+
+def test_stream_corrects_completed_words():
+    streams = VoiceTriggerStreams()
+    stream = streams.open()
+    assert stream.feed("plese ha") == [] and stream.feed("lp m") == ['please help']
+    assert stream.feed("e now") == ['help me']
+    stream.reset()
+    # A misspelled last word is matched when the phrase ends
+    assert stream.feed("mujhe bacha") == [] and stream.feed("ao") == []
+    assert sorted(stream.finish()) == ['bachao', 'mujhe bachao']
+    # Exact keywords fire as soon as they complete, once
+    assert stream.feed("help me") == ['help me'] and stream.feed(" ok") == [] and stream.finish() == []
+    assert stream.feed("x" * 200 + " help me") == ['help me']
+    streams.close(stream)
+    print("✅ Streams correct each word once it ends")
+
+
+if __name__ == "__main__":
+    test_osa_distance()
+    test_lookup_matches_brute_force()
+    test_speech_misspellings_resolve()
+    test_corrected_decisions()
+    test_ordinary_words_left_alone()
+    test_stream_corrects_completed_words()
+    print("✅ Fuzzy keyword test complete!")
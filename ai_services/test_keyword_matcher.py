@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared Aho-Corasick keyword matcher
+Checks intent, emotion and voice-trigger decisions match per-table substring scans
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.keyword_matcher import (INTENT_KEYWORDS, EMOTION_KEYWORDS, VOICE_TRIGGER_KEYWORDS,
+                                    KeywordAutomaton, SafetyKeywordMatcher, analyze_text)
+from models.intent_detector import detect_intent
+from models.emotion_detector import detect_emotion
+from models.active_voice_detection import detect_voice_trigger
+
+
+def scan_table(text, groups, default):
+    """The `any(word in text ...)` chain the detectors used to run"""
+    text = text.lower()
+    for label, words in groups:
+        if any(word in text for word in words):
+            return label
+    return default
+
+
+def test_known_decisions():
+    cases = {
+        'I feel UNSAFE walking home': ('travel_safety', 'happy', 'safe'),
+        'Mujhe Bachao!': ('sos', 'neutral', 'triggered'),
+        'where am i': ('location', 'neutral', 'safe'),
+        # "low" inside "following" is a sadness keyword, as before
+        'Someone is following me, I am scared': ('emotional_support', 'sad', 'safe'),
+        'hello there': ('general', 'neutral', 'safe'),
+        'Please HELP me, I am lost': ('sos', 'distressed', 'triggered'),
+        'The road looks dark and creepy': ('travel_safety', 'neutral', 'safe'),
+        'İstanbul road': ('travel_safety', 'neutral', 'safe'),
+        '': ('general', 'neutral', 'safe')
+    }
+    for text, expected in cases.items():
+        assert (detect_intent(text), detect_emotion(text), detect_voice_trigger(text)) == expected, text
+        assert tuple(analyze_text(text).values()) == expected
+    print("✅ Detectors keep their decisions")
+
+
+def test_matches_substring_scans():
+    words = sorted({w for table in (INTENT_KEYWORDS, EMOTION_KEYWORDS, VOICE_TRIGGER_KEYWORDS)
+                    for _, group in table for w in group})
+    pieces = words + [w[:len(w) // 2] for w in words] + [w[len(w) // 2:] for w in words] + \
+        ['hello', 'ok', 'the', 'ÄÖ', 'İ', '🙂', 'me', 'please', 'HELP', 'Save']
+    rng = random.Random(0)
+    # Both the automaton pass and the long-text substring path
+    matchers = [SafetyKeywordMatcher(scan_max_chars=10 ** 9), SafetyKeywordMatcher(scan_max_chars=0)]
+    for _ in range(5000):
+        text = rng.choice(['', ' ', ', ']).join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        for matcher in matchers:
+            assert matcher.analyze(text) == {
+                'intent': scan_table(text, INTENT_KEYWORDS, 'general'),
+                'emotion': scan_table(text, EMOTION_KEYWORDS, 'neutral'),
+                'trigger': scan_table(text, VOICE_TRIGGER_KEYWORDS, 'safe')
+            }, text
+    print("✅ One automaton pass matches the per-table substring scans")
+
+
+def test_overlapping_keywords():
+    automaton = KeywordAutomaton(['he', 'she', 'his', 'hers', 'ushe'])
+    assert automaton.matches('ushers') == {'he', 'she', 'hers', 'ushe'}
+    assert automaton.matches('ahishers') == {'he', 'she', 'his', 'hers'}
+    assert automaton.matches('xyz') == set()
+    print("✅ Overlapping keywords are all reported")
+
+
+if __name__ == "__main__":
+    test_known_decisions()
+    test_matches_substring_scans()
+    test_overlapping_keywords()
+    print("✅ Keyword matcher test complete!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for live tracking
+Checks that each fix only recomputes the parts whose inputs changed
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.location_analyzer import LocationAnalyzer
+from models.safety_predictor import SafetyPredictor
+from models.live_tracker import LiveTracker
+from test_batching import with_fake_lookups
+
+
+class CountingGeocoder:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_real_address(self, lat, lon):
+        self.calls += 1
+        road = 'MG Road' if lon < 77.2100 else 'Ring Road'
+        return {'formatted_address': road, 'components': {'road': road, 'city': 'Delhi'}, 'source': 'test'}
+
+
+def make_tracker():
+    analyzer = LocationAnalyzer(CountingGeocoder(), SafetyPredictor())
+
+    async def fake_weather(lat, lon):
+        analyzer.weather_calls += 1
+        return {'temperature': 25.0, 'condition': 'clear'}
+
+    analyzer.weather_calls = 0
+    analyzer._get_weather_data = fake_weather
+    return analyzer, LiveTracker(analyzer)
+
+
+def test_recomputes_only_changed_inputs():
+    async def run():
+        analyzer, tracker = make_tracker()
+        session = tracker.get_session('s1')
+        fix = {'latitude': 28.61391, 'longitude': 77.20901, 'hour': 14, 'day_of_week': 2}
+
+        first = await tracker.process_fix(session, fix)
+        assert first['type'] == 'snapshot' and 'safety_score' in first['analysis']
+
+        # Jitter inside the same cell: nothing is refetched or pushed
+        assert await tracker.process_fix(session, {**fix, 'latitude': 28.61395}) is None
+        assert analyzer.geocoder.calls == 1 and analyzer.weather_calls == 1
+
+        # New cell on another road: address is refetched, weather is not
+        delta = await tracker.process_fix(session, {**fix, 'longitude': 77.2125})
+        assert delta['type'] == 'delta' and delta['recomputed'] == ['address', 'score']
+        assert 'address_info' in delta['changes'] and 'weather' not in delta['changes']
+        assert analyzer.geocoder.calls == 2 and analyzer.weather_calls == 1
+
+        # Hour change only rescores
+        delta = await tracker.process_fix(session, {**fix, 'longitude': 77.2125, 'hour': 23})
+        assert delta['recomputed'] == ['score'] and 'safety_score' in delta['changes']
+        assert analyzer.geocoder.calls == 2
+        assert session.fixes == 4 and session.score_calls == 3
+
+    asyncio.run(run())
+    print("✅ Fixes only recompute what changed")
+
+
+def test_sessions_resume_and_reject_bad_fixes():
+    async def run():
+        analyzer, tracker = make_tracker()
+        fix = {'latitude': 28.6139, 'longitude': 77.2090, 'hour': 14, 'day_of_week': 2}
+        await tracker.process_fix(tracker.get_session('s2'), fix)
+        assert await tracker.process_fix(tracker.get_session('s2'), fix) is None
+        assert tracker.stats()['fixes'] == 2
+
+        for bad in ({'latitude': 28.6}, {'latitude': 'x', 'longitude': 77.2}, {'latitude': 95, 'longitude': 77.2}):
+            try:
+                await tracker.process_fix(tracker.get_session('s2'), bad)
+                raise AssertionError("bad fix accepted")
+            except (KeyError, ValueError):
+                pass
+
+    asyncio.run(run())
+    print("✅ Sessions resume and invalid fixes are rejected")
+
+
+def test_midnight_and_monday_are_kept():
+    analyzer, _ = make_tracker()
+    address = {'formatted_address': 'MG Road', 'components': {'road': 'MG Road', 'city': 'Delhi'}}
+    weather = {'temperature': 25.0, 'condition': 'clear'}
+    features = analyzer.build_features(28.6139, 77.2090, address, weather, hour=0, day_of_week=0)
+    assert features['hour'] == 0 and features['day_of_week'] == 0
+    features = analyzer.build_features(28.6139, 77.2090, address, weather)
+    assert 0 <= features['hour'] <= 23 and 0 <= features['day_of_week'] <= 6
+    print("✅ Hour 0 and day 0 are used as given, missing values fall back to now")
+
+
+@with_fake_lookups
+def test_anonymous_connections_get_their_own_session(client):
+    fix = {'latitude': 28.6139, 'longitude': 77.2090, 'hour': 14, 'day_of_week': 2}
+    session_ids = set()
+    for _ in range(3):
+        with client.websocket_connect('/ai/track') as websocket:
+            websocket.send_json(fix)
+            reply = websocket.receive_json()
+            assert reply['type'] == 'snapshot' and reply['session_id'].startswith('ws-')
+            session_ids.add(reply['session_id'])
+    assert len(session_ids) == 3
+
+    # The returned id resumes the session: the same fix produces no update
+    with client.websocket_connect(f"/ai/track?session_id={reply['session_id']}") as websocket:
+        websocket.send_json(fix)
+        websocket.send_json({'latitude': 95, 'longitude': 77.2})
+        assert websocket.receive_json()['type'] == 'error'
+    print("✅ Anonymous connections never share a session")
+
+
+if __name__ == "__main__":
+    test_recomputes_only_changed_inputs()
+    test_sessions_resume_and_reject_bad_fixes()
+    test_midnight_and_monday_are_kept()
+    test_anonymous_connections_get_their_own_session()
+    print("✅ Live tracker test complete!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite R*Tree local crime store
+Checks radius queries against brute force, date filters and the analyzer source
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from models.local_crime_store import LocalCrimeStore
+from models.real_crime_analyzer import RealCrimeAnalyzer
+from utils.geo import KM_PER_DEGREE, haversine_km
+
+
+def synthetic_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'latitude': 28.61 + rng.normal(0, 0.03, n),
+        'longitude': 77.21 + rng.normal(0, 0.03, n),
+        'crime_type': rng.choice(['theft', 'robbery', 'burglary'], n),
+        'date': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+        'area': rng.choice(['Karol Bagh', 'Saket'], n)
+    })
+
+
+def test_radius_query_matches_brute_force():
+    frame = synthetic_frame(20000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        frame.to_csv(path, index=False)
+        store = LocalCrimeStore(os.path.join(tmp, 'crimes.db'))
+        assert store.load_csv(path, chunksize=7000) == 20000
+
+        for lat, lon, radius in ((28.61, 77.21, 1.0), (28.65, 77.18, 0.5), (28.7, 77.3, 2.0)):
+            found = store.query(lat, lon, radius)
+            distance = haversine_km(lat, lon, frame['latitude'], frame['longitude'])
+            assert len(found) == int((distance <= radius).sum())
+            assert all(a['distance_km'] <= b['distance_km'] for a, b in zip(found, found[1:]))
+
+        # Month and date filters
+        june = store.query(28.61, 77.21, 2.0, month_from='2025-06', month_to='2025-06')
+        assert june and all(i['date'] == '2025-06' for i in june)
+        late = store.query(28.61, 77.21, 2.0, date_from='2025-12-15')
+        assert late and all(i['incident_date'] >= '2025-12-15' for i in late)
+        assert len(store.query(28.61, 77.21, 2.0, limit=5)) == 5
+        plan = store._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM incidents WHERE month = '2025-06'").fetchall()
+        assert any('idx_incidents_month' in str(step) for step in plan)
+        assert store.stats()['queries'] == 6
+        store.close()
+    print("✅ R*Tree radius queries match brute force and filters apply")
+
+
+def test_radius_edge_is_inside_the_box():
+    # Incidents just inside the radius due north, south, east and west, measured with haversine_km
+    offsets = np.array([0.9995, -0.9995]) / KM_PER_DEGREE
+    frame = synthetic_frame(4)
+    frame['latitude'] = [28.61 + offsets[0], 28.61 + offsets[1], 28.61, 28.61]
+    frame['longitude'] = [77.21, 77.21, 77.21 + offsets[0] / np.cos(np.radians(28.61)), 77.21 + offsets[1] / np.cos(np.radians(28.61))]
+    distance = haversine_km(28.61, 77.21, frame['latitude'], frame['longitude'])
+    assert ((distance > 0.999) & (distance <= 1.0)).all()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        frame.to_csv(path, index=False)
+        store = LocalCrimeStore(os.path.join(tmp, 'crimes.db'))
+        store.load_csv(path)
+        assert len(store.query(28.61, 77.21, 1.0)) == 4
+        store.close()
+    print("✅ Incidents on the edge of the radius are found")
+
+
+def test_analyzer_reads_local_store():
+    month = datetime.now().strftime('%Y-%m')
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalCrimeStore(os.path.join(tmp, 'crimes.db'))
+        store.bulk_load([
+            {'category': 'robbery', 'location': {'latitude': 28.6140, 'longitude': 77.2091, 'street': 'Janpath'}, 'date': month},
+            {'category': 'theft', 'latitude': 28.6141, 'longitude': 77.2092, 'date': f"{month}-01", 'severity': 2},
+            {'category': 'theft', 'latitude': 28.6142, 'longitude': 77.2093, 'date': '2019-01'},  # outside the window
+            {'category': 'theft', 'latitude': 29.5, 'longitude': 77.2, 'date': month}  # far away
+        ])
+
+        async def run():
+            async with RealCrimeAnalyzer(local_store=store) as analyzer:
+                incidents = await analyzer._fetch_local_crime_data(28.6139, 77.2090, 1.0)
+                assert sorted(i['category'] for i in incidents) == ['robbery', 'theft']
+                assert {i['category']: i['severity'] for i in incidents} == {'robbery': 9, 'theft': 2}
+                assert incidents[0]['location']['street'] == 'Janpath'
+
+        asyncio.run(run())
+        store.close()
+    print("✅ RealCrimeAnalyzer serves incidents from the local store")
+
+
+if __name__ == "__main__":
+    test_radius_query_matches_brute_force()
+    test_radius_edge_is_inside_the_box()
+    test_analyzer_reads_local_store()
+    print("✅ Local crime store test complete!")
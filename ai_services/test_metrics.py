@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process metrics registry
+Checks histogram buckets, the Prometheus text output, request/upstream instrumentation and collectors
+"""
+
+import sys
+import os
+import asyncio
+import socket
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.metrics import MetricsMiddleware, MetricsRegistry
+from utils import helpers
+
+
+def _lines(registry):
+    return registry.render().splitlines()
+
+
+def test_histogram_and_counter_render():
+    registry = MetricsRegistry()
+    latency = registry.histogram('stage_seconds', "Stage time", labels=('stage',), buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 0.5, 3.0):
+        latency.labels('geocode').observe(value)
+    requests = registry.counter('calls_total', "Calls\nby outcome")
+    requests.inc()
+    requests.inc(2)
+
+    lines = _lines(registry)
+    assert '# TYPE stage_seconds histogram' in lines
+    # Buckets are cumulative and "le" includes the bound itself
+    assert 'stage_seconds_bucket{stage="geocode",le="0.01"} 2' in lines
+    assert 'stage_seconds_bucket{stage="geocode",le="0.1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="geocode",le="1"} 4' in lines
+    assert 'stage_seconds_bucket{stage="geocode",le="+Inf"} 5' in lines
+    assert 'stage_seconds_count{stage="geocode"} 5' in lines
+    assert any(line.startswith('stage_seconds_sum{stage="geocode"} 3.565') for line in lines)
+    assert '# HELP calls_total Calls\\nby outcome' in lines and 'calls_total 3' in lines
+
+    # Same definition returns the same family; a conflicting one is refused
+    assert registry.histogram('stage_seconds', "Stage time", labels=('stage',)) is latency
+    try:
+        registry.counter('stage_seconds', "Stage time", labels=('stage',))
+        assert False, "conflicting registration accepted"
+    except ValueError:
+        pass
+    print("✅ Histograms and counters render in the Prometheus text format")
+
+
+def test_labels_and_collectors():
+    registry = MetricsRegistry()
+    family = registry.counter('responses_total', "Responses", labels=('route', 'status'))
+    family.labels('/a', 200).inc()
+    family.labels('/a', '200').inc()
+    family.labels('/"q"', 500).inc()
+    try:
+        family.labels('/a')
+        assert False, "wrong label count accepted"
+    except ValueError:
+        pass
+    registry.register_collector(lambda: [('cache_hit_ratio', 'gauge', "Ratio", [({'cache': 'x'}, 0.25)])])
+
+    lines = _lines(registry)
+    # Integer and string label values are one series
+    assert 'responses_total{route="/a",status="200"} 2' in lines
+    assert 'responses_total{route="/\\"q\\"",status="500"} 1' in lines
+    assert '# TYPE cache_hit_ratio gauge' in lines and 'cache_hit_ratio{cache="x"} 0.25' in lines
+    print("✅ Label values are normalized and escaped, collectors are read at render time")
+
+
+def test_middleware_labels_by_route():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('http_seconds', "Requests", labels=('method', 'route', 'status'))
+
+    class Route:
+        path = '/items/{item_id}'
+
+    async def app(scope, receive, send):
+        if scope['path'] == '/boom':
+            raise RuntimeError("handler failed")
+        scope['route'] = Route()
+        await send({'type': 'http.response.start', 'status': 201, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, histogram)
+    for path in ('/items/1', '/items/2', '/boom'):
+        try:
+            asyncio.run(middleware({'type': 'http', 'method': 'GET', 'path': path}, None, send))
+        except RuntimeError:
+            pass
+    lines = _lines(registry)
+    assert 'http_seconds_count{method="GET",route="/items/{item_id}",status="201"} 2' in lines
+    assert 'http_seconds_count{method="GET",route="unmatched",status="500"} 1' in lines
+    print("✅ Requests are timed per route template and status")
+
+
+def test_upstream_calls_counted():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    before = helpers.upstream_requests.labels('127.0.0.1', 'exception').value
+    timed = sum(helpers.upstream_seconds.labels('127.0.0.1').snapshot()[0])
+    try:
+        helpers.http_get(f"http://127.0.0.1:{port}/reverse", timeout=1)
+        assert False, "request to a closed port succeeded"
+    except OSError:
+        pass
+    assert helpers.upstream_requests.labels('127.0.0.1', 'exception').value == before + 1
+    assert sum(helpers.upstream_seconds.labels('127.0.0.1').snapshot()[0]) == timed + 1
+    print("✅ Upstream calls are counted per provider and outcome")
+
+
+if __name__ == "__main__":
+    test_histogram_and_counter_render()
+    test_labels_and_collectors()
+    test_middleware_labels_by_route()
+    test_upstream_calls_counted()
+    print("✅ Metrics test complete!")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the location pattern engine
+Covers clustering, incremental ingest, day-window expiry and the risk join
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta, timezone
+from models.safety_predictor import SafetyPredictor
+from models.pattern_analyzer import PatternAnalyzer, _hour_ranges, _timestamps_to_ms
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+HOME = (18.5204, 73.8567)
+OFFICE = (18.5590, 73.7868)
+
+
+def make_points(place, count, start, step_minutes=10, safety_score=None):
+    points = []
+    for i in range(count):
+        point = {
+            'latitude': place[0] + (i % 5) * 0.00005,
+            'longitude': place[1] + (i % 3) * 0.00005,
+            'timestamp': (start + timedelta(minutes=step_minutes * i)).isoformat()
+        }
+        if safety_score is not None:
+            point['safety_score'] = safety_score
+        points.append(point)
+    return points
+
+
+def test_clusters_frequent_places():
+    analyzer = PatternAnalyzer(SafetyPredictor(), crime_risk=lambda lat, lon: 3.0)
+    points = make_points(HOME, 40, START) + make_points(OFFICE, 20, START + timedelta(days=1))
+    points.append({'latitude': 19.0, 'longitude': 72.8, 'timestamp': START.isoformat()})  # one-off visit
+
+    result = analyzer.analyze('user-1', points, days=30)
+    places = result['frequent_locations']
+    assert len(places) == 2
+    assert places[0]['visits'] == 40 and abs(places[0]['latitude'] - HOME[0]) < 0.001
+    assert places[1]['visits'] == 20
+    assert all(p['crime_risk_score'] == 3.0 for p in places)
+    assert any(p['type'] == 'frequent_high_risk_location' for p in result['risk_patterns'])
+    assert set(result['safety_trends']) == {'overall_trend', 'high_risk_periods', 'safe_locations'}
+    print("✅ Frequent places clustered and joined against crime risk")
+
+
+def test_incremental_updates_skip_seen_points():
+    analyzer = PatternAnalyzer(SafetyPredictor())
+    history = make_points(HOME, 30, START)
+    first = analyzer.analyze('user-2', history, days=30)
+    assert first['analysis_summary']['points_added'] == 30
+
+    history += make_points(HOME, 10, START + timedelta(days=1))
+    second = analyzer.analyze('user-2', history, days=30)
+    assert second['analysis_summary']['points_added'] == 10
+    assert second['frequent_locations'][0]['visits'] == 40
+    print("✅ Resending history only ingests new points")
+
+
+def test_old_days_expire():
+    analyzer = PatternAnalyzer(SafetyPredictor())
+    analyzer.analyze('user-3', make_points(HOME, 30, START), days=7)
+    result = analyzer.analyze('user-3', make_points(OFFICE, 30, START + timedelta(days=10)), days=7)
+    assert result['analysis_summary']['points_expired'] == 30
+    assert len(result['frequent_locations']) == 1
+    assert abs(result['frequent_locations'][0]['latitude'] - OFFICE[0]) < 0.001
+    print("✅ Days outside the window are expired")
+
+
+def test_clusters_scored_on_their_weekday():
+    analyzer = PatternAnalyzer(SafetyPredictor())
+    saturday = analyzer.analyze('user-5', make_points(HOME, 30, START + timedelta(days=2)))['frequent_locations'][0]
+    wednesday = analyzer.analyze('user-6', make_points(HOME, 30, START - timedelta(days=1)))['frequent_locations'][0]
+    assert saturday['peak_weekday'] == 5 and wednesday['peak_weekday'] == 2
+    # Same hours, so only the weekend factor separates them
+    assert round(wednesday['predicted_safety_score'] - saturday['predicted_safety_score'], 1) == 0.5
+    print("✅ Places are scored on the weekday they are visited")
+
+
+def test_skipped_points_are_counted():
+    analyzer = PatternAnalyzer(SafetyPredictor())
+    history = make_points(HOME, 10, START)
+    analyzer.analyze('user-7', history)
+    later = make_points(HOME, 5, START + timedelta(days=1))
+    later[0]['timestamp'] = None
+    later[1]['latitude'] = 'unknown'
+    late = make_points(OFFICE, 2, START - timedelta(days=1))  # older than what was already ingested
+    summary = analyzer.analyze('user-7', history + later + late)['analysis_summary']
+    assert summary['points_added'] == 3
+    assert summary['points_skipped_old'] == 12 and summary['points_skipped_invalid'] == 2
+    print("✅ Points that are not ingested are counted as old or invalid")
+
+
+def test_mixed_and_missing_timestamps():
+    epoch = int(START.timestamp())
+    assert list(_timestamps_to_ms([epoch, None, epoch * 1000 + 5, START.isoformat(), 'soon', float('nan')])) == \
+        [epoch * 1000, -1, epoch * 1000 + 5, epoch * 1000, -1, -1]
+
+    analyzer = PatternAnalyzer(SafetyPredictor())
+    points = make_points(HOME, 50, START)
+    for point in points[:25]:
+        point['timestamp'] = int(datetime.fromisoformat(point['timestamp']).timestamp())
+    points.append({'latitude': HOME[0], 'longitude': HOME[1]})
+    summary = analyzer.analyze('user-8', points)['analysis_summary']
+    assert summary['points_added'] == 50 and summary['points_skipped_invalid'] == 1
+    print("✅ One point without a timestamp does not invalidate the rest")
+
+
+def test_empty_history_and_hour_ranges():
+    result = PatternAnalyzer(SafetyPredictor()).analyze('user-4', None)
+    assert result['frequent_locations'] == [] and result['safety_trends']['high_risk_periods'] == ['20:00-02:00']
+    assert _hour_ranges([20, 21, 22, 23, 0, 1]) == ['20:00-02:00']
+    assert _hour_ranges([3, 7, 8]) == ['03:00-04:00', '07:00-09:00']
+    print("✅ Empty history keeps the default response")
+
+
+if __name__ == "__main__":
+    test_clusters_frequent_places()
+    test_incremental_updates_skip_seen_points()
+    test_old_days_expire()
+    test_clusters_scored_on_their_weekday()
+    test_skipped_points_are_counted()
+    test_mixed_and_missing_timestamps()
+    test_empty_history_and_hour_ranges()
+    print("✅ Pattern analyzer test complete!")
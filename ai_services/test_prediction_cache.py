@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the crime prediction result cache
+Checks the canonical key, invalidation on data reload and memory accounting
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from models import crime_prediction
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from models.crime_prediction import CrimePredictionCache, predict_crime_risk
+from utils.cache import LRUCache, approx_size
+
+REQUEST = {'lat': 28.61391, 'lon': 77.20902, 'time_of_day': 'night', 'weather': 'clear',
+           'user_profile': 'alone', 'area_type': None, 'location_name': None}
+
+
+def test_canonical_key_and_fresh_timestamp():
+    cache = CrimePredictionCache(maxsize=10, ttl=60, precision=4)
+    token = cache.dataset_token()
+    cache.set(REQUEST, predict_crime_risk(**REQUEST), token)
+
+    # Same point to 4 decimals and same context: served from the cache
+    hit = cache.get({**REQUEST, 'lat': 28.613912, 'lon': 77.209018})
+    assert hit is not None and hit['score'] == predict_crime_risk(**REQUEST)['score']
+    assert cache.get({**REQUEST, 'weather': 'fog'}) is None
+    assert cache.get({**REQUEST, 'lat': 28.6145}) is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['approx_bytes'] > 0
+    print("✅ Predictions are cached on the quantized location and context")
+
+
+def test_invalidated_when_crime_data_reloads():
+    original = crime_prediction.csv_crime_analyzer
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        pd.DataFrame({'latitude': [28.6139] * 30, 'longitude': [77.2090] * 30, 'crime_type': ['robbery'] * 30}).to_csv(path, index=False)
+        crime_prediction.csv_crime_analyzer = CSVCrimeAnalyzer(path)
+        try:
+            cache = CrimePredictionCache(maxsize=10, ttl=60)
+            token = cache.dataset_token()
+            before = predict_crime_risk(**REQUEST)
+            cache.set(REQUEST, before, token)
+            assert cache.get(REQUEST)['score'] == before['score']
+
+            # Replace the data on disk and reload: the cached result must not survive
+            pd.DataFrame({'latitude': [10.0], 'longitude': [10.0], 'crime_type': ['theft']}).to_csv(path, index=False)
+            crime_prediction.csv_crime_analyzer.load_crime_data()
+            assert cache.get(REQUEST) is None
+            assert predict_crime_risk(**REQUEST)['score'] > before['score']
+
+            # A result computed against the old data is not stored after the reload
+            cache.set(REQUEST, before, token)
+            assert cache.get(REQUEST) is None
+            stats = cache.stats()
+            assert stats['invalidations'] == 1 and stats['stale_writes'] == 1 and stats['size'] == 0
+        finally:
+            crime_prediction.csv_crime_analyzer = original
+    print("✅ Cached predictions are dropped when the crime data reloads")
+
+
+def test_reload_is_atomic():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        pd.DataFrame({'latitude': [28.6139] * 3, 'longitude': [77.2090] * 3, 'crime_type': ['theft'] * 3}).to_csv(path, index=False)
+        analyzer = CSVCrimeAnalyzer(path)
+        snapshot = analyzer._snapshot()
+
+        # An unreadable file leaves the loaded data, its index and the version in place
+        broken = os.path.join(tmp, 'broken.csv')
+        open(broken, 'w').close()
+        assert analyzer.load_crime_data(broken) is False
+        assert analyzer.csv_file_path == path and analyzer.data_version == 1
+        assert analyzer.analyze_location_crime_risk(28.6139, 77.2090)['crime_data_found'] == 3
+
+        # An analysis that started before a reload keeps reading the frame and index it started with
+        pd.DataFrame({'latitude': [28.6139], 'longitude': [77.2090], 'crime_type': ['robbery']}).to_csv(path, index=False)
+        assert analyzer.load_crime_data() is True and analyzer.data_version == 2
+        assert snapshot._analyze_location_crime_risk(28.6139, 77.2090)['crime_data_found'] == 3
+        assert analyzer.analyze_location_crime_risk(28.6139, 77.2090)['crime_data_found'] == 1
+    print("✅ Crime data reloads swap in whole or not at all")
+
+
+def test_lru_tracks_memory():
+    cache = LRUCache(2, sizeof=approx_size)
+    cache.set('a', {'recommendations': ['x' * 1000]})
+    cache.set('b', {'recommendations': ['y' * 10]})
+    full = cache.stats()['approx_bytes']
+    assert full > 1000
+    cache.set('c', {'recommendations': []})  # evicts 'a'
+    assert cache.stats()['approx_bytes'] < full - 900
+    cache.clear()
+    assert cache.stats()['approx_bytes'] == 0
+    print("✅ LRU cache tracks approximate memory through evictions")
+
+
+if __name__ == "__main__":
+    test_canonical_key_and_fresh_timestamp()
+    test_invalidated_when_crime_data_reloads()
+    test_reload_is_atomic()
+    test_lru_tracks_memory()
+    print("✅ Prediction cache test complete!")
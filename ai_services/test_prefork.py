@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for preforked serving
+Checks workers share state built before the fork, dead workers are replaced and SIGTERM stops them all
+"""
+
+import sys
+import os
+import json
+import signal
+import socket
+import subprocess
+import time
+import urllib.request
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.prefork import memory_usage
+
+APP = """
+import os, sys, json
+sys.path.insert(0, {root!r})
+from utils.prefork import serve_preforked, worker_index
+
+shared = {{}}
+
+def preload():
+    shared['built_by'] = os.getpid()
+
+async def app(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    body = json.dumps({{'pid': os.getpid(), 'worker': worker_index(), 'built_by': shared.get('built_by')}}).encode()
+    await send({{'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json')]}})
+    await send({{'type': 'http.response.body', 'body': body}})
+
+serve_preforked(app, '127.0.0.1', {port}, workers=2, preload=preload, restart_delay_s=0.1, log_level='warning')
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2) as response:
+        return json.loads(response.read())
+
+
+def _wait_for(predicate, timeout_s=10.0):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if predicate():
+                return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def test_memory_usage():
+    usage = memory_usage()
+    if usage:
+        assert usage['rss_mb'] >= usage['pss_mb'] >= usage['uss_mb'] > 0
+    assert memory_usage(pid=2 ** 30) == {}
+    print("✅ Process memory is read from /proc")
+
+
+def test_workers_share_preloaded_state():
+    port = _free_port()
+    parent = subprocess.Popen([sys.executable, '-c', APP.format(root=os.path.dirname(os.path.abspath(__file__)), port=port)])
+    try:
+        seen = {}
+
+        def both_workers_answered():
+            reply = _get(port)
+            seen[reply['pid']] = reply
+            return len(seen) == 2
+        assert _wait_for(both_workers_answered), seen
+        # State built once in the parent, inherited by both workers
+        assert {reply['built_by'] for reply in seen.values()} == {parent.pid}
+        assert sorted(reply['worker'] for reply in seen.values()) == [0, 1]
+
+        # A dead worker is re-forked with the same number
+        victim = next(pid for pid, reply in seen.items() if reply['worker'] == 0)
+        os.kill(victim, signal.SIGKILL)
+        seen.clear()
+        assert _wait_for(lambda: both_workers_answered() and victim not in seen), seen
+        assert sorted(reply['worker'] for reply in seen.values()) == [0, 1]
+
+        parent.send_signal(signal.SIGTERM)
+        assert parent.wait(timeout=10) == 0
+        for pid in seen:
+            assert _wait_for(lambda: not os.path.exists(f"/proc/{pid}") or
+                             open(f"/proc/{pid}/stat").read().split()[2] == 'Z', 5)
+    finally:
+        if parent.poll() is None:
+            parent.kill()
+    print("✅ Workers share preloaded state, restart when killed and stop on SIGTERM")
+
+
+if __name__ == "__main__":
+    test_memory_usage()
+    test_workers_share_preloaded_state()
+    print("✅ Prefork test complete!")
@@ -60,6 +60,9 @@ async def test_real_crime_analysis():
         
         print("-" * 40)
     
+    print(f"\n🔌 Source fan-out: {analyzer.stats()['fanout_ms']}")
+    await analyzer.close()
+    
     print("\n✅ Real Crime Analysis Test Complete!")
     print("\n📋 How to integrate:")
     print("1. The system fetches real crime data from multiple sources")
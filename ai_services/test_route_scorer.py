@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for route scoring
+Covers polyline densification, the crime grid index and per-segment scores
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from models.crime_index import CrimeGridIndex
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from models.safety_predictor import SafetyPredictor
+from models.route_scorer import RouteScorer
+from utils.geo import KM_PER_DEGREE, haversine_km, densify_polyline
+
+ROUTE = [
+    {'latitude': 18.5204, 'longitude': 73.8567},
+    {'latitude': 18.5304, 'longitude': 73.8567},
+    {'latitude': 18.5304, 'longitude': 73.8767}
+]
+
+
+def test_densify_keeps_vertices_and_spacing():
+    lats = [p['latitude'] for p in ROUTE]
+    lons = [p['longitude'] for p in ROUTE]
+    sample_lat, sample_lon, segment, distance = densify_polyline(lats, lons, 100)
+    gaps = haversine_km(sample_lat[:-1], sample_lon[:-1], sample_lat[1:], sample_lon[1:])
+    assert gaps.max() <= 0.1 + 1e-9
+    assert (sample_lat[0], sample_lon[-1]) == (lats[0], lons[-1])
+    assert set(segment.tolist()) == {0, 1}
+    assert abs(distance[-1] - haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum()) < 1e-9
+    print("✅ Polyline densified at the requested spacing")
+
+
+def test_grid_index_matches_brute_force():
+    rng = np.random.default_rng(1)
+    crime_lat = 18.52 + rng.normal(0, 0.05, 5000)
+    crime_lon = 73.85 + rng.normal(0, 0.05, 5000)
+    index = CrimeGridIndex(crime_lat, crime_lon, np.full(5000, 5.0), cell_km=0.5)
+    query_lat = 18.52 + rng.normal(0, 0.05, 50)
+    query_lon = 73.85 + rng.normal(0, 0.05, 50)
+
+    counts, _ = index.summarize(query_lat, query_lon, 1.2)
+    expected = [(haversine_km(la, lo, crime_lat, crime_lon) <= 1.2).sum() for la, lo in zip(query_lat, query_lon)]
+    assert counts.tolist() == expected
+
+    # Radii too wide for the cell walk (here also near the pole) fall back to direct distances
+    far_lat, far_lon = np.array([80.0, 18.52]), np.array([73.85, 73.85])
+    counts, _ = index.summarize(far_lat, far_lon, 500)
+    expected = [(haversine_km(la, lo, crime_lat, crime_lon) <= 500).sum() for la, lo in zip(far_lat, far_lon)]
+    assert counts.tolist() == expected == [0, 5000]
+
+    # Crimes due north or south just inside the radius are inside the fallback's latitude band too
+    edge = np.array([499.9, -499.9, 500.1]) / KM_PER_DEGREE
+    edge_index = CrimeGridIndex(18.52 + edge, np.full(3, 73.85), np.ones(3))
+    counts, _ = edge_index.summarize([18.52], [73.85], 500)
+    assert counts.tolist() == [2]
+    for bad in ([np.nan], [np.inf]):
+        try:
+            index.summarize(bad, [73.85], 1.0)
+            assert False, "non-finite query accepted"
+        except ValueError:
+            pass
+    print("✅ Grid index radius counts match brute force")
+
+
+def test_route_scores_follow_crime_density():
+    rng = np.random.default_rng(2)
+    crimes = pd.DataFrame({
+        # A cluster of robberies along the second segment only
+        'latitude': 18.5304 + rng.normal(0, 0.0005, 200),
+        'longitude': 73.8667 + rng.normal(0, 0.002, 200),
+        'crime_type': 'robbery'
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        crimes.to_csv(path, index=False)
+        analyzer = CSVCrimeAnalyzer(path)
+
+    # The batched scores agree with the single-point analysis
+    single = analyzer.analyze_location_crime_risk(18.5304, 73.8667, radius_km=2.0)
+    assert analyzer.batch_crime_scores([18.5304], [73.8667], 2.0)['risk_score'][0] == single['risk_score']
+
+    result = RouteScorer(SafetyPredictor(), analyzer).score_route(ROUTE, hour=14, day_of_week=2, spacing_m=50)
+    first, second = result['segments']
+    assert second['max_nearby_crimes'] > 0 and first['safety_score'] > second['safety_score']
+    assert result['summary']['worst_segment'] == 1
+    assert result['summary']['samples'] > 40
+    print("✅ Route segments scored against crime density")
+
+
+def test_invalid_routes_rejected():
+    scorer = RouteScorer(SafetyPredictor(), CSVCrimeAnalyzer(lazy=True))
+    for points, kwargs in (([{'latitude': 91.0, 'longitude': 73.8}, ROUTE[1]], {}),
+                           ([ROUTE[0], {'latitude': 18.5, 'longitude': float('nan')}], {}),
+                           (ROUTE, {'crime_radius_km': 0}),
+                           (ROUTE, {'spacing_m': -5})):
+        try:
+            scorer.score_route(points, hour=12, day_of_week=1, **kwargs)
+            assert False, (points, kwargs)
+        except ValueError:
+            pass
+    print("✅ Routes with invalid coordinates or radii are rejected")
+
+
+if __name__ == "__main__":
+    test_densify_keeps_vertices_and_spacing()
+    test_grid_index_matches_brute_force()
+    test_route_scores_follow_crime_density()
+    test_invalid_routes_rejected()
+    print("✅ Route scorer test complete!")
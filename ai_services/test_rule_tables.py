@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for compiled rule lookup tables
+Compares the table-backed SafetyPredictor and calculate_contextual_adjustments
+against the original if/else rule code, and checks that rule changes recompile
+"""
+
+import sys
+import os
+import itertools
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.safety_predictor import SafetyPredictor
+from models import crime_prediction
+from models.crime_prediction import calculate_contextual_adjustments, update_contextual_rules
+
+
+def original_safety_score(features):
+    """SafetyPredictor.predict_safety_score as it was before table compilation"""
+    base_score = 7.0
+    hour = features.get('hour', 12)
+    if 22 <= hour <= 23 or 0 <= hour <= 5:
+        base_score -= 2.5
+    elif 18 <= hour <= 21:
+        base_score -= 1.5
+    elif 6 <= hour <= 17:
+        base_score += 0.5
+    area_type = features.get('area_type', 'unknown')
+    if area_type == 'residential':
+        base_score += 1.5
+    elif area_type == 'commercial':
+        base_score += 0.5
+    elif area_type == 'industrial':
+        base_score -= 1.0
+    elif area_type == 'isolated':
+        base_score -= 2.0
+    weather = features.get('weather', {}).get('condition', 'clear')
+    if weather in ['heavy_rain', 'storm', 'thunderstorm']:
+        base_score -= 2.0
+    elif weather in ['rain', 'fog']:
+        base_score -= 1.0
+    city_size = features.get('city_size', 'medium')
+    if city_size == 'metro':
+        base_score -= 0.5
+    elif city_size == 'small':
+        base_score += 1.0
+    day_of_week = features.get('day_of_week', 0)
+    if day_of_week in [5, 6]:
+        base_score -= 0.5
+    return max(1.0, min(10.0, round(base_score, 1)))
+
+
+def original_contextual_adjustments(time_of_day, weather, user_profile, area_type):
+    """crime_prediction.calculate_contextual_adjustments as it was before table compilation"""
+    score = 5
+    score += {"morning": 2, "afternoon": 1, "evening": -1, "night": -3}.get(time_of_day, 0)
+    score += {"clear": 1, "partly_cloudy": 0, "cloudy": 0, "overcast": -0.5, "drizzle": -1, "rain": -1.5,
+              "heavy_rain": -2, "fog": -2, "storm": -2.5, "thunderstorm": -3}.get(weather, 0)
+    score += {"alone": -2, "with_friends": 1.5, "family": 2, "public_transport": -0.5,
+              "vehicle": 1, "indoor_public": 1}.get(user_profile, 0)
+    if area_type:
+        score += {"residential": 1, "commercial": 0.5, "industrial": -1, "highway": -1.5,
+                  "isolated": -2, "unknown": 0}.get(area_type, 0)
+    return score
+
+
+def test_safety_table_matches_original_rules():
+    """Every hour/day/area/weather/city combination scores exactly as the original rules"""
+    predictor = SafetyPredictor()
+    hours = list(range(-1, 25)) + [5.5, 17.5]
+    areas = ['unknown', 'residential', 'commercial', 'industrial', 'isolated', 'highway', 'farmland']
+    weathers = ['unknown', 'clear', 'partly_cloudy', 'overcast', 'drizzle', 'rain', 'fog', 'heavy_rain', 'storm', 'thunderstorm', 'snow']
+    cities = ['medium', 'metro', 'small', '']
+
+    checked = 0
+    for hour, day, area, weather, city in itertools.product(hours, range(8), areas, weathers, cities):
+        features = {'hour': hour, 'day_of_week': day, 'area_type': area, 'weather': {'condition': weather}, 'city_size': city}
+        expected = original_safety_score(features)
+        actual = predictor.predict_safety_score(features)
+        assert actual == expected and type(actual) is type(expected), (features, expected, actual)
+        checked += 1
+
+    for features in ({}, {'weather': {}}, {'hour': 3}):
+        assert predictor.predict_safety_score(features) == original_safety_score(features)
+
+    print(f"✅ Safety score table matches original rules on {checked} combinations")
+
+
+def test_contextual_table_matches_original_rules():
+    """Contextual adjustments match the original rules, including result types"""
+    times = list(crime_prediction.TIME_ADJUSTMENTS) + ['dawn', None]
+    weathers = list(crime_prediction.WEATHER_ADJUSTMENTS) + ['snow', None]
+    profiles = list(crime_prediction.PROFILE_ADJUSTMENTS) + ['pet', None]
+    areas = list(crime_prediction.AREA_ADJUSTMENTS) + ['farmland', '', None]
+
+    checked = 0
+    for combo in itertools.product(times, weathers, profiles, areas):
+        expected = original_contextual_adjustments(*combo)
+        actual = calculate_contextual_adjustments(*combo)
+        assert actual == expected and type(actual) is type(expected), (combo, expected, actual)
+        checked += 1
+
+    print(f"✅ Contextual table matches original rules on {checked} combinations")
+
+
+def test_rule_changes_recompile():
+    """Updating rules is reflected immediately by table lookups"""
+    predictor = SafetyPredictor()
+    features = {'hour': 12, 'day_of_week': 1, 'area_type': 'residential', 'weather': {'condition': 'clear'}, 'city_size': 'medium'}
+    assert predictor.predict_safety_score(features) == 9.0
+    predictor.update_rules(area_type={'residential': 0.5})
+    assert predictor.predict_safety_score(features) == 8.0
+    assert predictor.predict_safety_scores_from_features([features]) == [8.0]
+    # Values outside the table's vocabulary are refused rather than scored only on the scalar path
+    for changes in ({'area_type': {'harbour': -1.0}}, {'weather': {'hail': -2.0}}, {'city_size': {'huge': 1.0}}):
+        try:
+            predictor.update_rules(**changes)
+            assert False, f"{changes} accepted"
+        except ValueError:
+            pass
+    assert predictor.rules['area_type'] == {'residential': 0.5}
+
+    original = dict(crime_prediction.TIME_ADJUSTMENTS)
+    try:
+        assert calculate_contextual_adjustments('night', 'clear', 'alone', None) == 1
+        update_contextual_rules(time_of_day=dict(original, night=-4))
+        assert calculate_contextual_adjustments('night', 'clear', 'alone', None) == 0
+    finally:
+        update_contextual_rules(time_of_day=original)
+
+    print("✅ Rule updates recompile lookup tables")
+
+
+if __name__ == "__main__":
+    test_safety_table_matches_original_rules()
+    test_contextual_table_matches_original_rules()
+    test_rule_changes_recompile()
+    print("✅ Rule table test complete!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the trained safety-model backend
+Covers save/load round trips, tree inference, hot swapping and rule fallback
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from models.safety_predictor import SafetyPredictor, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES, HOURS, DAYS_OF_WEEK
+from models import safety_model
+from models.safety_model import (LinearSafetyModel, TreeEnsembleSafetyModel, save_safety_model,
+                                 load_safety_model, fit_linear_model_from_rules, encode_model_inputs)
+
+FEATURES = {'hour': 23, 'day_of_week': 6, 'area_type': 'isolated', 'weather': {'condition': 'rain'}, 'city_size': 'metro'}
+
+
+def test_input_layout_matches_vocabularies():
+    assert (safety_model.HOUR_VALUES, safety_model.DAY_VALUES, safety_model.AREA_VALUES,
+            safety_model.WEATHER_VALUES, safety_model.CITY_VALUES) == \
+        (len(HOURS), len(DAYS_OF_WEEK), len(AREA_TYPES), len(WEATHER_CONDITIONS), len(CITY_SIZES))
+
+
+def test_linear_model_round_trip_and_swap():
+    predictor = SafetyPredictor()
+    rule_score = predictor.predict_safety_score(FEATURES)
+    model = fit_linear_model_from_rules(predictor._score_table.array, version='test-1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.npz')
+        save_safety_model(path, model)
+        loaded = load_safety_model(path)
+        assert loaded.version == 'test-1'
+        assert np.array_equal(loaded.weights, model.weights)
+
+        status = predictor.load_model(path)
+        assert status['backend'] == 'model' and status['model_version'] == 'test-1'
+
+    score = predictor.predict_safety_score(FEATURES)
+    assert 1.0 <= score <= 10.0 and abs(score - rule_score) < 1.5
+    assert predictor.get_model_status()['inference']['batches'] == 1
+
+    # Off-table hours still go through the rules
+    assert predictor.predict_safety_score(dict(FEATURES, hour=5.5)) == SafetyPredictor().predict_safety_score(dict(FEATURES, hour=5.5))
+
+    predictor.unload_model()
+    assert predictor.predict_safety_score(FEATURES) == rule_score
+    print(f"✅ Linear model score {score} vs rules {rule_score}")
+
+
+def test_tree_ensemble_inference():
+    # One stump per tree: tree 0 splits on "hour 23" one-hot, tree 1 is a single leaf
+    feature = np.array([[23, 0, 0], [0, 0, 0]])
+    threshold = np.array([[0.5, 0, 0], [0, 0, 0]])
+    left = np.array([[1, -1, -1], [-1, -1, -1]])
+    right = np.array([[2, -1, -1], [-1, -1, -1]])
+    value = np.array([[0, 1.0, -2.0], [0.25, 0, 0]])
+    model = TreeEnsembleSafetyModel(feature, threshold, left, right, value, base_score=6.0, version='tree-1')
+
+    inputs = encode_model_inputs([22, 23], [0, 0], [0, 0], [0, 0], [0, 0])
+    assert model.predict(inputs).tolist() == [7.2, 4.2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tree.npz')
+        save_safety_model(path, model)
+        assert load_safety_model(path).predict(inputs).tolist() == [7.2, 4.2]
+    print("✅ Tree ensemble inference")
+
+
+def test_bad_model_keeps_rules():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bad.npz')
+        np.savez(path, format_version=99, model_type='linear', model_version='x')
+        predictor = SafetyPredictor(model_path=path)
+        assert predictor.get_model_status()['backend'] == 'rules'
+    print("✅ Unsupported model file falls back to rules")
+
+
+if __name__ == "__main__":
+    test_input_layout_matches_vocabularies()
+    test_linear_model_round_trip_and_swap()
+    test_tree_ensemble_inference()
+    test_bad_model_keeps_rules()
+    print("✅ Safety model test complete!")
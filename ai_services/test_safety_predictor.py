@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for SafetyPredictor batch scoring
+Checks that the vectorized scorer matches predict_safety_score bit for bit
+over every combination of its categorical inputs
+"""
+
+import sys
+import os
+import itertools
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from models.safety_predictor import SafetyPredictor, AREA_TYPES, WEATHER_CONDITIONS, CITY_SIZES, encode_category
+
+HOURS = list(range(24)) + [5.5, 21.5, 24, -1]
+DAYS = list(range(7))
+# Include values outside the vocabularies to check the fallback codes
+AREAS = list(AREA_TYPES) + ['highway', 'farmland']
+WEATHERS = list(WEATHER_CONDITIONS) + ['snow']
+CITIES = list(CITY_SIZES) + ['megacity']
+
+
+def test_batch_matches_scalar():
+    """Vectorized scores must equal the scalar rule chain exactly"""
+    predictor = SafetyPredictor()
+    combos = list(itertools.product(HOURS, DAYS, AREAS, WEATHERS, CITIES))
+
+    expected = [
+        predictor.predict_safety_score({
+            'hour': hour, 'day_of_week': day, 'area_type': area,
+            'weather': {'condition': weather}, 'city_size': city
+        })
+        for hour, day, area, weather, city in combos
+    ]
+
+    hours, days, areas, weathers, cities = zip(*combos)
+    scores = predictor.predict_safety_scores(
+        np.array(hours, dtype=float),
+        np.array(days),
+        encode_category(areas, AREA_TYPES),
+        encode_category(weathers, WEATHER_CONDITIONS),
+        encode_category(cities, CITY_SIZES)
+    )
+
+    mismatches = [(combo, e, s) for combo, e, s in zip(combos, expected, scores.tolist()) if e != s]
+    print(f"🔍 Compared {len(combos)} combinations, {len(mismatches)} mismatches")
+    assert not mismatches, mismatches[:5]
+
+
+def test_batch_from_features_matches_scalar():
+    """Feature-dict batch scoring, including missing keys, matches the scalar path"""
+    predictor = SafetyPredictor()
+    features_list = [
+        {},
+        {'hour': 23, 'weather': {}},
+        {'hour': 14, 'day_of_week': 6, 'area_type': 'isolated', 'weather': {'condition': 'fog'}, 'city_size': 'small'},
+        {'hour': 19, 'area_type': 'commercial', 'weather': {'condition': 'thunderstorm', 'temperature': 21}, 'city_size': 'metro'},
+    ]
+    expected = [predictor.predict_safety_score(f) for f in features_list]
+    assert predictor.predict_safety_scores_from_features(features_list) == expected
+    assert predictor.predict_safety_scores_from_features([]) == []
+    print(f"✅ Feature batch scores: {expected}")
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_batch_from_features_matches_scalar()
+    print("✅ SafetyPredictor batch scoring test complete!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for startup profiling and lazily loaded dependencies
+Checks the import-time report, that heavy libraries stay out of startup and the lazy crime data load
+"""
+
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.csv_crime_analyzer import CSVCrimeAnalyzer
+from utils.startup_profile import format_report, parse_importtime, profile_imports
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   encodings.utf_8
+import time:       900 |       2400 |     numpy._core
+import time:       300 |       2700 |   numpy
+INFO:some.logger:not an import line
+import time:      5000 |       7700 | server
+"""
+
+
+def test_parse_importtime():
+    entries = parse_importtime(SAMPLE.splitlines())
+    assert [e['module'] for e in entries] == ['encodings.utf_8', 'numpy._core', 'numpy', 'server']
+    assert [e['depth'] for e in entries] == [1, 2, 1, 0]
+    assert entries[-1]['self_ms'] == 5.0 and entries[-1]['cumulative_ms'] == 7.7
+    report = format_report({'module': 'server', 'wall_ms': 20.0, 'import_ms': 7.7, 'entries': entries,
+                            'deferred': ['pandas']}, top=3)
+    assert 'import server took 8 ms' in report and 'pandas' in report
+    # numpy's submodules are summed into one package row
+    assert any(line.split()[:2] == ['numpy', '1.2'] for line in report.splitlines())
+    print("✅ -X importtime output is parsed and grouped by package")
+
+
+def test_heavy_imports_deferred():
+    profile = profile_imports('server')
+    modules = {entry['module'] for entry in profile['entries']}
+    assert 'server' in modules and 'fastapi' in modules and profile['import_ms'] > 0
+    assert profile['deferred'] == ['pandas', 'requests'], profile['deferred']
+    print(f"✅ Server imports in {profile['import_ms']:.0f} ms without pandas or requests")
+
+
+def test_lazy_crime_data():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crimes.csv')
+        with open(path, 'w') as f:
+            f.write("latitude,longitude,crime_type\n28.6139,77.2090,theft\n28.6140,77.2091,robbery\n")
+        analyzer = CSVCrimeAnalyzer(path, lazy=True)
+        assert analyzer.crime_data is None and analyzer.data_version == 1
+
+        loads = []
+        original = analyzer.load_crime_data
+        analyzer.load_crime_data = lambda: (loads.append(1), original())
+        threads = [threading.Thread(target=analyzer.ensure_loaded) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(loads) == 1 and len(analyzer.crime_data) == 2
+
+        # The first load is version 1 either way, so results cached before it stay valid
+        eager = CSVCrimeAnalyzer(path)
+        assert analyzer.data_version == eager.data_version == 1
+        assert analyzer.analyze_location_crime_risk(28.6139, 77.2090)['crime_data_found'] == 2
+        analyzer.load_crime_data()
+        assert analyzer.data_version == 2
+    print("✅ Crime data loads once on first use")
+
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_heavy_imports_deferred()
+    test_lazy_crime_data()
+    print("✅ Startup profile test complete!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic crime dataset generator
+Checks determinism, realistic structure and that the output loads everywhere
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from models import synthetic_crime_data
+from models.csv_crime_analyzer import CRIME_WEIGHTS, CSVCrimeAnalyzer
+from models.local_crime_store import LocalCrimeStore
+from models.synthetic_crime_data import CITIES, SyntheticCrimeGenerator, load_npy, write_csv, write_npy
+from utils.geo import haversine_km
+
+
+def test_generation_is_deterministic():
+    a = pd.concat(SyntheticCrimeGenerator(seed=3).frames(25000))
+    b = pd.concat(SyntheticCrimeGenerator(seed=3).frames(25000))
+    c = pd.concat(SyntheticCrimeGenerator(seed=4).frames(25000))
+    pd.testing.assert_frame_equal(a, b)
+    assert not a['latitude'].equals(c['latitude'])
+
+    # Blocks only depend on their own seed, so they can be produced out of order
+    generator = SyntheticCrimeGenerator(seed=3)
+    np.testing.assert_array_equal(generator.block(1, 500)['date'], SyntheticCrimeGenerator(seed=3).block(1, 500)['date'])
+    print("✅ Same seed, same dataset")
+
+
+def test_dataset_structure():
+    original = synthetic_crime_data.BLOCK_ROWS
+    synthetic_crime_data.BLOCK_ROWS = 30000
+    try:
+        generator = SyntheticCrimeGenerator(seed=1, start_date='2024-01-01', end_date='2024-12-31')
+        frames = list(generator.frames(100000))
+    finally:
+        synthetic_crime_data.BLOCK_ROWS = original
+    assert [len(f) for f in frames] == [30000, 30000, 30000, 10000]
+    crimes = pd.concat(frames, ignore_index=True)
+
+    assert set(crimes['crime_type']) <= set(CRIME_WEIGHTS)
+    assert crimes['severity'].between(1, 10).all()
+    assert crimes.groupby('crime_type')['severity'].mean()['murder'] > crimes.groupby('crime_type')['severity'].mean()['vandalism']
+    assert crimes['date'].min() >= pd.Timestamp('2024-01-01') and crimes['date'].max() < pd.Timestamp('2025-01-01')
+
+    # Spatially clustered: most incidents within a few km of a city centre, and denser than uniform
+    nearest = np.min([haversine_km(lat, lon, crimes['latitude'], crimes['longitude']) for _, lat, lon, _, _ in CITIES], axis=0)
+    assert (nearest < 25).mean() > 0.98
+    delhi_share = (haversine_km(28.6139, 77.2090, crimes['latitude'], crimes['longitude']) < 25).mean()
+    assert 0.2 < delhi_share < 0.36
+    cells = (np.floor(crimes['latitude'] * 100).astype(int).astype(str) + ':' + np.floor(crimes['longitude'] * 100).astype(int).astype(str))
+    assert cells.value_counts().iloc[0] > 20 * cells.value_counts().median()
+
+    # Evening peak and summer above winter
+    hours = crimes['date'].dt.hour.value_counts()
+    assert hours[20] > 4 * hours[4]
+    months = crimes['date'].dt.month.value_counts()
+    assert months[6] > months[12]
+    print("✅ Synthetic incidents are clustered, seasonal and use the analyzer crime types")
+
+
+def test_outputs_load_in_analyzer_and_store():
+    generator = SyntheticCrimeGenerator(seed=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'crimes.csv')
+        assert write_csv(generator, csv_path, 20000) == 20000
+        analyzer = CSVCrimeAnalyzer(csv_path)
+        assert len(analyzer.crime_data) == 20000
+        analysis = analyzer.analyze_location_crime_risk(28.6139, 77.2090, 5.0)
+        assert analysis['crime_data_found'] > 0 and analysis['data_sources'] == ['csv_crime_data']
+
+        store = LocalCrimeStore(os.path.join(tmp, 'crimes.db'))
+        assert store.load_csv(csv_path) == 20000
+        assert store.query(19.0760, 72.8777, 5.0)
+        store.close()
+
+        npy_path = os.path.join(tmp, 'crimes_npy')
+        assert write_npy(generator, npy_path, 20000) == 20000
+        columns, meta = load_npy(npy_path)
+        frame = pd.read_csv(csv_path, parse_dates=['date'])
+        np.testing.assert_allclose(columns['latitude'], frame['latitude'], atol=1e-6)
+        assert [meta['crime_types'][i] for i in columns['crime_type'][:100]] == frame['crime_type'][:100].tolist()
+        assert (columns['date'].astype('datetime64[s]') == frame['date'].to_numpy()).all()
+    print("✅ CSV and npy outputs agree and load into the analyzer and the local store")
+
+
+if __name__ == "__main__":
+    test_generation_is_deterministic()
+    test_dataset_structure()
+    test_outputs_load_in_analyzer_and_store()
+    print("✅ Synthetic crime data test complete!")
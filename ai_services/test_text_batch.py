@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for batch text classification
+Checks batch results match per-text detection and repeated texts are classified once
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.keyword_matcher import SafetyKeywordMatcher, analyze_texts
+from models.intent_detector import detect_intent
+from models.emotion_detector import detect_emotion
+from models.active_voice_detection import detect_voice_trigger
+
+UTTERANCES = ["help me", "Bachao!", "I am sad", "where am i", "ok", "", "please help, someone is following me",
+              "Is the bus route safe at night?", "I'm so angry", "thanks"]
+
+
+def test_batch_matches_single_detection():
+    rng = random.Random(0)
+    texts = [rng.choice(UTTERANCES) for _ in range(2000)]
+    results = analyze_texts(texts)
+    assert len(results) == len(texts)
+    for text, result in zip(texts, results):
+        assert result == {'intent': detect_intent(text), 'emotion': detect_emotion(text),
+                          'trigger': detect_voice_trigger(text)}
+    assert analyze_texts([]) == []
+    print("✅ Batch classification matches the single-text detectors")
+
+
+def test_repeated_texts_scanned_once():
+    matcher = SafetyKeywordMatcher()
+    scanned = []
+    scan = matcher.automaton.scan
+    matcher.automaton.scan = lambda text: scanned.append(text) or scan(text)
+    results = matcher.analyze_many(["ok", "help me", "ok", "OK", "help me"] * 100)
+    assert len(results) == 500 and sorted(scanned) == ["help me", "ok", "ok"]
+    print("✅ Repeated texts in a batch are classified once")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_detection()
+    test_repeated_texts_scanned_once()
+    print("✅ Text batch test complete!")
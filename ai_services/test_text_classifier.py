@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the hashed n-gram text classifier
+Checks feature hashing, the sparse product, training, model files and the keyword fallback
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.keyword_matcher import analyze_texts
+from models.text_classifier import (
+    HashedNgramModel, TextClassifier, hash_features, load_text_model, save_text_model, sparse_dot, train_text_model
+)
+
+LABELED = [
+    ("a man grabbed my arm call the police", 'sos', 'distressed'),
+    ("send someone to the market right now", 'sos', ''),
+    ("how do i get to the metro station", 'location', 'neutral'),
+    ("which way is the bus stop", 'location', 'neutral'),
+    ("were there robberies near my hostel", 'crime', 'neutral'),
+    ("is the park known for thefts", 'crime', 'neutral'),
+    ("hi there", 'general', 'happy'),
+    ("tell me a joke", '', 'happy'),
+]
+
+
+def _dense(features, n_texts, n_buckets):
+    rows, columns, scale = features
+    matrix = np.zeros((n_texts, n_buckets))
+    np.add.at(matrix, (rows, columns), 1.0)
+    return matrix * scale[:, None]
+
+
+def test_hashing_is_deterministic():
+    texts = ["Help me at MG Road", "", "où est la gare ?", "help me at mg road"]
+    first, again = hash_features(texts, 1024), hash_features(texts, 1024)
+    assert all(np.array_equal(a, b) for a, b in zip(first, again))
+    dense = _dense(first, len(texts), 1024)
+    # Case does not matter, a text's features do not depend on its neighbours, empty texts have none
+    assert np.allclose(dense[0], dense[3])
+    assert np.allclose(dense[0], _dense(hash_features(["help me at mg road"], 1024), 1, 1024)[0])
+    assert not dense[1].any() and dense[2].any()
+    print("✅ Feature hashing is deterministic and per text")
+
+
+def test_sparse_dot_matches_dense_product():
+    texts = ["please help", "", "where is the nearest bus stop", "ok ok ok"]
+    features = hash_features(texts, 4096)
+    weights = np.random.default_rng(0).normal(size=(3, 4096)).astype(np.float32)
+    expected = _dense(features, len(texts), 4096) @ weights.T
+    assert np.allclose(sparse_dot(features, len(texts), weights), expected, atol=1e-4)
+    assert sparse_dot(hash_features([], 4096), 0, weights).shape == (0, 3)
+    print("✅ Sparse product matches the dense one")
+
+
+def _trained_model():
+    return train_text_model([row[0] for row in LABELED],
+                            {'intent': [row[1] for row in LABELED], 'emotion': [row[2] for row in LABELED]},
+                            'test', n_buckets=2 ** 12, epochs=50, batch_size=4)
+
+
+def test_training_fits_labels():
+    texts = [text for text, _, _ in LABELED]
+    model = _trained_model()
+    # Rows without a label for a head are left out of that head
+    assert model.heads['intent'][0] == ['crime', 'general', 'location', 'sos']
+    assert model.heads['emotion'][0] == ['distressed', 'happy', 'neutral']
+    predicted = model.predict(texts)
+    for (text, intent, emotion), result in zip(LABELED, predicted):
+        assert not intent or result['intent'] == intent, (text, result)
+        assert not emotion or result['emotion'] == emotion, (text, result)
+    # Batches give the same answers as single texts
+    assert [model.predict([text])[0] for text in texts] == predicted
+    print("✅ Training fits a small labeled set")
+
+
+def test_model_file_round_trip():
+    model = _trained_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'text_model.npz')
+        save_text_model(path, model)
+        loaded = load_text_model(path)
+        assert loaded.version == 'test' and loaded.n_buckets == model.n_buckets
+        texts = [text for text, _, _ in LABELED] + ["something else entirely"]
+        assert loaded.predict(texts) == model.predict(texts)
+
+        np.savez(path, **{**dict(np.load(path)), 'format_version': 99})
+        try:
+            load_text_model(path)
+            assert False, "expected a format error"
+        except ValueError:
+            pass
+    try:
+        HashedNgramModel({'intent': (['a', 'b'], np.zeros((8, 3)), np.zeros(2))}, 8, 'bad')
+        assert False, "expected a shape error"
+    except ValueError:
+        pass
+    print("✅ Model files round-trip and bad files are rejected")
+
+
+def test_classifier_falls_back_to_keywords():
+    texts = ["help me", "where am i", "a man grabbed my arm call the police", "hi there"]
+    classifier = TextClassifier()
+    results, backend = classifier.classify(texts)
+    assert backend == 'keywords' and results == analyze_texts(texts)
+
+    model = _trained_model()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'text_model.npz')
+        save_text_model(path, model)
+        status = classifier.load_model(path)
+    assert status['backend'] == 'model' and status['model_version'] == 'test'
+    results, backend = classifier.classify(texts)
+    assert backend == 'model'
+    assert [r['intent'] for r in results] == [r['intent'] for r in model.predict(texts)]
+    # Voice triggers always come from the keywords
+    assert [r['trigger'] for r in results] == [r['trigger'] for r in analyze_texts(texts)]
+    assert classifier.classify(texts, backend='keywords') == (analyze_texts(texts), 'keywords')
+    assert classifier.get_model_status()['inference']['rows'] == len(texts)
+
+    classifier.unload_model()
+    assert classifier.classify(texts)[1] == 'keywords'
+    assert TextClassifier(model_path='/nonexistent/model.npz').model is None
+    print("✅ Classifier uses the model when loaded and keywords otherwise")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Text Classifier")
+    print("=" * 40)
+    test_hashing_is_deterministic()
+    test_sparse_dot_matches_dense_product()
+    test_training_fits_labels()
+    test_model_file_round_trip()
+    test_classifier_falls_back_to_keywords()
+    print("🎉 All text classifier tests passed!")
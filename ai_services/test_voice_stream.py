@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming voice-trigger detection
+Checks keywords split across fragments trigger on the fragment that completes them
+"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.keyword_matcher import VOICE_TRIGGER_KEYWORDS, VoiceTriggerStreams
+from models.active_voice_detection import detect_voice_trigger
+
+
+def test_split_keywords_trigger_on_completion():
+    streams = VoiceTriggerStreams()
+    for phrase in ["please Bachao me", "I need help me now", "SOS"]:
+        for cut in range(1, len(phrase)):
+            stream = streams.open()
+            first, second = stream.feed(phrase[:cut]), stream.feed(phrase[cut:])
+            streams.close(stream)
+            keyword_end = max(phrase.lower().find(k) + len(k) for k in ('bachao', 'help me', 'sos') if k in phrase.lower())
+            # Nothing fires before the keyword is complete, and it fires exactly once
+            assert (bool(first), bool(second)) == ((True, False) if cut >= keyword_end else (False, True)), (phrase, cut)
+    assert streams.active == 0 and streams.stats()['fragments'] > 0
+    print("✅ Keywords split across fragments trigger when they complete")
+
+
+def test_stream_agrees_with_whole_text_detection():
+    rng = random.Random(0)
+    words = [w for _, group in VOICE_TRIGGER_KEYWORDS for w in group] + ['hello', 'please', 'me', 'the road', 'mujhe']
+    streams = VoiceTriggerStreams()
+    for _ in range(500):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+        stream = streams.open()
+        triggered, position = False, 0
+        while position < len(text):
+            step = rng.randint(1, 5)
+            triggered |= bool(stream.feed(text[position:position + step]))
+            position += step
+        assert ('triggered' if triggered else 'safe') == detect_voice_trigger(text), text
+    print("✅ Streamed fragments agree with whole-text detection")
+
+
+def test_reset_ends_the_phrase():
+    stream = VoiceTriggerStreams().open()
+    assert stream.feed("sa") == []
+    stream.reset()
+    assert stream.feed("ve me") == []
+    assert stream.feed(", save me") == ['save me'] and stream.triggers == 1
+    print("✅ Reset stops keywords spanning phrases")
+
+
+if __name__ == "__main__":
+    test_split_keywords_trigger_on_completion()
+    test_stream_agrees_with_whole_text_detection()
+    test_reset_ends_the_phrase()
+    print("✅ Voice stream test complete!")
@@ -1,3 +1,5 @@
 from .helpers import get_current_time_info, format_location_response
+from .batching import dedupe_locations, run_bounded, iter_ndjson_lines, stream_bounded
+from .cache import LRUCache, MovementThresholdCache
 
-__all__ = ['get_current_time_info', 'format_location_response']
\ No newline at end of file
+__all__ = ['get_current_time_info', 'format_location_response', 'dedupe_locations', 'run_bounded', 'iter_ndjson_lines', 'stream_bounded', 'LRUCache', 'MovementThresholdCache']
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import StreamingResponse
+
+# Context fields that change the analysis result besides the coordinates
+DEDUP_CONTEXT_FIELDS = ('hour', 'day_of_week', 'time_of_day')
+
+
+def location_dedup_key(location: Dict[str, Any], tolerance: float) -> Hashable:
+    """Build a key that is equal for points within `tolerance` degrees sharing the same context"""
+    lat = float(location['latitude'])
+    lon = float(location['longitude'])
+    context = tuple(location.get(field) for field in DEDUP_CONTEXT_FIELDS)
+    weather = location.get('weather') or {}
+    condition = weather.get('condition') if isinstance(weather, dict) else None
+    return (round(lat / tolerance), round(lon / tolerance), context, condition)
+
+
+def dedupe_locations(locations: Sequence[Dict[str, Any]], tolerance: float) -> Tuple[List[int], List[int]]:
+    """
+    Group near-identical locations so each is analyzed once.
+    Returns (unique_indexes, owner) where owner[i] is the position in
+    unique_indexes whose result answers locations[i].
+    Items without usable coordinates are kept unique so they fail on their own.
+    """
+    unique_indexes: List[int] = []
+    owner: List[int] = []
+    seen: Dict[Hashable, int] = {}
+
+    for index, location in enumerate(locations):
+        try:
+            key = location_dedup_key(location, tolerance)
+        except (KeyError, TypeError, ValueError):
+            key = None
+
+        if key is not None and key in seen:
+            owner.append(seen[key])
+            continue
+
+        slot = len(unique_indexes)
+        unique_indexes.append(index)
+        owner.append(slot)
+        if key is not None:
+            seen[key] = slot
+
+    return unique_indexes, owner
+
+
+async def run_bounded(items: Sequence[Any], worker: Callable[[Any], Awaitable[Any]], limit: int) -> List[Tuple[bool, Any]]:
+    """
+    Run `worker` over `items` with at most `limit` calls in flight.
+    Returns (success, result_or_exception) per item, in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(item):
+        async with semaphore:
+            try:
+                return True, await worker(item)
+            except Exception as e:
+                return False, e
+
+    return await asyncio.gather(*(_run(item) for item in items))
+
+
+async def iter_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into non-empty text lines without buffering the whole body"""
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line.decode('utf-8')
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer.decode('utf-8')
+
+
+async def stream_bounded(items: AsyncIterable[Any], worker: Callable[[int, Any], Awaitable[Any]], limit: int) -> AsyncIterator[Tuple[int, bool, Any]]:
+    """
+    Run `worker(index, item)` over an async stream with at most `limit` calls in flight.
+    Yields (index, success, result_or_exception) as soon as each call finishes, so
+    memory stays bounded by `limit` no matter how long the stream is.
+    """
+    limit = max(1, limit)
+    semaphore = asyncio.Semaphore(limit)
+    results: asyncio.Queue = asyncio.Queue(maxsize=limit)
+    in_flight = set()
+    end_of_stream = object()
+
+    async def _run(index, item):
+        try:
+            outcome = (index, True, await worker(index, item))
+        except Exception as e:
+            outcome = (index, False, e)
+        await results.put(outcome)
+        semaphore.release()
+
+    async def _feed():
+        error = None
+        try:
+            index = 0
+            async for item in items:
+                await semaphore.acquire()
+                task = asyncio.ensure_future(_run(index, item))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                index += 1
+        except Exception as e:
+            error = e
+        # Every slot back means every result is already queued
+        for _ in range(limit):
+            await semaphore.acquire()
+        await results.put((end_of_stream, error))
+
+    feeder = asyncio.ensure_future(_feed())
+    try:
+        while True:
+            outcome = await results.get()
+            if outcome[0] is end_of_stream:
+                if outcome[1] is not None:
+                    raise outcome[1]
+                return
+            yield outcome
+    finally:
+        feeder.cancel()
+        for task in list(in_flight):
+            task.cancel()
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams `handler(body)` back while the handler is still reading the request body.
+    StreamingResponse.__call__ (on ASGI servers below spec 2.4, uvicorn included) listens for
+    the disconnect by calling receive() next to the body iterator, which would swallow request
+    body chunks. Here the body is the only receive() reader until it ends: a disconnect before
+    that ends the body stream when the handler next reads it (after at most its in-flight work,
+    since it stops reading while those are busy), and one after it cancels the handler at once.
+    """
+
+    def __init__(self, request: Request, handler: Callable[[AsyncIterator[bytes]], AsyncIterable[Any]], **kwargs):
+        self.request = request
+        self._body_done = asyncio.Event()
+        super().__init__(handler(self._body()), **kwargs)
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        async for chunk in self.request.stream():
+            yield chunk
+        self._body_done.set()
+
+    async def _wait_for_disconnect(self):
+        await self._body_done.wait()
+        while (await self.request.receive())['type'] != 'http.disconnect':
+            pass
+
+    async def __call__(self, scope, receive, send):
+        streaming = asyncio.ensure_future(self.stream_response(send))
+        disconnect = asyncio.ensure_future(self._wait_for_disconnect())
+        try:
+            await asyncio.wait((streaming, disconnect), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            streaming.cancel()
+        if not streaming.done() or streaming.cancelled():
+            return
+        try:
+            streaming.result()
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
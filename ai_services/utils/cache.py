@@ -0,0 +1,177 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .geo import haversine_km
+
+
+class LRUCache:
+    """
+    Size-bounded LRU cache with optional per-entry TTL and hit/miss counters.
+    Thread-safe so it can be shared with executor threads. Pass `sizeof` to
+    track the approximate memory held by cached values.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, name: str = 'cache',
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.name = name
+        self.sizeof = sizeof
+        self.bytes = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            previous = self._data.get(key)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._data[key] = (value, expires_at, size)
+            self._data.move_to_end(key)
+            self.bytes += size
+            while len(self._data) > self.maxsize:
+                self.bytes -= self._data.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[2]
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def values(self):
+        with self._lock:
+            return [entry[0] for entry in self._data.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            'name': self.name,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+        if self.sizeof:
+            stats['approx_bytes'] = self.bytes
+        return stats
+
+
+class MovementThresholdCache:
+    """
+    Last analysis per user, reused while the user stays within `distance_m` of it
+    for at most `max_age_s`. Users are evicted LRU once `max_users` is reached.
+    """
+
+    def __init__(self, max_users: int, distance_m: float, max_age_s: float, name: str = 'movement_cache'):
+        self.distance_m = distance_m
+        self.max_age_s = max_age_s
+        self.entries = LRUCache(max_users, ttl=max_age_s, name=name)
+        self._lock = threading.Lock()
+        self.short_circuits = 0
+        self.recomputes = {'no_recent_analysis': 0, 'moved': 0, 'context_changed': 0}
+        self.bypassed = 0
+
+    def lookup(self, user_id: Optional[str], lat: float, lon: float, context: tuple = ()) -> Optional[Dict[str, Any]]:
+        """Cached analysis if the fix is close enough to the last one, else None"""
+        if not user_id:
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        entry = self.entries.get(user_id)
+        if entry is None:
+            reason = 'no_recent_analysis'
+        elif entry['context'] != context:
+            reason = 'context_changed'
+        elif haversine_m(lat, lon, entry['lat'], entry['lon']) > self.distance_m:
+            reason = 'moved'
+        else:
+            with self._lock:
+                self.short_circuits += 1
+            return {**entry['analysis'], 'cache': {'hit': True, 'age_seconds': round(time.monotonic() - entry['stored_at'], 1)}}
+
+        with self._lock:
+            self.recomputes[reason] += 1
+        return None
+
+    def store(self, user_id: Optional[str], lat: float, lon: float, analysis: Dict[str, Any], context: tuple = ()):
+        if user_id:
+            self.entries.set(user_id, {'lat': lat, 'lon': lon, 'context': context,
+                                       'analysis': analysis, 'stored_at': time.monotonic()})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recomputed = sum(self.recomputes.values())
+            lookups = self.short_circuits + recomputed
+            return {
+                'users': self.entries.stats(),
+                'distance_m': self.distance_m,
+                'max_age_s': self.max_age_s,
+                'short_circuits': self.short_circuits,
+                'recomputes': dict(self.recomputes),
+                'bypassed_without_user_id': self.bypassed,
+                'short_circuit_rate': round(self.short_circuits / lookups, 4) if lookups else 0.0
+            }
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two points"""
+    return float(haversine_km(lat1, lon1, lat2, lon2)) * 1000
+
+
+def approx_size(obj: Any) -> int:
+    """Rough deep size in bytes of JSON-like values (dicts, lists, tuples, scalars)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(key) + approx_size(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(approx_size(item) for item in obj)
+    return size
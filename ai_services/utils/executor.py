@@ -0,0 +1,162 @@
+import asyncio
+import collections
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict):
+    """Runs in the pool worker; reports when it actually started so queue wait can be measured"""
+    started = time.time()
+    result = func(*args, **kwargs)
+    return result, started, time.time() - started
+
+
+class CPUExecutor:
+    """
+    Runs CPU-bound analysis off the event loop.
+    `mode='thread'` uses a thread pool; `mode='process'` adds a process pool for stateless
+    work (functions and arguments must be picklable). Work that reads or updates in-process
+    state passes `stateful=True` and always runs on the thread pool.
+    """
+
+    def __init__(self, mode: str = 'thread', max_workers: int = 4):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max(1, int(max_workers))
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cpu')
+        self.process_pool = ProcessPoolExecutor(max_workers=self.max_workers) if mode == 'process' else None
+        self._lock = threading.Lock()
+        self.in_flight = {'thread': 0, 'process': 0}
+        self.max_queue_depth = 0
+        self.tasks = collections.Counter()
+        self.failures = collections.Counter()
+        self.wait_ms = collections.deque(maxlen=1000)
+        self.run_ms = collections.deque(maxlen=1000)
+
+    async def run(self, func: Callable, *args, stateful: bool = False, **kwargs) -> Any:
+        pool_name = 'process' if self.process_pool is not None and not stateful else 'thread'
+        pool = self.process_pool if pool_name == 'process' else self.thread_pool
+        with self._lock:
+            self.in_flight[pool_name] += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+
+        submitted = time.time()
+        name = getattr(func, '__name__', 'task')
+        try:
+            result, started, run_s = await asyncio.get_running_loop().run_in_executor(
+                pool, functools.partial(_timed_call, func, args, kwargs)
+            )
+        except Exception:
+            with self._lock:
+                self.failures[name] += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight[pool_name] -= 1
+
+        with self._lock:
+            self.tasks[name] += 1
+            self.wait_ms.append(max(0.0, started - submitted) * 1000)
+            self.run_ms.append(run_s * 1000)
+        return result
+
+    def _queue_depth(self) -> int:
+        """Tasks submitted but waiting for a free worker"""
+        return sum(max(0, count - self.max_workers) for count in self.in_flight.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'max_workers': self.max_workers,
+                'in_flight': sum(self.in_flight.values()),
+                'queue_depth': self._queue_depth(),
+                'max_queue_depth': self.max_queue_depth,
+                'tasks': dict(self.tasks),
+                'failures': dict(self.failures),
+                'wait_ms': summarize_samples(self.wait_ms),
+                'run_ms': summarize_samples(self.run_ms)
+            }
+
+    def reset_after_fork(self):
+        """Give a forked server worker its own pools; the parent's queues and threads cannot be shared"""
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cpu')
+        self.process_pool = ProcessPoolExecutor(max_workers=self.max_workers) if self.mode == 'process' else None
+        self._lock = threading.Lock()
+
+    def recycle_process_pool(self):
+        """
+        Replace the process pool after shared data changed: its workers were forked with the old
+        copy, new ones fork with the current one. Tasks already submitted finish on the old pool.
+        """
+        if self.process_pool is None:
+            return
+        old_pool, self.process_pool = self.process_pool, ProcessPoolExecutor(max_workers=self.max_workers)
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+class EventLoopLagMonitor:
+    """Measures how late a periodic sleep wakes up; anything blocking the loop shows up as lag"""
+
+    def __init__(self, interval_s: float = 0.1, window: int = 600, histogram=None):
+        self.interval_s = interval_s
+        self.lag_ms = collections.deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self.histogram = histogram  # optional metrics histogram, observed in seconds
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            lag = max(0.0, (time.perf_counter() - start - self.interval_s) * 1000)
+            self.lag_ms.append(lag)
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+            if self.histogram is not None:
+                self.histogram.observe(lag / 1000)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'interval_ms': self.interval_s * 1000,
+            'running': self._task is not None and not self._task.done(),
+            'lag_ms': summarize_samples(self.lag_ms),
+            'max_lag_ms_since_start': round(self.max_lag_ms, 3)
+        }
+
+
+def summarize_samples(samples) -> Dict[str, float]:
+    values = sorted(samples)
+    if not values:
+        return {'count': 0, 'avg': 0.0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(values),
+        'avg': round(sum(values) / len(values), 3),
+        'p50': round(values[len(values) // 2], 3),
+        'p99': round(values[min(len(values) - 1, int(len(values) * 0.99))], 3),
+        'max': round(values[-1], 3)
+    }
@@ -0,0 +1,38 @@
+import math
+import numpy as np
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0
+# Length of a degree of latitude on the sphere haversine_km measures on
+KM_PER_DEGREE = math.radians(EARTH_RADIUS_KM)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized great-circle distance in kilometers"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def densify_polyline(lats, lons, spacing_m: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Resample a polyline so consecutive samples are at most `spacing_m` apart.
+    Every vertex is kept. Returns (lat, lon, segment index, distance along the route in km),
+    where segment i runs from vertex i to vertex i + 1; the final vertex belongs to the last segment.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    if lats.size < 2:
+        return lats, lons, np.zeros(lats.size, dtype=np.intp), np.zeros(lats.size)
+
+    lengths_km = haversine_km(lats[:-1], lons[:-1], lats[1:], lons[1:])
+    steps = np.maximum(1, np.ceil(lengths_km * 1000 / spacing_m)).astype(np.intp)
+
+    # Interpolate in lat/lon; segments are short enough that the error is negligible
+    segment = np.repeat(np.arange(steps.size), steps)
+    fraction = (np.arange(segment.size) - np.repeat(np.cumsum(steps) - steps, steps)) / steps[segment]
+    sample_lat = np.append(lats[segment] + (lats[segment + 1] - lats[segment]) * fraction, lats[-1])
+    sample_lon = np.append(lons[segment] + (lons[segment + 1] - lons[segment]) * fraction, lons[-1])
+    start_km = np.concatenate([[0.0], np.cumsum(lengths_km)])
+    distance_km = np.append(start_km[segment] + lengths_km[segment] * fraction, start_km[-1])
+    return sample_lat, sample_lon, np.append(segment, steps.size - 1), distance_km
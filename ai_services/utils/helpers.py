@@ -1,5 +1,17 @@
+import hmac
+import os
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from .metrics import registry
+
+upstream_requests = registry.counter('upstream_requests_total', "Calls to external providers by host and outcome "
+                                     "(ok, http_error for 4xx/5xx, exception for timeouts and connection errors)",
+                                     labels=('provider', 'outcome'))
+upstream_seconds = registry.histogram('upstream_request_duration_seconds', "External provider call latency",
+                                      labels=('provider',))
 
 def get_current_time_info() -> Dict[str, Any]:
     """Get current time information"""
@@ -22,4 +34,36 @@ def format_location_response(success: bool, data: Dict[str, Any] = None, error:
     elif error:
         response['error'] = error
         
-    return response
\ No newline at end of file
+    return response
+
+def http_get(url: str, **kwargs):
+    """requests.get, importing requests on the first call instead of at startup; counted per provider host"""
+    import requests
+    provider = urlsplit(url).hostname or 'unknown'
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, **kwargs)
+    except Exception:
+        upstream_requests.labels(provider, 'exception').inc()
+        raise
+    finally:
+        upstream_seconds.labels(provider).observe(time.perf_counter() - start)
+    upstream_requests.labels(provider, 'ok' if response.ok else 'http_error').inc()
+    return response
+
+def resolve_data_file(name: str, directory: str) -> str:
+    """
+    Path of a file named by an API caller, resolved inside `directory`; raises ValueError
+    for anything that ends up outside it (absolute paths, '..', symlinks pointing elsewhere)
+    """
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError("Path must name a file inside the data directory")
+    return path
+
+def admin_allowed(token: Optional[str], client_host: Optional[str], admin_token: Optional[str]) -> bool:
+    """With an admin token configured the request must carry it; without one only loopback clients pass"""
+    if admin_token:
+        return token is not None and hmac.compare_digest(token.encode(), admin_token.encode())
+    return client_host in ('127.0.0.1', '::1')
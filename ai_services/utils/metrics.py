@@ -0,0 +1,218 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; from sub-millisecond in-process work up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A collector returns (name, type, help, [(labels, value), ...]) families, read when /metrics is scraped
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class Counter:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: 'Histogram'):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram:
+    """Fixed-bucket histogram; an observation is a bisect and two additions under a lock"""
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        """Context manager observing the seconds spent in its block"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class MetricFamily:
+    """
+    A named metric and its children, one per combination of label values.
+    Without labels the family itself can be observed or incremented.
+    """
+
+    def __init__(self, name: str, kind: str, help: str, labelnames: Sequence[str], factory: Callable[[], Any]):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(tuple(str(value) for value in values), self._factory())
+            self._children.setdefault(values, child)
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        # Label values passed as non-strings are also stored under their string form; report that one
+        return sorted((values, child) for values, child in list(self._children.items())
+                      if all(type(value) is str for value in values))
+
+    # Unlabeled shortcuts
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms rendered in the Prometheus text format.
+    Gauges and totals that already live elsewhere (cache and executor stats)
+    are read at scrape time by registered collectors instead of being mirrored.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, kind: str, help: str, labels: Sequence[str], factory: Callable[[], Any]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, kind, help, labels, factory)
+            elif family.kind != kind or family.labelnames != tuple(labels):
+                raise ValueError(f"Metric {name} already registered as {family.kind} with labels {family.labelnames}")
+            return family
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, 'counter', help, labels, Counter)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        bounds = tuple(sorted(buckets))
+        return self._family(name, 'histogram', help, labels, lambda: Histogram(bounds))
+
+    def register_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for family in list(self._families.values()):
+            children = family.children()
+            if not children:
+                continue
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in children:
+                labels = list(zip(family.labelnames, values))
+                if family.kind == 'counter':
+                    lines.append(f"{family.name}{_labels(labels)} {_value(child.value)}")
+                    continue
+                counts, total = child.snapshot()
+                cumulative = 0
+                for bound, count in zip(list(child.bounds) + [math.inf], counts):
+                    cumulative += count
+                    lines.append(f"{family.name}_bucket{_labels(labels + [('le', _value(bound))])} {cumulative}")
+                lines.append(f"{family.name}_sum{_labels(labels)} {_value(total)}")
+                lines.append(f"{family.name}_count{_labels(labels)} {cumulative}")
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {_escape_help(help)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(sorted(labels.items()))} {_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing every HTTP request's duration, labeled by method,
+    route template (not the raw path, so path parameters cannot explode the
+    label set) and status code
+    """
+
+    def __init__(self, app, histogram: MetricFamily):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            self.histogram.labels(scope['method'], route, status).observe(time.perf_counter() - start)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _labels(pairs: List[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, bool) or (isinstance(value, (int, float)) and float(value).is_integer()):
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process-wide registry; each forked worker reports its own
+registry = MetricsRegistry()
@@ -0,0 +1,123 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_worker_index: Optional[int] = None
+
+
+def worker_index() -> Optional[int]:
+    """This process's worker number under serve_preforked, None when serving alone"""
+    return _worker_index
+
+
+def memory_usage(pid: Any = 'self') -> Dict[str, float]:
+    """
+    RSS, PSS and USS (private pages) of a process in MB from /proc/<pid>/smaps_rollup.
+    Pages shared copy-on-write with forked workers count fully in RSS, once
+    overall in PSS, and not at all in USS. Empty where /proc is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.endswith('kB\n')}
+    except (OSError, ValueError, IndexError):
+        return {}
+    return {
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'uss_mb': round((fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024, 1)
+    }
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_preforked(app, host: str, port: int, workers: int, preload: Callable[[], None] = None,
+                    after_fork: Callable[[], None] = None, restart_delay_s: float = 1.0, **uvicorn_kwargs):
+    """
+    Serve `app` from `workers` forked uvicorn processes sharing one listening socket.
+
+    The parent runs `preload` to build everything the workers only read (crime
+    data and its index, keyword tables, models), freezes the garbage collector
+    so collections in the workers do not write to those objects' pages, and then
+    forks; the workers inherit the structures copy-on-write instead of each
+    parsing and indexing the data again. `after_fork` runs first thing in each
+    worker for state that cannot be shared (thread and process pools). Workers
+    that die are re-forked from the parent; SIGTERM or SIGINT stops them all.
+    """
+    import uvicorn
+
+    start = time.perf_counter()
+    if preload is not None:
+        preload()
+    gc.collect()
+    gc.freeze()
+    sock = bind_socket(host, port)
+    logger.info(f"🍴 Shared state ready in {(time.perf_counter() - start) * 1000:.0f} ms "
+                f"({memory_usage().get('rss_mb', '?')} MB), forking {workers} workers on {host}:{port}")
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid:
+            children[pid] = index
+            return
+        global _worker_index
+        _worker_index = index
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        code = 0
+        try:
+            if after_fork is not None:
+                after_fork()
+            uvicorn.Server(uvicorn.Config(app, **uvicorn_kwargs)).run(sockets=[sock])
+        except BaseException as e:
+            if not isinstance(e, KeyboardInterrupt):
+                logger.error(f"❌ Worker {index} failed: {e}")
+                code = 1
+        finally:
+            # Skip the parent's atexit handlers and finalizers
+            os._exit(code)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning(f"⚠️ Worker {index} (pid {pid}) exited with status {status}, restarting")
+        time.sleep(restart_delay_s)
+        if not stopping:
+            spawn(index)
+    sock.close()
+    logger.info("🛑 All workers stopped")
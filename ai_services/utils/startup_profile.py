@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+# Imported on first use by the endpoints that need them; listed so the report shows they stayed out
+DEFERRED_MODULES = ('pandas', 'requests')
+
+
+def parse_importtime(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Entries of `python -X importtime` output, in import order: module, self and
+    cumulative (self plus nested imports) time in ms, and nesting depth
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            entries.append({
+                'module': name.strip(),
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(name) - len(name.lstrip()) - 1) // 2
+            })
+        except ValueError:
+            continue  # the "self [us] | cumulative | imported package" header
+    return entries
+
+
+def profile_imports(module: str = 'server', cwd: str = None, env: Dict[str, str] = None) -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter with -X importtime, so nothing is
+    already cached in sys.modules, and return its per-module import times.
+    Module-level work (building services) shows up as the module's self time.
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=cwd,
+                               env={**os.environ, **(env or {})}, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {completed.stderr.strip().splitlines()[-1:]}")
+    entries = parse_importtime(completed.stderr.splitlines())
+    imported = {entry['module'] for entry in entries}
+    return {
+        'module': module,
+        'wall_ms': round(wall_ms, 1),
+        'import_ms': round(next((e['cumulative_ms'] for e in entries if e['module'] == module), 0.0), 1),
+        'entries': entries,
+        'deferred': [name for name in DEFERRED_MODULES if name not in imported]
+    }
+
+
+def _package(module: str) -> str:
+    """Group third-party modules by top-level package, this service's by module"""
+    parts = module.split('.')
+    return '.'.join(parts[:2]) if parts[0] in ('models', 'utils') else parts[0]
+
+
+def format_report(profile: Dict[str, Any], top: int = 20) -> str:
+    """Text report: slowest packages by self time and slowest modules by cumulative time"""
+    entries = profile['entries']
+    by_package = defaultdict(lambda: [0.0, 0])
+    for entry in entries:
+        totals = by_package[_package(entry['module'])]
+        totals[0] += entry['self_ms']
+        totals[1] += 1
+
+    lines = [f"Startup profile: import {profile['module']} took {profile['import_ms']:.0f} ms "
+             f"({profile['wall_ms']:.0f} ms including interpreter start), {len(entries)} modules",
+             "", f"{'package':<32} {'self ms':>8} {'modules':>8}"]
+    for package, (self_ms, count) in sorted(by_package.items(), key=lambda item: -item[1][0])[:top]:
+        lines.append(f"{package:<32} {self_ms:>8.1f} {count:>8}")
+
+    lines += ["", f"{'module':<48} {'self ms':>8} {'cumul ms':>9}"]
+    for entry in sorted(entries, key=lambda e: -e['cumulative_ms'])[:top]:
+        lines.append(f"{entry['module']:<48} {entry['self_ms']:>8.1f} {entry['cumulative_ms']:>9.1f}")
+
+    if profile['deferred']:
+        lines += ["", f"Not imported at startup (loaded on first use): {', '.join(profile['deferred'])}"]
+    return '\n'.join(lines)
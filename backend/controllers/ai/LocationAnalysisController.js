@@ -1,5 +1,6 @@
 // backend/controllers/ai/LocationAnalysisController.js
 import axios from "axios";
+import { Readable } from "stream";
 
 // AI Service URL
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || "http://localhost:8000";
@@ -173,6 +174,68 @@ class LocationAnalysisController {
         }
     }
 
+    // -----------------------------
+    // 🔷 STREAM MULTIPLE LOCATIONS (NDJSON)
+    // -----------------------------
+    static async analyzeLocationsStream(req, res) {
+        // req emits "close" once its body has been read; only res "close" means the client went away
+        const upstream = new AbortController();
+        let aiStream = null;
+        res.on("close", () => {
+            upstream.abort();
+            if (aiStream) aiStream.destroy();
+        });
+
+        try {
+            // NDJSON bodies are left unparsed by express.json(), so pipe them straight through.
+            // JSON bodies with a locations array are converted to NDJSON on the fly.
+            let body = req;
+            if (Array.isArray(req.body && req.body.locations)) {
+                const { locations } = req.body;
+                body = Readable.from((function* () {
+                    for (const location of locations) {
+                        yield JSON.stringify(location) + "\n";
+                    }
+                })());
+            }
+
+            const aiResponse = await axios.post(
+                `${AI_SERVICE_URL}/ai/analyze-locations-stream`,
+                body, {
+                    headers: { "Content-Type": "application/x-ndjson" },
+                    responseType: "stream",
+                    maxBodyLength: Infinity,
+                    maxContentLength: Infinity,
+                    signal: upstream.signal
+                }
+            );
+
+            aiStream = aiResponse.data;
+            aiStream.on("error", (error) => {
+                // An upstream reset mid-stream: abort the response so the client sees it was cut short
+                console.error("❌ Streaming batch analysis interrupted:", error.message);
+                res.destroy(error);
+            });
+            if (res.destroyed) {
+                aiStream.destroy();
+                return;
+            }
+            res.setHeader("Content-Type", "application/x-ndjson");
+            aiStream.pipe(res);
+        } catch (error) {
+            if (res.destroyed) return;
+            console.error("❌ Streaming batch analysis error:", error.message);
+            if (!res.headersSent) {
+                return res.status(500).json({
+                    success: false,
+                    error: "Streaming batch analysis failed",
+                    details: error.message
+                });
+            }
+            res.end();
+        }
+    }
+
     // -----------------------------
     // 🔷 PATTERN ANALYSIS
     // -----------------------------
@@ -214,6 +277,41 @@ class LocationAnalysisController {
         }
     }
 
+    // -----------------------------
+    // 🔷 ROUTE SCORING
+    // -----------------------------
+    static async scoreRoute(req, res) {
+        try {
+            const { points } = req.body;
+
+            if (!Array.isArray(points) || points.length < 2) {
+                return res.status(400).json({
+                    success: false,
+                    error: "At least two route points are required"
+                });
+            }
+
+            const aiResponse = await axios.post(
+                `${AI_SERVICE_URL}/ai/score-route`,
+                req.body
+            );
+
+            return res.json({
+                success: true,
+                ...aiResponse.data
+            });
+
+        } catch (error) {
+            console.error("❌ Route scoring error:", error.message);
+            const status = error.response ? error.response.status : 500;
+            return res.status(status).json({
+                success: false,
+                error: "Route scoring failed",
+                details: error.response ? error.response.data.detail : error.message
+            });
+        }
+    }
+
     // -----------------------------
     // 🔷 CRIME RISK PREDICTION
     // -----------------------------
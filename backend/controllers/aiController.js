@@ -70,6 +70,33 @@ export const detectEmotion = async(req, res) => {
     }
 };
 
+export const classifyTexts = async(req, res) => {
+    try {
+        const { text, texts } = req.body;
+        const batch = Array.isArray(texts) ? texts : (text ? [text] : []);
+
+        if (batch.length === 0) {
+            return res.status(400).json({ error: "Provide text or a non-empty texts array" });
+        }
+
+        // One call returns intent, emotion and voice trigger for every text
+        const aiResponse = await axios.post(`${AI_SERVICE_URL}/ai/classify-text-batch`, { texts: batch });
+
+        // A single text answers with its own result, so the live path needs one round trip
+        if (!Array.isArray(texts)) {
+            return res.json(aiResponse.data.results[0]);
+        }
+        return res.json(aiResponse.data);
+    } catch (error) {
+        console.error("AI Text Classification Error:", error.message);
+        const status = error.response ? error.response.status : 500;
+        return res.status(status).json({
+            error: "Text classification failed",
+            details: error.response ? error.response.data.detail : error.message
+        });
+    }
+};
+
 export const predictCrime = async(req, res) => {
     try {
         const { lat, lon, time_of_day, weather, user_profile, location_name, area_type } = req.body;
@@ -176,6 +203,28 @@ export const predictCrime = async(req, res) => {
     }
 };
 
+export const predictCrimeBatch = async(req, res) => {
+    try {
+        const { requests } = req.body;
+
+        if (!Array.isArray(requests) || requests.length === 0) {
+            return res.status(400).json({ error: "requests must be a non-empty array" });
+        }
+
+        // One call scores every location; the AI service vectorizes the crime lookups
+        const aiResponse = await axios.post(`${AI_SERVICE_URL}/ai/predict-crime-batch`, { requests });
+
+        return res.json(aiResponse.data);
+    } catch (error) {
+        console.error("AI Batch Crime Prediction Error:", error.message);
+        const status = error.response ? error.response.status : 500;
+        return res.status(status).json({
+            error: "Batch prediction failed",
+            details: error.response ? error.response.data.detail : error.message
+        });
+    }
+};
+
 export const analyzeLocation = async (req, res) => {
     try {
         const { coordinates, accuracy, timestamp, userId, hour, day_of_week, time_of_day } = req.body;
@@ -31,9 +31,11 @@ export const chatWithAssistant = async (req, res) => {
     const messages = historyDoc ? historyDoc.messages : [];
 
     // ---------- AI Service CALL ----------
+    // session_id lets the AI service keep running context instead of re-reading the whole history
     const aiResponse = await axios.post("http://localhost:8000/ai/conversation", {
       user_input: prompt,
       chat_history: messages,
+      session_id: `${userId}:${currentSessionId}`,
     });
 
     const reply = aiResponse.data.reply;
@@ -22,12 +22,24 @@ router.post("/analyze-locations-batch", async(req, res) => {
     LocationAnalysisController.analyzeLocationsBatch(req, res);
 });
 
+// Streaming batch location analysis (NDJSON in, NDJSON out)
+router.post("/analyze-locations-stream", async(req, res) => {
+    console.log("📥 /analyze-locations-stream called");
+    LocationAnalysisController.analyzeLocationsStream(req, res);
+});
+
 // Pattern analysis
 router.post("/analyze-patterns", async(req, res) => {
     console.log("📥 /analyze-patterns called");
     LocationAnalysisController.analyzePatterns(req, res);
 });
 
+// Route risk scoring
+router.post("/score-route", async(req, res) => {
+    console.log("📥 /score-route called");
+    LocationAnalysisController.scoreRoute(req, res);
+});
+
 // Crime risk prediction
 router.post("/predict-crime-risk", async(req, res) => {
     console.log("📥 /predict-crime-risk called");
@@ -2,7 +2,9 @@ import express from "express";
 import {
   checkIntent,
   detectEmotion,
+  classifyTexts,
   predictCrime,
+  predictCrimeBatch,
   analyzeLocation,
   debugLocation,
   chatWithAI,
@@ -12,7 +14,9 @@ const router = express.Router();
 
 router.post("/check-intent", checkIntent);
 router.post("/emotion", detectEmotion);
+router.post("/classify-text", classifyTexts);
 router.post("/predict-crime", predictCrime);
+router.post("/predict-crime-batch", predictCrimeBatch);
 router.post("/analyze-location", analyzeLocation);
 router.post("/debug-location", debugLocation);
 router.post("/conversation", chatWithAI);